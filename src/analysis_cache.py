@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Cache de Resultados de Análise por Fingerprint
+==============================================
+
+Análises do Notebook 4 (vizinhança entre modelos, projeções, ...) dependem
+apenas das matrizes de embeddings e dos parâmetros. Aqui cada resultado é
+salvo num ``.npz`` cuja chave é o hash de:
+
+- fingerprint de cada matriz de entrada (BLAKE2b do conteúdo, forma e dtype;
+  matrizes esparsas pelos arrays CSR; ``np.memmap`` lido em blocos)
+- parâmetros da análise
+
+Reexecutar o notebook com os mesmos embeddings carrega o resultado em
+milissegundos; qualquer mudança nos vetores gera outra chave.
+
+Configuração (config_example.env):
+
+    ANALYSIS_CACHE_DIR=     # Vazio = results/analysis_cache
+
+Exemplo:
+    >>> from analysis_cache import AnalysisCache, array_fingerprint
+    >>> cache = AnalysisCache("topk")
+    >>> key = cache.key(array_fingerprint(embeddings), k=10)
+    >>> cached = cache.load(key)
+    >>> if cached is None:
+    ...     cache.save(key, {"indices": indices}, {"k": 10})
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "results" / "analysis_cache"
+ANALYSIS_CACHE_DIR = Path(os.getenv("ANALYSIS_CACHE_DIR") or DEFAULT_CACHE_DIR)
+
+# Linhas lidas por vez ao calcular o fingerprint de um memmap
+_FINGERPRINT_BLOCK_ROWS = 8192
+
+
+def array_fingerprint(matrix: Any) -> str:
+    """
+    Fingerprint do conteúdo de uma matriz (densa, memmap ou esparsa).
+
+    Args:
+        matrix: np.ndarray, np.memmap ou matriz scipy.sparse
+
+    Returns:
+        str: hash hexadecimal (32 caracteres)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+
+    if sp.issparse(matrix):
+        matrix = sp.csr_matrix(matrix)
+        if not matrix.has_sorted_indices:
+            matrix = matrix.copy()
+            matrix.sort_indices()
+        digest.update(f"csr{matrix.shape}{matrix.dtype}".encode())
+        for part in (matrix.data, matrix.indices, matrix.indptr):
+            digest.update(np.ascontiguousarray(part).tobytes())
+        return digest.hexdigest()
+
+    digest.update(f"dense{matrix.shape}{np.dtype(matrix.dtype)}".encode())
+    if isinstance(matrix, np.memmap) and matrix.ndim > 0:
+        for start in range(0, matrix.shape[0], _FINGERPRINT_BLOCK_ROWS):
+            block = matrix[start:start + _FINGERPRINT_BLOCK_ROWS]
+            digest.update(np.ascontiguousarray(block).tobytes())
+    else:
+        digest.update(np.ascontiguousarray(matrix).tobytes())
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Resultados (arrays + metadados JSON) em ``{cache_dir}/{namespace}/{chave}.npz``"""
+
+    def __init__(self, namespace: str, cache_dir: Optional[Path] = None):
+        """
+        Args:
+            namespace: Tipo de análise (subdiretório)
+            cache_dir: Diretório base (padrão: ANALYSIS_CACHE_DIR)
+        """
+        self.directory = Path(cache_dir or ANALYSIS_CACHE_DIR) / namespace
+
+    @staticmethod
+    def key(*fingerprints: str, **params: Any) -> str:
+        """Chave determinística a partir dos fingerprints e parâmetros"""
+        payload = json.dumps(
+            {"inputs": list(fingerprints), "params": params}, sort_keys=True, default=str
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.npz"
+
+    def load(self, key: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+        """
+        Carrega um resultado salvo.
+
+        Returns:
+            (arrays, metadados) ou None se não existe / está corrompido
+        """
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                arrays = {name: stored[name] for name in stored.files if name != "__metadata__"}
+                metadata = json.loads(str(stored["__metadata__"]))
+            return arrays, metadata
+        except Exception as e:
+            print(f"⚠️  Cache de análise ilegível ({path.name}): {e}")
+            return None
+
+    def save(
+        self,
+        key: str,
+        arrays: Dict[str, np.ndarray],
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        """Salva arrays e metadados (escrita atômica)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp.npz")
+        with os.fdopen(fd, "wb") as handle:
+            np.savez(
+                handle,
+                __metadata__=np.asarray(json.dumps(metadata or {}, default=str)),
+                **arrays,
+            )
+        os.replace(tmp_name, path)
+        return path
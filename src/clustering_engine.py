@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Varredura Paralela de k para K-Means
+====================================
+
+A etapa de clustering avalia k = 2..MAX_CLUSTERS (20) para os cinco tipos de
+embedding: ~100 ajustes independentes, antes executados em série.
+
+Aqui:
+
+1. Cada matriz de embeddings é copiada UMA vez para memória compartilhada
+   (``multiprocessing.shared_memory``); os workers anexam sem cópia. Matrizes
+   do ``embedding_workspace`` (memmap em arquivo) nem são copiadas: os
+   workers mapeiam o mesmo arquivo.
+2. Os pares (embedding, k) são distribuídos num pool de processos (cada
+   worker limitado a 1 thread BLAS/OpenMP, sem disputa de núcleos).
+3. Os valores de k formam cadeias de tamanho fixo (CLUSTERING_CHAIN_LENGTH)
+   alinhadas em k = 2: 2..6, 7..11, ... O primeiro k de cada cadeia parte do
+   k-means++; os demais partem dos centróides de k-1 mais um centróide novo
+   escolhido por amostragem D² (passo do k-means++) — o "warm start" converge
+   em menos iterações. Como as fronteiras dependem só de k, o resultado de um
+   par nunca depende do número de workers nem dos k pedidos; cadeias
+   diferentes rodam em paralelo.
+4. Centróides, rótulos e inércia ficam em ``analysis_cache`` por
+   fingerprint da matriz e parâmetros: só os pares ausentes são ajustados.
+
+O tempo total fica próximo de (tempo serial / núcleos).
+
+Exemplo:
+    >>> from clustering_engine import kmeans_sweep
+    >>> sweep = kmeans_sweep(embeddings_dict, k_values=range(2, 21))
+    >>> sweep.to_frame()                        # inércia e tempo por (embedding, k)
+    >>> sweep.results[("sbert", 20)].labels
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analysis_cache import AnalysisCache, array_fingerprint
+
+MAX_CLUSTERS = int(os.getenv("MAX_CLUSTERS") or 20)
+CLUSTERING_RANDOM_STATE = int(os.getenv("CLUSTERING_RANDOM_STATE") or 42)
+CLUSTERING_METHODS = ("minibatch", "kmeans")
+# Tamanho das cadeias de warm start (1 = todo ajuste parte do k-means++)
+CLUSTERING_CHAIN_LENGTH = int(os.getenv("CLUSTERING_CHAIN_LENGTH") or 5)
+
+# Descritor de uma matriz compartilhada: (tipo "shm"/"file", nome do segmento ou
+# caminho, shape, dtype, offset no arquivo)
+SharedDescriptor = Tuple[str, str, Tuple[int, ...], str, int]
+
+# Estado de cada processo worker (preenchido pelo initializer)
+_worker_matrices: Dict[str, np.ndarray] = {}
+_worker_segments: List[shared_memory.SharedMemory] = []
+
+
+@dataclass
+class ClusteringResult:
+    """Um ajuste de K-Means"""
+
+    k: int
+    centroids: np.ndarray  # (k, n_dims) float32
+    labels: np.ndarray     # (n_docs,) int32
+    inertia: float
+    n_iter: int
+    seconds: float
+    warm_started: bool = False
+
+
+@dataclass
+class SweepResult:
+    """Resultados da varredura: (embedding, k) → ClusteringResult"""
+
+    results: Dict[Tuple[str, int], ClusteringResult] = field(default_factory=dict)
+    seconds: float = 0.0
+    cached: int = 0
+
+    def to_frame(self) -> pd.DataFrame:
+        rows = [
+            {
+                "embedding": name, "k": k, "inertia": result.inertia,
+                "n_iter": result.n_iter, "seconds": result.seconds,
+                "warm_started": result.warm_started,
+            }
+            for (name, k), result in sorted(self.results.items())
+        ]
+        return pd.DataFrame(rows)
+
+    def labels(self, name: str) -> Dict[int, np.ndarray]:
+        """k → rótulos de um embedding"""
+        return {k: result.labels for (emb, k), result in self.results.items() if emb == name}
+
+
+# ----------------------------------------------------------------------
+# Memória compartilhada
+# ----------------------------------------------------------------------
+
+def _share_matrix(
+    matrix: np.ndarray,
+) -> Tuple[Optional[shared_memory.SharedMemory], SharedDescriptor]:
+    # Memmap float32 C-contíguo (ex: embedding_workspace): workers mapeiam o arquivo
+    if (
+        isinstance(matrix, np.memmap) and isinstance(matrix.base, mmap.mmap)
+        and matrix.dtype == np.float32 and matrix.flags["C_CONTIGUOUS"]
+    ):
+        return None, ("file", matrix.filename, matrix.shape, matrix.dtype.str, matrix.offset)
+    segment = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+    shared = np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=segment.buf)
+    shared[:] = matrix
+    return segment, ("shm", segment.name, matrix.shape, matrix.dtype.str, 0)
+
+
+def _init_worker(descriptors: Dict[str, SharedDescriptor]) -> None:
+    from threadpoolctl import threadpool_limits
+
+    # Um núcleo por worker: o paralelismo vem do pool de processos
+    threadpool_limits(1)
+    for name, (kind, location, shape, dtype, offset) in descriptors.items():
+        if kind == "file":
+            _worker_matrices[name] = np.memmap(
+                location, dtype=np.dtype(dtype), mode="r", shape=shape, offset=offset
+            )
+            continue
+        # Workers compartilham o resource tracker do processo principal, que
+        # cria os segmentos e faz o unlink ao final
+        segment = shared_memory.SharedMemory(name=location)
+        _worker_segments.append(segment)
+        _worker_matrices[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+
+
+# ----------------------------------------------------------------------
+# Ajustes
+# ----------------------------------------------------------------------
+
+def _add_centroid(
+    matrix: np.ndarray, centroids: np.ndarray, rng: np.random.Generator
+) -> np.ndarray:
+    """Acrescenta um centróide por amostragem D² (um passo do k-means++)"""
+    sample = matrix[rng.choice(len(matrix), size=min(len(matrix), 20000), replace=False)]
+    distances = (
+        (sample**2).sum(axis=1)[:, None]
+        - 2 * sample @ centroids.T
+        + (centroids**2).sum(axis=1)[None, :]
+    ).min(axis=1)
+    distances = np.maximum(distances, 0)
+    total = distances.sum()
+    probabilities = distances / total if total > 0 else None
+    new_centroid = sample[rng.choice(len(sample), p=probabilities)]
+    return np.vstack([centroids, new_centroid]).astype(np.float32)
+
+
+def _fit_one(
+    matrix: np.ndarray,
+    k: int,
+    init: Optional[np.ndarray],
+    method: str,
+    random_state: int,
+    batch_size: int,
+) -> ClusteringResult:
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+
+    start = time.perf_counter()
+    warm_started = init is not None
+    if warm_started:
+        rng = np.random.default_rng(random_state + k)
+        init = _add_centroid(matrix, init, rng)
+
+    if method == "minibatch":
+        model = MiniBatchKMeans(
+            n_clusters=k,
+            init=init if warm_started else "k-means++",
+            n_init=1 if warm_started else 3,
+            batch_size=batch_size,
+            random_state=random_state,
+        )
+    else:
+        model = KMeans(
+            n_clusters=k,
+            init=init if warm_started else "k-means++",
+            n_init=1,
+            random_state=random_state,
+        )
+    model.fit(matrix)
+
+    return ClusteringResult(
+        k=k,
+        centroids=model.cluster_centers_.astype(np.float32),
+        labels=model.labels_.astype(np.int32),
+        inertia=float(model.inertia_),
+        n_iter=int(model.n_iter_),
+        seconds=time.perf_counter() - start,
+        warm_started=warm_started,
+    )
+
+
+def _fit_chain(
+    name: str,
+    k_values: List[int],
+    init: Optional[np.ndarray],
+    method: str,
+    random_state: int,
+    batch_size: int,
+    matrix: Optional[np.ndarray] = None,
+) -> Tuple[str, List[ClusteringResult]]:
+    """Ajusta k consecutivos, cada um partindo dos centróides do anterior"""
+    if matrix is None:
+        matrix = _worker_matrices[name]
+    results = []
+    for k in k_values:
+        result = _fit_one(matrix, k, init, method, random_state, batch_size)
+        results.append(result)
+        init = result.centroids
+    return name, results
+
+
+def _chain_start(k: int, chain_length: int) -> int:
+    """Primeiro k da cadeia de k (cadeias alinhadas em k = 2)"""
+    return k if k < 2 else k - (k - 2) % chain_length
+
+
+def _plan_chains(
+    needed: Dict[str, List[int]], chain_length: int
+) -> List[Tuple[str, List[int]]]:
+    """
+    Divide os k a ajustar em sequências consecutivas dentro de cada cadeia.
+
+    Uma sequência começa no início da cadeia (k-means++) ou logo após um k
+    já ajustado (warm start pelos centróides em cache); a divisão independe
+    do número de workers.
+    """
+    runs = []
+    for name, ks in needed.items():
+        run: List[int] = []
+        for k in ks:
+            if run and (k != run[-1] + 1 or k == _chain_start(k, chain_length)):
+                runs.append((name, run))
+                run = []
+            run.append(k)
+        if run:
+            runs.append((name, run))
+    # Sequências com k maiores primeiro: são as mais lentas
+    return sorted(runs, key=lambda run: -sum(run[1]))
+
+
+def kmeans_sweep(
+    embeddings: Dict[str, np.ndarray],
+    k_values: Iterable[int] = range(2, MAX_CLUSTERS + 1),
+    method: str = "minibatch",
+    random_state: int = CLUSTERING_RANDOM_STATE,
+    n_workers: Optional[int] = None,
+    batch_size: int = 2048,
+    chain_length: int = CLUSTERING_CHAIN_LENGTH,
+    use_cache: bool = True,
+    verbose: bool = True,
+) -> SweepResult:
+    """
+    Ajusta K-Means para todos os pares (embedding, k) em paralelo.
+
+    Args:
+        embeddings: Nome → matriz densa (n_docs, n_dims)
+        k_values: Valores de k (padrão: 2..MAX_CLUSTERS)
+        method: "minibatch" (MiniBatchKMeans) ou "kmeans" (KMeans completo)
+        random_state: Semente (padrão: CLUSTERING_RANDOM_STATE)
+        n_workers: Processos (padrão: todos os núcleos; 1 = no próprio processo)
+        batch_size: Tamanho do mini-batch
+        chain_length: k por cadeia de warm start (padrão: CLUSTERING_CHAIN_LENGTH)
+        use_cache: Lê/grava centróides e rótulos em ``analysis_cache``
+        verbose: Imprime o progresso
+
+    Returns:
+        SweepResult
+    """
+    if method not in CLUSTERING_METHODS:
+        raise ValueError(f"Método desconhecido: {method} (opções: {CLUSTERING_METHODS})")
+    if chain_length < 1:
+        raise ValueError(f"chain_length deve ser >= 1 (recebido {chain_length})")
+    start = time.perf_counter()
+    k_values = sorted(set(int(k) for k in k_values))
+    n_workers = n_workers or os.cpu_count() or 1
+    # Memmaps float32 (embedding_workspace) seguem sem cópia
+    matrices = {
+        name: matrix if isinstance(matrix, np.memmap) and matrix.dtype == np.float32
+        else np.ascontiguousarray(matrix, dtype=np.float32)
+        for name, matrix in embeddings.items()
+    }
+
+    cache = AnalysisCache("clustering")
+    # O início da cadeia entra na chave: o resultado de k depende de onde o
+    # warm start começou
+    params = dict(
+        method=method, random_state=random_state, batch_size=batch_size,
+        chain_length=chain_length,
+    )
+    fingerprints = {
+        name: array_fingerprint(matrix) if use_cache else None
+        for name, matrix in matrices.items()
+    }
+    keys: Dict[Tuple[str, int], str] = {}
+    stored: Dict[Tuple[str, int], Optional[ClusteringResult]] = {}
+    sweep = SweepResult()
+
+    def cached(name: str, k: int) -> Optional[ClusteringResult]:
+        if (name, k) not in stored:
+            stored[(name, k)] = None
+            if use_cache:
+                keys[(name, k)] = cache.key(
+                    fingerprints[name], k=k, chain_start=_chain_start(k, chain_length),
+                    **params,
+                )
+                entry = cache.load(keys[(name, k)])
+                if entry is not None:
+                    arrays, metadata = entry
+                    stored[(name, k)] = ClusteringResult(
+                        k=k, centroids=arrays["centroids"], labels=arrays["labels"],
+                        **metadata,
+                    )
+        return stored[(name, k)]
+
+    # Resultados em cache; k ausentes e os k anteriores da cadeia até o
+    # último em cache (o warm start precisa deles)
+    needed: Dict[str, List[int]] = {}
+    for name in matrices:
+        to_fit = set()
+        for k in k_values:
+            result = cached(name, k)
+            if result is not None:
+                sweep.results[(name, k)] = result
+                sweep.cached += 1
+                continue
+            to_fit.add(k)
+            previous = k - 1
+            while previous >= _chain_start(k, chain_length) and cached(name, previous) is None:
+                to_fit.add(previous)
+                previous -= 1
+        if to_fit:
+            needed[name] = sorted(to_fit)
+
+    chains = _plan_chains(needed, chain_length)
+    if verbose:
+        n_fits = sum(len(ks) for _, ks in chains)
+        print(f"🔄 K-Means ({method}): {n_fits} ajustes em {len(chains)} cadeias, "
+              f"{n_workers} workers ({sweep.cached} em cache)")
+
+    def chain_init(name: str, ks: List[int]) -> Optional[np.ndarray]:
+        if ks[0] == _chain_start(ks[0], chain_length):
+            return None
+        return stored[(name, ks[0] - 1)].centroids
+
+    requested = set(k_values)
+
+    def store(name: str, results: List[ClusteringResult]) -> None:
+        for result in results:
+            if result.k in requested:
+                sweep.results[(name, result.k)] = result
+            if use_cache:
+                cache.save(
+                    keys[(name, result.k)],
+                    {"centroids": result.centroids, "labels": result.labels},
+                    {
+                        "inertia": result.inertia, "n_iter": result.n_iter,
+                        "seconds": result.seconds, "warm_started": result.warm_started,
+                    },
+                )
+        if verbose:
+            print(f"   ✅ {name:<9} k={results[0].k}..{results[-1].k} "
+                  f"({sum(r.seconds for r in results):.1f}s)")
+
+    if chains and n_workers == 1:
+        from threadpoolctl import threadpool_limits
+
+        with threadpool_limits(1):
+            for name, ks in chains:
+                store(*_fit_chain(name, ks, chain_init(name, ks), method,
+                                  random_state, batch_size, matrix=matrices[name]))
+    elif chains:
+        segments = []
+        try:
+            descriptors = {}
+            for name in needed:
+                segment, descriptors[name] = _share_matrix(matrices[name])
+                if segment is not None:
+                    segments.append(segment)
+
+            with ProcessPoolExecutor(
+                max_workers=n_workers, initializer=_init_worker, initargs=(descriptors,)
+            ) as executor:
+                futures = [
+                    executor.submit(_fit_chain, name, ks, chain_init(name, ks), method,
+                                    random_state, batch_size)
+                    for name, ks in chains
+                ]
+                for future in as_completed(futures):
+                    store(*future.result())
+        finally:
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+    sweep.seconds = time.perf_counter() - start
+    if verbose:
+        print(f"✅ Varredura concluída em {sweep.seconds:.1f}s")
+    return sweep
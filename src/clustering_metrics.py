@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Métricas de Qualidade de Clustering Escaláveis
+==============================================
+
+``silhouette_score`` exato precisa de todas as distâncias par a par: com 18k
+pontos é a etapa mais lenta e que mais consome memória ao avaliar cada k.
+
+Este módulo oferece:
+
+- **Silhouette exato em blocos**: distâncias de um bloco de linhas contra
+  todos os pontos (um matmul), somadas por cluster com um produto pela
+  matriz one-hot dos rótulos. Memória limitada a um bloco por thread
+  (``SIMILARITY_MEMORY_BUDGET_MB``); blocos em paralelo.
+- **Silhouette por amostra estratificada**: silhouettes exatos (contra todos
+  os pontos) de uma amostra estratificada por cluster, com média ponderada
+  e intervalo de confiança do estimador estratificado.
+- **Índices por centróide**: Davies-Bouldin e Calinski-Harabasz a partir de
+  somas por cluster e distâncias ao centróide, em blocos de linhas float32.
+- **ARI / NMI** contra os rótulos ``target`` do ``documents_dataset``.
+
+``evaluate_clusterings`` calcula tudo para vários k em paralelo (threads: o
+BLAS libera o GIL) e devolve um DataFrame, pronto para os rótulos de
+``clustering_engine.kmeans_sweep``. A matriz é centralizada uma única vez e
+compartilhada pelas threads; cada thread só aloca seus blocos.
+
+Exemplo:
+    >>> from clustering_metrics import evaluate_clusterings
+    >>> metrics = evaluate_clusterings(embeddings, sweep.labels("sbert"),
+    ...                                target=df['target'], silhouette="sample")
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from similarity_search import SIMILARITY_MEMORY_BUDGET_MB
+
+SILHOUETTE_MODES = ("exact", "sample", None)
+
+
+@dataclass
+class SilhouetteEstimate:
+    """Silhouette médio estimado por amostra estratificada"""
+
+    mean: float
+    ci_low: float
+    ci_high: float
+    sample_size: int
+    confidence: float
+
+
+def center_matrix(matrix: np.ndarray) -> np.ndarray:
+    """Cópia float32 centralizada (reduz o cancelamento de ||a||² + ||b||² - 2a·b)"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return matrix - matrix.mean(axis=0, dtype=np.float64).astype(np.float32)
+
+
+def _prepare(matrix: np.ndarray, labels: Sequence[int], centered: bool = False):
+    matrix = np.asarray(matrix, dtype=np.float32) if centered else center_matrix(matrix)
+    _, codes = np.unique(np.asarray(labels), return_inverse=True)
+    return matrix, codes.astype(np.int64)
+
+
+def _silhouette_rows(
+    matrix: np.ndarray,
+    squared_norms: np.ndarray,
+    codes: np.ndarray,
+    one_hot: np.ndarray,
+    cluster_sizes: np.ndarray,
+    rows: np.ndarray,
+) -> np.ndarray:
+    """Silhouette exato das linhas ``rows`` (distâncias contra todos os pontos)"""
+    products = matrix[rows] @ matrix.T
+    distances = squared_norms[rows, None] + squared_norms[None, :] - 2 * products
+    np.maximum(distances, 0, out=distances)
+    np.sqrt(distances, out=distances)
+    # A distância de um ponto a si mesmo é exatamente 0
+    distances[np.arange(len(rows)), rows] = 0
+
+    cluster_sums = distances @ one_hot  # (linhas, k)
+    own = codes[rows]
+    own_sizes = cluster_sizes[own]
+
+    a = cluster_sums[np.arange(len(rows)), own] / np.maximum(own_sizes - 1, 1)
+    means = cluster_sums / cluster_sizes[None, :]
+    means[np.arange(len(rows)), own] = np.inf
+    b = means.min(axis=1)
+
+    scores = (b - a) / np.maximum(np.maximum(a, b), np.finfo(np.float32).tiny)
+    # Convenção do scikit-learn: pontos em clusters unitários valem 0
+    scores[own_sizes == 1] = 0.0
+    return scores.astype(np.float64)
+
+
+def _row_block(n_docs: int, n_threads: int, memory_budget_mb: Optional[float]) -> int:
+    budget = (memory_budget_mb or SIMILARITY_MEMORY_BUDGET_MB) * 2**20 / n_threads
+    # distâncias float32 + cópia temporária do matmul
+    return int(max(1, min(n_docs, budget // (8 * max(n_docs, 1)))))
+
+
+def silhouette_samples_blocked(
+    matrix: np.ndarray,
+    labels: Sequence[int],
+    rows: Optional[np.ndarray] = None,
+    memory_budget_mb: Optional[float] = None,
+    n_threads: Optional[int] = None,
+    centered: bool = False,
+) -> np.ndarray:
+    """
+    Silhouette de cada ponto (ou de ``rows``), em blocos de memória limitada.
+
+    Args:
+        matrix: Embeddings (n_docs, n_dims)
+        labels: Rótulo de cluster de cada documento
+        rows: Linhas a avaliar (padrão: todas)
+        memory_budget_mb: Orçamento somando as threads (padrão: SIMILARITY_MEMORY_BUDGET_MB)
+        n_threads: Threads (padrão: todos os núcleos)
+        centered: ``matrix`` já vem de ``center_matrix`` (evita outra cópia)
+
+    Returns:
+        np.ndarray float64 com um silhouette por linha avaliada
+    """
+    matrix, codes = _prepare(matrix, labels, centered)
+    n_docs = len(codes)
+    rows = np.arange(n_docs) if rows is None else np.asarray(rows, dtype=np.int64)
+    n_clusters = int(codes.max()) + 1 if n_docs else 0
+    if n_clusters < 2:
+        raise ValueError("Silhouette requer pelo menos 2 clusters")
+
+    squared_norms = np.einsum("ij,ij->i", matrix, matrix)
+    one_hot = np.zeros((n_docs, n_clusters), dtype=np.float32)
+    one_hot[np.arange(n_docs), codes] = 1.0
+    cluster_sizes = np.bincount(codes, minlength=n_clusters).astype(np.float64)
+
+    n_threads = n_threads or os.cpu_count() or 1
+    block = _row_block(n_docs, n_threads, memory_budget_mb)
+    blocks = [rows[start:start + block] for start in range(0, len(rows), block)]
+
+    def run(block_rows: np.ndarray) -> np.ndarray:
+        return _silhouette_rows(
+            matrix, squared_norms, codes, one_hot, cluster_sizes, block_rows
+        )
+
+    if n_threads == 1 or len(blocks) == 1:
+        parts = [run(block_rows) for block_rows in blocks]
+    else:
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            parts = list(executor.map(run, blocks))
+    return np.concatenate(parts) if parts else np.empty(0)
+
+
+def silhouette_blocked(matrix: np.ndarray, labels: Sequence[int], **kwargs) -> float:
+    """Silhouette médio exato (mesmo valor de ``sklearn.metrics.silhouette_score``)"""
+    return float(silhouette_samples_blocked(matrix, labels, **kwargs).mean())
+
+
+def silhouette_sampled(
+    matrix: np.ndarray,
+    labels: Sequence[int],
+    sample_size: int = 2000,
+    confidence: float = 0.95,
+    random_state: int = 42,
+    **kwargs,
+) -> SilhouetteEstimate:
+    """
+    Silhouette médio estimado por amostragem estratificada por cluster.
+
+    Cada ponto amostrado tem silhouette EXATO (distâncias contra todos os
+    pontos); a média é ponderada pelo tamanho de cada cluster e o intervalo
+    vem da variância do estimador estratificado (com correção de população
+    finita).
+
+    Args:
+        matrix: Embeddings (n_docs, n_dims)
+        labels: Rótulo de cluster de cada documento
+        sample_size: Tamanho total da amostra (alocação proporcional, >= 2 por cluster)
+        confidence: Nível de confiança do intervalo
+        random_state: Semente da amostragem
+        **kwargs: Repassados a ``silhouette_samples_blocked``
+
+    Returns:
+        SilhouetteEstimate
+    """
+    labels = np.asarray(labels)
+    clusters, codes = np.unique(labels, return_inverse=True)
+    n_docs = len(codes)
+    sizes = np.bincount(codes)
+    rng = np.random.default_rng(random_state)
+
+    # Alocação proporcional por cluster
+    allocation = np.minimum(
+        sizes, np.maximum(2, np.round(sample_size * sizes / n_docs)).astype(np.int64)
+    )
+    strata = [
+        rng.choice(np.flatnonzero(codes == cluster), size=int(allocation[cluster]), replace=False)
+        for cluster in range(len(clusters))
+    ]
+    rows = np.concatenate(strata)
+    scores = silhouette_samples_blocked(matrix, labels, rows=rows, **kwargs)
+
+    weights = sizes / n_docs
+    mean = 0.0
+    variance = 0.0
+    offset = 0
+    for cluster, stratum in enumerate(strata):
+        stratum_scores = scores[offset:offset + len(stratum)]
+        offset += len(stratum)
+        n_h, size_h = len(stratum), sizes[cluster]
+        mean += weights[cluster] * stratum_scores.mean()
+        if n_h > 1:
+            finite_population = 1 - n_h / size_h
+            variance += (
+                weights[cluster] ** 2 * stratum_scores.var(ddof=1) / n_h * finite_population
+            )
+
+    margin = norm.ppf(0.5 + confidence / 2) * np.sqrt(variance)
+    return SilhouetteEstimate(
+        mean=float(mean),
+        ci_low=float(mean - margin),
+        ci_high=float(mean + margin),
+        sample_size=len(rows),
+        confidence=confidence,
+    )
+
+
+def centroid_indices(
+    matrix: np.ndarray,
+    labels: Sequence[int],
+    memory_budget_mb: Optional[float] = None,
+) -> Dict[str, float]:
+    """
+    Davies-Bouldin e Calinski-Harabasz a partir de somas por cluster.
+
+    Somas e distâncias ao centróide são calculadas em blocos de linhas
+    float32 (sem cópias da matriz inteira); só os acumuladores por cluster
+    ficam em float64.
+
+    Args:
+        matrix: Embeddings (n_docs, n_dims); de preferência já centralizados
+        labels: Rótulo de cluster de cada documento
+        memory_budget_mb: Orçamento dos blocos (padrão: SIMILARITY_MEMORY_BUDGET_MB)
+
+    Returns:
+        Dict com 'davies_bouldin' (menor = melhor) e 'calinski_harabasz' (maior = melhor)
+    """
+    _, codes = np.unique(np.asarray(labels), return_inverse=True)
+    n_docs, n_clusters = len(codes), int(codes.max()) + 1
+    if not 1 < n_clusters < n_docs:
+        raise ValueError("Os índices requerem 2 <= clusters < documentos")
+
+    n_dims = matrix.shape[1]
+    budget = (memory_budget_mb or SIMILARITY_MEMORY_BUDGET_MB) * 2**20
+    # bloco float32 + diferença ao centróide + one-hot do bloco
+    block = int(max(1, min(n_docs, budget // (4 * (2 * n_dims + n_clusters)))))
+    starts = range(0, n_docs, block)
+
+    sizes = np.bincount(codes, minlength=n_clusters).astype(np.float64)
+    sums = np.zeros((n_clusters, n_dims))
+    for start in starts:
+        rows = np.asarray(matrix[start:start + block], dtype=np.float32)
+        one_hot = np.zeros((len(rows), n_clusters), dtype=np.float32)
+        one_hot[np.arange(len(rows)), codes[start:start + block]] = 1.0
+        sums += one_hot.T @ rows
+    centroids = sums / sizes[:, None]
+    overall = sums.sum(axis=0) / n_docs
+    centroids32 = centroids.astype(np.float32)
+
+    # Calinski-Harabasz: dispersão entre / dentro dos clusters
+    distances_to_centroid = np.empty(n_docs)
+    for start in starts:
+        rows = np.asarray(matrix[start:start + block], dtype=np.float32)
+        diff = rows - centroids32[codes[start:start + block]]
+        distances_to_centroid[start:start + block] = np.sqrt(
+            np.einsum("ij,ij->i", diff, diff, dtype=np.float64)
+        )
+    within = float((distances_to_centroid**2).sum())
+    between = float((sizes * ((centroids - overall) ** 2).sum(axis=1)).sum())
+    calinski = (
+        1.0 if within == 0
+        else between * (n_docs - n_clusters) / (within * (n_clusters - 1))
+    )
+
+    # Davies-Bouldin: dispersão média de cada cluster vs distância entre centróides
+    scatter = np.bincount(codes, weights=distances_to_centroid, minlength=n_clusters) / sizes
+    centroid_distances = np.linalg.norm(centroids[:, None, :] - centroids[None, :, :], axis=2)
+    if np.allclose(scatter, 0) or np.allclose(centroid_distances, 0):
+        davies_bouldin = 0.0
+    else:
+        # Mesma convenção do scikit-learn: centróides coincidentes não contam
+        centroid_distances[centroid_distances == 0] = np.inf
+        ratios = (scatter[:, None] + scatter[None, :]) / centroid_distances
+        davies_bouldin = float(np.mean(ratios.max(axis=1)))
+
+    return {"davies_bouldin": davies_bouldin, "calinski_harabasz": float(calinski)}
+
+
+def external_indices(labels: Sequence[int], target: Sequence[int]) -> Dict[str, float]:
+    """ARI e NMI contra os rótulos verdadeiros (ex: coluna ``target``)"""
+    from sklearn.metrics import adjusted_rand_score, normalized_mutual_info_score
+
+    return {
+        "ari": float(adjusted_rand_score(target, labels)),
+        "nmi": float(normalized_mutual_info_score(target, labels)),
+    }
+
+
+def evaluate_clusterings(
+    matrix: np.ndarray,
+    labels_by_k: Dict[int, Sequence[int]],
+    target: Optional[Sequence[int]] = None,
+    silhouette: Optional[str] = "sample",
+    sample_size: int = 2000,
+    random_state: int = 42,
+    n_threads: Optional[int] = None,
+    memory_budget_mb: Optional[float] = None,
+) -> pd.DataFrame:
+    """
+    Métricas de qualidade para vários k, avaliados em paralelo.
+
+    Args:
+        matrix: Embeddings (n_docs, n_dims)
+        labels_by_k: k → rótulos (ex: ``SweepResult.labels("sbert")``)
+        target: Rótulos verdadeiros (habilita ARI/NMI)
+        silhouette: "exact" (em blocos), "sample" (estratificado, com IC) ou None
+        sample_size: Tamanho da amostra no modo "sample"
+        random_state: Semente da amostragem
+        n_threads: Threads (padrão: todos os núcleos; uma por k)
+        memory_budget_mb: Orçamento de memória dos blocos (somando as threads)
+
+    Returns:
+        DataFrame com uma linha por k
+    """
+    if silhouette not in SILHOUETTE_MODES:
+        raise ValueError(f"Modo de silhouette desconhecido: {silhouette}")
+    # Uma cópia centralizada para todos os k (índices por centróide não mudam
+    # com a translação)
+    matrix = center_matrix(matrix)
+    n_threads = n_threads or os.cpu_count() or 1
+    # Threads divididas entre os k; cada silhouette usa uma fatia do orçamento
+    budget = (memory_budget_mb or SIMILARITY_MEMORY_BUDGET_MB) / max(
+        min(n_threads, len(labels_by_k)), 1
+    )
+
+    def evaluate(k: int) -> Dict[str, float]:
+        labels = np.asarray(labels_by_k[k])
+        row: Dict[str, float] = {"k": k}
+        if silhouette == "exact":
+            row["silhouette"] = silhouette_blocked(
+                matrix, labels, memory_budget_mb=budget, n_threads=1, centered=True
+            )
+        elif silhouette == "sample":
+            estimate = silhouette_sampled(
+                matrix, labels, sample_size=sample_size, random_state=random_state,
+                memory_budget_mb=budget, n_threads=1, centered=True,
+            )
+            row.update(
+                silhouette=estimate.mean,
+                silhouette_ci_low=estimate.ci_low,
+                silhouette_ci_high=estimate.ci_high,
+            )
+        row.update(centroid_indices(matrix, labels, memory_budget_mb=budget))
+        if target is not None:
+            row.update(external_indices(labels, target))
+        return row
+
+    ks = sorted(labels_by_k)
+    with ThreadPoolExecutor(max_workers=min(n_threads, max(len(ks), 1))) as executor:
+        rows = list(executor.map(evaluate, ks))
+    return pd.DataFrame(rows)
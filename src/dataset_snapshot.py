@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Snapshot Local do Dataset em Parquet
+====================================
+
+Os Notebooks 2, 3 e 4 percorriam os 18k documentos do ``documents_dataset``
+com a Scroll API a cada inicialização (~19 requisições e toda a
+decodificação JSON), mesmo sem nenhuma mudança no índice.
+
+Aqui o DataFrame carregado é gravado num arquivo Parquet local junto com o
+fingerprint do índice, obtido com UMA requisição barata (``size=1``, sem
+``_source``):
+
+- número de documentos (``hits.total``, exato)
+- maior ``_seq_no`` e seu ``_primary_term``: qualquer inserção, atualização
+  ou remoção incrementa o ``_seq_no``
+- maior ``created_at``: distingue um índice recriado (``_seq_no`` reinicia)
+
+Se o fingerprint ainda bate, o DataFrame vem do Parquet (leitura colunar,
+sub-segundo, com os mesmos dtypes: ``category`` categórica, ``target``
+compacto); senão, o scroll completo é feito e o snapshot é regravado.
+Um snapshot com mais colunas atende pedidos de subconjuntos (ex: o
+Notebook 4 lê só ``doc_id``, ``category`` e ``target``).
+
+Requer ``pyarrow``; sem ele (ou sem o fingerprint) cai no scroll normal.
+
+Configuração (config_example.env):
+
+    DATASET_SNAPSHOT_DIR=   # Vazio = results/snapshots
+
+Exemplo:
+    >>> from dataset_snapshot import load_documents_with_snapshot
+    >>> df = load_documents_with_snapshot(es, "documents_dataset")
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+from elasticsearch import Elasticsearch
+
+from elasticsearch_helpers import (
+    load_all_documents_from_elasticsearch, resolve_document_columns, string_storage_dtype
+)
+
+DEFAULT_SNAPSHOT_DIR = Path(__file__).resolve().parent.parent / "results" / "snapshots"
+DATASET_SNAPSHOT_DIR = Path(os.getenv("DATASET_SNAPSHOT_DIR") or DEFAULT_SNAPSHOT_DIR)
+
+
+def index_fingerprint(es_client: Elasticsearch, index_name: str) -> Optional[str]:
+    """
+    Fingerprint do estado do índice com uma única requisição.
+
+    Returns:
+        str hexadecimal ou None se o índice não pôde ser consultado
+    """
+    try:
+        response = es_client.search(
+            index=index_name,
+            body={
+                "size": 1,
+                "_source": False,
+                "track_total_hits": True,
+                "seq_no_primary_term": True,
+                "sort": [{"_seq_no": "desc"}],
+                "aggs": {"max_created_at": {"max": {"field": "created_at"}}},
+            },
+        )
+    except Exception as e:
+        print(f"⚠️  Fingerprint do índice '{index_name}' indisponível: {e}")
+        return None
+
+    hits = response['hits']['hits']
+    state = {
+        "index": index_name,
+        "count": response['hits']['total']['value'],
+        "max_seq_no": hits[0].get('_seq_no') if hits else None,
+        "primary_term": hits[0].get('_primary_term') if hits else None,
+        "max_created_at": (
+            response.get('aggregations', {}).get('max_created_at', {}).get('value')
+        ),
+    }
+    payload = json.dumps(state, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class DatasetSnapshot:
+    """Parquet + manifesto JSON por índice em ``{snapshot_dir}/{índice}.parquet``"""
+
+    def __init__(self, snapshot_dir: Optional[Path] = None):
+        """
+        Args:
+            snapshot_dir: Diretório dos snapshots (padrão: DATASET_SNAPSHOT_DIR)
+        """
+        self.directory = Path(snapshot_dir or DATASET_SNAPSHOT_DIR)
+
+    def _paths(self, index_name: str):
+        return (
+            self.directory / f"{index_name}.parquet",
+            self.directory / f"{index_name}.json",
+        )
+
+    def manifest(self, index_name: str) -> Optional[Dict[str, Any]]:
+        """Manifesto do snapshot (fingerprint, colunas, linhas) ou None"""
+        _, manifest_path = self._paths(index_name)
+        if not manifest_path.exists():
+            return None
+        try:
+            return json.loads(manifest_path.read_text(encoding="utf-8"))
+        except Exception:
+            return None
+
+    def load(
+        self, index_name: str, fingerprint: str, columns: Sequence[str]
+    ) -> Optional[pd.DataFrame]:
+        """
+        Lê o snapshot se o fingerprint bate e ele contém ``columns``.
+
+        Returns:
+            DataFrame (só as colunas pedidas) ou None
+        """
+        manifest = self.manifest(index_name)
+        if manifest is None or manifest.get("fingerprint") != fingerprint:
+            return None
+        if not set(columns) <= set(manifest.get("columns", [])):
+            return None
+        parquet_path, _ = self._paths(index_name)
+        try:
+            df = pd.read_parquet(parquet_path, columns=list(columns))
+        except Exception as e:
+            print(f"⚠️  Snapshot ilegível ({parquet_path.name}): {e}")
+            return None
+        return df if len(df) == manifest.get("rows") else None
+
+    def save(self, index_name: str, fingerprint: str, df: pd.DataFrame) -> Optional[Path]:
+        """
+        Grava o snapshot (Parquet atômico, depois o manifesto).
+
+        Um snapshot válido com mais colunas não é substituído por um menor.
+
+        Returns:
+            Caminho do Parquet ou None se não gravado
+        """
+        current = self.manifest(index_name)
+        if (
+            current is not None and current.get("fingerprint") == fingerprint
+            and set(df.columns) < set(current.get("columns", []))
+        ):
+            return None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        parquet_path, manifest_path = self._paths(index_name)
+        # Sem manifesto, um Parquet pela metade nunca é considerado válido
+        manifest_path.unlink(missing_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp.parquet")
+        os.close(fd)
+        try:
+            df.to_parquet(tmp_name, index=False)
+            os.replace(tmp_name, parquet_path)
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+
+        manifest = {
+            "index": index_name,
+            "fingerprint": fingerprint,
+            "columns": list(df.columns),
+            "rows": len(df),
+            "created_at": time.time(),
+        }
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp.json")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, indent=2)
+        os.replace(tmp_name, manifest_path)
+        return parquet_path
+
+    def clear(self, index_name: str) -> None:
+        """Remove o snapshot de um índice"""
+        for path in self._paths(index_name):
+            path.unlink(missing_ok=True)
+
+
+def _apply_string_storage(df: pd.DataFrame, string_storage: Optional[str]) -> pd.DataFrame:
+    string_dtype = string_storage_dtype(string_storage)
+    if string_dtype is None:
+        return df
+    for column in ("doc_id", "text"):
+        if column in df.columns:
+            df[column] = df[column].astype(string_dtype)
+    return df
+
+
+def load_documents_with_snapshot(
+    es_client: Elasticsearch,
+    index_name: str = "documents_dataset",
+    columns: Optional[Sequence[str]] = None,
+    string_storage: Optional[str] = None,
+    use_snapshot: bool = True,
+    snapshot: Optional[DatasetSnapshot] = None,
+    verbose: bool = True,
+    **scroll_kwargs,
+) -> pd.DataFrame:
+    """
+    ``load_all_documents_from_elasticsearch`` com snapshot Parquet local.
+
+    Args:
+        es_client: Cliente Elasticsearch conectado
+        index_name: Índice de documentos
+        columns: Colunas desejadas (ver ``load_all_documents_from_elasticsearch``)
+        string_storage: None, "pyarrow" ou "python"
+        use_snapshot: False força o scroll completo (sem ler nem gravar snapshot)
+        snapshot: DatasetSnapshot a usar (padrão: DATASET_SNAPSHOT_DIR)
+        verbose: Imprime a origem dos dados e o progresso do scroll
+        **scroll_kwargs: batch_size, scroll_timeout
+
+    Returns:
+        pd.DataFrame ordenado por doc_id
+    """
+    columns: List[str] = resolve_document_columns(columns)
+    fingerprint = None
+    if use_snapshot and _parquet_available():
+        snapshot = snapshot or DatasetSnapshot()
+        fingerprint = index_fingerprint(es_client, index_name)
+    elif use_snapshot and verbose:
+        print("⚠️  pyarrow não instalado - snapshot Parquet desativado")
+
+    if fingerprint is not None:
+        start = time.perf_counter()
+        df = snapshot.load(index_name, fingerprint, columns)
+        if df is not None:
+            if verbose:
+                print(f"⚡ Snapshot local de '{index_name}' válido: {len(df):,} documentos "
+                      f"em {time.perf_counter() - start:.2f}s (sem scroll)")
+            return _apply_string_storage(df, string_storage)
+        if verbose:
+            print(f"🔄 Snapshot de '{index_name}' ausente ou desatualizado - fazendo scroll")
+
+    df = load_all_documents_from_elasticsearch(
+        es_client, index_name, verbose=verbose, columns=columns,
+        string_storage=string_storage, **scroll_kwargs,
+    )
+    if fingerprint is not None:
+        try:
+            saved = snapshot.save(index_name, fingerprint, df)
+            if saved is not None and verbose:
+                print(f"💾 Snapshot salvo em {saved}")
+        except Exception as e:
+            print(f"⚠️  Falha ao salvar snapshot: {e}")
+    return df
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Deduplicação de Textos antes da Geração de Embeddings
+=====================================================
+
+O 20 Newsgroups sem headers/footers/quotes tem muitos corpos vazios ou
+idênticos. Cada gerador (BERT, Sentence-BERT, OpenAI) codificava cada um
+separadamente — e a OpenAI cobra por cada um.
+
+Aqui os textos são agrupados ANTES da geração:
+
+1. Duplicatas exatas: mesmo ``text_hash`` (MD5, igual ao do Elasticsearch).
+   O embedding é idêntico por definição.
+2. Quase-duplicatas (opcional): MinHash-LSH sobre shingles de palavras.
+   Pares com similaridade de Jaccard estimada >= ``near_threshold`` passam
+   a compartilhar o embedding do representante (aproximação).
+
+Apenas os representantes são codificados; ``expand`` replica os vetores
+para todos os doc_ids (a ordem original é preservada).
+
+Configuração (config_example.env):
+
+    DEDUPLICATE_TEXTS=true          # Duplicatas exatas
+    DEDUP_NEAR_DUPLICATES=false     # Também quase-duplicatas (MinHash-LSH)
+    DEDUP_NEAR_THRESHOLD=0.9        # Jaccard mínimo para quase-duplicatas
+
+Exemplo:
+    >>> from deduplication import deduplicate_texts
+    >>> dedup = deduplicate_texts(df['text'].tolist())
+    >>> dedup.print_report()
+    >>> unique_embeddings = model.encode(dedup.select(df['text'].tolist()))
+    >>> embeddings = dedup.expand(unique_embeddings)   # (n_docs, dims)
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from token_accounting import text_hash
+
+DEDUPLICATE_TEXTS = os.getenv("DEDUPLICATE_TEXTS", "true").lower() == "true"
+DEDUP_NEAR_DUPLICATES = os.getenv("DEDUP_NEAR_DUPLICATES", "false").lower() == "true"
+DEDUP_NEAR_THRESHOLD = float(os.getenv("DEDUP_NEAR_THRESHOLD") or 0.9)
+
+# Preço por 1M de tokens (USD) dos modelos de embeddings da OpenAI
+OPENAI_PRICE_PER_MILLION_TOKENS = {
+    "text-embedding-3-small": 0.02,
+    "text-embedding-3-large": 0.13,
+    "text-embedding-ada-002": 0.10,
+}
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+@dataclass
+class DedupResult:
+    """Agrupamento de textos em representantes"""
+
+    representatives: np.ndarray  # Linha original de cada representante (crescente)
+    inverse: np.ndarray          # Para cada linha original: índice do seu representante
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.inverse)
+
+    @property
+    def n_unique(self) -> int:
+        return len(self.representatives)
+
+    def select(self, items: Sequence[Any]) -> List[Any]:
+        """Itens (textos, doc_ids...) dos representantes, na ordem de ``representatives``"""
+        return [items[row] for row in self.representatives]
+
+    def expand(self, embeddings: np.ndarray) -> np.ndarray:
+        """Replica os embeddings dos representantes para todas as linhas originais"""
+        return np.asarray(embeddings)[self.inverse]
+
+    def members(self) -> List[np.ndarray]:
+        """Linhas originais de cada grupo (mesma ordem de ``representatives``)"""
+        order = np.argsort(self.inverse, kind="stable")
+        bounds = np.cumsum(np.bincount(self.inverse, minlength=self.n_unique))[:-1]
+        return np.split(order, bounds)
+
+    def savings(
+        self, token_counts: Optional[Sequence[int]] = None, model: str = "text-embedding-3-small"
+    ) -> Dict[str, float]:
+        """
+        Economia da deduplicação.
+
+        Args:
+            token_counts: Tokens de cada texto original (para estimar custo de API)
+            model: Modelo OpenAI usado na estimativa de custo
+
+        Returns:
+            Dicionário com textos/tokens evitados e custo economizado (USD)
+        """
+        saved = self.n_docs - self.n_unique
+        report: Dict[str, float] = {
+            "documents": self.n_docs,
+            "unique": self.n_unique,
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates,
+            "texts_saved": saved,
+            "texts_saved_pct": saved / self.n_docs * 100 if self.n_docs else 0.0,
+        }
+        if token_counts is not None:
+            token_counts = np.asarray(token_counts, dtype=np.int64)
+            total_tokens = int(token_counts.sum())
+            unique_tokens = int(token_counts[self.representatives].sum())
+            price = OPENAI_PRICE_PER_MILLION_TOKENS.get(model, 0.0)
+            report.update(
+                tokens_total=total_tokens,
+                tokens_saved=total_tokens - unique_tokens,
+                tokens_saved_pct=(
+                    (total_tokens - unique_tokens) / total_tokens * 100 if total_tokens else 0.0
+                ),
+                cost_total_usd=total_tokens / 1e6 * price,
+                cost_saved_usd=(total_tokens - unique_tokens) / 1e6 * price,
+            )
+        return report
+
+    def print_report(
+        self, token_counts: Optional[Sequence[int]] = None, model: str = "text-embedding-3-small"
+    ) -> None:
+        """Imprime a economia de computação e de API"""
+        report = self.savings(token_counts, model)
+        print(f"🧬 DEDUPLICAÇÃO: {report['documents']:,} textos → {report['unique']:,} únicos")
+        print(f"   Duplicatas exatas:     {report['exact_duplicates']:>7,}")
+        print(f"   Quase-duplicatas:      {report['near_duplicates']:>7,}")
+        print(f"   Encodes evitados:      {report['texts_saved']:>7,} "
+              f"({report['texts_saved_pct']:.1f}%)")
+        if "tokens_saved" in report:
+            print(f"   Tokens evitados:       {report['tokens_saved']:>7,} "
+                  f"({report['tokens_saved_pct']:.1f}% de {report['tokens_total']:,})")
+            print(f"   Custo API ({model}): ${report['cost_total_usd']:.4f} → "
+                  f"${report['cost_total_usd'] - report['cost_saved_usd']:.4f} "
+                  f"(economia ${report['cost_saved_usd']:.4f})")
+
+
+# =============================================================================
+# MINHASH-LSH
+# =============================================================================
+
+
+def _shingle_hashes(text: str, shingle_size: int, word_cache: Dict[str, int]) -> np.ndarray:
+    """Hashes (uint64) dos shingles de palavras de um texto normalizado"""
+    words = _WORD_PATTERN.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+
+    # crc32 é determinístico entre execuções (hash() do Python não é)
+    for word in set(words).difference(word_cache):
+        word_cache[word] = zlib.crc32(word.encode("utf-8"))
+    word_hashes = np.array([word_cache[word] for word in words], dtype=np.uint64)
+    size = min(shingle_size, len(words))
+    shingles = np.zeros(len(words) - size + 1, dtype=np.uint64)
+    # Combinação polinomial (overflow em uint64 é intencional)
+    with np.errstate(over="ignore"):
+        for offset in range(size):
+            shingles = shingles * np.uint64(1_000_003) + word_hashes[offset:offset + len(shingles)]
+    return np.unique(shingles)
+
+
+def minhash_signatures(
+    texts: Sequence[str], num_perm: int = 128, shingle_size: int = 3, seed: int = 42
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Assinaturas MinHash (multiply-shift em uint64) dos shingles de palavras.
+
+    Args:
+        texts: Lista de textos
+        num_perm: Número de funções de hash
+        shingle_size: Palavras por shingle
+        seed: Semente das funções de hash
+
+    Returns:
+        (assinaturas uint32 (n_textos, num_perm), máscara de textos sem palavras)
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    word_cache: Dict[str, int] = {}
+    shingle_sets = [_shingle_hashes(text, shingle_size, word_cache) for text in texts]
+    empty = np.array([len(s) == 0 for s in shingle_sets], dtype=bool)
+    signatures = np.full((len(texts), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+
+    non_empty = np.flatnonzero(~empty)
+    if len(non_empty):
+        all_shingles = np.concatenate([shingle_sets[i] for i in non_empty])
+        starts = np.concatenate(([0], np.cumsum([len(shingle_sets[i]) for i in non_empty])[:-1]))
+        with np.errstate(over="ignore"):
+            for p in range(num_perm):
+                hashed = ((a[p] * all_shingles + b[p]) >> np.uint64(32)).astype(np.uint32)
+                signatures[non_empty, p] = np.minimum.reduceat(hashed, starts)
+
+    return signatures, empty
+
+
+def _false_probability_area(threshold: float, bands: int, rows: int) -> Tuple[float, float]:
+    """Áreas de falso positivo e falso negativo da curva 1 - (1 - s^r)^b"""
+    # Soma de Riemann (np.trapz não existe no NumPy 2)
+    step = 0.005
+    s = np.arange(step / 2, 1.0, step)
+    p_candidate = 1.0 - (1.0 - s**rows) ** bands
+    fp_area = p_candidate[s < threshold].sum() * step
+    fn_area = (1.0 - p_candidate[s >= threshold]).sum() * step
+    return float(fp_area), float(fn_area)
+
+
+def optimal_lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Escolhe (bandas, linhas por banda) minimizando FP + FN em torno do limiar.
+
+    Args:
+        threshold: Similaridade de Jaccard alvo
+        num_perm: Tamanho da assinatura
+
+    Returns:
+        (bands, rows)
+    """
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            error = sum(_false_probability_area(threshold, bands, rows))
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+def near_duplicate_groups(
+    texts: Sequence[str],
+    threshold: float = 0.9,
+    num_perm: int = 128,
+    shingle_size: int = 3,
+    seed: int = 42,
+) -> np.ndarray:
+    """
+    Agrupa quase-duplicatas com MinHash-LSH.
+
+    Candidatos de cada bucket LSH são confirmados pela similaridade estimada
+    (fração de posições iguais na assinatura) antes de unir os grupos. Textos
+    sem palavras nunca são agrupados aqui.
+
+    Args:
+        texts: Lista de textos
+        threshold: Jaccard mínimo
+        num_perm: Tamanho da assinatura MinHash
+        shingle_size: Palavras por shingle
+        seed: Semente das funções de hash
+
+    Returns:
+        Array com a linha do representante (menor índice) de cada texto
+    """
+    signatures, empty = minhash_signatures(texts, num_perm, shingle_size, seed)
+    bands, rows = optimal_lsh_params(threshold, num_perm)
+
+    parent = np.arange(len(texts))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    # Textos sem nenhuma palavra ('!!!', '???') têm o mesmo conjunto vazio de
+    # shingles, mas não são quase-duplicatas: ficam fora do LSH (só a
+    # deduplicação exata os agrupa)
+    candidates = np.flatnonzero(~empty)
+    for band in range(bands):
+        band_signatures = signatures[candidates, band * rows:(band + 1) * rows]
+        buckets: Dict[bytes, int] = {}
+        for row, key in zip(candidates, band_signatures):
+            first = buckets.setdefault(key.tobytes(), int(row))
+            if first != row and find(first) != find(int(row)):
+                similarity = float(np.mean(signatures[first] == signatures[row]))
+                if similarity >= threshold:
+                    union(first, int(row))
+
+    return np.array([find(i) for i in range(len(texts))], dtype=np.int64)
+
+
+# =============================================================================
+# API PRINCIPAL
+# =============================================================================
+
+
+def deduplicate_texts(
+    texts: Sequence[str],
+    near_duplicates: Optional[bool] = None,
+    near_threshold: Optional[float] = None,
+    num_perm: int = 128,
+    shingle_size: int = 3,
+) -> DedupResult:
+    """
+    Agrupa duplicatas exatas (text_hash) e, opcionalmente, quase-duplicatas.
+
+    Args:
+        texts: Lista de textos
+        near_duplicates: Padrão: DEDUP_NEAR_DUPLICATES
+        near_threshold: Padrão: DEDUP_NEAR_THRESHOLD
+        num_perm: Tamanho da assinatura MinHash
+        shingle_size: Palavras por shingle
+
+    Returns:
+        DedupResult (representante = primeira ocorrência de cada grupo)
+    """
+    near_duplicates = DEDUP_NEAR_DUPLICATES if near_duplicates is None else near_duplicates
+    near_threshold = DEDUP_NEAR_THRESHOLD if near_threshold is None else near_threshold
+
+    # 1. Duplicatas exatas
+    first_row: Dict[str, int] = {}
+    group_root = np.empty(len(texts), dtype=np.int64)
+    for row, text in enumerate(texts):
+        group_root[row] = first_row.setdefault(text_hash(text), row)
+    exact_roots = np.flatnonzero(group_root == np.arange(len(texts)))
+    exact_duplicates = len(texts) - len(exact_roots)
+
+    # 2. Quase-duplicatas entre os textos exatos únicos
+    near_count = 0
+    if near_duplicates and len(exact_roots) > 1:
+        near_roots = near_duplicate_groups(
+            [texts[row] for row in exact_roots], near_threshold, num_perm, shingle_size
+        )
+        # raiz exata → raiz do grupo de quase-duplicatas
+        root_map = exact_roots[near_roots]
+        lookup = np.empty(len(texts), dtype=np.int64)
+        lookup[exact_roots] = root_map
+        group_root = lookup[group_root]
+        near_count = int((near_roots != np.arange(len(exact_roots))).sum())
+
+    representatives, inverse = np.unique(group_root, return_inverse=True)
+    return DedupResult(
+        representatives=representatives,
+        inverse=inverse.reshape(-1),
+        exact_duplicates=exact_duplicates,
+        near_duplicates=near_count,
+    )
@@ -10,17 +10,114 @@ Autor: Sistema de Embeddings e Clustering
 Data: 2025-10
 """
 
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
 import pandas as pd
-from typing import Optional
 from elasticsearch import Elasticsearch
 
 
+DOCUMENT_COLUMNS = ("doc_id", "text", "category", "target")
+STRING_STORAGES = (None, "pyarrow", "python")
+
+
+def resolve_document_columns(columns: Optional[Sequence[str]]) -> List[str]:
+    """Colunas pedidas, na ordem canônica e sempre com doc_id"""
+    if columns is None:
+        return list(DOCUMENT_COLUMNS)
+    unknown = set(columns) - set(DOCUMENT_COLUMNS)
+    if unknown:
+        raise ValueError(
+            f"Colunas desconhecidas: {sorted(unknown)} (opções: {DOCUMENT_COLUMNS})"
+        )
+    return [column for column in DOCUMENT_COLUMNS if column == "doc_id" or column in columns]
+
+
+def string_storage_dtype(string_storage: Optional[str]):
+    if string_storage not in STRING_STORAGES:
+        raise ValueError(f"string_storage inválido: {string_storage} (opções: {STRING_STORAGES})")
+    if string_storage == "python":
+        return object
+    if string_storage == "pyarrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("⚠️  pyarrow não instalado - usando strings padrão do pandas")
+            return None
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+def _compact_int_dtype(values: np.ndarray) -> np.dtype:
+    """Menor inteiro com sinal que representa todos os valores"""
+    if values.size == 0:
+        return np.dtype(np.int8)
+    low, high = int(values.min()), int(values.max())
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class _ColumnBuffers:
+    """Buffers por coluna preenchidos página a página do scroll"""
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self.strings: Dict[str, List[str]] = {
+            column: [] for column in self.columns if column in ("doc_id", "text")
+        }
+        # category: código por documento + dicionário de categorias
+        self.category_codes = array("i")
+        self.categories: Dict[str, int] = {}
+        self.targets = array("q")
+
+    def __len__(self) -> int:
+        return len(self.strings["doc_id"])
+
+    def extend(self, hits: List[Dict[str, Any]]) -> None:
+        sources = [hit['_source'] for hit in hits]
+        for column, buffer in self.strings.items():
+            buffer.extend(source[column] for source in sources)
+        if "category" in self.columns:
+            categories = self.categories
+            self.category_codes.extend(
+                categories.setdefault(source['category'], len(categories)) for source in sources
+            )
+        if "target" in self.columns:
+            self.targets.extend(int(source['target']) for source in sources)
+
+    def to_dataframe(self, string_storage: Optional[str] = None) -> pd.DataFrame:
+        string_dtype = string_storage_dtype(string_storage)
+        doc_ids = np.array(self.strings["doc_id"], dtype=object)
+        order = np.argsort(doc_ids, kind="stable")
+
+        data: Dict[str, Any] = {}
+        for column in self.columns:
+            if column in self.strings:
+                values = np.array(self.strings[column], dtype=object)[order]
+                self.strings[column] = []  # Libera a lista assim que a coluna existe
+                data[column] = pd.Series(values, dtype=string_dtype, copy=False)
+            elif column == "category":
+                codes = np.frombuffer(self.category_codes, dtype=np.int32)[order]
+                categorical = pd.Categorical.from_codes(codes, categories=list(self.categories))
+                data[column] = categorical.reorder_categories(sorted(self.categories))
+            elif column == "target":
+                targets = np.frombuffer(self.targets, dtype=np.int64)[order]
+                data[column] = targets.astype(_compact_int_dtype(targets))
+        return pd.DataFrame(data, columns=self.columns)
+
+
 def load_all_documents_from_elasticsearch(
     es_client: Elasticsearch,
     index_name: str = "documents_dataset",
     batch_size: int = 1000,
     scroll_timeout: str = '2m',
-    verbose: bool = True
+    verbose: bool = True,
+    columns: Optional[Sequence[str]] = None,
+    string_storage: Optional[str] = None,
 ) -> pd.DataFrame:
     """
     Carrega TODOS os documentos do Elasticsearch usando Scroll API.
@@ -146,14 +243,29 @@ def load_all_documents_from_elasticsearch(
             Se True, mostra progresso detalhado.
             Se False, execução silenciosa.
             Padrão: True
+        
+        columns (Sequence[str], optional):
+            Colunas a buscar (subconjunto de doc_id, text, category, target).
+            'doc_id' é sempre incluída. Campos fora da lista nem saem do
+            Elasticsearch — ex: o Notebook 4 não precisa de 'text'.
+            Padrão: None (todas)
+        
+        string_storage (str, optional):
+            Armazenamento das colunas de texto (doc_id, text):
+            - None: padrão do pandas
+            - "pyarrow": strings Arrow (buffers contíguos, bem menos memória
+              que objetos Python; requer o pacote pyarrow)
+            - "python": objetos str do Python
+            Padrão: None
     
     Returns:
         pd.DataFrame: 
-            DataFrame com todos os documentos do índice, contendo colunas:
+            DataFrame com todos os documentos do índice, contendo colunas
+            (as pedidas em ``columns``, nesta ordem):
             - doc_id: ID único do documento (ex: "doc_0000")
             - text: Texto completo do documento
-            - category: Categoria/classe do documento
-            - target: Código numérico da categoria
+            - category: Categoria/classe do documento (dtype ``category``)
+            - target: Código numérico da categoria (menor inteiro que cabe, ex: int8)
             
             O DataFrame é ordenado por doc_id para garantir consistência.
     
@@ -176,6 +288,8 @@ def load_all_documents_from_elasticsearch(
         (18211, 4)
     
     Notes:
+        - Cada página do scroll é copiada direto para buffers por coluna e
+          descartada: o texto do corpus existe uma única vez na memória
         - A Scroll API cria um snapshot dos dados no momento da busca inicial
         - Mudanças no índice durante a busca NÃO serão refletidas nos resultados
         - O scroll_id é automaticamente limpo ao final ou em caso de erro
@@ -186,13 +300,18 @@ def load_all_documents_from_elasticsearch(
         - Search After API: Alternativa moderna para paginação em tempo real
     """
     
+    columns = resolve_document_columns(columns)
+
     if verbose:
         print(f"🔄 Buscando documentos do índice '{index_name}'")
         print(f"   Método: Scroll API (recomendado para >10k docs)")
         print(f"   Tamanho do lote: {batch_size:,} documentos")
         print(f"   Timeout do scroll: {scroll_timeout}")
+        print(f"   Colunas: {columns}")
     
-    all_documents = []
+    # Um buffer por coluna, preenchido a cada lote (os hits de cada página
+    # são descartados logo em seguida — nada de lista de hits + lista de dicts)
+    buffers = _ColumnBuffers(columns)
     scroll_id = None
     
     try:
@@ -207,7 +326,7 @@ def load_all_documents_from_elasticsearch(
             size=batch_size,        # Docs por lote
             body={
                 "query": {"match_all": {}},  # Buscar todos os docs
-                "_source": ["doc_id", "text", "category", "target"]  # Campos desejados
+                "_source": columns           # Só os campos pedidos (ex: sem 'text')
             }
         )
         
@@ -221,10 +340,10 @@ def load_all_documents_from_elasticsearch(
             print(f"🔄 Iniciando busca em lotes...")
         
         # Adicionar primeiro lote
-        all_documents.extend(hits)
+        buffers.extend(hits)
         
         if verbose:
-            print(f"   Lote 1: {len(hits):,} docs | Total acumulado: {len(all_documents):,}/{total_docs:,}")
+            print(f"   Lote 1: {len(hits):,} docs | Total acumulado: {len(buffers):,}/{total_docs:,}")
         
         # =================================================================
         # PASSO 2: CONTINUAR SCROLL
@@ -244,12 +363,12 @@ def load_all_documents_from_elasticsearch(
             scroll_id = response['_scroll_id']
             hits = response['hits']['hits']
             
-            # Se houver documentos, adicionar à lista
+            # Se houver documentos, adicionar aos buffers
             if len(hits) > 0:
-                all_documents.extend(hits)
+                buffers.extend(hits)
                 
                 if verbose:
-                    print(f"   Lote {batch_number}: {len(hits):,} docs | Total acumulado: {len(all_documents):,}/{total_docs:,}")
+                    print(f"   Lote {batch_number}: {len(hits):,} docs | Total acumulado: {len(buffers):,}/{total_docs:,}")
                 
                 batch_number += 1
         
@@ -270,29 +389,17 @@ def load_all_documents_from_elasticsearch(
         # =================================================================
         # PASSO 4: CONVERTER PARA DATAFRAME
         # =================================================================
-        # Processar documentos para formato pandas
+        # Cada buffer vira uma coluna tipada, já na ordem de doc_id
+        # (consistente entre notebooks)
         
         if verbose:
-            print(f"\n📊 Processando {len(all_documents):,} documentos em DataFrame...")
-        
-        documents_data = []
-        
-        for hit in all_documents:
-            source = hit['_source']
-            documents_data.append({
-                'doc_id': source['doc_id'],
-                'text': source['text'],
-                'category': source['category'],
-                'target': source['target']
-            })
+            print(f"\n📊 Processando {len(buffers):,} documentos em DataFrame...")
         
-        df = pd.DataFrame(documents_data)
-        
-        # Ordenar por doc_id para garantir ordem consistente entre notebooks
-        df = df.sort_values('doc_id').reset_index(drop=True)
+        df = buffers.to_dataframe(string_storage)
         
         if verbose:
-            print(f"✅ DataFrame criado com sucesso!")
+            memory_mb = df.memory_usage(deep=True).sum() / (1024 * 1024)
+            print(f"✅ DataFrame criado com sucesso! ({memory_mb:.1f} MB)")
         
         return df
         
@@ -313,6 +420,57 @@ def load_all_documents_from_elasticsearch(
         raise
 
 
+def iter_document_batches(
+    es_client: Elasticsearch,
+    index_name: str = "documents_dataset",
+    batch_size: int = 1000,
+    scroll_timeout: str = '2m',
+    fields: Sequence[str] = ("doc_id", "text"),
+    query: Optional[Dict[str, Any]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Percorre o índice com a Scroll API entregando um DataFrame por lote.
+
+    Diferente de ``load_all_documents_from_elasticsearch``, nada é acumulado:
+    a memória usada é a de um lote, independente do tamanho do índice. A ordem
+    dos lotes é a do scroll (não ordenada por doc_id).
+
+    Args:
+        es_client: Cliente Elasticsearch conectado
+        index_name: Índice a percorrer
+        batch_size: Documentos por lote
+        scroll_timeout: Tempo de vida do contexto de scroll entre lotes
+        fields: Campos de ``_source`` a retornar (viram colunas)
+        query: Query do Elasticsearch (padrão: match_all)
+
+    Yields:
+        pd.DataFrame com as colunas ``fields``
+    """
+    fields = list(fields)
+    scroll_id = None
+    try:
+        response = es_client.search(
+            index=index_name,
+            scroll=scroll_timeout,
+            size=batch_size,
+            body={"query": query or {"match_all": {}}, "_source": fields},
+        )
+        while True:
+            scroll_id = response['_scroll_id']
+            hits = response['hits']['hits']
+            if not hits:
+                break
+            yield pd.DataFrame([hit['_source'] for hit in hits], columns=fields)
+            response = es_client.scroll(scroll_id=scroll_id, scroll=scroll_timeout)
+    finally:
+        # Também executa se o consumidor abandonar o gerador no meio
+        if scroll_id:
+            try:
+                es_client.clear_scroll(scroll_id=scroll_id)
+            except Exception:
+                pass
+
+
 def print_dataframe_summary(df: pd.DataFrame, expected_docs: Optional[int] = None):
     """
     Imprime um resumo detalhado do DataFrame carregado.
@@ -5,17 +5,20 @@ Sistema inteligente de cache com verificação de duplicatas e validação de in
 """
 
 import os
+import base64
 import hashlib
 import json
 import time
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Iterator, Optional, Tuple, Any
 import numpy as np
 import pandas as pd
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import NotFoundError, ConnectionError
 import warnings
 
+from profiling_helpers import profiled
+
 
 class ElasticsearchEmbeddingsCache:
     """
@@ -150,6 +153,22 @@ class ElasticsearchEmbeddingsCache:
                     }
                 }
             },
+            # Artefatos de modelos ajustados (ex: vocabulário + IDF do TF-IDF)
+            "model_artifacts": {
+                "mapping": {
+                    "mappings": {
+                        "properties": {
+                            "artifact_name": {"type": "keyword"},
+                            "artifact_type": {"type": "keyword"},
+                            "fingerprint": {"type": "keyword"},
+                            "params": {"type": "object", "enabled": False},
+                            "payload": {"type": "binary"},
+                            "size_bytes": {"type": "long"},
+                            "created_at": {"type": "date"},
+                        }
+                    }
+                }
+            },
             # Índices de teste
             "embeddings_test": {
                 "mapping": {
@@ -284,12 +303,13 @@ class ElasticsearchEmbeddingsCache:
             print(f"   Erro ao verificar dimensões: {e}")
             return True  # Se não conseguir verificar, assume compatível
 
-    def create_index(self, index_name: str) -> bool:
+    def create_index(self, index_name: str, verbose: bool = True) -> bool:
         """
         Cria índice se não existir
 
         Args:
             index_name: Nome do índice
+            verbose: Se False, não imprime mensagem quando o índice já existe
 
         Returns:
             bool: True se criado com sucesso
@@ -304,7 +324,8 @@ class ElasticsearchEmbeddingsCache:
 
         try:
             if self._check_index_exists(index_name):
-                print(f"✅ Índice '{index_name}' já existe")
+                if verbose:
+                    print(f"✅ Índice '{index_name}' já existe")
                 return True
 
             mapping = self.indices_config[index_name]["mapping"]
@@ -316,6 +337,27 @@ class ElasticsearchEmbeddingsCache:
             print(f"❌ Erro ao criar índice '{index_name}': {e}")
             return False
 
+    def refresh_index(self, index_name: str) -> bool:
+        """
+        Força o refresh do índice (torna visíveis os documentos recém-gravados)
+
+        Args:
+            index_name: Nome do índice
+
+        Returns:
+            bool: True se o refresh foi executado
+        """
+        if not self.connected:
+            return False
+
+        try:
+            self.es.indices.refresh(index=index_name)
+            return True
+        except Exception as e:
+            print(f"⚠️  Erro ao fazer refresh de '{index_name}': {e}")
+            return False
+
+    @profiled("cache.save_dataset")
     def save_dataset(self, df: pd.DataFrame) -> bool:
         """
         Salva dataset completo no Elasticsearch com IDs únicos e proteção robusta contra duplicatas
@@ -351,8 +393,9 @@ class ElasticsearchEmbeddingsCache:
                     f"📊 Índice '{index_name}' já existe com {doc_count:,} documentos"
                 )
 
-                # Se número de documentos está correto
-                if doc_count == expected_count:
+                # Se número de documentos está correto (ou há documentos acrescentados
+                # depois via append_dataset, com doc_ids após os originais)
+                if doc_count >= expected_count:
                     # Validar integridade dos dados (amostra)
                     print("🔍 Verificando integridade dos dados...")
                     sample_size = min(100, expected_count)
@@ -383,6 +426,11 @@ class ElasticsearchEmbeddingsCache:
                         print(
                             f"✅ Dados já existem e estão íntegros - PULANDO salvamento"
                         )
+                        if doc_count > expected_count:
+                            print(
+                                f"ℹ️  {doc_count - expected_count:,} documentos acrescentados "
+                                f"incrementalmente foram mantidos"
+                            )
                         print(
                             f"💡 Use FORCE_REGENERATE_EMBEDDINGS=true para forçar re-salvamento"
                         )
@@ -396,7 +444,7 @@ class ElasticsearchEmbeddingsCache:
                     print(f"🗑️  Deletando índice existente...")
                     self.es.indices.delete(index=index_name)
 
-                elif doc_count != expected_count:
+                else:
                     print(
                         f"⚠️  Contagem incorreta (esperado: {expected_count:,}, encontrado: {doc_count:,})"
                     )
@@ -446,6 +494,119 @@ class ElasticsearchEmbeddingsCache:
             print(f"❌ Erro ao salvar dataset: {e}")
             return False
 
+    def _existing_text_hashes(self, index_name: str, text_hashes: List[str]) -> set:
+        """Subconjunto de ``text_hashes`` que já está no índice"""
+        existing = set()
+        unique_hashes = list(dict.fromkeys(text_hashes))
+        for start in range(0, len(unique_hashes), 1000):
+            chunk = unique_hashes[start:start + 1000]
+            response = self.es.search(
+                index=index_name,
+                size=len(chunk),
+                body={"query": {"terms": {"text_hash": chunk}}, "_source": ["text_hash"]},
+            )
+            existing.update(hit["_source"]["text_hash"] for hit in response["hits"]["hits"])
+        return existing
+
+    @profiled("cache.append_dataset")
+    def append_dataset(self, df: pd.DataFrame, skip_existing: bool = True) -> pd.DataFrame:
+        """
+        Acrescenta documentos novos ao 'documents_dataset' SEM recriar o índice
+
+        Os doc_ids continuam a numeração existente (doc_0000, doc_0001, ...), então
+        os embeddings já gravados continuam válidos e só os novos precisam ser gerados.
+
+        Args:
+            df: DataFrame com colunas 'text', 'category', 'target'
+            skip_existing: Se True, ignora textos cujo text_hash já está no índice
+                (reexecutar a mesma carga não duplica documentos)
+
+        Returns:
+            pd.DataFrame: Documentos gravados, com a coluna 'doc_id' atribuída
+            (vazio se nada novo ou em caso de erro)
+        """
+        if not self.connected:
+            print("❌ Não conectado ao Elasticsearch")
+            return pd.DataFrame()
+
+        index_name = "documents_dataset"
+        if not self.create_index(index_name, verbose=False):
+            return pd.DataFrame()
+
+        try:
+            self.refresh_index(index_name)
+            rows = df.reset_index(drop=True)
+            text_hashes = [self._generate_text_hash(text) for text in rows["text"]]
+
+            if skip_existing:
+                existing = self._existing_text_hashes(index_name, text_hashes)
+                keep = [h not in existing for h in text_hashes]
+                # Repetições dentro da própria carga também entram uma única vez
+                seen = set()
+                for i, text_hash in enumerate(text_hashes):
+                    keep[i] = keep[i] and text_hash not in seen
+                    seen.add(text_hash)
+                skipped = len(rows) - sum(keep)
+                rows = rows[keep].reset_index(drop=True)
+                text_hashes = [h for h, k in zip(text_hashes, keep) if k]
+                if skipped:
+                    print(f"ℹ️  {skipped:,} documentos já existentes ignorados")
+
+            if rows.empty:
+                print("✅ Nenhum documento novo para acrescentar")
+                return pd.DataFrame()
+
+            # Próximo índice livre (contagem atual; avança se o id já existir)
+            next_index = self.es.count(index=index_name)["count"]
+            while self.es.exists(index=index_name, id=self._generate_doc_id(next_index)):
+                next_index += 1
+
+            bulk_data = []
+            new_doc_ids = []
+            current_time = datetime.now().isoformat()
+            for offset, row in rows.iterrows():
+                doc_id = self._generate_doc_id(next_index + offset)
+                new_doc_ids.append(doc_id)
+                doc = {
+                    "doc_id": doc_id,
+                    "text": row["text"],
+                    "category": row["category"],
+                    "target": int(row["target"]),
+                    "text_hash": text_hashes[offset],
+                    "created_at": current_time,
+                }
+                bulk_data.append({"_index": index_name, "_id": doc_id, "_source": doc})
+
+            from elasticsearch.helpers import bulk
+
+            # raise_on_error=False: numa falha parcial os documentos já gravados
+            # precisam ser devolvidos (senão nunca recebem embeddings: a próxima
+            # execução os ignora pelo text_hash)
+            success_count, failed_items = bulk(
+                self.es, bulk_data, chunk_size=1000, raise_on_error=False
+            )
+            self.refresh_index(index_name)
+
+            rows.insert(0, "doc_id", new_doc_ids)
+            if failed_items:
+                print(f"⚠️  {len(failed_items)} documentos falharam:")
+                for item in failed_items[:5]:
+                    print(f"   {item['index']['_id']}: {item['index'].get('error')}")
+                failed_ids = {item["index"]["_id"] for item in failed_items}
+                rows = rows[~rows["doc_id"].isin(failed_ids)].reset_index(drop=True)
+
+            if not rows.empty:
+                print(
+                    f"✅ {success_count:,} documentos acrescentados a '{index_name}' "
+                    f"({rows['doc_id'].iloc[0]} .. {rows['doc_id'].iloc[-1]})"
+                )
+            return rows
+
+        except Exception as e:
+            print(f"❌ Erro ao acrescentar documentos: {e}")
+            return pd.DataFrame()
+
+    @profiled("cache.check_embeddings_exist")
     def check_embeddings_exist(
         self, index_name: str, doc_ids: List[str]
     ) -> Tuple[bool, List[str], List[str]]:
@@ -522,6 +683,7 @@ class ElasticsearchEmbeddingsCache:
             print(f"❌ Erro ao verificar embeddings: {e}")
             return False, [], doc_ids
 
+    @profiled("cache.validate_embeddings_integrity")
     def validate_embeddings_integrity(
         self, index_name: str, doc_ids: List[str], expected_texts: List[str]
     ) -> Tuple[bool, List[str]]:
@@ -606,6 +768,7 @@ class ElasticsearchEmbeddingsCache:
             print(f"❌ Erro ao validar integridade: {e}")
             return False, doc_ids
 
+    @profiled("cache.save_embeddings")
     def save_embeddings(
         self,
         index_name: str,
@@ -614,6 +777,9 @@ class ElasticsearchEmbeddingsCache:
         texts: List[str],
         model_type: str,
         model_version: str = "1.0",
+        check_existing: bool = True,
+        wait_for_indexing: bool = True,
+        verbose: bool = True,
     ) -> bool:
         """
         Salva embeddings no Elasticsearch com verificação de duplicatas
@@ -625,6 +791,10 @@ class ElasticsearchEmbeddingsCache:
             texts: Lista de textos originais
             model_type: Tipo do modelo (tfidf, word2vec, bert, etc.)
             model_version: Versão do modelo
+            check_existing: Se False, grava todos os doc_ids sem consultar o
+                índice (usado por quem já calculou os faltantes, ex: EmbeddingPipeline)
+            wait_for_indexing: Se True, aguarda a indexação após o bulk
+            verbose: Se False, suprime mensagens de sucesso
 
         Returns:
             bool: True se salvo com sucesso
@@ -634,14 +804,20 @@ class ElasticsearchEmbeddingsCache:
             return False
 
         # Verificar se índice existe
-        if not self.create_index(index_name):
+        if not self.create_index(index_name, verbose=verbose):
             return False
 
         try:
-            # Verificar quais embeddings já existem
-            all_exist, existing_ids, missing_ids = self.check_embeddings_exist(
-                index_name, doc_ids
-            )
+            # Posição de cada doc_id (evita doc_ids.index() O(n) por documento)
+            positions = {doc_id: idx for idx, doc_id in enumerate(doc_ids)}
+
+            if check_existing:
+                # Verificar quais embeddings já existem
+                all_exist, existing_ids, missing_ids = self.check_embeddings_exist(
+                    index_name, doc_ids
+                )
+            else:
+                all_exist, existing_ids, missing_ids = False, [], list(doc_ids)
 
             if all_exist:
                 print(f"✅ Todos os embeddings já existem em '{index_name}'")
@@ -652,7 +828,7 @@ class ElasticsearchEmbeddingsCache:
                 valid, invalid_ids = self.validate_embeddings_integrity(
                     index_name,
                     existing_ids,
-                    [texts[doc_ids.index(doc_id)] for doc_id in existing_ids],
+                    [texts[positions[doc_id]] for doc_id in existing_ids],
                 )
 
                 if not valid:
@@ -665,12 +841,25 @@ class ElasticsearchEmbeddingsCache:
                 print(f"✅ Todos os embeddings válidos já existem em '{index_name}'")
                 return True
 
+            # Vetores com NaN/inf (ex: falha na geração) nunca são persistidos
+            finite_rows = np.isfinite(embeddings).all(axis=1)
+            if not finite_rows.all():
+                skipped = [doc_id for doc_id in missing_ids if not finite_rows[positions[doc_id]]]
+                if skipped:
+                    print(
+                        f"⚠️  {len(skipped)} embeddings com NaN/inf ignorados (não salvos) em '{index_name}'"
+                    )
+                    skipped_set = set(skipped)
+                    missing_ids = [doc_id for doc_id in missing_ids if doc_id not in skipped_set]
+                    if not missing_ids:
+                        return False
+
             # Preparar documentos para bulk insert
             bulk_data = []
             current_time = datetime.now().isoformat()
 
             for doc_id in missing_ids:
-                idx = doc_ids.index(doc_id)
+                idx = positions[doc_id]
                 text_hash = self._generate_text_hash(texts[idx])
 
                 # Normalizar vetor para evitar vetores zero
@@ -700,12 +889,13 @@ class ElasticsearchEmbeddingsCache:
                 self.es, bulk_data, chunk_size=1000, raise_on_error=False
             )
 
-            print(
-                f"✅ Embeddings salvos: {success_count} novos documentos em '{index_name}'"
-            )
+            if verbose:
+                print(
+                    f"✅ Embeddings salvos: {success_count} novos documentos em '{index_name}'"
+                )
 
             # Aguardar indexação (Elasticsearch precisa de tempo para indexar)
-            if success_count > 0:
+            if success_count > 0 and wait_for_indexing:
                 import time
 
                 time.sleep(1)  # 1 segundo para garantir que os dados sejam indexados
@@ -721,26 +911,69 @@ class ElasticsearchEmbeddingsCache:
             print(f"❌ Erro ao salvar embeddings: {e}")
             return False
 
+    @profiled("cache.load_embeddings")
     def load_embeddings(
-        self, index_name: str, doc_ids: List[str]
+        self,
+        index_name: str,
+        doc_ids: List[str],
+        dtype: Any = np.float32,
+        normalize: bool = False,
+        out: Optional[np.ndarray] = None,
     ) -> Optional[np.ndarray]:
         """
         Carrega embeddings do Elasticsearch usando Scroll API
 
+        Cada hit é decodificado direto na sua linha da matriz de saída (sem
+        dicionário/lista intermediários).
+
         Args:
             index_name: Nome do índice
             doc_ids: Lista de IDs dos documentos
+            dtype: Tipo numérico da matriz (padrão: float32, metade da memória do float64)
+            normalize: Se True, normaliza cada linha pela norma L2 (in-place)
+            out: Buffer pré-alocado C-contíguo (len(doc_ids), n_dims) com o mesmo
+                dtype, preenchido diretamente (ex: memmap ou memória compartilhada)
 
         Returns:
-            np.ndarray: Array de embeddings ou None se erro
+            np.ndarray: Array C-contíguo (len(doc_ids), n_dims) ou None se erro
+
+        Raises:
+            ValueError: Se ``out`` não for compatível com doc_ids/dtype
         """
+        dtype = np.dtype(dtype)
+        if out is not None:
+            if out.ndim != 2 or out.shape[0] != len(doc_ids):
+                raise ValueError(
+                    f"out deve ter shape ({len(doc_ids)}, n_dims), recebido {out.shape}"
+                )
+            if out.dtype != dtype or not out.flags["C_CONTIGUOUS"]:
+                raise ValueError(f"out deve ser C-contíguo com dtype {dtype}")
+
         if not self.connected:
             print("❌ Não conectado ao Elasticsearch")
             return None
 
         try:
+            # Linha de destino de cada doc_id
+            positions = {doc_id: row for row, doc_id in enumerate(doc_ids)}
+            filled = np.zeros(len(doc_ids), dtype=bool)
+            embeddings_array = out
+
+            def decode_hits(hits):
+                nonlocal embeddings_array
+                for hit in hits:
+                    source = hit["_source"]
+                    row = positions.get(source["doc_id"])
+                    if row is None:
+                        continue
+                    if embeddings_array is None:
+                        embeddings_array = np.empty(
+                            (len(doc_ids), len(source["embedding"])), dtype=dtype
+                        )
+                    embeddings_array[row] = source["embedding"]
+                    filled[row] = True
+
             # Buscar embeddings usando Scroll API para suportar >10k docs
-            embeddings_dict = {}
             scroll_id = None
             
             try:
@@ -759,8 +992,7 @@ class ElasticsearchEmbeddingsCache:
                 hits = response['hits']['hits']
                 
                 # Processar primeiro lote
-                for hit in hits:
-                    embeddings_dict[hit["_source"]["doc_id"]] = hit["_source"]["embedding"]
+                decode_hits(hits)
                 
                 # Continuar scroll para buscar mais lotes
                 while len(hits) > 0:
@@ -769,8 +1001,7 @@ class ElasticsearchEmbeddingsCache:
                     hits = response['hits']['hits']
                     
                     if len(hits) > 0:
-                        for hit in hits:
-                            embeddings_dict[hit["_source"]["doc_id"]] = hit["_source"]["embedding"]
+                        decode_hits(hits)
                 
                 # Limpar scroll
                 try:
@@ -787,22 +1018,22 @@ class ElasticsearchEmbeddingsCache:
                         pass
                 raise scroll_error
 
-            if len(embeddings_dict) == 0:
+            if not filled.any():
                 print(f"❌ Nenhum embedding encontrado em '{index_name}'")
                 return None
 
-            # Organizar embeddings na ordem correta dos doc_ids
-            embeddings = []
-            for doc_id in doc_ids:
-                if doc_id in embeddings_dict:
-                    embeddings.append(embeddings_dict[doc_id])
-                else:
-                    print(f"⚠️  Embedding não encontrado para {doc_id}")
-                    return None
+            # Todos os doc_ids precisam estar presentes
+            if not filled.all():
+                missing_row = int(np.argmin(filled))
+                print(f"⚠️  Embedding não encontrado para {doc_ids[missing_row]}")
+                return None
+
+            if normalize:
+                norms = np.linalg.norm(embeddings_array, axis=1, keepdims=True)
+                np.divide(embeddings_array, norms, out=embeddings_array, where=norms > 0)
 
-            embeddings_array = np.array(embeddings)
             print(
-                f"✅ Embeddings carregados: {embeddings_array.shape} de '{index_name}'"
+                f"✅ Embeddings carregados: {embeddings_array.shape} ({dtype.name}) de '{index_name}'"
             )
             return embeddings_array
 
@@ -810,6 +1041,150 @@ class ElasticsearchEmbeddingsCache:
             print(f"❌ Erro ao carregar embeddings: {e}")
             return None
 
+    def iter_embeddings(
+        self,
+        index_name: str,
+        batch_size: int = 1000,
+        dtype: Any = np.float32,
+    ) -> Iterator[Tuple[List[str], np.ndarray]]:
+        """
+        Percorre um índice de embeddings em blocos, sem montar a matriz inteira
+
+        A ordem é a do scroll (não a de doc_ids); útil para agregações em uma
+        passada (estatísticas, histogramas) com memória de um bloco.
+
+        Args:
+            index_name: Nome do índice
+            batch_size: Documentos por bloco
+            dtype: Tipo numérico dos blocos
+
+        Yields:
+            Tuple[doc_ids, np.ndarray (len(doc_ids), n_dims)]
+        """
+        if not self.connected:
+            print("❌ Não conectado ao Elasticsearch")
+            return
+
+        scroll_id = None
+        try:
+            response = self.es.search(
+                index=index_name,
+                scroll='2m',
+                size=batch_size,
+                body={"query": {"match_all": {}}, "_source": ["doc_id", "embedding"]},
+            )
+            while True:
+                scroll_id = response['_scroll_id']
+                hits = response['hits']['hits']
+                if not hits:
+                    break
+                doc_ids = [hit["_source"]["doc_id"] for hit in hits]
+                block = np.array([hit["_source"]["embedding"] for hit in hits], dtype=dtype)
+                yield doc_ids, block
+                response = self.es.scroll(scroll_id=scroll_id, scroll='2m')
+        finally:
+            if scroll_id:
+                try:
+                    self.es.clear_scroll(scroll_id=scroll_id)
+                except Exception:
+                    pass
+
+    @profiled("cache.save_artifact")
+    def save_artifact(
+        self,
+        artifact_name: str,
+        artifact_type: str,
+        payload: bytes,
+        params: Dict[str, Any],
+        fingerprint: str,
+    ) -> bool:
+        """
+        Salva (ou substitui) um artefato binário de modelo no índice 'model_artifacts'
+
+        Args:
+            artifact_name: Nome único do artefato (usado como _id)
+            artifact_type: Tipo do artefato (ex: tfidf_vectorizer)
+            payload: Conteúdo serializado
+            params: Parâmetros do modelo (JSON)
+            fingerprint: Fingerprint do corpus/dados usados no ajuste
+
+        Returns:
+            bool: True se salvo com sucesso
+        """
+        if not self.connected:
+            print("❌ Não conectado ao Elasticsearch")
+            return False
+
+        index_name = "model_artifacts"
+        if not self.create_index(index_name, verbose=False):
+            return False
+
+        try:
+            doc = {
+                "artifact_name": artifact_name,
+                "artifact_type": artifact_type,
+                "fingerprint": fingerprint,
+                "params": params,
+                "payload": base64.b64encode(payload).decode("ascii"),
+                "size_bytes": len(payload),
+                "created_at": datetime.now().isoformat(),
+            }
+            self.es.index(index=index_name, id=artifact_name, document=doc, refresh=True)
+            print(
+                f"✅ Artefato '{artifact_name}' salvo ({len(payload) / 1024:.1f} KB)"
+            )
+            return True
+
+        except Exception as e:
+            print(f"❌ Erro ao salvar artefato '{artifact_name}': {e}")
+            return False
+
+    @profiled("cache.load_artifact")
+    def load_artifact(
+        self, artifact_name: str, fingerprint: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Carrega um artefato de modelo do índice 'model_artifacts'
+
+        Args:
+            artifact_name: Nome do artefato
+            fingerprint: Se informado, só retorna o artefato se o fingerprint coincidir
+
+        Returns:
+            Dict com 'payload' (bytes), 'params', 'fingerprint', 'artifact_type'
+            e 'created_at', ou None se não existir/estiver desatualizado
+        """
+        if not self.connected:
+            return None
+
+        index_name = "model_artifacts"
+        try:
+            if not self._check_index_exists(index_name):
+                return None
+
+            response = self.es.get(index=index_name, id=artifact_name)
+            source = response["_source"]
+
+            if fingerprint is not None and source.get("fingerprint") != fingerprint:
+                print(
+                    f"⚠️  Artefato '{artifact_name}' desatualizado (fingerprint diferente)"
+                )
+                return None
+
+            return {
+                "payload": base64.b64decode(source["payload"]),
+                "params": source.get("params", {}),
+                "fingerprint": source.get("fingerprint"),
+                "artifact_type": source.get("artifact_type"),
+                "created_at": source.get("created_at"),
+            }
+
+        except NotFoundError:
+            return None
+        except Exception as e:
+            print(f"❌ Erro ao carregar artefato '{artifact_name}': {e}")
+            return None
+
     def get_cache_status(self) -> Dict[str, Any]:
         """
         Retorna status completo do cache
@@ -928,6 +1303,11 @@ def save_dataset_to_cache(df: pd.DataFrame) -> bool:
     return cache_manager.save_dataset(df)
 
 
+def append_dataset_to_cache(df: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta documentos novos ao dataset (sem recriar o índice)"""
+    return cache_manager.append_dataset(df)
+
+
 def save_embeddings_to_cache(
     index_name: str,
     embeddings: np.ndarray,
@@ -943,10 +1323,23 @@ def save_embeddings_to_cache(
 
 
 def load_embeddings_from_cache(
-    index_name: str, doc_ids: List[str]
+    index_name: str,
+    doc_ids: List[str],
+    dtype: Any = np.float32,
+    normalize: bool = False,
+    out: Optional[np.ndarray] = None,
 ) -> Optional[np.ndarray]:
     """Carrega embeddings do cache"""
-    return cache_manager.load_embeddings(index_name, doc_ids)
+    return cache_manager.load_embeddings(
+        index_name, doc_ids, dtype=dtype, normalize=normalize, out=out
+    )
+
+
+def iter_embeddings_from_cache(
+    index_name: str, batch_size: int = 1000, dtype: Any = np.float32
+) -> Iterator[Tuple[List[str], np.ndarray]]:
+    """Percorre embeddings do cache em blocos (doc_ids, matriz)"""
+    return cache_manager.iter_embeddings(index_name, batch_size=batch_size, dtype=dtype)
 
 
 def check_embeddings_in_cache(
@@ -966,3 +1359,43 @@ def validate_embeddings_integrity(
 ) -> Tuple[bool, List[str]]:
     """Valida integridade dos embeddings"""
     return cache_manager.validate_embeddings_integrity(index_name, doc_ids, texts)
+
+
+def save_artifact_to_cache(
+    artifact_name: str,
+    artifact_type: str,
+    payload: bytes,
+    params: Dict[str, Any],
+    fingerprint: str,
+) -> bool:
+    """Salva artefato de modelo no cache"""
+    return cache_manager.save_artifact(
+        artifact_name, artifact_type, payload, params, fingerprint
+    )
+
+
+def load_artifact_from_cache(
+    artifact_name: str, fingerprint: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Carrega artefato de modelo do cache"""
+    return cache_manager.load_artifact(artifact_name, fingerprint)
+
+
+def generate_corpus_fingerprint(doc_ids: List[str], texts: List[str]) -> str:
+    """
+    Gera fingerprint de um corpus (doc_ids + hash MD5 de cada texto)
+
+    Qualquer mudança em um documento, na ordem ou na quantidade altera o fingerprint.
+
+    Args:
+        doc_ids: Lista de IDs dos documentos
+        texts: Lista de textos (mesma ordem)
+
+    Returns:
+        str: Hash SHA-256 hexadecimal
+    """
+    digest = hashlib.sha256()
+    for doc_id, text in zip(doc_ids, texts):
+        digest.update(doc_id.encode("utf-8"))
+        digest.update(hashlib.md5(text.encode("utf-8")).digest())
+    return digest.hexdigest()
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+Embedding Pipeline
+==================
+
+Motor reutilizável para gerar embeddings com cache no Elasticsearch.
+
+Substitui o fluxo manual repetido nos notebooks (verificar cache → gerar a
+matriz inteira → salvar tudo de uma vez) por um pipeline produtor/consumidor:
+
+    ┌──────────────┐   fila (chunks)   ┌──────────────────────┐
+    │  Produtor    │ ────────────────→ │  Consumidor (thread) │
+    │  encode(k+1) │                   │  bulk no ES (k)      │
+    └──────────────┘                   └──────────────────────┘
+
+Enquanto o modelo codifica o chunk k+1, o chunk k está sendo gravado no
+Elasticsearch. O tempo total tende a max(encode, escrita) em vez da soma.
+Em re-execuções, apenas os documentos ausentes (ou com text_hash divergente)
+são gerados. Textos repetidos são codificados uma única vez e o vetor é
+replicado para todos os doc_ids (``deduplication.py``).
+
+Os modelos são plugados via adaptadores (``EmbeddingAdapter``):
+
+- ``TfidfAdapter``: TfidfVectorizer (4096 features, unigramas + bigramas)
+- ``Word2VecAdapter``: Word2Vec treinado no corpus + média dos vetores
+- ``SentenceTransformerAdapter``: BERT / Sentence-BERT
+- ``OpenAIAdapter``: API de embeddings da OpenAI
+
+Exemplo:
+    >>> from embedding_pipeline import EmbeddingPipeline, SentenceTransformerAdapter
+    >>> pipeline = EmbeddingPipeline(
+    ...     SentenceTransformerAdapter("all-MiniLM-L6-v2", model_type="sbert"),
+    ...     index_name="embeddings_sbert",
+    ... )
+    >>> sbert_embeddings = pipeline.run(doc_ids, df['text'].tolist())
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import elasticsearch_manager
+from deduplication import DEDUPLICATE_TEXTS, deduplicate_texts
+from profiling_helpers import profile_stage
+from tfidf_artifacts import load_tfidf_vectorizer, save_tfidf_vectorizer
+from word2vec_pooling import document_embeddings_from_texts, tokenize_texts
+
+# Tamanho padrão dos chunks (CACHE_CHUNK_SIZE no config_example.env)
+DEFAULT_CHUNK_SIZE = int(os.getenv("CACHE_CHUNK_SIZE", 1000))
+
+# Sentinela que sinaliza fim da fila para o consumidor
+_END_OF_STREAM = object()
+
+
+# =============================================================================
+# ADAPTADORES DE MODELOS
+# =============================================================================
+
+
+class EmbeddingAdapter(ABC):
+    """
+    Interface base dos adaptadores de modelos de embeddings.
+
+    Subclasses devem implementar ``encode``. Modelos que precisam ver o corpus
+    inteiro antes de gerar vetores (TF-IDF, Word2Vec) sobrescrevem ``fit`` e
+    marcam ``refitted = True`` quando o ajuste gerou um modelo NOVO (não
+    restaurado): os vetores em cache vieram de outro modelo e o pipeline
+    recodifica todas as linhas.
+    """
+
+    model_type: str = "base"
+    model_version: str = "1.0"
+    refitted: bool = False
+
+    def fit(self, texts: List[str], doc_ids: Optional[List[str]] = None) -> None:
+        """Ajusta o modelo ao corpus completo (padrão: nada a fazer)"""
+
+    @abstractmethod
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Gera embeddings float32 (n_textos, n_dims) para uma lista de textos"""
+
+
+class TfidfAdapter(EmbeddingAdapter):
+    """
+    Adaptador TF-IDF (mesmos parâmetros do Notebook 2).
+
+    Com ``persist=True`` o vectorizer ajustado é salvo no índice
+    ``model_artifacts`` e restaurado (sem refit) quando o corpus não mudou.
+    """
+
+    model_type = "tfidf"
+
+    def __init__(
+        self,
+        max_features: int = 4096,
+        max_df: float = 0.95,
+        min_df: int = 2,
+        ngram_range: Tuple[int, int] = (1, 2),
+        persist: bool = True,
+    ):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self.vectorizer = TfidfVectorizer(
+            max_features=max_features,  # Máximo do dense_vector no Elasticsearch
+            max_df=max_df,
+            min_df=min_df,
+            ngram_range=ngram_range,
+        )
+        self.persist = persist
+
+    def fit(self, texts: List[str], doc_ids: Optional[List[str]] = None) -> None:
+        cache = elasticsearch_manager.cache_manager
+        use_artifacts = self.persist and doc_ids is not None and cache.connected
+
+        if use_artifacts:
+            fingerprint = elasticsearch_manager.generate_corpus_fingerprint(doc_ids, texts)
+            expected_params = {
+                name: self.vectorizer.get_params()[name]
+                for name in ("max_features", "max_df", "min_df", "ngram_range")
+            }
+            restored = load_tfidf_vectorizer(fingerprint, expected_params=expected_params)
+            if restored is not None:
+                self.vectorizer = restored
+                self.refitted = False
+                return
+
+        self.vectorizer.fit(texts)
+        self.refitted = True
+
+        if use_artifacts:
+            save_tfidf_vectorizer(self.vectorizer, fingerprint)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.vectorizer.transform(texts).astype(np.float32).toarray()
+
+
+class Word2VecAdapter(EmbeddingAdapter):
+    """Adaptador Word2Vec: treina no corpus e faz média dos vetores das palavras"""
+
+    model_type = "word2vec"
+
+    def __init__(
+        self,
+        vector_size: int = 100,
+        window: int = 5,
+        min_count: int = 2,
+        workers: int = 4,
+        epochs: int = 10,
+        seed: int = 42,
+    ):
+        self.params = dict(
+            vector_size=vector_size,
+            window=window,
+            min_count=min_count,
+            workers=workers,
+            epochs=epochs,
+            seed=seed,
+        )
+        self.model = None
+
+    def fit(self, texts: List[str], doc_ids: Optional[List[str]] = None) -> None:
+        from gensim.models import Word2Vec
+
+        self.model = Word2Vec(sentences=tokenize_texts(texts), **self.params)
+        # Treino com vários workers não é determinístico: sempre um modelo novo
+        self.refitted = True
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return document_embeddings_from_texts(texts, self.model.wv, n_jobs=1)
+
+
+class SentenceTransformerAdapter(EmbeddingAdapter):
+    """Adaptador para modelos SentenceTransformer (BERT e Sentence-BERT)"""
+
+    def __init__(self, model_name: str, model_type: str, batch_size: Optional[int] = None):
+        from sentence_transformers import SentenceTransformer
+
+        from transformer_encoding import TokenBudgetEncoder
+
+        self.model_name = model_name
+        self.model_type = model_type
+        self.model = SentenceTransformer(model_name)
+        self.encoder = TokenBudgetEncoder(self.model, batch_size=batch_size)
+        self.batch_size = self.encoder.batch_size
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.encoder.encode(texts)
+
+
+class OpenAIAdapter(EmbeddingAdapter):
+    """Adaptador para a API de embeddings da OpenAI"""
+
+    def __init__(
+        self,
+        client,
+        model: str = "text-embedding-3-small",
+        max_tokens_per_request: Optional[int] = None,
+    ):
+        self.client = client
+        self.model = model
+        self.model_type = f"openai_{model}"
+        self.max_tokens_per_request = max_tokens_per_request
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        from openai_batching import pack_batches
+
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+
+        # Agrupar textos em requisições por bin packing de tokens
+        request_batches = pack_batches(
+            texts, max_tokens_per_request=self.max_tokens_per_request, model=self.model
+        ).batches
+
+        for batch in request_batches:
+            response = self.client.embeddings.create(
+                model=self.model, input=[texts[i] for i in batch]
+            )
+            for i, embedding_data in enumerate(response.data):
+                vectors[batch[i]] = embedding_data.embedding
+
+        return np.asarray(vectors, dtype=np.float32)
+
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+
+
+class EmbeddingPipeline:
+    """
+    Pipeline produtor/consumidor que gera apenas os embeddings ausentes no
+    cache e sobrepõe a geração do chunk k+1 com a gravação do chunk k.
+    """
+
+    def __init__(
+        self,
+        adapter: EmbeddingAdapter,
+        index_name: str,
+        cache: Optional["elasticsearch_manager.ElasticsearchEmbeddingsCache"] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        queue_size: int = 2,
+        use_cache: Optional[bool] = None,
+        force_regenerate: Optional[bool] = None,
+        deduplicate: Optional[bool] = None,
+        verbose: bool = True,
+    ):
+        """
+        Args:
+            adapter: Adaptador do modelo
+            index_name: Índice de embeddings no Elasticsearch
+            cache: Gerenciador de cache (padrão: instância global do módulo)
+            chunk_size: Documentos por chunk (padrão: CACHE_CHUNK_SIZE)
+            queue_size: Chunks aguardando gravação (limita memória)
+            use_cache: Padrão: USE_ELASTICSEARCH_CACHE
+            force_regenerate: Padrão: FORCE_REGENERATE_EMBEDDINGS
+            deduplicate: Codifica textos repetidos uma única vez (padrão: DEDUPLICATE_TEXTS)
+            verbose: Se True, mostra progresso
+        """
+        self.adapter = adapter
+        self.index_name = index_name
+        self._cache = cache
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self.use_cache = (
+            use_cache
+            if use_cache is not None
+            else os.getenv("USE_ELASTICSEARCH_CACHE", "true").lower() == "true"
+        )
+        self.force_regenerate = (
+            force_regenerate
+            if force_regenerate is not None
+            else os.getenv("FORCE_REGENERATE_EMBEDDINGS", "false").lower() == "true"
+        )
+        self.deduplicate = DEDUPLICATE_TEXTS if deduplicate is None else deduplicate
+        self.verbose = verbose
+        self.timings: Dict[str, float] = {}
+
+    @property
+    def cache(self):
+        # Resolvido em tempo de execução: init_elasticsearch_cache() substitui a instância global
+        return self._cache if self._cache is not None else elasticsearch_manager.cache_manager
+
+    @property
+    def cache_enabled(self) -> bool:
+        return self.use_cache and self.cache.connected
+
+    def find_missing(self, doc_ids: List[str], texts: List[str]) -> List[str]:
+        """
+        Retorna os doc_ids que precisam ser gerados (ausentes ou inválidos)
+
+        Args:
+            doc_ids: Lista de IDs dos documentos
+            texts: Lista de textos (para validar text_hash)
+
+        Returns:
+            Lista de doc_ids a gerar
+        """
+        if not self.cache_enabled or self.force_regenerate:
+            return list(doc_ids)
+
+        _, existing_ids, missing_ids = self.cache.check_embeddings_exist(
+            self.index_name, doc_ids
+        )
+
+        if existing_ids:
+            positions = {doc_id: idx for idx, doc_id in enumerate(doc_ids)}
+            valid, invalid_ids = self.cache.validate_embeddings_integrity(
+                self.index_name,
+                existing_ids,
+                [texts[positions[doc_id]] for doc_id in existing_ids],
+            )
+            if not valid:
+                if self.verbose:
+                    print(f"⚠️  {len(invalid_ids):,} embeddings inválidos serão regenerados")
+                invalid_set = set(invalid_ids)
+                missing_set = set(missing_ids) | invalid_set
+                missing_ids = [doc_id for doc_id in doc_ids if doc_id in missing_set]
+
+        return missing_ids
+
+    def _writer(self, write_queue: "queue.Queue", errors: List[str]) -> None:
+        """Consumidor: grava cada chunk no Elasticsearch assim que fica pronto"""
+        while True:
+            item = write_queue.get()
+            if item is _END_OF_STREAM:
+                break
+
+            chunk_ids, chunk_texts, chunk_embeddings = item
+            start = time.perf_counter()
+            try:
+                ok = self.cache.save_embeddings(
+                    self.index_name,
+                    chunk_embeddings,
+                    chunk_ids,
+                    chunk_texts,
+                    self.adapter.model_type,
+                    self.adapter.model_version,
+                    check_existing=False,
+                    wait_for_indexing=False,
+                    verbose=False,
+                )
+                if not ok:
+                    errors.append(f"chunk {chunk_ids[0]}..{chunk_ids[-1]}")
+            except Exception as e:
+                errors.append(f"chunk {chunk_ids[0]}..{chunk_ids[-1]}: {e}")
+            self.timings["write"] += time.perf_counter() - start
+
+    def run(self, doc_ids: List[str], texts: List[str]) -> np.ndarray:
+        """
+        Retorna a matriz de embeddings (n_docs, n_dims) em float32, na ordem
+        de ``doc_ids``, gerando e gravando apenas o que falta no cache.
+
+        Args:
+            doc_ids: Lista de IDs dos documentos
+            texts: Lista de textos (mesma ordem de doc_ids)
+
+        Returns:
+            np.ndarray: Embeddings float32 (forma (0, 0) se ``doc_ids`` é vazio)
+        """
+        with profile_stage(f"pipeline.{self.adapter.model_type}"):
+            return self._run(doc_ids, texts)
+
+    def _run(self, doc_ids: List[str], texts: List[str]) -> np.ndarray:
+        wall_start = time.perf_counter()
+        self.timings = {"fit": 0.0, "encode": 0.0, "write": 0.0, "load": 0.0}
+        positions = {doc_id: idx for idx, doc_id in enumerate(doc_ids)}
+
+        if self.verbose:
+            print(f"🧮 Pipeline '{self.adapter.model_type}' → '{self.index_name}'")
+
+        # 1. Descobrir o que falta no cache
+        missing_ids = self.find_missing(doc_ids, texts)
+        missing_set = set(missing_ids)
+        cached_ids = [doc_id for doc_id in doc_ids if doc_id not in missing_set]
+
+        # 2. Ajustar o modelo ao corpus completo (TF-IDF / Word2Vec). Um modelo
+        # novo não é compatível com os vetores em cache: recodificar tudo
+        if missing_ids:
+            start = time.perf_counter()
+            self.adapter.fit(list(texts), list(doc_ids))
+            self.timings["fit"] = time.perf_counter() - start
+            if self.adapter.refitted and cached_ids:
+                if self.verbose:
+                    print(f"   Modelo reajustado: {len(cached_ids):,} vetores em cache "
+                          f"serão recodificados")
+                missing_ids, cached_ids = list(doc_ids), []
+
+        if self.verbose:
+            print(f"   Em cache: {len(cached_ids):,} | A gerar: {len(missing_ids):,}")
+
+        result: Optional[np.ndarray] = None
+
+        # 3. Carregar o que já existe
+        if cached_ids:
+            start = time.perf_counter()
+            cached = self.cache.load_embeddings(self.index_name, cached_ids)
+            self.timings["load"] = time.perf_counter() - start
+
+            if cached is None:
+                # Falha na carga: regenerar tudo
+                if not missing_ids:
+                    self.adapter.fit(list(texts), list(doc_ids))
+                missing_ids, cached_ids = list(doc_ids), []
+            else:
+                result = np.empty((len(doc_ids), cached.shape[1]), dtype=np.float32)
+                result[[positions[doc_id] for doc_id in cached_ids]] = cached
+
+        if not missing_ids:
+            self._report(wall_start, generated=0)
+            return result if result is not None else np.empty((0, 0), dtype=np.float32)
+
+        # 4. Deduplicar: apenas representantes são codificados
+        if self.deduplicate:
+            dedup = deduplicate_texts([texts[positions[doc_id]] for doc_id in missing_ids])
+            group_members = {
+                missing_ids[rep_row]: [missing_ids[row] for row in rows]
+                for rep_row, rows in zip(dedup.representatives, dedup.members())
+            }
+            if self.verbose and dedup.n_unique < dedup.n_docs:
+                dedup.print_report()
+        else:
+            group_members = {doc_id: [doc_id] for doc_id in missing_ids}
+        unique_ids = list(group_members)
+
+        # 5. Produtor/consumidor: encode(k+1) em paralelo com a gravação de k
+        write_queue: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        write_errors: List[str] = []
+        writer = None
+        if self.cache_enabled:
+            self.cache.create_index(self.index_name, verbose=False)
+            writer = threading.Thread(
+                target=self._writer,
+                args=(write_queue, write_errors),
+                name=f"embedding-writer-{self.index_name}",
+                daemon=True,
+            )
+            writer.start()
+
+        try:
+            for chunk_start in range(0, len(unique_ids), self.chunk_size):
+                chunk_unique = unique_ids[chunk_start:chunk_start + self.chunk_size]
+
+                start = time.perf_counter()
+                unique_embeddings = self.adapter.encode(
+                    [texts[positions[doc_id]] for doc_id in chunk_unique]
+                )
+                self.timings["encode"] += time.perf_counter() - start
+
+                # Replicar o vetor de cada representante para o seu grupo
+                groups = [group_members[doc_id] for doc_id in chunk_unique]
+                chunk_ids = [doc_id for group in groups for doc_id in group]
+                chunk_rows = [positions[doc_id] for doc_id in chunk_ids]
+                chunk_texts = [texts[row] for row in chunk_rows]
+                chunk_embeddings = np.repeat(
+                    unique_embeddings, [len(group) for group in groups], axis=0
+                )
+
+                if result is None:
+                    result = np.empty(
+                        (len(doc_ids), chunk_embeddings.shape[1]), dtype=np.float32
+                    )
+                result[chunk_rows] = chunk_embeddings
+
+                if writer is not None:
+                    write_queue.put((chunk_ids, chunk_texts, chunk_embeddings))
+
+                if self.verbose:
+                    done = min(chunk_start + self.chunk_size, len(unique_ids))
+                    print(f"   Chunk gerado: {done:,}/{len(unique_ids):,}")
+        finally:
+            if writer is not None:
+                write_queue.put(_END_OF_STREAM)
+                writer.join()
+                self.cache.refresh_index(self.index_name)
+
+        if write_errors:
+            print(f"⚠️  {len(write_errors)} chunks falharam ao gravar no cache:")
+            for error in write_errors[:5]:
+                print(f"   {error}")
+
+        self._report(wall_start, generated=len(missing_ids))
+        return result
+
+    def _report(self, wall_start: float, generated: int) -> None:
+        self.timings["wall"] = time.perf_counter() - wall_start
+        if not self.verbose:
+            return
+
+        t = self.timings
+        print(f"✅ Pipeline '{self.adapter.model_type}' concluído: {generated:,} gerados")
+        print(
+            f"   Tempo total: {t['wall']:.1f}s | fit: {t['fit']:.1f}s | "
+            f"encode: {t['encode']:.1f}s | escrita: {t['write']:.1f}s | carga: {t['load']:.1f}s"
+        )
+        if generated and t["write"] > 0:
+            overlap = t["fit"] + t["encode"] + t["write"] + t["load"] - t["wall"]
+            print(f"   Sobreposição encode/escrita: {max(overlap, 0.0):.1f}s economizados")
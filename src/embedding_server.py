@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+"""
+Servidor Local de Embeddings (modelos sempre carregados)
+========================================================
+
+Cada execução do Notebook 2 (e cada job em lote) recarregava
+bert-base-uncased e all-MiniLM-L6-v2 do disco. Este módulo mantém os
+modelos carregados num processo de longa duração e os expõe por HTTP
+(TCP ou Unix socket):
+
+- ``GET  /health`` → modelos disponíveis, dimensões e estatísticas
+- ``POST /embed``  → ``{"model": "...", "texts": [...]}``; resposta BINÁRIA
+  (float32 little-endian, linha a linha) com o shape no header
+  ``X-Embedding-Shape: n,d`` — sem JSON de milhares de floats
+
+Requisições concorrentes do mesmo modelo são agrupadas (micro-batching):
+a primeira requisição abre uma janela de até ``max_wait_ms``; as que chegam
+nesse intervalo são codificadas juntas num único ``encode`` (até
+``max_batch_size`` textos). Consultas isoladas pagam no máximo essa janela.
+
+Configuração (config_example.env):
+
+    EMBEDDING_SERVER_URL=              # Ex: http://127.0.0.1:8090 ou unix:///tmp/embeddings.sock
+    EMBEDDING_SERVER_MAX_BATCH=64      # Textos por micro-batch
+    EMBEDDING_SERVER_MAX_WAIT_MS=5     # Janela de agrupamento (orçamento de latência)
+
+Uso:
+    python src/embedding_server.py --model all-MiniLM-L6-v2 --model bert-base-uncased \\
+        --word2vec results/models/word2vec.model --port 8090
+
+    >>> from embedding_server import EmbeddingServerClient
+    >>> client = EmbeddingServerClient("http://127.0.0.1:8090")
+    >>> client.encode(["consulta curta"], model="all-MiniLM-L6-v2").shape
+    (1, 384)
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import argparse
+import http.client
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+EMBEDDING_SERVER_URL = os.getenv("EMBEDDING_SERVER_URL", "")
+EMBEDDING_SERVER_MAX_BATCH = int(os.getenv("EMBEDDING_SERVER_MAX_BATCH") or 64)
+EMBEDDING_SERVER_MAX_WAIT_MS = float(os.getenv("EMBEDDING_SERVER_MAX_WAIT_MS") or 5)
+
+DEFAULT_WORD2VEC_PATH = (
+    Path(__file__).resolve().parent.parent / "results" / "models" / "word2vec.model"
+)
+
+EncodeFn = Callable[[List[str]], np.ndarray]
+
+
+# =============================================================================
+# MICRO-BATCHING
+# =============================================================================
+
+
+class _PendingRequest:
+    """Textos de uma requisição aguardando o micro-batch"""
+
+    __slots__ = ("texts", "done", "result", "error")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result: Optional[np.ndarray] = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatcher:
+    """
+    Agrupa requisições concorrentes de um modelo num único ``encode``.
+
+    Uma thread por modelo: espera a primeira requisição, coleta as que
+    chegarem em até ``max_wait_ms`` (ou até ``max_batch_size`` textos),
+    codifica tudo junto e devolve a fatia de cada requisição.
+    """
+
+    def __init__(
+        self,
+        encode_fn: EncodeFn,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        name: str = "model",
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size or EMBEDDING_SERVER_MAX_BATCH
+        max_wait_ms = EMBEDDING_SERVER_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms
+        self.max_wait = max_wait_ms / 1000
+        self.queue: "queue.Queue[Optional[_PendingRequest]]" = queue.Queue()
+        self.stats = {"requests": 0, "texts": 0, "batches": 0, "encode_seconds": 0.0}
+        self._thread = threading.Thread(target=self._run, name=f"microbatch-{name}", daemon=True)
+        self._thread.start()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Enfileira os textos e espera o micro-batch (bloqueante)"""
+        request = _PendingRequest(list(texts))
+        self.queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def close(self) -> None:
+        self.queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first: _PendingRequest) -> Tuple[List[_PendingRequest], bool]:
+        batch, n_texts = [first], len(first.texts)
+        deadline = time.monotonic() + self.max_wait
+        while n_texts < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+            n_texts += len(request.texts)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self.queue.get()
+            if first is None:
+                return
+            batch, stop = self._collect(first)
+
+            texts = [text for request in batch for text in request.texts]
+            start = time.perf_counter()
+            try:
+                embeddings = np.asarray(self.encode_fn(texts), dtype=np.float32)
+                offset = 0
+                for request in batch:
+                    request.result = embeddings[offset:offset + len(request.texts)]
+                    offset += len(request.texts)
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+            self.stats["encode_seconds"] += time.perf_counter() - start
+            self.stats["requests"] += len(batch)
+            self.stats["texts"] += len(texts)
+            self.stats["batches"] += 1
+
+            for request in batch:
+                request.done.set()
+            if stop:
+                return
+
+
+# =============================================================================
+# CARREGAMENTO DOS MODELOS
+# =============================================================================
+
+
+def sentence_transformer_encoder(model_name: str) -> Tuple[EncodeFn, int]:
+    """Carrega um SentenceTransformer com batches por orçamento de tokens"""
+    from sentence_transformers import SentenceTransformer
+
+    from transformer_encoding import TokenBudgetEncoder
+
+    encoder = TokenBudgetEncoder(SentenceTransformer(model_name))
+
+    def encode(texts: List[str]) -> np.ndarray:
+        return encoder.encode(texts, show_progress_bar=False)
+
+    return encode, encoder.model.get_sentence_embedding_dimension()
+
+
+def word2vec_encoder(path: Path) -> Tuple[EncodeFn, int]:
+    """Carrega um Word2Vec salvo (``Word2Vec.save`` ou ``KeyedVectors.save``)"""
+    from gensim.utils import SaveLoad
+
+    from word2vec_pooling import document_embeddings_from_texts
+
+    loaded = SaveLoad.load(str(path))
+    keyed_vectors = getattr(loaded, "wv", loaded)
+
+    def encode(texts: List[str]) -> np.ndarray:
+        return document_embeddings_from_texts(texts, keyed_vectors, n_jobs=1)
+
+    return encode, keyed_vectors.vector_size
+
+
+# =============================================================================
+# SERVIDOR HTTP
+# =============================================================================
+
+
+class _EmbeddingServerMixin:
+    """Estado compartilhado pelos servidores TCP e Unix socket"""
+
+    daemon_threads = True
+    request_queue_size = 128  # Backlog do listen (padrão 5 recusa rajadas de clientes)
+
+    def setup_models(
+        self,
+        encoders: Dict[str, Tuple[EncodeFn, int]],
+        max_batch_size: Optional[int],
+        max_wait_ms: Optional[float],
+        verbose: bool,
+    ) -> None:
+        self.batchers = {
+            name: MicroBatcher(encode_fn, max_batch_size, max_wait_ms, name=name)
+            for name, (encode_fn, _) in encoders.items()
+        }
+        self.dimensions = {name: dimension for name, (_, dimension) in encoders.items()}
+        self.verbose = verbose
+        self.started_at = time.time()
+
+    def close_models(self) -> None:
+        for batcher in self.batchers.values():
+            batcher.close()
+
+
+class EmbeddingServer(_EmbeddingServerMixin, ThreadingHTTPServer):
+    """Servidor HTTP (TCP)"""
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class UnixEmbeddingServer(_EmbeddingServerMixin, socketserver.ThreadingUnixStreamServer):
+    """Servidor HTTP sobre Unix socket (sem pilha TCP; só acesso local)"""
+
+    @property
+    def url(self) -> str:
+        return f"unix://{self.server_address}"
+
+
+class EmbeddingRequestHandler(BaseHTTPRequestHandler):
+    """Rotas ``GET /health`` e ``POST /embed``"""
+
+    protocol_version = "HTTP/1.1"  # Conexões persistentes (keep-alive)
+
+    def setup(self) -> None:
+        super().setup()
+        if self.connection.family in (socket.AF_INET, socket.AF_INET6):
+            # Sem Nagle: cabeçalho e corpo saem em writes separados
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def address_string(self) -> str:
+        # Em Unix sockets client_address é uma string vazia
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: bytes, content_type: str,
+              headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") != "/health":
+            self._send_json(404, {"error": f"Rota desconhecida: {self.path}"})
+            return
+        self._send_json(
+            200,
+            {
+                "status": "ok",
+                "models": self.server.dimensions,
+                "uptime_seconds": round(time.time() - self.server.started_at, 1),
+                "stats": {name: b.stats for name, b in self.server.batchers.items()},
+            },
+        )
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/embed":
+            self._send_json(404, {"error": f"Rota desconhecida: {self.path}"})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "JSON inválido"})
+            return
+
+        model = request.get("model")
+        texts = request.get("texts")
+        if model not in self.server.batchers:
+            self._send_json(404, {"error": f"Modelo não carregado: {model}",
+                                  "models": list(self.server.batchers)})
+            return
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            self._send_json(400, {"error": "'texts' deve ser uma lista de textos"})
+            return
+
+        try:
+            embeddings = (
+                self.server.batchers[model].encode(texts) if texts
+                else np.empty((0, self.server.dimensions[model]), dtype=np.float32)
+            )
+        except Exception as e:
+            self._send_json(500, {"error": f"Falha no encode: {e}"})
+            return
+
+        self._send(
+            200,
+            np.ascontiguousarray(embeddings, dtype="<f4").tobytes(),
+            "application/octet-stream",
+            {"X-Embedding-Shape": f"{embeddings.shape[0]},{embeddings.shape[1]}",
+             "X-Embedding-Dtype": "float32"},
+        )
+
+
+def start_embedding_server(
+    encoders: Dict[str, Tuple[EncodeFn, int]],
+    host: str = "127.0.0.1",
+    port: int = 0,
+    unix_socket: Optional[str] = None,
+    max_batch_size: Optional[int] = None,
+    max_wait_ms: Optional[float] = None,
+    verbose: bool = False,
+    background: bool = True,
+):
+    """
+    Cria o servidor com os modelos já carregados.
+
+    Args:
+        encoders: ``{nome: (encode_fn, dimensão)}`` (ver ``sentence_transformer_encoder``
+            e ``word2vec_encoder``)
+        host: Endereço TCP
+        port: Porta TCP (0 = porta livre aleatória)
+        unix_socket: Caminho do Unix socket (substitui host/porta)
+        max_batch_size: Textos por micro-batch (padrão: EMBEDDING_SERVER_MAX_BATCH)
+        max_wait_ms: Janela de agrupamento (padrão: EMBEDDING_SERVER_MAX_WAIT_MS)
+        verbose: Se True, registra cada requisição
+        background: Se True, atende numa thread em segundo plano
+
+    Returns:
+        O servidor (``server.url`` para o cliente; ``stop_embedding_server`` para encerrar)
+    """
+    if unix_socket:
+        unix_socket = os.path.abspath(unix_socket)
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        server = UnixEmbeddingServer(unix_socket, EmbeddingRequestHandler)
+    else:
+        server = EmbeddingServer((host, port), EmbeddingRequestHandler)
+    server.setup_models(encoders, max_batch_size, max_wait_ms, verbose)
+
+    if background:
+        threading.Thread(target=server.serve_forever, name="embedding-server", daemon=True).start()
+    return server
+
+
+def stop_embedding_server(server) -> None:
+    """Encerra o servidor, as threads de micro-batching e remove o Unix socket"""
+    server.shutdown()
+    server.server_close()
+    server.close_models()
+    if isinstance(server, UnixEmbeddingServer) and os.path.exists(server.server_address):
+        os.unlink(server.server_address)
+
+
+# =============================================================================
+# CLIENTE
+# =============================================================================
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class EmbeddingServerClient:
+    """
+    Cliente do servidor de embeddings (uma conexão persistente por thread).
+    """
+
+    def __init__(self, url: Optional[str] = None, timeout: float = 600.0):
+        """
+        Args:
+            url: ``http://host:porta`` ou ``unix:///caminho.sock``
+                (padrão: EMBEDDING_SERVER_URL)
+            timeout: Timeout de cada requisição (segundos)
+        """
+        self.url = url or EMBEDDING_SERVER_URL
+        if not self.url:
+            raise ValueError("URL do servidor não informada (EMBEDDING_SERVER_URL)")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            parsed = urlparse(self.url)
+            if parsed.scheme == "unix":
+                connection = _UnixHTTPConnection(parsed.path, self.timeout)
+            else:
+                connection = http.client.HTTPConnection(
+                    parsed.hostname, parsed.port or 80, timeout=self.timeout
+                )
+            self._local.connection = connection
+        return connection
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None):
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                headers = {"Content-Type": "application/json"} if body is not None else {}
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                return response, response.read()
+            except (ConnectionError, http.client.HTTPException):
+                # Conexão keep-alive encerrada pelo servidor: reconectar uma vez
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise
+
+    def health(self) -> Dict[str, Any]:
+        """Modelos disponíveis e estatísticas do servidor"""
+        response, payload = self._request("GET", "/health")
+        return json.loads(payload)
+
+    def has_model(self, model: str) -> bool:
+        """True se o servidor responde e tem o modelo carregado"""
+        try:
+            return model in self.health().get("models", {})
+        except OSError:
+            return False
+
+    def encode(self, texts: Sequence[str], model: str, chunk_size: int = 2048) -> np.ndarray:
+        """
+        Embeddings float32 (n_textos, dim) calculados no servidor.
+
+        Args:
+            texts: Lista de textos
+            model: Nome do modelo no servidor
+            chunk_size: Textos por requisição
+
+        Returns:
+            np.ndarray float32
+        """
+        texts = list(texts)
+        parts = []
+        for start in range(0, max(len(texts), 1), chunk_size):
+            body = json.dumps({"model": model, "texts": texts[start:start + chunk_size]})
+            response, payload = self._request("POST", "/embed", body.encode("utf-8"))
+            if response.status != 200:
+                raise RuntimeError(f"Servidor de embeddings ({response.status}): "
+                                   f"{payload.decode('utf-8', errors='replace')}")
+            n_rows, n_dims = map(int, response.getheader("X-Embedding-Shape").split(","))
+            parts.append(np.frombuffer(payload, dtype="<f4").reshape(n_rows, n_dims))
+        return np.concatenate(parts).astype(np.float32, copy=False)
+
+
+def main() -> int:
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Servidor local de embeddings")
+    parser.add_argument('--model', action='append', default=[],
+                        help="Modelo SentenceTransformer (repita para vários)")
+    parser.add_argument('--word2vec', type=Path, default=None,
+                        help=f"Word2Vec salvo (padrão: {DEFAULT_WORD2VEC_PATH}, se existir)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--unix-socket', default=None)
+    parser.add_argument('--max-batch', type=int, default=None)
+    parser.add_argument('--max-wait-ms', type=float, default=None)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    encoders: Dict[str, Tuple[EncodeFn, int]] = {}
+    for model_name in args.model or ["all-MiniLM-L6-v2", "bert-base-uncased"]:
+        start = time.perf_counter()
+        encoders[model_name] = sentence_transformer_encoder(model_name)
+        print(f"✅ {model_name} carregado em {time.perf_counter() - start:.1f}s "
+              f"({encoders[model_name][1]} dims)")
+
+    word2vec_path = args.word2vec
+    if word2vec_path is None and DEFAULT_WORD2VEC_PATH.exists():
+        word2vec_path = DEFAULT_WORD2VEC_PATH
+    if word2vec_path is not None:
+        encoders["word2vec"] = word2vec_encoder(word2vec_path)
+        print(f"✅ word2vec carregado de {word2vec_path}")
+
+    server = start_embedding_server(
+        encoders,
+        host=args.host,
+        port=args.port,
+        unix_socket=args.unix_socket,
+        max_batch_size=args.max_batch,
+        max_wait_ms=args.max_wait_ms,
+        verbose=args.verbose,
+        background=False,
+    )
+    print(f"🚀 Servidor de embeddings em {server.url} (Ctrl+C para encerrar)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Encerrando...")
+    finally:
+        server.server_close()
+        server.close_models()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Estatísticas de Embeddings em Uma Única Passada
+===============================================
+
+``calculate_embedding_stats`` do Notebook 4 fazia ``embeddings.flatten()``
+(cópia da matriz inteira), uma segunda cópia com os não-zeros e passadas
+separadas para média, desvio, mínimo, máximo, esparsidade e normas — e as
+células de esparsidade e de boxplots repetiam boa parte disso.
+
+``EmbeddingStatsAccumulator`` consome a matriz em blocos de linhas e
+atualiza tudo numa única passada, com memória extra O(D):
+
+- média e variância (valores não-zero, todos os valores e por dimensão)
+  combinadas bloco a bloco com a fórmula de Welford/Chan
+- mínimo, máximo, contagem de zeros
+- normas L2 por linha (média, mínimo, máximo, fração com norma ≈ 1)
+- amostras de reservatório (todos os valores e não-zeros) de tamanho fixo,
+  para histogramas e boxplots
+
+Aceita um ``np.ndarray``/``np.memmap`` (fatiado em blocos) ou qualquer
+iterável de blocos — inclusive os pares ``(doc_ids, bloco)`` de
+``iter_embeddings`` do ``elasticsearch_manager``.
+
+Exemplo:
+    >>> from embedding_stats import compute_embedding_stats
+    >>> stats = compute_embedding_stats(embeddings)
+    >>> stats.sparsity, stats.nonzero_std, stats.is_normalized
+    >>> plt.boxplot(stats.nonzero_sample)
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+# Tolerância para considerar uma linha normalizada (mesma do Notebook 4)
+NORMALIZED_ATOL = 1e-2
+
+
+@dataclass
+class EmbeddingStats:
+    """Estatísticas de uma matriz de embeddings"""
+
+    n_rows: int
+    n_dims: int
+    itemsize: int
+    zero_count: int
+    min: float
+    max: float
+    mean: float                # Todos os valores
+    std: float
+    nonzero_mean: float        # Apenas valores não-zero
+    nonzero_std: float
+    dim_mean: np.ndarray       # (n_dims,)
+    dim_std: np.ndarray        # (n_dims,)
+    norm_mean: float
+    norm_min: float
+    norm_max: float
+    normalized_fraction: float  # Fração das linhas com |norma - 1| <= NORMALIZED_ATOL
+    value_sample: np.ndarray    # Amostra de reservatório de todos os valores
+    nonzero_sample: np.ndarray  # Amostra de reservatório dos valores não-zero
+
+    @property
+    def n_values(self) -> int:
+        return self.n_rows * self.n_dims
+
+    @property
+    def sparsity(self) -> float:
+        """Percentual de zeros"""
+        return 100.0 * self.zero_count / max(self.n_values, 1)
+
+    @property
+    def is_normalized(self) -> bool:
+        return self.n_rows > 0 and self.normalized_fraction == 1.0
+
+    @property
+    def memory_mb(self) -> float:
+        return self.n_values * self.itemsize / (1024 * 1024)
+
+    def as_row(self, name: str) -> Dict[str, Any]:
+        """Linha da tabela comparativa do Notebook 4"""
+        has_nonzero = self.zero_count < self.n_values
+        return {
+            'Nome': name,
+            'Shape': f"{self.n_rows} × {self.n_dims}",
+            'Dimensionalidade': self.n_dims,
+            'Esparsidade (%)': f"{self.sparsity:.2f}%",
+            'Densidade (%)': f"{100 - self.sparsity:.2f}%",
+            'Normalizado': "✅ Sim" if self.is_normalized else "❌ Não",
+            'Média': f"{self.nonzero_mean:.4f}" if has_nonzero else "N/A",
+            'Std': f"{self.nonzero_std:.4f}" if has_nonzero else "N/A",
+            'Min': f"{self.min:.4f}",
+            'Max': f"{self.max:.4f}",
+            'Memória (MB)': f"{self.memory_mb:.2f}",
+        }
+
+
+def _merge_moments(
+    count_a: Union[int, np.ndarray], mean_a, m2_a,
+    count_b: Union[int, np.ndarray], mean_b, m2_b,
+) -> Tuple[Any, Any, Any]:
+    """Combina (contagem, média, M2) de dois conjuntos (Chan et al.)"""
+    count = count_a + count_b
+    safe_count = np.maximum(count, 1)
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (count_b / safe_count)
+    m2 = m2_a + m2_b + delta**2 * (count_a * count_b / safe_count)
+    return count, mean, m2
+
+
+class _Reservoir:
+    """
+    Amostra uniforme de tamanho fixo sobre um fluxo de blocos.
+
+    Cada valor recebe uma prioridade aleatória; ficam os ``size`` de menor
+    prioridade (equivalente ao algoritmo R, mas vetorizado por bloco).
+    """
+
+    def __init__(self, size: int, rng: np.random.Generator):
+        self.size = size
+        self.rng = rng
+        self.values = np.empty(0, dtype=np.float32)
+        self.priorities = np.empty(0, dtype=np.float64)
+
+    def update(self, values: np.ndarray) -> None:
+        if self.size <= 0 or values.size == 0:
+            return
+        priorities = self.rng.random(values.size)
+        # Só candidatos que podem entrar no reservatório
+        if values.size > self.size:
+            keep = np.argpartition(priorities, self.size - 1)[:self.size]
+            values, priorities = values[keep], priorities[keep]
+        values = np.concatenate([self.values, values.astype(np.float32, copy=False)])
+        priorities = np.concatenate([self.priorities, priorities])
+        if values.size > self.size:
+            keep = np.argpartition(priorities, self.size - 1)[:self.size]
+            values, priorities = values[keep], priorities[keep]
+        self.values, self.priorities = values, priorities
+
+
+class EmbeddingStatsAccumulator:
+    """Acumula estatísticas de embeddings bloco a bloco (memória O(D))"""
+
+    def __init__(self, reservoir_size: int = 10000, seed: int = 42):
+        """
+        Args:
+            reservoir_size: Tamanho de cada amostra de reservatório
+            seed: Semente das amostras
+        """
+        rng = np.random.default_rng(seed)
+        self.value_reservoir = _Reservoir(reservoir_size, rng)
+        self.nonzero_reservoir = _Reservoir(reservoir_size, rng)
+
+        self.n_rows = 0
+        self.n_dims: Optional[int] = None
+        self.itemsize = 4
+        self.zero_count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        # (contagem, média, M2) para todos os valores, não-zeros e por dimensão
+        self.values_moments = (0, 0.0, 0.0)
+        self.nonzero_moments = (0, 0.0, 0.0)
+        self.dim_moments: Optional[Tuple[int, np.ndarray, np.ndarray]] = None
+        self.norm_sum = 0.0
+        self.norm_min = np.inf
+        self.norm_max = -np.inf
+        self.normalized_rows = 0
+
+    def update(self, chunk: np.ndarray) -> "EmbeddingStatsAccumulator":
+        """Incorpora um bloco (n_linhas, n_dims)"""
+        chunk = np.asarray(chunk)
+        if chunk.ndim != 2:
+            raise ValueError(f"Bloco deve ser 2D, recebido {chunk.shape}")
+        if self.n_dims is None:
+            self.n_dims = chunk.shape[1]
+            self.itemsize = chunk.dtype.itemsize
+            self.dim_moments = (0, np.zeros(self.n_dims), np.zeros(self.n_dims))
+        elif chunk.shape[1] != self.n_dims:
+            raise ValueError(f"Dimensão inconsistente: {chunk.shape[1]} vs {self.n_dims}")
+        if chunk.shape[0] == 0:
+            return self
+
+        values = chunk.astype(np.float64, copy=False)
+        n_rows = values.shape[0]
+        self.n_rows += n_rows
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        # Por dimensão
+        dim_mean = values.mean(axis=0)
+        dim_m2 = ((values - dim_mean) ** 2).sum(axis=0)
+        self.dim_moments = _merge_moments(*self.dim_moments, n_rows, dim_mean, dim_m2)
+
+        # Todos os valores: derivados das estatísticas por dimensão do bloco
+        chunk_mean = float(dim_mean.mean())
+        chunk_m2 = float(dim_m2.sum() + n_rows * ((dim_mean - chunk_mean) ** 2).sum())
+        self.values_moments = _merge_moments(
+            *self.values_moments, values.size, chunk_mean, chunk_m2
+        )
+
+        # Não-zeros
+        nonzero = values[values != 0]
+        self.zero_count += values.size - nonzero.size
+        if nonzero.size:
+            nonzero_mean = float(nonzero.mean())
+            nonzero_m2 = float(((nonzero - nonzero_mean) ** 2).sum())
+            self.nonzero_moments = _merge_moments(
+                *self.nonzero_moments, nonzero.size, nonzero_mean, nonzero_m2
+            )
+
+        # Normas L2 por linha
+        norms = np.sqrt(np.einsum("ij,ij->i", values, values))
+        self.norm_sum += float(norms.sum())
+        self.norm_min = min(self.norm_min, float(norms.min()))
+        self.norm_max = max(self.norm_max, float(norms.max()))
+        self.normalized_rows += int(np.count_nonzero(np.abs(norms - 1.0) <= NORMALIZED_ATOL))
+
+        self.value_reservoir.update(chunk.ravel())
+        self.nonzero_reservoir.update(nonzero)
+        return self
+
+    def result(self) -> EmbeddingStats:
+        """Estatísticas acumuladas até aqui"""
+        if self.n_dims is None:
+            raise ValueError("Nenhum bloco processado")
+
+        def std(moments) -> Any:
+            count, _, m2 = moments
+            return np.sqrt(m2 / np.maximum(count, 1))
+
+        n_rows = max(self.n_rows, 1)
+        return EmbeddingStats(
+            n_rows=self.n_rows,
+            n_dims=self.n_dims,
+            itemsize=self.itemsize,
+            zero_count=self.zero_count,
+            min=float(self.min),
+            max=float(self.max),
+            mean=float(self.values_moments[1]),
+            std=float(std(self.values_moments)),
+            nonzero_mean=float(self.nonzero_moments[1]),
+            nonzero_std=float(std(self.nonzero_moments)),
+            dim_mean=np.asarray(self.dim_moments[1], dtype=np.float64),
+            dim_std=np.asarray(std(self.dim_moments), dtype=np.float64),
+            norm_mean=self.norm_sum / n_rows,
+            norm_min=float(self.norm_min),
+            norm_max=float(self.norm_max),
+            normalized_fraction=self.normalized_rows / n_rows,
+            value_sample=self.value_reservoir.values.copy(),
+            nonzero_sample=self.nonzero_reservoir.values.copy(),
+        )
+
+
+def _iter_chunks(source: Any, chunk_size: int) -> Iterable[np.ndarray]:
+    if isinstance(source, np.ndarray):
+        for start in range(0, source.shape[0], chunk_size):
+            yield source[start:start + chunk_size]
+        return
+    for chunk in source:
+        # Pares (doc_ids, bloco) de iter_embeddings
+        if isinstance(chunk, tuple):
+            chunk = chunk[-1]
+        yield chunk
+
+
+def compute_embedding_stats(
+    source: Any,
+    chunk_size: int = 4096,
+    reservoir_size: int = 10000,
+    seed: int = 42,
+) -> EmbeddingStats:
+    """
+    Estatísticas de uma matriz ou de um fluxo de blocos, numa única passada.
+
+    Args:
+        source: np.ndarray / np.memmap, iterável de blocos 2D ou de pares
+            (doc_ids, bloco) como os de ``iter_embeddings``
+        chunk_size: Linhas por bloco quando ``source`` é uma matriz
+        reservoir_size: Tamanho das amostras para histogramas
+        seed: Semente das amostras
+
+    Returns:
+        EmbeddingStats
+    """
+    accumulator = EmbeddingStatsAccumulator(reservoir_size=reservoir_size, seed=seed)
+    for chunk in _iter_chunks(source, chunk_size):
+        accumulator.update(chunk)
+    return accumulator.result()
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Workspace Compartilhado de Embeddings
+=====================================
+
+Cada kernel de notebook e cada processo worker carregava do Elasticsearch sua
+própria cópia das cinco matrizes (> 1 GB por processo).
+
+O workspace carrega cada índice de embeddings UMA vez para um arquivo ``.npy``
+e registra forma, dtype, fingerprint do conteúdo e fingerprint da ordem dos
+doc_ids num pequeno ``registry.json``. Qualquer processo anexa a matriz por
+nome do índice como ``np.memmap`` somente leitura: sem cópia, as páginas
+ficam no page cache e são compartilhadas por todos os processos.
+
+Por padrão o diretório fica em ``/dev/shm`` (tmpfs, memória compartilhada
+POSIX no Linux); sem ``/dev/shm`` (macOS/Windows) usa
+``results/embedding_workspace`` em disco — mesmo comportamento, páginas
+compartilhadas pelo cache do sistema.
+
+Republicar um índice grava um arquivo novo (nome com o fingerprint) e só
+então atualiza o registro: processos já anexados continuam com a versão
+antiga até reanexar.
+
+Matrizes carregadas do Elasticsearch guardam também o fingerprint do estado
+do índice (``dataset_snapshot.index_fingerprint``: contagem, ``_seq_no``,
+``created_at``). Se o Notebook 2 regenerar ou reajustar os embeddings, o
+fingerprint muda e ``load_from_elasticsearch`` recarrega o índice em vez de
+anexar a cópia antiga.
+
+Configuração (config_example.env):
+
+    EMBEDDING_WORKSPACE_DIR=   # Vazio = /dev/shm/embedding_workspace (ou results/)
+
+Exemplo:
+    >>> from embedding_workspace import EmbeddingWorkspace
+    >>> workspace = EmbeddingWorkspace()
+    >>> sbert = workspace.load_from_elasticsearch("embeddings_sbert", doc_ids)
+    >>> # Em outro kernel/processo, sem tocar no Elasticsearch:
+    >>> sbert = workspace.attach("embeddings_sbert", doc_ids=doc_ids)
+
+CLI:
+    python embedding_workspace.py load --types tfidf sbert
+    python embedding_workspace.py list
+    python embedding_workspace.py drop
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import argparse
+import errno
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from analysis_cache import array_fingerprint
+
+try:
+    import fcntl
+except ImportError:  # Windows: registro sem lock entre processos
+    fcntl = None
+
+_SHM_ROOT = Path("/dev/shm")
+DEFAULT_WORKSPACE_DIR = (
+    _SHM_ROOT / "embedding_workspace" if _SHM_ROOT.is_dir()
+    else Path(__file__).resolve().parent.parent / "results" / "embedding_workspace"
+)
+EMBEDDING_WORKSPACE_DIR = Path(os.getenv("EMBEDDING_WORKSPACE_DIR") or DEFAULT_WORKSPACE_DIR)
+
+EMBEDDING_TYPES = ['tfidf', 'word2vec', 'bert', 'sbert', 'openai']
+
+
+def _reserve_space(path: Path, n_bytes: int) -> None:
+    """
+    Reserva o espaço do arquivo antes de gravar pelo memmap.
+
+    Gravar num memmap esparso sem espaço no tmpfs mata o processo com SIGBUS;
+    reservando antes, a falta de espaço vira um OSError tratável.
+    """
+    if hasattr(os, "posix_fallocate"):
+        fd = os.open(path, os.O_RDWR)
+        try:
+            os.posix_fallocate(fd, 0, n_bytes)
+        finally:
+            os.close(fd)
+        return
+    free = shutil.disk_usage(path.parent).free
+    if n_bytes - path.stat().st_size > free:
+        raise OSError(errno.ENOSPC, f"{n_bytes} bytes necessários, {free} livres", str(path))
+
+
+def doc_ids_fingerprint(doc_ids: Sequence[str]) -> str:
+    """Fingerprint da ordem das linhas (lista de doc_ids)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for doc_id in doc_ids:
+        digest.update(str(doc_id).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass
+class WorkspaceEntry:
+    """Registro de uma matriz publicada"""
+
+    name: str
+    file: str                # Relativo ao diretório do workspace
+    shape: List[int]
+    dtype: str
+    fingerprint: str         # array_fingerprint do conteúdo
+    doc_ids_fingerprint: Optional[str]
+    created_at: float
+    index_state: Optional[str] = None  # index_fingerprint do índice de origem
+
+    @property
+    def size_mb(self) -> float:
+        return int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize / (1024 * 1024)
+
+
+class EmbeddingWorkspace:
+    """Matrizes publicadas uma vez e anexadas sem cópia por qualquer processo"""
+
+    def __init__(self, directory: Optional[Path] = None):
+        """
+        Args:
+            directory: Diretório do workspace (padrão: EMBEDDING_WORKSPACE_DIR)
+        """
+        self.directory = Path(directory or EMBEDDING_WORKSPACE_DIR)
+        self.registry_path = self.directory / "registry.json"
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Lock exclusivo do registro (ler-modificar-gravar entre processos)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / "registry.lock", "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _read_registry(self) -> Dict[str, WorkspaceEntry]:
+        if not self.registry_path.exists():
+            return {}
+        try:
+            raw = json.loads(self.registry_path.read_text(encoding="utf-8"))
+            return {name: WorkspaceEntry(**entry) for name, entry in raw.items()}
+        except Exception as e:
+            print(f"⚠️  Registro do workspace ilegível: {e}")
+            return {}
+
+    def _write_registry(self, entries: Dict[str, WorkspaceEntry]) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp.json")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump({name: asdict(entry) for name, entry in entries.items()}, handle, indent=2)
+        os.replace(tmp_name, self.registry_path)
+
+    def entries(self) -> Dict[str, WorkspaceEntry]:
+        """Matrizes publicadas (nome → WorkspaceEntry)"""
+        return self._read_registry()
+
+    # ------------------------------------------------------------------
+    # Publicar / anexar
+    # ------------------------------------------------------------------
+
+    def _register(
+        self,
+        name: str,
+        tmp_path: Path,
+        fingerprint: str,
+        doc_ids: Optional[Sequence[str]],
+        index_state: Optional[str] = None,
+    ) -> np.memmap:
+        """Move o arquivo temporário para o nome final e atualiza o registro"""
+        matrix = np.load(tmp_path, mmap_mode="r")
+        final_name = f"{name}-{fingerprint[:16]}.npy"
+        entry = WorkspaceEntry(
+            name=name,
+            file=final_name,
+            shape=list(matrix.shape),
+            dtype=matrix.dtype.str,
+            fingerprint=fingerprint,
+            doc_ids_fingerprint=None if doc_ids is None else doc_ids_fingerprint(doc_ids),
+            created_at=time.time(),
+            index_state=index_state,
+        )
+        del matrix
+        with self._locked():
+            entries = self._read_registry()
+            os.replace(tmp_path, self.directory / final_name)
+            if doc_ids is not None:
+                ids_path = self.directory / f"{name}-{fingerprint[:16]}.ids.json"
+                ids_path.write_text(json.dumps(list(doc_ids)), encoding="utf-8")
+            previous = entries.get(name)
+            entries[name] = entry
+            self._write_registry(entries)
+        # Arquivo antigo: quem já o anexou mantém o mapeamento (unlink POSIX)
+        if previous is not None and previous.file != final_name:
+            self._remove_files(previous)
+        return self.attach(name)
+
+    def publish(
+        self,
+        name: str,
+        matrix: np.ndarray,
+        doc_ids: Optional[Sequence[str]] = None,
+        index_state: Optional[str] = None,
+    ) -> np.memmap:
+        """
+        Copia uma matriz para o workspace (uma vez) e a registra.
+
+        Args:
+            name: Nome do índice (ex: 'embeddings_sbert')
+            matrix: Matriz densa (n_docs, n_dims)
+            doc_ids: Ordem das linhas (permite validar ao anexar)
+            index_state: Fingerprint do índice de origem (permite validar ao anexar)
+
+        Returns:
+            np.memmap somente leitura da cópia publicada
+        """
+        matrix = np.ascontiguousarray(matrix)
+        if doc_ids is not None and len(doc_ids) != matrix.shape[0]:
+            raise ValueError(f"{len(doc_ids)} doc_ids para {matrix.shape[0]} linhas")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp.npy")
+        with os.fdopen(fd, "wb") as handle:
+            np.save(handle, matrix)
+        return self._register(
+            name, Path(tmp_name), array_fingerprint(matrix), doc_ids, index_state
+        )
+
+    def attach(
+        self,
+        name: str,
+        fingerprint: Optional[str] = None,
+        doc_ids: Optional[Sequence[str]] = None,
+        index_state: Optional[str] = None,
+    ) -> Optional[np.memmap]:
+        """
+        Anexa uma matriz publicada (memmap somente leitura, sem cópia).
+
+        Args:
+            name: Nome do índice
+            fingerprint: Fingerprint esperado do conteúdo (opcional)
+            doc_ids: Ordem esperada das linhas (opcional)
+            index_state: Fingerprint esperado do índice de origem (opcional)
+
+        Returns:
+            np.memmap ou None se ausente / fingerprint, ordem ou índice diferentes
+        """
+        entry = self._read_registry().get(name)
+        if entry is None:
+            return None
+        if fingerprint is not None and entry.fingerprint != fingerprint:
+            return None
+        if doc_ids is not None and entry.doc_ids_fingerprint != doc_ids_fingerprint(doc_ids):
+            return None
+        if index_state is not None and entry.index_state != index_state:
+            return None
+        try:
+            return np.load(self.directory / entry.file, mmap_mode="r")
+        except FileNotFoundError:
+            return None
+
+    def doc_ids(self, name: str) -> Optional[List[str]]:
+        """Ordem das linhas de uma matriz publicada (se registrada)"""
+        entry = self._read_registry().get(name)
+        if entry is None:
+            return None
+        ids_path = self.directory / entry.file.replace(".npy", ".ids.json")
+        if not ids_path.exists():
+            return None
+        return json.loads(ids_path.read_text(encoding="utf-8"))
+
+    def get_or_publish(
+        self,
+        name: str,
+        loader: Callable[[], Optional[np.ndarray]],
+        doc_ids: Optional[Sequence[str]] = None,
+        index_state: Optional[str] = None,
+    ) -> Optional[np.memmap]:
+        """Anexa se já publicado (mesma ordem e índice); senão carrega e publica"""
+        attached = self.attach(name, doc_ids=doc_ids, index_state=index_state)
+        if attached is not None:
+            return attached
+        matrix = loader()
+        return None if matrix is None else self.publish(name, matrix, doc_ids, index_state)
+
+    def load_from_elasticsearch(
+        self,
+        index_name: str,
+        doc_ids: Sequence[str],
+        dtype=np.float32,
+    ) -> Optional[np.memmap]:
+        """
+        Anexa o índice se já publicado e inalterado no Elasticsearch; senão o
+        carrega direto para o arquivo do workspace (sem cópia intermediária).
+        O espaço do arquivo é reservado antes da carga: sem espaço no
+        diretório, levanta OSError em vez de derrubar o processo.
+
+        Args:
+            index_name: Índice de embeddings (ex: 'embeddings_sbert')
+            doc_ids: Ordem das linhas
+            dtype: Tipo numérico da matriz
+
+        Returns:
+            np.memmap somente leitura ou None se o índice não pôde ser carregado
+        """
+        from dataset_snapshot import index_fingerprint
+        from elasticsearch_manager import cache_manager
+
+        # Sem conexão não há como verificar o índice: anexa a cópia publicada
+        index_state = (
+            index_fingerprint(cache_manager.es, index_name) if cache_manager.connected else None
+        )
+        attached = self.attach(index_name, doc_ids=doc_ids, index_state=index_state)
+        if attached is not None:
+            return attached
+
+        properties = (
+            cache_manager.indices_config.get(index_name, {})
+            .get("mapping", {}).get("mappings", {}).get("properties", {})
+        )
+        n_dims = properties.get("embedding", {}).get("dims")
+        if not n_dims:
+            # Dimensão desconhecida: carrega em memória uma vez e publica
+            return self.get_or_publish(
+                index_name,
+                lambda: cache_manager.load_embeddings(index_name, list(doc_ids), dtype=dtype),
+                doc_ids,
+                index_state,
+            )
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp.npy")
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        try:
+            out = np.lib.format.open_memmap(
+                tmp_path, mode="w+", dtype=dtype, shape=(len(doc_ids), n_dims)
+            )
+            _reserve_space(tmp_path, out.offset + out.nbytes)
+            loaded = cache_manager.load_embeddings(index_name, list(doc_ids), dtype=dtype, out=out)
+            if loaded is None:
+                return None
+            out.flush()
+            fingerprint = array_fingerprint(out)
+            del out, loaded
+            return self._register(index_name, tmp_path, fingerprint, doc_ids, index_state)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    # ------------------------------------------------------------------
+    # Limpeza
+    # ------------------------------------------------------------------
+
+    def _remove_files(self, entry: WorkspaceEntry) -> None:
+        for path in (
+            self.directory / entry.file,
+            self.directory / entry.file.replace(".npy", ".ids.json"),
+        ):
+            path.unlink(missing_ok=True)
+
+    def drop(self, name: Optional[str] = None) -> int:
+        """
+        Remove uma matriz (ou todas) do workspace.
+
+        Returns:
+            int: Número de matrizes removidas
+        """
+        with self._locked():
+            entries = self._read_registry()
+            removed = [entries.pop(name)] if name in entries else []
+            if name is None:
+                removed, entries = list(entries.values()), {}
+            self._write_registry(entries)
+        for entry in removed:
+            self._remove_files(entry)
+        return len(removed)
+
+
+def load_workspace_embeddings(
+    doc_ids: Sequence[str],
+    embedding_types: Sequence[str] = EMBEDDING_TYPES,
+    workspace: Optional[EmbeddingWorkspace] = None,
+    verbose: bool = True,
+) -> Dict[str, np.ndarray]:
+    """
+    Matrizes de todos os tipos de embedding via workspace compartilhado.
+
+    Erros são tratados por tipo: se o workspace falhar (ex: ``/dev/shm`` de
+    64 MB no Docker), a matriz é carregada só em memória neste processo; se o
+    Elasticsearch falhar, o tipo é omitido e os demais seguem.
+
+    Returns:
+        Dict tipo → np.memmap (ou np.ndarray no fallback em memória)
+    """
+    from elasticsearch_manager import cache_manager
+
+    workspace = workspace or EmbeddingWorkspace()
+    published = workspace.entries()
+    embeddings = {}
+    for emb_type in embedding_types:
+        index_name = f"embeddings_{emb_type}"
+        try:
+            matrix = workspace.load_from_elasticsearch(index_name, doc_ids)
+            # Registro inalterado = cópia existente anexada; senão (re)publicada
+            reused = published.get(index_name) == workspace.entries().get(index_name)
+            origin = "anexado" if reused else "publicado"
+        except Exception as e:
+            print(f"   ⚠️  {emb_type.upper()}: Workspace indisponível ({str(e)[:50]}) - "
+                  f"carregando em memória")
+            try:
+                matrix = cache_manager.load_embeddings(index_name, list(doc_ids))
+                origin = "em memória"
+            except Exception as e:
+                print(f"   ❌ {emb_type.upper()}: Erro - {str(e)[:50]}")
+                continue
+        if matrix is None:
+            if verbose:
+                print(f"   ⚠️  {emb_type.upper()}: Não encontrado")
+            continue
+        embeddings[emb_type] = matrix
+        if verbose:
+            print(f"   ✅ {emb_type.upper()}: {matrix.shape} ({origin})")
+    return embeddings
+
+
+def main() -> int:
+    """CLI: carregar, listar e remover matrizes do workspace"""
+    parser = argparse.ArgumentParser(description="Workspace compartilhado de embeddings")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    load_parser = subparsers.add_parser("load", help="Publica índices do Elasticsearch")
+    load_parser.add_argument('--types', nargs='+', default=EMBEDDING_TYPES,
+                             choices=EMBEDDING_TYPES)
+    load_parser.add_argument('--host', default='localhost')
+    load_parser.add_argument('--port', type=int, default=9200)
+    subparsers.add_parser("list", help="Lista as matrizes publicadas")
+    drop_parser = subparsers.add_parser("drop", help="Remove matrizes do workspace")
+    drop_parser.add_argument('name', nargs='?', help="Índice (padrão: todos)")
+    args = parser.parse_args()
+
+    workspace = EmbeddingWorkspace()
+    if args.command == "load":
+        import elasticsearch_manager
+        from elasticsearch import Elasticsearch
+        from elasticsearch_helpers import load_all_documents_from_elasticsearch
+
+        if not elasticsearch_manager.init_elasticsearch_cache(args.host, args.port):
+            return 1
+        es = Elasticsearch([{'host': args.host, 'port': args.port, 'scheme': 'http'}])
+        df = load_all_documents_from_elasticsearch(
+            es, "documents_dataset", verbose=False, columns=["doc_id"]
+        )
+        load_workspace_embeddings(df['doc_id'].tolist(), args.types, workspace)
+    elif args.command == "list":
+        entries = workspace.entries()
+        print(f"📁 {workspace.directory} ({len(entries)} matrizes)")
+        for name, entry in sorted(entries.items()):
+            print(f"   {name:<22} {str(tuple(entry.shape)):<16} {entry.size_mb:>8.1f} MB  "
+                  f"{entry.fingerprint[:12]}")
+    else:
+        print(f"🗑️  {workspace.drop(args.name)} matrizes removidas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
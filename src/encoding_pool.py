@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Pool Multiprocesso de Encoding (CPU)
+====================================
+
+Em máquinas só com CPU, ``SentenceTransformer.encode`` roda num único
+processo e o paralelismo intra-op do PyTorch não satura máquinas com muitos
+núcleos. Este módulo distribui o corpus entre N processos:
+
+- cada worker carrega sua própria cópia do modelo, com um número controlado
+  de threads (``torch.set_num_threads``)
+- o corpus é dividido em shards contíguos, distribuídos dinamicamente
+  (workers mais rápidos pegam mais shards)
+- cada worker codifica seu shard com ``TokenBudgetEncoder`` e escreve o
+  resultado DIRETO num bloco de memória compartilhada (float32), sem
+  serializar os vetores de volta pelo pipe
+
+Configuração (config_example.env):
+
+    ENCODING_WORKERS=1              # Processos (1 = encoding no processo atual)
+    ENCODING_THREADS_PER_WORKER=    # Vazio = núcleos / workers
+
+Exemplo:
+    >>> from encoding_pool import EncodingPool
+    >>> with EncodingPool('all-MiniLM-L6-v2', n_workers=4) as pool:
+    ...     embeddings = pool.encode(df['text'].tolist())
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ENCODING_WORKERS = int(os.getenv("ENCODING_WORKERS") or 1)
+
+# Documentos por shard (unidade de distribuição entre workers)
+DEFAULT_SHARD_SIZE = 256
+
+# Estado de cada processo worker (preenchido pelo initializer)
+_worker_encoder = None
+
+# Fábrica de encoder (model_name, batch_size) → objeto com ``encode(texts, out=)``
+# e ``model.get_sentence_embedding_dimension()``; precisa ser picklable (spawn)
+EncoderFactory = Callable[[str, Optional[int]], Any]
+
+
+def _default_threads_per_worker(n_workers: int) -> int:
+    env_threads = os.getenv("ENCODING_THREADS_PER_WORKER")
+    if env_threads:
+        return int(env_threads)
+    return max(1, (os.cpu_count() or 1) // n_workers)
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Anexa um bloco existente sem registrá-lo no resource_tracker do worker
+    (quem cria o bloco é responsável pelo unlink).
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: com "spawn" o worker compartilha o resource_tracker
+        # do processo pai, então o registro repetido é a mesma entrada que o
+        # unlink do pai remove (não desfazer aqui)
+        return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(
+    model_name: str,
+    n_threads: int,
+    batch_size: Optional[int],
+    encoder_factory: Optional[EncoderFactory] = None,
+) -> None:
+    global _worker_encoder
+
+    if encoder_factory is not None:
+        _worker_encoder = encoder_factory(model_name, batch_size)
+        return
+
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    from transformer_encoding import TokenBudgetEncoder
+
+    torch.set_num_threads(n_threads)
+    model = SentenceTransformer(model_name, device="cpu")
+    _worker_encoder = TokenBudgetEncoder(model, batch_size=batch_size)
+
+
+def _worker_dimension() -> int:
+    return _worker_encoder.model.get_sentence_embedding_dimension()
+
+
+def _encode_shard(
+    shm_name: str, shape: Tuple[int, int], start: int, texts: Sequence[str]
+) -> int:
+    shm = _attach_shared_memory(shm_name)
+    try:
+        output = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        _worker_encoder.encode(texts, out=output[start:start + len(texts)])
+        del output
+    finally:
+        shm.close()
+    return len(texts)
+
+
+class EncodingPool:
+    """
+    Pool de processos, cada um com uma cópia do SentenceTransformer.
+
+    Os workers são criados uma vez e reaproveitados entre chamadas de
+    ``encode`` (o carregamento do modelo é o custo dominante na partida).
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        n_workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        start_method: str = "spawn",
+        encoder_factory: Optional[EncoderFactory] = None,
+    ):
+        """
+        Args:
+            model_name: Nome do modelo (ex: 'bert-base-uncased', 'all-MiniLM-L6-v2')
+            n_workers: Número de processos (padrão: ENCODING_WORKERS)
+            threads_per_worker: Threads do PyTorch por processo
+                (padrão: ENCODING_THREADS_PER_WORKER ou núcleos / workers)
+            batch_size: Batch de referência do TokenBudgetEncoder
+                (padrão: EMBEDDING_BATCH_SIZE)
+            shard_size: Documentos por shard
+            start_method: Método de criação dos processos ('spawn' é seguro
+                com PyTorch e dentro do Jupyter)
+            encoder_factory: Cria o encoder em cada worker no lugar do
+                SentenceTransformer + TokenBudgetEncoder (ex: modelos de teste)
+        """
+        self.model_name = model_name
+        self.n_workers = max(1, n_workers or ENCODING_WORKERS)
+        self.threads_per_worker = threads_per_worker or _default_threads_per_worker(
+            self.n_workers
+        )
+        self.shard_size = shard_size
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=mp.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(model_name, self.threads_per_worker, batch_size, encoder_factory),
+        )
+        self._dimension: Optional[int] = None
+
+    @property
+    def dimension(self) -> int:
+        """Dimensão dos embeddings (consultada em um worker)"""
+        if self._dimension is None:
+            self._dimension = self._executor.submit(_worker_dimension).result()
+        return self._dimension
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Gera embeddings float32 na ordem original dos textos.
+
+        Args:
+            texts: Lista de textos
+
+        Returns:
+            np.ndarray (n_textos, dim) float32
+        """
+        texts = list(texts)
+        shape = (len(texts), self.dimension)
+        if not texts:
+            return np.empty(shape, dtype=np.float32)
+
+        shm = shared_memory.SharedMemory(create=True, size=shape[0] * shape[1] * 4)
+        try:
+            futures = [
+                self._executor.submit(
+                    _encode_shard, shm.name, shape, start, texts[start:start + self.shard_size]
+                )
+                for start in range(0, len(texts), self.shard_size)
+            ]
+            for future in futures:
+                future.result()
+
+            shared = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+            embeddings = shared.copy()
+            del shared
+        finally:
+            shm.close()
+            shm.unlink()
+
+        return embeddings
+
+    def close(self) -> None:
+        """Encerra os processos worker"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "EncodingPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def encode_texts(
+    model_name: str,
+    texts: Sequence[str],
+    n_workers: Optional[int] = None,
+    show_progress_bar: bool = True,
+) -> np.ndarray:
+    """
+    Codifica textos no servidor de embeddings (se EMBEDDING_SERVER_URL estiver
+    definido e o modelo estiver carregado nele), no processo atual (1 worker)
+    ou num EncodingPool.
+
+    Args:
+        model_name: Nome do modelo SentenceTransformer
+        texts: Lista de textos
+        n_workers: Número de processos (padrão: ENCODING_WORKERS)
+        show_progress_bar: Barra de progresso (apenas no modo de 1 processo)
+
+    Returns:
+        np.ndarray (n_textos, dim) float32
+    """
+    # Import local: os workers do pool (spawn) importam este módulo e não
+    # precisam do servidor HTTP
+    from embedding_server import EMBEDDING_SERVER_URL, EmbeddingServerClient
+
+    if EMBEDDING_SERVER_URL:
+        client = EmbeddingServerClient()
+        if client.has_model(model_name):
+            print(f"   🚀 Usando o servidor de embeddings ({client.url}), sem carregar o modelo")
+            return client.encode(texts, model_name)
+        print(f"   ⚠️  Servidor {client.url} indisponível ou sem '{model_name}', "
+              f"codificando localmente")
+
+    n_workers = n_workers or ENCODING_WORKERS
+    if n_workers <= 1:
+        from sentence_transformers import SentenceTransformer
+
+        from transformer_encoding import TokenBudgetEncoder
+
+        model = SentenceTransformer(model_name)
+        return TokenBudgetEncoder(model).encode(texts, show_progress_bar=show_progress_bar)
+
+    print(f"   ⚡ Encoding em {n_workers} processos...")
+    with EncodingPool(model_name, n_workers=n_workers) as pool:
+        return pool.encode(texts)
+
+
+def scaling_sweep(
+    model_name: str,
+    texts: Sequence[str],
+    worker_counts: List[int],
+    encoder_factory: Optional[EncoderFactory] = None,
+) -> List[Tuple[int, float]]:
+    """
+    Mede throughput (docs/s) para diferentes números de workers.
+
+    O carregamento dos modelos fica fora da medição (aquecimento com um
+    shard antes de cronometrar).
+
+    Args:
+        model_name: Nome do modelo SentenceTransformer
+        texts: Textos de benchmark
+        worker_counts: Números de workers a testar (ex: [1, 2, 4, 8])
+        encoder_factory: Encoder alternativo nos workers (ver EncodingPool)
+
+    Returns:
+        Lista de (workers, docs/s)
+    """
+    import time
+
+    results = []
+    for n_workers in worker_counts:
+        with EncodingPool(
+            model_name, n_workers=n_workers, encoder_factory=encoder_factory
+        ) as pool:
+            pool.encode(texts[: pool.shard_size * n_workers])
+            start = time.perf_counter()
+            pool.encode(texts)
+            elapsed = time.perf_counter() - start
+        results.append((n_workers, len(texts) / elapsed))
+    return results
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+TF-IDF em Streaming com Feature Hashing
+=======================================
+
+O ``TfidfVectorizer`` precisa do corpus inteiro em memória e de um
+vocabulário ajustado — por isso o projeto o limita a 4096 features. Aqui o
+vocabulário é substituído por feature hashing (``HashingVectorizer``): cada
+termo/bigrama cai numa de ``n_features`` colunas (padrão 2^20) sem precisar
+conhecer o corpus.
+
+O IDF é mantido incrementalmente: a frequência de documentos por coluna é um
+vetor de contagens que cresce a cada lote. Com isso:
+
+- ``fit_stream`` percorre o corpus em lotes (memória constante: um lote +
+  o vetor de contagens, 8 MB para 2^20 colunas)
+- ``transform_stream`` emite vetores esparsos TF-IDF (norma L2) lote a lote
+- os lotes são hasheados em paralelo por processos workers
+- o estado (contagens + número de documentos) é salvo em disco, e documentos
+  novos só precisam de ``partial_fit``
+- o estado guarda também até onde o índice foi lido (``seen_until``, maior
+  ``created_at`` incluído no IDF): ``stream_from_elasticsearch`` acrescenta
+  ao IDF apenas os documentos indexados depois disso
+
+O IDF segue a fórmula do scikit-learn (``smooth_idf=True``):
+
+    idf(t) = ln((1 + n) / (1 + df(t))) + 1
+
+Sem ``max_df``/``min_df`` nem limite de features, os vetores não são
+idênticos aos do ``TfidfAdapter``; colisões de hash são raras com 2^20
+colunas. A saída é esparsa e não cabe no ``dense_vector`` do Elasticsearch
+(máximo 4096 dims): o CLI grava os lotes em arquivos ``.npz``.
+
+Uso:
+    python src/hashing_tfidf.py --output-dir results/hashing_tfidf --n-jobs 4
+
+Exemplo:
+    >>> from hashing_tfidf import StreamingHashingTfidf, stream_from_elasticsearch
+    >>> model = StreamingHashingTfidf.load()
+    >>> for doc_ids, vectors in stream_from_elasticsearch(model, es_client):
+    ...     print(len(doc_ids), vectors.shape)
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+DEFAULT_N_FEATURES = 2**20
+DEFAULT_STATE_PATH = (
+    Path(__file__).resolve().parent.parent / "results" / "models" / "hashing_tfidf.npz"
+)
+
+# Lote de documentos: (doc_ids, textos)
+Chunk = Tuple[List[str], List[str]]
+
+
+def _hash_counts(
+    texts: Sequence[str], n_features: int, ngram_range: Tuple[int, int]
+) -> sp.csr_matrix:
+    """Contagens de termos hasheados (sem sinal alternado e sem normalização)"""
+    vectorizer = HashingVectorizer(
+        n_features=n_features,
+        ngram_range=ngram_range,
+        alternate_sign=False,
+        norm=None,
+        dtype=np.float32,
+    )
+    return vectorizer.transform(texts)
+
+
+def _hash_chunk(
+    chunk: Chunk, n_features: int, ngram_range: Tuple[int, int]
+) -> Tuple[List[str], sp.csr_matrix]:
+    doc_ids, texts = chunk
+    return doc_ids, _hash_counts(texts, n_features, ngram_range)
+
+
+class StreamingHashingTfidf:
+    """TF-IDF com feature hashing e IDF acumulado incrementalmente"""
+
+    def __init__(
+        self,
+        n_features: int = DEFAULT_N_FEATURES,
+        ngram_range: Tuple[int, int] = (1, 2),
+        sublinear_tf: bool = False,
+        n_jobs: Optional[int] = None,
+    ):
+        """
+        Args:
+            n_features: Número de colunas do espaço hasheado
+            ngram_range: Intervalo de n-gramas (mesmo padrão do TfidfAdapter)
+            sublinear_tf: Usa 1 + ln(tf) no lugar da contagem bruta
+            n_jobs: Processos para hashear lotes (padrão: todos os núcleos; 1 = serial)
+        """
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.sublinear_tf = sublinear_tf
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.document_frequency = np.zeros(n_features, dtype=np.int64)
+        self.n_documents = 0
+        # Maior created_at (epoch ms) dos documentos já incluídos no IDF
+        self.seen_until: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # IDF incremental
+    # ------------------------------------------------------------------
+
+    def _update_document_frequency(self, counts: sp.csr_matrix) -> None:
+        # Após sum_duplicates cada coluna aparece no máximo uma vez por linha
+        self.document_frequency += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_documents += counts.shape[0]
+
+    @property
+    def idf_(self) -> np.ndarray:
+        """Pesos IDF atuais (float32, ``n_features``)"""
+        n = self.n_documents
+        return (np.log((1 + n) / (1 + self.document_frequency)) + 1).astype(np.float32)
+
+    def reset(self) -> None:
+        """Zera as contagens (antes de um ajuste completo)"""
+        self.document_frequency[:] = 0
+        self.n_documents = 0
+        self.seen_until = None
+
+    def partial_fit(self, texts: Sequence[str]) -> "StreamingHashingTfidf":
+        """Acrescenta um lote de textos às frequências de documentos"""
+        self._update_document_frequency(
+            _hash_counts(texts, self.n_features, self.ngram_range)
+        )
+        return self
+
+    # ------------------------------------------------------------------
+    # Transformação
+    # ------------------------------------------------------------------
+
+    def _weight(self, counts: sp.csr_matrix, idf: np.ndarray) -> sp.csr_matrix:
+        if self.sublinear_tf:
+            np.log(counts.data, out=counts.data)
+            counts.data += 1
+        counts.data *= idf[counts.indices]
+        return normalize(counts, norm="l2", copy=False)
+
+    def transform(self, texts: Sequence[str]) -> sp.csr_matrix:
+        """Vetores TF-IDF esparsos (n_textos × n_features, float32, norma L2)"""
+        if self.n_documents == 0:
+            raise RuntimeError("IDF vazio: execute fit_stream/partial_fit antes")
+        counts = _hash_counts(texts, self.n_features, self.ngram_range)
+        return self._weight(counts, self.idf_)
+
+    def _hash_chunks(self, chunks: Iterable[Chunk]) -> Iterator[Tuple[List[str], sp.csr_matrix]]:
+        """Hasheia lotes em paralelo, preservando a ordem e limitando lotes em voo"""
+        if self.n_jobs == 1:
+            for chunk in chunks:
+                yield _hash_chunk(chunk, self.n_features, self.ngram_range)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(
+                    executor.submit(_hash_chunk, chunk, self.n_features, self.ngram_range)
+                )
+                # No máximo 2 lotes por worker em memória
+                if len(pending) >= 2 * self.n_jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def fit_stream(self, chunks: Iterable[Chunk], verbose: bool = True) -> "StreamingHashingTfidf":
+        """
+        Acumula frequências de documentos a partir de lotes (doc_ids, textos).
+
+        As contagens são somadas às existentes: para um ajuste do zero chame
+        ``reset()`` antes.
+        """
+        for _, counts in self._hash_chunks(chunks):
+            self._update_document_frequency(counts)
+        if verbose:
+            print(
+                f"✅ IDF atualizado: {self.n_documents:,} documentos, "
+                f"{int(np.count_nonzero(self.document_frequency)):,} colunas ocupadas"
+            )
+        return self
+
+    def transform_stream(
+        self, chunks: Iterable[Chunk]
+    ) -> Iterator[Tuple[List[str], sp.csr_matrix]]:
+        """
+        Emite (doc_ids, vetores esparsos) para cada lote.
+
+        O IDF é fixado no início: lotes transformados numa mesma passada usam
+        os mesmos pesos.
+        """
+        if self.n_documents == 0:
+            raise RuntimeError("IDF vazio: execute fit_stream/partial_fit antes")
+        idf = self.idf_
+        for doc_ids, counts in self._hash_chunks(chunks):
+            yield doc_ids, self._weight(counts, idf)
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+
+    def save(self, path: Optional[Path] = None) -> Path:
+        """Salva contagens e parâmetros em ``.npz``"""
+        path = Path(path or DEFAULT_STATE_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            document_frequency=self.document_frequency,
+            n_documents=self.n_documents,
+            ngram_range=np.asarray(self.ngram_range),
+            sublinear_tf=self.sublinear_tf,
+            seen_until=np.nan if self.seen_until is None else self.seen_until,
+        )
+        return path
+
+    @classmethod
+    def load(
+        cls, path: Optional[Path] = None, n_jobs: Optional[int] = None
+    ) -> "StreamingHashingTfidf":
+        """Restaura o estado salvo (ou um modelo vazio se o arquivo não existe)"""
+        path = Path(path or DEFAULT_STATE_PATH)
+        if not path.exists():
+            return cls(n_jobs=n_jobs)
+        with np.load(path) as state:
+            model = cls(
+                n_features=len(state["document_frequency"]),
+                ngram_range=tuple(int(n) for n in state["ngram_range"]),
+                sublinear_tf=bool(state["sublinear_tf"]),
+                n_jobs=n_jobs,
+            )
+            model.document_frequency[:] = state["document_frequency"]
+            model.n_documents = int(state["n_documents"])
+            # Estados antigos não registram até onde o índice foi lido
+            if "seen_until" in state.files and not np.isnan(state["seen_until"]):
+                model.seen_until = float(state["seen_until"])
+        return model
+
+
+def elasticsearch_chunks(
+    es_client,
+    index_name: str = "documents_dataset",
+    batch_size: int = 1000,
+    query: Optional[Dict[str, Any]] = None,
+) -> Iterator[Chunk]:
+    """Lotes (doc_ids, textos) lidos com a Scroll API"""
+    from elasticsearch_helpers import iter_document_batches
+
+    for batch in iter_document_batches(
+        es_client, index_name, batch_size=batch_size, query=query
+    ):
+        yield batch["doc_id"].tolist(), batch["text"].tolist()
+
+
+def latest_created_at(es_client, index_name: str = "documents_dataset") -> Optional[float]:
+    """Maior ``created_at`` do índice (epoch ms) ou None se vazio/sem o campo"""
+    response = es_client.search(
+        index=index_name,
+        body={"size": 0, "aggs": {"max_created_at": {"max": {"field": "created_at"}}}},
+    )
+    return response.get('aggregations', {}).get('max_created_at', {}).get('value')
+
+
+def _created_at_range(
+    after: Optional[float], until: Optional[float]
+) -> Optional[Dict[str, Any]]:
+    """Query de documentos com ``after < created_at <= until`` (None = sem limite)"""
+    if until is None:
+        return None
+    bounds: Dict[str, Any] = {"lte": until, "format": "epoch_millis"}
+    if after is not None:
+        bounds["gt"] = after
+    return {"range": {"created_at": bounds}}
+
+
+def stream_from_elasticsearch(
+    model: StreamingHashingTfidf,
+    es_client,
+    index_name: str = "documents_dataset",
+    batch_size: int = 1000,
+    refit: bool = False,
+) -> Iterator[Tuple[List[str], sp.csr_matrix]]:
+    """
+    Atualiza o IDF e emite os vetores esparsos do índice inteiro.
+
+    São duas passadas de scroll: uma para as frequências de documentos e outra
+    para os vetores. Com um estado restaurado, a primeira lê só os documentos
+    indexados depois de ``model.seen_until``; sem estado (ou ``refit=True``,
+    ou estado antigo sem ``seen_until``) o IDF é recalculado do zero.
+
+    Args:
+        model: Modelo (novo ou restaurado com ``load``)
+        es_client: Cliente Elasticsearch conectado
+        index_name: Índice de documentos
+        batch_size: Documentos por lote
+        refit: Recalcula o IDF do zero
+
+    Yields:
+        (doc_ids, sp.csr_matrix) por lote
+    """
+    # Limite fixado antes da leitura: documentos indexados durante a passada
+    # ficam para a próxima atualização
+    latest = latest_created_at(es_client, index_name)
+    if refit or model.n_documents == 0 or model.seen_until is None:
+        model.reset()
+        model.fit_stream(elasticsearch_chunks(
+            es_client, index_name, batch_size, _created_at_range(None, latest)
+        ))
+    elif latest is not None and latest > model.seen_until:
+        n_before = model.n_documents
+        model.fit_stream(elasticsearch_chunks(
+            es_client, index_name, batch_size, _created_at_range(model.seen_until, latest)
+        ), verbose=False)
+        print(f"✅ IDF atualizado com {model.n_documents - n_before:,} documentos novos")
+    model.seen_until = latest
+    yield from model.transform_stream(elasticsearch_chunks(es_client, index_name, batch_size))
+
+
+def main() -> int:
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="TF-IDF em streaming com feature hashing")
+    parser.add_argument('--output-dir', type=Path,
+                        default=DEFAULT_STATE_PATH.parent.parent / "hashing_tfidf")
+    parser.add_argument('--index', default="documents_dataset")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--n-jobs', type=int, default=None)
+    parser.add_argument('--refit', action='store_true', help="Recalcula o IDF do zero")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=9200)
+    args = parser.parse_args()
+
+    import elasticsearch_manager
+
+    if not elasticsearch_manager.init_elasticsearch_cache(args.host, args.port):
+        return 1
+    es_client = elasticsearch_manager.cache_manager.es
+
+    model = StreamingHashingTfidf.load(n_jobs=args.n_jobs)
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    total = 0
+    stream = stream_from_elasticsearch(
+        model, es_client, args.index, args.batch_size, refit=args.refit
+    )
+    for chunk_number, (doc_ids, vectors) in enumerate(stream):
+        np.savez_compressed(
+            args.output_dir / f"chunk_{chunk_number:05d}.npz",
+            doc_ids=np.asarray(doc_ids),
+            data=vectors.data,
+            indices=vectors.indices,
+            indptr=vectors.indptr,
+            shape=np.asarray(vectors.shape),
+        )
+        total += len(doc_ids)
+        print(f"   Lote {chunk_number + 1}: {len(doc_ids):,} docs | nnz {vectors.nnz:,}")
+
+    print(f"💾 Estado do IDF salvo em {model.save()}")
+    print(f"✅ {total:,} vetores esparsos gravados em {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
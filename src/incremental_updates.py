@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Atualização Incremental de Embeddings
+=====================================
+
+Antes, qualquer mudança no corpus significava refit do TF-IDF, retreino do
+Word2Vec e — em ``save_dataset`` — apagar e recriar ``documents_dataset``.
+
+No modo incremental:
+
+1. ``append_dataset`` acrescenta os documentos novos ao índice, continuando
+   a numeração dos doc_ids (os embeddings existentes continuam válidos)
+2. Cada modelo gera embeddings APENAS para os doc_ids novos, a partir dos
+   modelos persistidos:
+
+   - TF-IDF: vocabulário e IDF congelados (artefato em ``model_artifacts``)
+   - Word2Vec: modelo salvo em disco; inferência com o vocabulário existente
+     ou, opcionalmente, treino online (``build_vocab(update=True)`` + ``train``)
+   - BERT / Sentence-BERT: modelos pré-treinados (ou o servidor de embeddings)
+
+3. Só os doc_ids novos são gravados nos índices de embeddings
+
+O custo de uma atualização diária passa a ser O(documentos novos).
+
+Observações:
+- Com o vocabulário congelado, termos novos são ignorados pelo TF-IDF e pelo
+  Word2Vec (sem treino online). Refaça o ajuste completo periodicamente.
+- O treino online altera os vetores de palavras existentes: embeddings antigos
+  e novos deixam de estar exatamente no mesmo espaço.
+- Embeddings OpenAI já são incrementais: ``generate_openai_embeddings`` só
+  envia os doc_ids ausentes no cache.
+
+Uso:
+    python src/incremental_updates.py novos_documentos.jsonl --models tfidf word2vec sbert
+
+Exemplo:
+    >>> from incremental_updates import append_and_update
+    >>> summary = append_and_update(df_novos, models=["tfidf", "word2vec", "sbert"])
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+import elasticsearch_manager
+from embedding_pipeline import EmbeddingAdapter, EmbeddingPipeline, SentenceTransformerAdapter
+from embedding_server import DEFAULT_WORD2VEC_PATH, EMBEDDING_SERVER_URL, EmbeddingServerClient
+from tfidf_artifacts import load_tfidf_vectorizer
+from word2vec_pooling import document_embeddings_from_texts, tokenize_texts
+
+# Modelos suportados: nome → (índice de embeddings, nome do SentenceTransformer)
+INCREMENTAL_MODELS = {
+    "tfidf": ("embeddings_tfidf", None),
+    "word2vec": ("embeddings_word2vec", None),
+    "bert": ("embeddings_bert", "bert-base-uncased"),
+    "sbert": ("embeddings_sbert", "all-MiniLM-L6-v2"),
+}
+
+
+class FrozenTfidfAdapter(EmbeddingAdapter):
+    """TF-IDF com vocabulário e IDF restaurados do artefato (sem refit)"""
+
+    model_type = "tfidf"
+
+    def __init__(self):
+        self.vectorizer = None
+
+    def fit(self, texts: List[str], doc_ids: Optional[List[str]] = None) -> None:
+        # Sem fingerprint: o artefato mais recente vale para documentos novos
+        self.vectorizer = load_tfidf_vectorizer()
+        if self.vectorizer is None:
+            raise RuntimeError(
+                "Vectorizer TF-IDF não encontrado em 'model_artifacts' "
+                "(execute o Notebook 2 uma vez)"
+            )
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.vectorizer.transform(texts).astype(np.float32).toarray()
+
+
+class PersistedWord2VecAdapter(EmbeddingAdapter):
+    """Word2Vec carregado do disco; treino online opcional com os textos novos"""
+
+    model_type = "word2vec"
+
+    def __init__(self, path: Optional[Path] = None, online_training: bool = False):
+        self.path = Path(path or DEFAULT_WORD2VEC_PATH)
+        self.online_training = online_training
+        self.model = None
+
+    def fit(self, texts: List[str], doc_ids: Optional[List[str]] = None) -> None:
+        from gensim.models import Word2Vec
+
+        if not self.path.exists():
+            raise RuntimeError(
+                f"Modelo Word2Vec não encontrado em {self.path} (execute o Notebook 2 uma vez)"
+            )
+        self.model = Word2Vec.load(str(self.path))
+        # Treino online altera o modelo (e os vetores de documentos já gravados)
+        self.refitted = self.online_training
+
+        if self.online_training:
+            sentences = tokenize_texts(texts)
+            vocab_before = len(self.model.wv)
+            self.model.build_vocab(sentences, update=True)
+            self.model.train(
+                sentences, total_examples=len(sentences), epochs=self.model.epochs
+            )
+            self.model.save(str(self.path))
+            print(f"   🔤 Word2Vec atualizado: +{len(self.model.wv) - vocab_before:,} palavras")
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return document_embeddings_from_texts(texts, self.model.wv, n_jobs=1)
+
+
+class ServerEmbeddingAdapter(EmbeddingAdapter):
+    """BERT / Sentence-BERT servidos pelo servidor de embeddings (sem carregar o modelo)"""
+
+    def __init__(self, client: EmbeddingServerClient, model_name: str, model_type: str):
+        self.client = client
+        self.model_name = model_name
+        self.model_type = model_type
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.client.encode(texts, self.model_name)
+
+
+def build_incremental_adapter(model: str, online_word2vec: bool = False) -> EmbeddingAdapter:
+    """
+    Adaptador que gera embeddings sem refit sobre o corpus completo.
+
+    Args:
+        model: Um de ``INCREMENTAL_MODELS``
+        online_word2vec: Treina o Word2Vec com os textos novos antes da inferência
+
+    Returns:
+        EmbeddingAdapter
+    """
+    if model == "tfidf":
+        return FrozenTfidfAdapter()
+    if model == "word2vec":
+        return PersistedWord2VecAdapter(online_training=online_word2vec)
+    if model in INCREMENTAL_MODELS:
+        model_name = INCREMENTAL_MODELS[model][1]
+        if EMBEDDING_SERVER_URL:
+            client = EmbeddingServerClient()
+            if client.has_model(model_name):
+                return ServerEmbeddingAdapter(client, model_name, model_type=model)
+        return SentenceTransformerAdapter(model_name, model_type=model)
+    raise ValueError(f"Modelo desconhecido: {model} (opções: {list(INCREMENTAL_MODELS)})")
+
+
+def update_embeddings(
+    doc_ids: Sequence[str],
+    texts: Sequence[str],
+    models: Sequence[str] = ("tfidf", "word2vec", "bert", "sbert"),
+    online_word2vec: bool = False,
+) -> Dict[str, int]:
+    """
+    Gera e grava embeddings apenas para os doc_ids informados (e ausentes no cache).
+
+    Args:
+        doc_ids: doc_ids dos documentos novos
+        texts: Textos correspondentes
+        models: Modelos a atualizar
+        online_word2vec: Treino online do Word2Vec com os textos novos
+
+    Returns:
+        Dict modelo → número de documentos processados
+    """
+    doc_ids, texts = list(doc_ids), list(texts)
+    summary: Dict[str, int] = {}
+    if not doc_ids:
+        return summary
+
+    for model in models:
+        index_name = INCREMENTAL_MODELS[model][0]
+        print(f"\n🔄 {model}: {len(doc_ids):,} documentos novos → '{index_name}'")
+        try:
+            adapter = build_incremental_adapter(model, online_word2vec)
+            pipeline = EmbeddingPipeline(adapter, index_name, force_regenerate=False)
+            embeddings = pipeline.run(doc_ids, texts)
+            summary[model] = len(embeddings)
+        except Exception as e:
+            print(f"❌ {model}: {e}")
+            summary[model] = 0
+    return summary
+
+
+def append_and_update(
+    df_new: pd.DataFrame,
+    models: Sequence[str] = ("tfidf", "word2vec", "bert", "sbert"),
+    online_word2vec: bool = False,
+) -> Dict[str, int]:
+    """
+    Acrescenta documentos ao 'documents_dataset' e gera só os embeddings deles.
+
+    Args:
+        df_new: DataFrame com colunas 'text', 'category', 'target'
+        models: Modelos a atualizar
+        online_word2vec: Treino online do Word2Vec com os textos novos
+
+    Returns:
+        Dict modelo → número de documentos processados
+    """
+    appended = elasticsearch_manager.cache_manager.append_dataset(df_new)
+    if appended.empty:
+        return {}
+    return update_embeddings(
+        appended["doc_id"].tolist(), appended["text"].tolist(), models, online_word2vec
+    )
+
+
+def _read_documents(path: Path) -> pd.DataFrame:
+    if path.suffix in (".jsonl", ".json"):
+        df = pd.read_json(path, lines=path.suffix == ".jsonl")
+    else:
+        df = pd.read_csv(path)
+    missing = {"text", "category", "target"} - set(df.columns)
+    if missing:
+        raise ValueError(f"Colunas ausentes em {path}: {sorted(missing)}")
+    return df
+
+
+def main() -> int:
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Atualização incremental de embeddings")
+    parser.add_argument('documents', type=Path,
+                        help="CSV/JSONL com colunas text, category, target")
+    parser.add_argument('--models', nargs='+', default=list(INCREMENTAL_MODELS),
+                        choices=list(INCREMENTAL_MODELS))
+    parser.add_argument('--online-word2vec', action='store_true',
+                        help="Treina o Word2Vec com os textos novos (altera vetores existentes)")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=9200)
+    args = parser.parse_args()
+
+    if not elasticsearch_manager.init_elasticsearch_cache(args.host, args.port):
+        return 1
+
+    df_new = _read_documents(args.documents)
+    print(f"📥 {len(df_new):,} documentos lidos de {args.documents}")
+    summary = append_and_update(df_new, args.models, args.online_word2vec)
+
+    print("\n📊 RESUMO DA ATUALIZAÇÃO")
+    for model, count in summary.items():
+        print(f"   {model:<10}: {count:,} documentos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
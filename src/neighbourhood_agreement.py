@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Concordância de Vizinhança entre Espaços de Embeddings
+======================================================
+
+Compara como dois modelos ordenam os vizinhos dos mesmos documentos, sem
+materializar nenhuma matriz de similaridade completa:
+
+- **Jaccard@k**: para cada documento, sobreposição entre os k vizinhos mais
+  próximos em cada espaço, |A ∩ B| / |A ∪ B| (top-k em blocos de
+  ``similarity_search``)
+- **Correlação de Spearman**: entre as similaridades de cosseno dos dois
+  espaços num conjunto de pares aleatórios (mesmos pares para os dois)
+- **Por categoria**: Jaccard@k médio por categoria e pureza da vizinhança
+  (fração dos k vizinhos com a mesma categoria) em cada espaço
+
+O top-k de cada modelo e o resultado de cada par de modelos ficam em
+``analysis_cache`` com chave nos fingerprints das matrizes: reexecutar o
+Notebook 4 com os mesmos embeddings é instantâneo.
+
+Exemplo:
+    >>> from neighbourhood_agreement import compare_embeddings
+    >>> summary, results = compare_embeddings(embeddings_dict, labels=df['category'], k=10)
+    >>> summary                                  # uma linha por par de modelos
+    >>> results[("sbert", "openai")].per_category
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.stats import spearmanr
+
+from analysis_cache import AnalysisCache, array_fingerprint
+from similarity_search import Matrix, top_k_similar
+
+# Pares avaliados por bloco no cálculo do cosseno de pares amostrados
+_PAIR_BLOCK = 4096
+
+
+@dataclass
+class AgreementResult:
+    """Concordância de vizinhança entre dois espaços de embeddings"""
+
+    model_a: str
+    model_b: str
+    k: int
+    jaccard: np.ndarray        # Jaccard@k por documento
+    spearman: float            # Correlação das similaridades nos pares amostrados
+    spearman_pvalue: float
+    n_pairs: int
+    per_category: Optional[pd.DataFrame] = None
+
+    @property
+    def mean_jaccard(self) -> float:
+        return float(self.jaccard.mean()) if len(self.jaccard) else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "model_a": self.model_a,
+            "model_b": self.model_b,
+            f"jaccard@{self.k}": self.mean_jaccard,
+            "spearman": self.spearman,
+            "n_pairs": self.n_pairs,
+        }
+
+
+def cached_top_k(
+    matrix: Matrix,
+    k: int,
+    fingerprint: Optional[str] = None,
+    use_cache: bool = True,
+    **search_kwargs,
+) -> np.ndarray:
+    """
+    Índices dos k vizinhos de cada linha (sem a própria), com cache em disco.
+
+    Args:
+        matrix: Embeddings (densos, memmap ou esparsos)
+        k: Número de vizinhos
+        fingerprint: Fingerprint já calculado de ``matrix`` (evita recalcular)
+        use_cache: Lê/grava em ``analysis_cache``
+        **search_kwargs: Repassados a ``top_k_similar`` (memory_budget_mb, n_threads)
+
+    Returns:
+        np.ndarray (n, k) int64
+    """
+    cache = AnalysisCache("topk")
+    key = None
+    if use_cache:
+        key = cache.key(fingerprint or array_fingerprint(matrix), k=k)
+        cached = cache.load(key)
+        if cached is not None:
+            return cached[0]["indices"]
+
+    indices = top_k_similar(matrix, k=k, **search_kwargs).indices
+    if use_cache:
+        cache.save(key, {"indices": indices}, {"k": k, "shape": list(matrix.shape)})
+    return indices
+
+
+def jaccard_at_k(neighbours_a: np.ndarray, neighbours_b: np.ndarray) -> np.ndarray:
+    """
+    Jaccard entre os conjuntos de vizinhos de cada linha (vetorizado).
+
+    Cada linha de ``neighbours_a``/``neighbours_b`` não tem repetições, então
+    após ordenar a concatenação, cada interseção aparece como um par de
+    valores adjacentes iguais.
+    """
+    merged = np.sort(np.concatenate([neighbours_a, neighbours_b], axis=1), axis=1)
+    intersection = np.count_nonzero(merged[:, 1:] == merged[:, :-1], axis=1)
+    union = neighbours_a.shape[1] + neighbours_b.shape[1] - intersection
+    return (intersection / np.maximum(union, 1)).astype(np.float32)
+
+
+def neighbour_purity(neighbours: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """Fração dos vizinhos de cada documento com o mesmo rótulo"""
+    return (labels[neighbours] == labels[:, None]).mean(axis=1).astype(np.float32)
+
+
+def sample_pairs(n_docs: int, n_pairs: int, seed: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+    """Pares aleatórios (i, j) com i != j"""
+    rng = np.random.default_rng(seed)
+    left = rng.integers(0, n_docs, size=n_pairs)
+    # Deslocamento em [1, n): j nunca é igual a i
+    right = (left + rng.integers(1, max(n_docs, 2), size=n_pairs)) % n_docs
+    return left, right
+
+
+def pair_cosines(matrix: Matrix, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Cosseno entre as linhas ``left[p]`` e ``right[p]`` de cada par, em blocos"""
+    cosines = np.empty(len(left), dtype=np.float32)
+    for start in range(0, len(left), _PAIR_BLOCK):
+        rows_a = matrix[left[start:start + _PAIR_BLOCK]]
+        rows_b = matrix[right[start:start + _PAIR_BLOCK]]
+        if sp.issparse(matrix):
+            dots = np.asarray(rows_a.multiply(rows_b).sum(axis=1)).ravel()
+            norms_a = np.sqrt(np.asarray(rows_a.multiply(rows_a).sum(axis=1)).ravel())
+            norms_b = np.sqrt(np.asarray(rows_b.multiply(rows_b).sum(axis=1)).ravel())
+        else:
+            rows_a = np.asarray(rows_a, dtype=np.float32)
+            rows_b = np.asarray(rows_b, dtype=np.float32)
+            dots = np.einsum("ij,ij->i", rows_a, rows_b)
+            norms_a = np.linalg.norm(rows_a, axis=1)
+            norms_b = np.linalg.norm(rows_b, axis=1)
+        denominator = norms_a * norms_b
+        cosines[start:start + _PAIR_BLOCK] = np.divide(
+            dots, denominator, out=np.zeros_like(dots, dtype=np.float64),
+            where=denominator > 0,
+        )
+    return cosines
+
+
+def _per_category(
+    labels: np.ndarray, jaccard: np.ndarray, purity_a: np.ndarray, purity_b: np.ndarray,
+    model_a: str, model_b: str,
+) -> pd.DataFrame:
+    frame = pd.DataFrame({
+        "category": labels,
+        "jaccard": jaccard,
+        f"purity_{model_a}": purity_a,
+        f"purity_{model_b}": purity_b,
+    })
+    per_category = frame.groupby("category", observed=True).mean()
+    per_category.insert(0, "n_docs", frame.groupby("category", observed=True).size())
+    return per_category.sort_values("jaccard", ascending=False)
+
+
+def neighbourhood_agreement(
+    embeddings_a: Matrix,
+    embeddings_b: Matrix,
+    model_a: str = "a",
+    model_b: str = "b",
+    labels: Optional[Sequence] = None,
+    k: int = 10,
+    n_pairs: int = 20000,
+    seed: int = 42,
+    use_cache: bool = True,
+    fingerprints: Optional[Tuple[str, str]] = None,
+    **search_kwargs,
+) -> AgreementResult:
+    """
+    Concordância de vizinhança entre dois espaços com as mesmas linhas (doc_ids).
+
+    Args:
+        embeddings_a, embeddings_b: Matrizes (n, d_a) e (n, d_b), mesma ordem de docs
+        model_a, model_b: Nomes dos modelos (relatórios)
+        labels: Categoria de cada documento (habilita a análise por categoria)
+        k: Número de vizinhos
+        n_pairs: Pares amostrados para a correlação de Spearman
+        seed: Semente da amostragem de pares
+        use_cache: Lê/grava resultados em ``analysis_cache``
+        fingerprints: Fingerprints já calculados das duas matrizes
+        **search_kwargs: Repassados a ``top_k_similar``
+
+    Returns:
+        AgreementResult
+    """
+    if embeddings_a.shape[0] != embeddings_b.shape[0]:
+        raise ValueError(
+            f"Número de documentos diferente: {embeddings_a.shape[0]} vs {embeddings_b.shape[0]}"
+        )
+    n_docs = embeddings_a.shape[0]
+    labels = None if labels is None else np.asarray(labels)
+
+    if use_cache and fingerprints is None:
+        fingerprints = (array_fingerprint(embeddings_a), array_fingerprint(embeddings_b))
+
+    cache = AnalysisCache("neighbourhood_agreement")
+    key = None
+    stored = None
+    if use_cache:
+        labels_fingerprint = None if labels is None else array_fingerprint(labels.astype(str))
+        key = cache.key(
+            *fingerprints, labels=labels_fingerprint, k=k, n_pairs=n_pairs, seed=seed
+        )
+        stored = cache.load(key)
+
+    if stored is not None:
+        arrays, metadata = stored
+    else:
+        fingerprint_a, fingerprint_b = fingerprints or (None, None)
+        neighbours_a = cached_top_k(embeddings_a, k, fingerprint_a, use_cache, **search_kwargs)
+        neighbours_b = cached_top_k(embeddings_b, k, fingerprint_b, use_cache, **search_kwargs)
+
+        arrays = {"jaccard": jaccard_at_k(neighbours_a, neighbours_b)}
+        if labels is not None:
+            arrays["purity_a"] = neighbour_purity(neighbours_a, labels)
+            arrays["purity_b"] = neighbour_purity(neighbours_b, labels)
+
+        left, right = sample_pairs(n_docs, n_pairs, seed)
+        rho, pvalue = spearmanr(
+            pair_cosines(embeddings_a, left, right), pair_cosines(embeddings_b, left, right)
+        )
+        metadata = {
+            "spearman": float(rho), "spearman_pvalue": float(pvalue),
+            "k": neighbours_a.shape[1], "n_pairs": n_pairs,
+        }
+        if use_cache:
+            cache.save(key, arrays, metadata)
+
+    per_category = None
+    if labels is not None:
+        per_category = _per_category(
+            labels, arrays["jaccard"], arrays["purity_a"], arrays["purity_b"], model_a, model_b
+        )
+
+    return AgreementResult(
+        model_a=model_a,
+        model_b=model_b,
+        k=int(metadata["k"]),
+        jaccard=arrays["jaccard"],
+        spearman=metadata["spearman"],
+        spearman_pvalue=metadata["spearman_pvalue"],
+        n_pairs=int(metadata["n_pairs"]),
+        per_category=per_category,
+    )
+
+
+def compare_embeddings(
+    embeddings: Dict[str, Matrix],
+    labels: Optional[Sequence] = None,
+    k: int = 10,
+    n_pairs: int = 20000,
+    seed: int = 42,
+    use_cache: bool = True,
+    verbose: bool = True,
+    **search_kwargs,
+) -> Tuple[pd.DataFrame, Dict[Tuple[str, str], AgreementResult]]:
+    """
+    Concordância de vizinhança entre todos os pares de modelos.
+
+    O top-k de cada modelo é calculado uma única vez (e reaproveitado do cache).
+
+    Args:
+        embeddings: Nome do modelo → matriz (mesma ordem de documentos)
+        labels: Categoria de cada documento
+        k: Número de vizinhos
+        n_pairs: Pares amostrados para Spearman
+        seed: Semente da amostragem
+        use_cache: Usa ``analysis_cache``
+        verbose: Imprime o progresso
+        **search_kwargs: Repassados a ``top_k_similar``
+
+    Returns:
+        (DataFrame resumo com uma linha por par, dict (a, b) → AgreementResult)
+    """
+    fingerprints = (
+        {name: array_fingerprint(matrix) for name, matrix in embeddings.items()}
+        if use_cache else {}
+    )
+
+    results: Dict[Tuple[str, str], AgreementResult] = {}
+    for model_a, model_b in combinations(embeddings, 2):
+        result = neighbourhood_agreement(
+            embeddings[model_a], embeddings[model_b], model_a, model_b,
+            labels=labels, k=k, n_pairs=n_pairs, seed=seed, use_cache=use_cache,
+            fingerprints=(fingerprints[model_a], fingerprints[model_b]) if use_cache else None,
+            **search_kwargs,
+        )
+        results[(model_a, model_b)] = result
+        if verbose:
+            print(
+                f"   {model_a:>8} × {model_b:<8} Jaccard@{result.k}: {result.mean_jaccard:.3f}"
+                f"   Spearman: {result.spearman:+.3f}"
+            )
+
+    summary = pd.DataFrame([result.summary() for result in results.values()])
+    return summary, results
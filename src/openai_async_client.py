@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Cliente Assíncrono de Embeddings OpenAI com Rate Limiting
+=========================================================
+
+O Notebook 3 chamava ``client.embeddings.create`` de forma sequencial, com
+``time.sleep(0.5)`` a cada 100 batches, e preenchia vetores com zeros em
+caso de erro. Este módulo:
+
+- mantém várias requisições em andamento ao mesmo tempo (``asyncio``)
+- limita requisições/min E tokens/min com dois token buckets
+- respeita ``Retry-After`` / ``retry-after-ms`` das respostas 429 e pausa
+  TODAS as requisições (não apenas a que recebeu o 429)
+- faz backoff exponencial com jitter para erros 5xx e de conexão
+- devolve a lista de batches que falharam em vez de mascará-los
+
+Configuração (config_example.env):
+
+    OPENAI_MAX_CONCURRENCY=8           # Requisições simultâneas
+    OPENAI_REQUESTS_PER_MINUTE=3000    # Limite de requisições (tier da conta)
+    OPENAI_TOKENS_PER_MINUTE=1000000   # Limite de tokens (tier da conta)
+
+Para benchmarks offline há um servidor compatível em
+``src/setup/mock_openai_server.py``.
+
+Exemplo:
+    >>> from openai_async_client import AsyncEmbeddingClient
+    >>> embedder = AsyncEmbeddingClient(api_key=OPENAI_API_KEY)
+    >>> result = embedder.embed_batches_sync(texts_list, batches)
+    >>> result.embeddings.shape, result.failed_batches
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from token_accounting import DEFAULT_MODEL, count_tokens
+
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY") or 8)
+OPENAI_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE") or 3000)
+OPENAI_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TOKENS_PER_MINUTE") or 1_000_000)
+
+# Backoff para erros sem Retry-After
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+
+class TokenBucket:
+    """
+    Token bucket assíncrono: ``rate_per_minute`` unidades por minuto, com
+    rajada de até ``capacity`` unidades.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """
+        Aguarda até haver ``amount`` unidades disponíveis e as consome.
+
+        Pedidos maiores que a capacidade consomem o bucket inteiro.
+
+        Returns:
+            float: Segundos de espera
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self.level < amount:
+                delay = (amount - self.level) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self.level -= amount
+        return waited
+
+
+class RateLimiter:
+    """Limites combinados de requisições/min e tokens/min + pausa global"""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.paused_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Pausa todas as requisições por ``seconds`` (ex: Retry-After)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, n_tokens: int) -> float:
+        """
+        Aguarda a pausa global e os dois buckets.
+
+        Returns:
+            float: Segundos de espera
+        """
+        waited = 0.0
+        delay = self.paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+        waited += await self.requests.acquire(1)
+        waited += await self.tokens.acquire(n_tokens)
+        return waited
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Extrai o tempo de espera dos headers ``retry-after-ms`` / ``retry-after``.
+
+    Returns:
+        Segundos ou None se a resposta não informa
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            from email.utils import parsedate_to_datetime
+
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+@dataclass
+class EmbeddingBatchResult:
+    """Resultado de ``AsyncEmbeddingClient.embed_batches``"""
+
+    embeddings: np.ndarray
+    failed_batches: List[int] = field(default_factory=list)
+    errors: Dict[int, str] = field(default_factory=dict)
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def failed_indices(self) -> np.ndarray:
+        """Linhas sem embedding (NaN)"""
+        if self.embeddings.shape[1] == 0:
+            return np.arange(len(self.embeddings))
+        return np.flatnonzero(np.isnan(self.embeddings[:, 0]))
+
+
+class AsyncEmbeddingClient:
+    """Gera embeddings OpenAI com concorrência e rate limiting"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: str = DEFAULT_MODEL,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: int = 6,
+        timeout: float = 60.0,
+        client=None,
+    ):
+        """
+        Args:
+            api_key: Chave da API (padrão: OPENAI_API_KEY)
+            base_url: URL base (ex: servidor mock local)
+            model: Modelo de embeddings
+            max_concurrency: Requisições simultâneas (padrão: OPENAI_MAX_CONCURRENCY)
+            requests_per_minute: Limite de requisições (padrão: OPENAI_REQUESTS_PER_MINUTE)
+            tokens_per_minute: Limite de tokens (padrão: OPENAI_TOKENS_PER_MINUTE)
+            max_retries: Tentativas extras por batch
+            timeout: Timeout por requisição (segundos)
+            client: ``openai.AsyncOpenAI`` já configurado (opcional)
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.max_concurrency = max_concurrency or OPENAI_MAX_CONCURRENCY
+        self.requests_per_minute = requests_per_minute or OPENAI_REQUESTS_PER_MINUTE
+        self.tokens_per_minute = tokens_per_minute or OPENAI_TOKENS_PER_MINUTE
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._client = client
+
+    def _create_client(self):
+        from openai import AsyncOpenAI
+
+        # Retries ficam a cargo deste cliente (rate limiter compartilhado)
+        return AsyncOpenAI(
+            api_key=self.api_key, base_url=self.base_url, max_retries=0, timeout=self.timeout
+        )
+
+    async def embed_batches(
+        self,
+        texts: Sequence[str],
+        batches: Sequence[Sequence[int]],
+        token_counts: Optional[Sequence[int]] = None,
+        progress_callback: Optional[Callable[[int, int, Dict[str, Any]], None]] = None,
+        batch_callback: Optional[Callable[[int, Sequence[int], np.ndarray], None]] = None,
+    ) -> EmbeddingBatchResult:
+        """
+        Gera embeddings para todos os batches com várias requisições em andamento.
+
+        Args:
+            texts: Lista de textos (já truncados ao limite do modelo)
+            batches: Listas de índices de ``texts`` (uma requisição por batch)
+            token_counts: Tokens de cada texto (padrão: ``token_accounting.count_tokens``)
+            progress_callback: Chamado como ``(concluídos, total, stats)``
+            batch_callback: Chamado a cada batch bem-sucedido como
+                ``(índice_do_batch, batch, vetores float32)`` — permite gravar
+                no cache à medida que os batches terminam
+
+        Returns:
+            EmbeddingBatchResult com linhas NaN para os batches que falharam
+        """
+        import openai
+
+        if token_counts is None:
+            token_counts = count_tokens(texts, self.model)
+
+        client = self._client or self._create_client()
+        limiter = RateLimiter(self.requests_per_minute, self.tokens_per_minute)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        errors: Dict[int, str] = {}
+        stats = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "wait_seconds": 0.0,
+            "tokens": 0,
+            "completed_batches": 0,
+        }
+
+        async def run_batch(batch_idx: int, batch: Sequence[int]) -> None:
+            batch_tokens = sum(token_counts[i] for i in batch)
+            for attempt in range(self.max_retries + 1):
+                async with semaphore:
+                    stats["wait_seconds"] += await limiter.acquire(batch_tokens)
+                    stats["requests"] += 1
+                    try:
+                        response = await client.embeddings.create(
+                            model=self.model, input=[texts[i] for i in batch]
+                        )
+                    except (openai.RateLimitError, openai.InternalServerError,
+                            openai.APIConnectionError) as e:
+                        error = e
+                    except openai.APIStatusError as e:
+                        # Erros 4xx (exceto 429) não melhoram com retry
+                        errors[batch_idx] = str(e)[:200]
+                        break
+                    else:
+                        batch_vectors = np.asarray(
+                            [item.embedding for item in response.data], dtype=np.float32
+                        )
+                        for position, vector in enumerate(batch_vectors):
+                            vectors[batch[position]] = vector
+                        stats["tokens"] += batch_tokens
+                        errors.pop(batch_idx, None)
+                        if batch_callback is not None:
+                            batch_callback(batch_idx, batch, batch_vectors)
+                        break
+
+                errors[batch_idx] = str(error)[:200]
+                if attempt == self.max_retries:
+                    break
+
+                stats["retries"] += 1
+                delay = retry_after_seconds(error)
+                if isinstance(error, openai.RateLimitError):
+                    stats["rate_limited"] += 1
+                    if delay is not None:
+                        limiter.pause(delay)
+                if delay is None:
+                    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)
+                    delay *= 0.5 + random.random() / 2
+                await asyncio.sleep(delay)
+                stats["wait_seconds"] += delay
+
+            stats["completed_batches"] += 1
+            if progress_callback is not None:
+                progress_callback(stats["completed_batches"], len(batches), stats)
+
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(run_batch(i, batch) for i, batch in enumerate(batches)))
+        finally:
+            if self._client is None:
+                await client.close()
+        stats["elapsed_seconds"] = time.perf_counter() - start
+
+        dimension = next((len(v) for v in vectors if v is not None), 0)
+        embeddings = np.full((len(texts), dimension), np.nan, dtype=np.float32)
+        for i, vector in enumerate(vectors):
+            if vector is not None:
+                embeddings[i] = vector
+
+        return EmbeddingBatchResult(
+            embeddings=embeddings,
+            failed_batches=sorted(errors),
+            errors=errors,
+            stats=stats,
+        )
+
+    def embed_batches_sync(self, *args, **kwargs) -> EmbeddingBatchResult:
+        """
+        Versão síncrona de ``embed_batches``.
+
+        Funciona também dentro do Jupyter (onde já existe um event loop
+        rodando): nesse caso a corrotina é executada numa thread auxiliar.
+        """
+        coroutine_factory = lambda: self.embed_batches(*args, **kwargs)
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine_factory())
+
+        result: Dict[str, Any] = {}
+
+        def runner() -> None:
+            try:
+                result["value"] = asyncio.run(coroutine_factory())
+            except BaseException as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=runner, name="openai-embeddings")
+        thread.start()
+        thread.join()
+        if "error" in result:
+            raise result["error"]
+        return result["value"]
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Batches de Requisições OpenAI por Bin Packing de Tokens
+=======================================================
+
+Substitui ``create_dynamic_batches`` do Notebook 3, que agrupava textos EM
+ORDEM por número de caracteres (limite MAX_CHARS_PER_REQUEST). Isso deixava
+muitas requisições subaproveitadas e ignorava os limites reais da API:
+
+- tokens por requisição (soma de todos os inputs)
+- tokens por input
+- número de inputs por requisição
+
+Aqui cada texto é medido em tokens (tiktoken) e os textos são empacotados
+com First-Fit Decreasing (FFD): do maior para o menor, cada texto entra na
+primeira requisição onde ainda cabe (tokens E número de inputs). FFD usa no
+máximo ~11/9 do número ótimo de requisições.
+
+Configuração (config_example.env):
+
+    OPENAI_MAX_TOKENS_PER_REQUEST=300000   # Soma de tokens por requisição
+    OPENAI_MAX_INPUTS_PER_REQUEST=2048     # Inputs por requisição
+
+Exemplo:
+    >>> from openai_batching import pack_batches
+    >>> plan = pack_batches(texts_list)
+    >>> plan.print_summary()
+    >>> result = embedder.embed_batches_sync(texts_list, plan.batches,
+    ...                                      token_counts=plan.text_tokens)
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import math
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from token_accounting import DEFAULT_MODEL, count_tokens
+
+# Limites da API de embeddings
+MAX_TOKENS_PER_INPUT = 8192
+OPENAI_MAX_TOKENS_PER_REQUEST = int(os.getenv("OPENAI_MAX_TOKENS_PER_REQUEST") or 300_000)
+OPENAI_MAX_INPUTS_PER_REQUEST = int(os.getenv("OPENAI_MAX_INPUTS_PER_REQUEST") or 2048)
+
+
+@dataclass
+class BatchPlan:
+    """Resultado do empacotamento"""
+
+    batches: List[List[int]]
+    batch_tokens: List[int]
+    text_tokens: List[int]
+    max_tokens_per_request: int
+    max_inputs_per_request: int
+    oversized: List[int] = field(default_factory=list)
+
+    @property
+    def total_tokens(self) -> int:
+        return int(sum(self.text_tokens))
+
+    @property
+    def lower_bound(self) -> int:
+        """Mínimo teórico de requisições (limite de tokens e de inputs)"""
+        if not self.text_tokens:
+            return 0
+        return max(
+            math.ceil(self.total_tokens / self.max_tokens_per_request),
+            math.ceil(len(self.text_tokens) / self.max_inputs_per_request),
+        )
+
+    @property
+    def fill_efficiency(self) -> float:
+        """Tokens enviados / capacidade de tokens das requisições (0-1)"""
+        if not self.batches:
+            return 0.0
+        return self.total_tokens / (len(self.batches) * self.max_tokens_per_request)
+
+    def print_summary(self) -> None:
+        """Imprime estatísticas do empacotamento"""
+        batch_sizes = [len(batch) for batch in self.batches]
+        print(f"   Total de textos: {len(self.text_tokens):,} ({self.total_tokens:,} tokens)")
+        print(f"   Requisições: {len(self.batches):,} (mínimo teórico: {self.lower_bound:,})")
+        print(f"   Limites por requisição: {self.max_tokens_per_request:,} tokens, "
+              f"{self.max_inputs_per_request:,} inputs")
+        if self.batches:
+            print(f"   Textos por requisição (min/média/max): "
+                  f"{min(batch_sizes)}/{np.mean(batch_sizes):.1f}/{max(batch_sizes)}")
+            print(f"   Tokens por requisição (média/max): "
+                  f"{np.mean(self.batch_tokens):,.0f}/{max(self.batch_tokens):,}")
+        print(f"   Eficiência de preenchimento: {self.fill_efficiency * 100:.1f}%")
+        if self.oversized:
+            print(f"   ⚠️  {len(self.oversized)} textos acima de {MAX_TOKENS_PER_INPUT:,} "
+                  f"tokens (trunque antes de enviar)")
+
+
+def first_fit_decreasing(
+    sizes: Sequence[int], capacity: int, max_items: int
+) -> List[List[int]]:
+    """
+    Empacota itens em bins com limite de capacidade e de número de itens.
+
+    Itens maiores que a capacidade ocupam um bin sozinhos.
+
+    Args:
+        sizes: Tamanho de cada item
+        capacity: Capacidade de cada bin
+        max_items: Número máximo de itens por bin
+
+    Returns:
+        Lista de bins (índices dos itens em ordem crescente)
+    """
+    sizes = np.asarray(sizes, dtype=np.int64)
+    order = np.argsort(-sizes, kind="stable")
+
+    # Capacidade restante por bin; bins cheios (em itens) recebem -1
+    remaining = np.empty(max(1, len(sizes)), dtype=np.int64)
+    counts = np.zeros(len(remaining), dtype=np.int64)
+    bins: List[List[int]] = []
+
+    for item in order:
+        size = int(sizes[item])
+        n_bins = len(bins)
+        candidates = np.flatnonzero(remaining[:n_bins] >= size) if n_bins else []
+        if len(candidates):
+            target = int(candidates[0])
+        else:
+            target = n_bins
+            bins.append([])
+            remaining[target] = capacity
+        bins[target].append(int(item))
+        remaining[target] -= size
+        counts[target] += 1
+        if counts[target] >= max_items:
+            remaining[target] = -1
+
+    return [sorted(items) for items in bins]
+
+
+def pack_batches(
+    texts: Sequence[str],
+    max_tokens_per_request: Optional[int] = None,
+    max_inputs_per_request: Optional[int] = None,
+    token_counts: Optional[Sequence[int]] = None,
+    model: str = DEFAULT_MODEL,
+) -> BatchPlan:
+    """
+    Agrupa textos em requisições por First-Fit Decreasing de tokens.
+
+    Args:
+        texts: Lista de textos (já truncados ao limite por input)
+        max_tokens_per_request: Soma de tokens por requisição
+            (padrão: OPENAI_MAX_TOKENS_PER_REQUEST)
+        max_inputs_per_request: Inputs por requisição
+            (padrão: OPENAI_MAX_INPUTS_PER_REQUEST)
+        token_counts: Tokens de cada texto (padrão: ``token_accounting.count_tokens``)
+        model: Modelo de embeddings (define o encoding)
+
+    Returns:
+        BatchPlan com os índices de cada requisição
+    """
+    max_tokens = max_tokens_per_request or OPENAI_MAX_TOKENS_PER_REQUEST
+    max_inputs = max_inputs_per_request or OPENAI_MAX_INPUTS_PER_REQUEST
+    if token_counts is None:
+        token_counts = count_tokens(texts, model)
+    token_counts = [int(n) for n in token_counts]
+
+    batches = first_fit_decreasing(token_counts, max_tokens, max_inputs)
+    return BatchPlan(
+        batches=batches,
+        batch_tokens=[sum(token_counts[i] for i in batch) for batch in batches],
+        text_tokens=token_counts,
+        max_tokens_per_request=max_tokens,
+        max_inputs_per_request=max_inputs,
+        oversized=[i for i, n in enumerate(token_counts) if n > MAX_TOKENS_PER_INPUT],
+    )
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Geração Incremental de Embeddings OpenAI
+========================================
+
+Antes, no Notebook 3:
+
+- um batch com erro recebia ``[0.0] * 1536``; depois ``save_embeddings``
+  trocava os vetores zero por ruído aleatório e os persistia como válidos
+- o resultado inteiro só era salvo depois do último batch (uma falha no
+  meio perdia tudo)
+
+Aqui:
+
+1. Apenas os doc_ids ausentes/inválidos no cache são enviados à API
+2. Cada batch concluído é gravado no Elasticsearch em lotes de
+   CACHE_CHUNK_SIZE, numa thread de escrita (a geração não espera o bulk)
+3. Batches que falham entram numa fila DURÁVEL (JSONL em disco) e são
+   re-tentados com backoff crescente; o que sobrar fica na fila para a
+   próxima execução, que os tenta primeiro
+4. Linhas sem embedding ficam NaN — nunca zero, nunca ruído
+5. Textos duplicados (mesmo text_hash; opcionalmente quase-duplicatas) são
+   enviados uma única vez e o vetor é replicado para todos os doc_ids
+   (ver ``deduplication.py``)
+
+Configuração (config_example.env):
+
+    OPENAI_FAILED_QUEUE_PATH=    # Vazio = results/openai_failed_batches.jsonl
+    OPENAI_RETRY_ROUNDS=3        # Rodadas extras para batches que falharam
+
+Exemplo:
+    >>> from openai_generation import generate_openai_embeddings
+    >>> result = generate_openai_embeddings(texts_list, doc_ids, embedder)
+    >>> result.embeddings.shape, result.failed_doc_ids
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+import elasticsearch_manager
+from deduplication import DEDUPLICATE_TEXTS, deduplicate_texts
+from openai_async_client import AsyncEmbeddingClient
+from openai_batching import pack_batches
+
+DEFAULT_QUEUE_PATH = (
+    Path(__file__).resolve().parent.parent / "results" / "openai_failed_batches.jsonl"
+)
+OPENAI_RETRY_ROUNDS = int(os.getenv("OPENAI_RETRY_ROUNDS") or 3)
+DEFAULT_FLUSH_SIZE = int(os.getenv("CACHE_CHUNK_SIZE", 1000))
+
+# Espera antes de cada rodada extra (segundos)
+RETRY_ROUND_BACKOFF_SECONDS = [5.0, 20.0, 60.0]
+
+# Sentinela que sinaliza fim da fila para o consumidor
+_END_OF_STREAM = object()
+
+
+class FailedBatchQueue:
+    """
+    Fila durável de batches com falha (um JSON por linha).
+
+    Cada entrada guarda os doc_ids do batch, o número de tentativas e o último
+    erro. O arquivo é regravado de forma atômica (arquivo temporário +
+    ``os.replace``), então uma interrupção nunca deixa a fila corrompida.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        custom_path = os.getenv("OPENAI_FAILED_QUEUE_PATH")
+        self.path = Path(path or custom_path or DEFAULT_QUEUE_PATH)
+        self.entries: List[Dict[str, Any]] = []
+        self.load()
+
+    def load(self) -> None:
+        """Lê a fila do disco (linhas inválidas são descartadas)"""
+        self.entries = []
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("doc_ids"):
+                    self.entries.append(entry)
+
+    def save(self) -> None:
+        """Grava a fila no disco (remove o arquivo se vazia)"""
+        if not self.entries:
+            if self.path.exists():
+                self.path.unlink()
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self.entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def doc_ids(self) -> List[str]:
+        """doc_ids pendentes, na ordem da fila"""
+        return [doc_id for entry in self.entries for doc_id in entry["doc_ids"]]
+
+    def attempts(self, doc_id: str) -> int:
+        """Tentativas já feitas para o documento"""
+        for entry in self.entries:
+            if doc_id in entry["doc_ids"]:
+                return int(entry.get("attempts", 0))
+        return 0
+
+    def add(self, doc_ids: Sequence[str], error: str, attempts: int = 1) -> None:
+        """Registra um batch com falha"""
+        self.entries.append(
+            {
+                "doc_ids": list(doc_ids),
+                "attempts": attempts,
+                "last_error": error[:500],
+                "updated_at": datetime.now().isoformat(),
+            }
+        )
+
+    def discard(self, doc_ids: Sequence[str]) -> None:
+        """Remove documentos concluídos (entradas vazias são apagadas)"""
+        done = set(doc_ids)
+        for entry in self.entries:
+            entry["doc_ids"] = [doc_id for doc_id in entry["doc_ids"] if doc_id not in done]
+        self.entries = [entry for entry in self.entries if entry["doc_ids"]]
+
+    def keep_only(self, doc_ids: Sequence[str]) -> None:
+        """Mantém apenas documentos ainda pendentes (ex: ausentes no cache)"""
+        pending = set(doc_ids)
+        self.discard([doc_id for doc_id in self.doc_ids() if doc_id not in pending])
+
+
+@dataclass
+class OpenAIGenerationResult:
+    """Resultado de ``generate_openai_embeddings``"""
+
+    embeddings: Optional[np.ndarray]
+    generated: int = 0
+    from_cache: int = 0
+    failed_doc_ids: List[str] = field(default_factory=list)
+    requests: int = 0
+    deduplicated: int = 0
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def complete(self) -> bool:
+        return not self.failed_doc_ids and self.embeddings is not None
+
+
+class _CacheWriter:
+    """Thread que grava lotes de embeddings no cache enquanto a geração continua"""
+
+    def __init__(self, cache, index_name: str, model_type: str, flush_size: int):
+        self.cache = cache
+        self.index_name = index_name
+        self.model_type = model_type
+        self.flush_size = flush_size
+        self.queue: "queue.Queue" = queue.Queue()
+        self.errors: List[str] = []
+        self.saved = 0
+        self._buffer_ids: List[str] = []
+        self._buffer_texts: List[str] = []
+        self._buffer_vectors: List[np.ndarray] = []
+        self._thread = threading.Thread(
+            target=self._run, name=f"openai-writer-{index_name}", daemon=True
+        )
+
+    def start(self) -> None:
+        self.cache.create_index(self.index_name, verbose=False)
+        self._thread.start()
+
+    def add(self, doc_ids: Sequence[str], texts: Sequence[str], vectors: np.ndarray) -> None:
+        """Acumula um batch concluído; envia à thread ao atingir flush_size"""
+        self._buffer_ids.extend(doc_ids)
+        self._buffer_texts.extend(texts)
+        self._buffer_vectors.append(vectors)
+        if len(self._buffer_ids) >= self.flush_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer_ids:
+            return
+        self.queue.put(
+            (self._buffer_ids, self._buffer_texts, np.concatenate(self._buffer_vectors))
+        )
+        self._buffer_ids, self._buffer_texts, self._buffer_vectors = [], [], []
+
+    def close(self) -> None:
+        self.flush()
+        self.queue.put(_END_OF_STREAM)
+        self._thread.join()
+        self.cache.refresh_index(self.index_name)
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is _END_OF_STREAM:
+                break
+            doc_ids, texts, vectors = item
+            try:
+                ok = self.cache.save_embeddings(
+                    self.index_name,
+                    vectors,
+                    doc_ids,
+                    texts,
+                    self.model_type,
+                    check_existing=False,
+                    wait_for_indexing=False,
+                    verbose=False,
+                )
+                if ok:
+                    self.saved += len(doc_ids)
+                else:
+                    self.errors.append(f"lote {doc_ids[0]}..{doc_ids[-1]}")
+            except Exception as e:
+                self.errors.append(f"lote {doc_ids[0]}..{doc_ids[-1]}: {e}")
+
+
+def _find_missing(cache, index_name: str, doc_ids: List[str], texts: List[str]) -> List[str]:
+    """doc_ids ausentes ou com text_hash divergente no cache"""
+    _, existing_ids, missing_ids = cache.check_embeddings_exist(index_name, doc_ids)
+    if existing_ids:
+        positions = {doc_id: idx for idx, doc_id in enumerate(doc_ids)}
+        valid, invalid_ids = cache.validate_embeddings_integrity(
+            index_name, existing_ids, [texts[positions[doc_id]] for doc_id in existing_ids]
+        )
+        if not valid:
+            print(f"⚠️  {len(invalid_ids):,} embeddings inválidos serão regenerados")
+            missing_set = set(missing_ids) | set(invalid_ids)
+            missing_ids = [doc_id for doc_id in doc_ids if doc_id in missing_set]
+    return missing_ids
+
+
+def generate_openai_embeddings(
+    texts: Sequence[str],
+    doc_ids: Sequence[str],
+    embedder: AsyncEmbeddingClient,
+    index_name: str = "embeddings_openai",
+    use_cache: bool = True,
+    force_regenerate: bool = False,
+    token_counts: Optional[Sequence[int]] = None,
+    retry_rounds: Optional[int] = None,
+    failed_queue: Optional[FailedBatchQueue] = None,
+    flush_size: int = DEFAULT_FLUSH_SIZE,
+    cache=None,
+    progress_callback: Optional[Callable[[int, int, Dict[str, Any]], None]] = None,
+    deduplicate: Optional[bool] = None,
+) -> OpenAIGenerationResult:
+    """
+    Gera (apenas) os embeddings OpenAI que faltam, gravando no cache à medida
+    que os batches terminam.
+
+    Args:
+        texts: Textos já truncados (mesma ordem de doc_ids)
+        doc_ids: IDs dos documentos
+        embedder: Cliente assíncrono configurado
+        index_name: Índice do cache
+        use_cache: Se False, gera tudo e não grava no cache
+        force_regenerate: Se True, ignora o que já existe no cache
+        token_counts: Tokens de cada texto (evita recontar)
+        retry_rounds: Rodadas extras para batches com falha (padrão: OPENAI_RETRY_ROUNDS)
+        failed_queue: Fila durável (padrão: FailedBatchQueue())
+        flush_size: Documentos por gravação no cache (padrão: CACHE_CHUNK_SIZE)
+        cache: Gerenciador de cache (padrão: instância global)
+        progress_callback: Repassado ao cliente (``(concluídos, total, stats)``)
+        deduplicate: Envia cada texto repetido uma única vez (padrão: DEDUPLICATE_TEXTS)
+
+    Returns:
+        OpenAIGenerationResult com linhas NaN para documentos que falharam
+    """
+    texts, doc_ids = list(texts), list(doc_ids)
+    cache = cache if cache is not None else elasticsearch_manager.cache_manager
+    use_cache = use_cache and cache.connected
+    retry_rounds = OPENAI_RETRY_ROUNDS if retry_rounds is None else retry_rounds
+    failed_queue = failed_queue if failed_queue is not None else FailedBatchQueue()
+    positions = {doc_id: idx for idx, doc_id in enumerate(doc_ids)}
+
+    # 1. O que falta no cache
+    if use_cache and not force_regenerate:
+        missing_ids = _find_missing(cache, index_name, doc_ids, texts)
+    else:
+        missing_ids = list(doc_ids)
+
+    failed_queue.keep_only(missing_ids)
+    if len(failed_queue):
+        print(f"🔁 {len(failed_queue.doc_ids()):,} documentos na fila de falhas "
+              f"({len(failed_queue)} batches) serão tentados primeiro")
+
+    # Fila de falhas primeiro, depois o restante
+    queued = failed_queue.doc_ids()
+    queued_set = set(queued)
+    missing_ids = queued + [doc_id for doc_id in missing_ids if doc_id not in queued_set]
+    missing_set = set(missing_ids)
+    cached_ids = [doc_id for doc_id in doc_ids if doc_id not in missing_set]
+    print(f"   Em cache: {len(cached_ids):,} | A gerar: {len(missing_ids):,}")
+
+    result = OpenAIGenerationResult(embeddings=None, from_cache=len(cached_ids))
+
+    # 2. Carregar o que já existe
+    embeddings: Optional[np.ndarray] = None
+    if cached_ids:
+        cached = cache.load_embeddings(index_name, cached_ids)
+        if cached is not None:
+            embeddings = np.full((len(doc_ids), cached.shape[1]), np.nan, dtype=np.float32)
+            embeddings[[positions[doc_id] for doc_id in cached_ids]] = cached
+        else:
+            missing_ids, cached_ids = list(doc_ids), []
+            result.from_cache = 0
+
+    if not missing_ids:
+        result.embeddings = embeddings
+        failed_queue.save()
+        return result
+
+    # 3. Deduplicar: apenas representantes vão à API; o vetor é replicado para o grupo
+    deduplicate = DEDUPLICATE_TEXTS if deduplicate is None else deduplicate
+    if deduplicate:
+        dedup = deduplicate_texts([texts[positions[doc_id]] for doc_id in missing_ids])
+        group_members = {
+            missing_ids[rep_row]: [missing_ids[row] for row in rows]
+            for rep_row, rows in zip(dedup.representatives, dedup.members())
+        }
+        result.deduplicated = dedup.n_docs - dedup.n_unique
+        if result.deduplicated:
+            missing_tokens = (
+                [token_counts[positions[doc_id]] for doc_id in missing_ids]
+                if token_counts is not None else None
+            )
+            dedup.print_report(missing_tokens, embedder.model)
+    else:
+        group_members = {doc_id: [doc_id] for doc_id in missing_ids}
+
+    # 4. Gerar com gravação incremental
+    writer = None
+    if use_cache:
+        writer = _CacheWriter(cache, index_name, f"openai_{embedder.model}", flush_size)
+        writer.start()
+
+    pending = list(group_members)
+    stats_total: Dict[str, Any] = {}
+
+    try:
+        for round_idx in range(retry_rounds + 1):
+            if round_idx > 0:
+                delay = RETRY_ROUND_BACKOFF_SECONDS[
+                    min(round_idx - 1, len(RETRY_ROUND_BACKOFF_SECONDS) - 1)
+                ]
+                print(f"🔁 Rodada {round_idx}/{retry_rounds}: {len(pending):,} documentos "
+                      f"após {delay:.0f}s de espera")
+                time.sleep(delay)
+
+            round_texts = [texts[positions[doc_id]] for doc_id in pending]
+            round_tokens = (
+                [token_counts[positions[doc_id]] for doc_id in pending]
+                if token_counts is not None else None
+            )
+            plan = pack_batches(round_texts, token_counts=round_tokens, model=embedder.model)
+
+            def on_batch(batch_idx: int, batch: Sequence[int], vectors: np.ndarray) -> None:
+                if writer is not None:
+                    groups = [group_members[pending[i]] for i in batch]
+                    batch_ids = [doc_id for group in groups for doc_id in group]
+                    writer.add(
+                        batch_ids,
+                        [texts[positions[doc_id]] for doc_id in batch_ids],
+                        np.repeat(vectors, [len(group) for group in groups], axis=0),
+                    )
+
+            batch_result = embedder.embed_batches_sync(
+                round_texts,
+                plan.batches,
+                token_counts=plan.text_tokens,
+                progress_callback=progress_callback,
+                batch_callback=on_batch,
+            )
+            result.requests += batch_result.stats.get("requests", 0)
+            for name, value in batch_result.stats.items():
+                if isinstance(value, (int, float)):
+                    stats_total[name] = stats_total.get(name, 0) + value
+
+            # Guardar vetores gerados nesta rodada
+            succeeded = np.flatnonzero(~np.isnan(batch_result.embeddings).any(axis=1)) \
+                if batch_result.embeddings.shape[1] else np.array([], dtype=np.int64)
+            if len(succeeded):
+                if embeddings is None:
+                    embeddings = np.full(
+                        (len(doc_ids), batch_result.embeddings.shape[1]), np.nan, dtype=np.float32
+                    )
+                groups = [group_members[pending[i]] for i in succeeded]
+                rows = [positions[doc_id] for group in groups for doc_id in group]
+                embeddings[rows] = np.repeat(
+                    batch_result.embeddings[succeeded], [len(group) for group in groups], axis=0
+                )
+                result.generated += len(rows)
+                failed_queue.discard([doc_id for group in groups for doc_id in group])
+
+            # Batches que continuam sem embedding: fila durável, gravada a cada rodada
+            still_pending = []
+            for batch_idx in batch_result.failed_batches:
+                batch_rep_ids = [pending[i] for i in plan.batches[batch_idx]]
+                batch_doc_ids = [
+                    doc_id for rep_id in batch_rep_ids for doc_id in group_members[rep_id]
+                ]
+                attempts = max(failed_queue.attempts(doc_id) for doc_id in batch_doc_ids)
+                failed_queue.discard(batch_doc_ids)
+                failed_queue.add(
+                    batch_doc_ids, batch_result.errors.get(batch_idx, ""), attempts + 1
+                )
+                still_pending.extend(batch_rep_ids)
+            failed_queue.save()
+
+            pending = still_pending
+            if not pending:
+                break
+    finally:
+        if writer is not None:
+            writer.close()
+
+    # 5. Falhas restantes ficam na fila para a próxima execução
+    pending = [doc_id for rep_id in pending for doc_id in group_members[rep_id]]
+    if pending:
+        print(f"❌ {len(pending):,} documentos sem embedding após {retry_rounds} rodadas extras")
+        print(f"   Registrados em {failed_queue.path} (re-tentados na próxima execução)")
+
+    if writer is not None and writer.errors:
+        print(f"⚠️  {len(writer.errors)} lotes falharam ao gravar no cache:")
+        for error in writer.errors[:5]:
+            print(f"   {error}")
+
+    result.embeddings = embeddings
+    result.failed_doc_ids = pending
+    result.stats = stats_total
+    if writer is not None:
+        result.stats["saved_to_cache"] = writer.saved
+    return result
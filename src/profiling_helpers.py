@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Profiling Helpers
+=================
+
+Ganchos opcionais de profiling para as etapas do pipeline de embeddings
+(cache Elasticsearch, geração de TF-IDF, Word2Vec, BERT, SBERT e OpenAI).
+
+Quando habilitado, cada etapa gera em ``results/profiling/``:
+
+- ``<etapa>_<timestamp>.prof``: estatísticas do cProfile (abrir com
+  ``snakeviz`` ou ``pstats``)
+- ``<etapa>_<timestamp>.txt``: resumo legível (top funções por tempo
+  acumulado + top alocações do tracemalloc)
+- ``<etapa>_<timestamp>.collapsed``: pilhas amostradas no formato
+  "collapsed stacks", compatível com ``flamegraph.pl`` e ``speedscope``
+
+Ativação (desligado por padrão, custo desprezível quando desligado):
+
+    PROFILE_STAGES=true   # ou DEBUG_MODE=true
+    PROFILING_RESULTS_DIR=/caminho/opcional
+
+Uso:
+
+    >>> from profiling_helpers import profile_stage
+    >>> with profile_stage("tfidf"):
+    ...     tfidf_matrix = vectorizer.fit_transform(textos)
+
+    No Jupyter, a mesma funcionalidade está disponível como cell magic:
+
+    %load_ext profiling_helpers
+    %%profile_stage tfidf
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+# Diretório padrão: <raiz do projeto>/results/profiling
+DEFAULT_PROFILING_DIR = Path(__file__).resolve().parent.parent / "results" / "profiling"
+
+# cProfile não suporta perfis aninhados (sys.setprofile é global);
+# apenas a etapa mais externa usa cProfile, as internas usam só amostragem
+_profiler_lock = threading.Lock()
+_profiler_active = False
+
+# tracemalloc tem um único pico global: cada etapa zera o pico ao iniciar, então
+# antes de zerar o pico atual é acumulado em todas as etapas ativas
+_active_peaks: Dict[object, int] = {}
+
+
+def is_profiling_enabled() -> bool:
+    """Verifica se o profiling está habilitado via PROFILE_STAGES ou DEBUG_MODE"""
+    return (
+        os.getenv("PROFILE_STAGES", "false").lower() == "true"
+        or os.getenv("DEBUG_MODE", "false").lower() == "true"
+    )
+
+
+def get_profiling_dir() -> Path:
+    """Retorna o diretório onde os relatórios de profiling são salvos"""
+    custom_dir = os.getenv("PROFILING_RESULTS_DIR")
+    return Path(custom_dir) if custom_dir else DEFAULT_PROFILING_DIR
+
+
+def _safe_stage_name(stage_name: str) -> str:
+    """Normaliza o nome da etapa para uso em nomes de arquivo"""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", stage_name).strip("_") or "stage"
+
+
+class _StackSampler:
+    """
+    Amostrador de pilhas em thread separada.
+
+    A cada ``interval`` segundos captura a pilha da thread alvo e acumula
+    contagens no formato "collapsed stacks" (frames separados por ';').
+    """
+
+    def __init__(self, target_thread_id: int, interval: float = 0.005):
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="profiling-stack-sampler", daemon=True
+        )
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            if frame is None:
+                continue
+
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(
+                    f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})"
+                )
+                frame = frame.f_back
+
+            # Ordem raiz -> folha, como esperado pelo flamegraph.pl
+            self.stacks[";".join(reversed(frames))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._thread.join()
+
+    def write_collapsed(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile_stage(
+    stage_name: str,
+    output_dir: Optional[Path] = None,
+    enabled: Optional[bool] = None,
+    sample_interval: float = 0.005,
+    top_n: int = 25,
+    verbose: bool = True,
+) -> Iterator[Optional[Path]]:
+    """
+    Context manager que perfila uma etapa do pipeline.
+
+    Quando desabilitado, apenas executa o bloco (custo de uma leitura de
+    variável de ambiente).
+
+    Args:
+        stage_name: Nome da etapa (usado nos nomes dos arquivos)
+        output_dir: Diretório de saída (padrão: results/profiling)
+        enabled: Força habilitar/desabilitar (padrão: variáveis de ambiente)
+        sample_interval: Intervalo de amostragem das pilhas (segundos)
+        top_n: Número de entradas nos rankings do resumo
+        verbose: Se True, imprime onde os relatórios foram salvos
+
+    Yields:
+        Path base dos relatórios (sem extensão) ou None se desabilitado
+    """
+    global _profiler_active
+
+    if enabled is None:
+        enabled = is_profiling_enabled()
+
+    if not enabled:
+        yield None
+        return
+
+    output_dir = Path(output_dir) if output_dir else get_profiling_dir()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    base_path = output_dir / f"{_safe_stage_name(stage_name)}_{timestamp}"
+
+    # tracemalloc: só paramos no final se fomos nós que iniciamos
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    peak_token = object()
+    with _profiler_lock:
+        peak_so_far = tracemalloc.get_traced_memory()[1]
+        for token, peak in _active_peaks.items():
+            _active_peaks[token] = max(peak, peak_so_far)
+        tracemalloc.reset_peak()
+        _active_peaks[peak_token] = 0
+
+    # cProfile: apenas na etapa mais externa
+    with _profiler_lock:
+        use_cprofile = not _profiler_active
+        if use_cprofile:
+            _profiler_active = True
+
+    profiler = cProfile.Profile() if use_cprofile else None
+    sampler = _StackSampler(threading.get_ident(), interval=sample_interval)
+
+    sampler.start()
+    if profiler is not None:
+        profiler.enable()
+    start_time = time.perf_counter()
+
+    try:
+        yield base_path
+    finally:
+        elapsed = time.perf_counter() - start_time
+        if profiler is not None:
+            profiler.disable()
+            with _profiler_lock:
+                _profiler_active = False
+        sampler.stop()
+
+        snapshot = tracemalloc.take_snapshot()
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        with _profiler_lock:
+            # Pico de etapas aninhadas (zerado por elas) ainda conta nesta etapa
+            peak_bytes = max(peak_bytes, _active_peaks.pop(peak_token))
+        if started_tracemalloc:
+            tracemalloc.stop()
+
+        # 1. cProfile bruto
+        if profiler is not None:
+            profiler.dump_stats(str(base_path.with_suffix(".prof")))
+
+        # 2. Pilhas amostradas (flamegraph)
+        sampler.write_collapsed(base_path.with_suffix(".collapsed"))
+
+        # 3. Resumo legível
+        with open(base_path.with_suffix(".txt"), "w", encoding="utf-8") as f:
+            f.write(f"Etapa: {stage_name}\n")
+            f.write(f"Tempo total: {elapsed:.3f} s\n")
+            f.write(f"Memória Python (atual/pico): {current_bytes / 1024**2:.2f} MB / "
+                    f"{peak_bytes / 1024**2:.2f} MB\n")
+            f.write(f"Amostras de pilha: {sum(sampler.stacks.values())}\n\n")
+
+            if profiler is not None:
+                stream = io.StringIO()
+                stats = pstats.Stats(profiler, stream=stream)
+                stats.sort_stats("cumulative").print_stats(top_n)
+                f.write("=" * 80 + "\ncProfile (tempo acumulado)\n" + "=" * 80 + "\n")
+                f.write(stream.getvalue())
+            else:
+                f.write("cProfile: desativado (etapa aninhada em outra etapa perfilada)\n")
+
+            f.write("\n" + "=" * 80 + "\ntracemalloc (top alocações por linha)\n" + "=" * 80 + "\n")
+            snapshot = snapshot.filter_traces(
+                [
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, __file__),
+                ]
+            )
+            for stat in snapshot.statistics("lineno")[:top_n]:
+                f.write(f"{stat}\n")
+
+        if verbose:
+            print(f"🔬 Profiling '{stage_name}': {elapsed:.2f}s | pico {peak_bytes / 1024**2:.1f} MB")
+            print(f"   Relatórios: {base_path}.{{prof,txt,collapsed}}")
+
+
+def profiled(stage_name: Optional[str] = None) -> Callable:
+    """
+    Decorator que envolve a função em ``profile_stage``.
+
+    Args:
+        stage_name: Nome da etapa (padrão: nome qualificado da função)
+
+    Returns:
+        Decorator
+    """
+
+    def decorator(func: Callable) -> Callable:
+        name = stage_name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_profiling_enabled():
+                return func(*args, **kwargs)
+            with profile_stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def load_ipython_extension(ipython) -> None:
+    """
+    Registra a cell magic ``%%profile_stage <nome>`` no Jupyter.
+
+    A célula é executada normalmente; se o profiling estiver habilitado
+    (PROFILE_STAGES/DEBUG_MODE), os relatórios são gerados para a etapa.
+    """
+
+    def profile_stage_magic(line: str, cell: str) -> None:
+        name = line.strip() or "notebook_cell"
+        code = ipython.transform_cell(cell)
+        with profile_stage(name):
+            exec(compile(code, f"<profile_stage {name}>", "exec"), ipython.user_ns)
+
+    ipython.register_magic_function(
+        profile_stage_magic, magic_kind="cell", magic_name="profile_stage"
+    )
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Projeções 2D dos Embeddings (PCA Rápido e com Cache)
+====================================================
+
+O Notebook 4 rodava ``PCA(n_components=2)`` completo em cada matriz — SVD
+inteira de 18k × 4096 para o TF-IDF (~40 s) — a cada execução, só para
+plotar 2 componentes.
+
+Aqui o solver é escolhido pela densidade e pelo tamanho da entrada
+(``method="auto"``), seja ela um array em memória ou um ``np.memmap`` do
+``embedding_workspace``:
+
+- **esparsa** (ou densa com < 5% de não-zeros, caso do TF-IDF): PCA com
+  ARPACK sobre a matriz CSR, com centralização implícita — exato e sem
+  densificar
+- **densa**: SVD randomizada (``svd_solver="randomized"``)
+- **densa maior que PROJECTION_IN_MEMORY_MAX_MB** (memmaps grandes):
+  ``IncrementalPCA`` sobre blocos de linhas (memória de um bloco); as
+  coordenadas também são calculadas bloco a bloco
+
+Componentes, média, variância explicada e coordenadas 2D ficam em
+``analysis_cache`` com chave no fingerprint da matriz e nos parâmetros: as
+execuções seguintes do notebook (e a geração de PDF, que reexecuta os
+notebooks) apenas carregam o resultado.
+
+Exemplo:
+    >>> from projection_service import project_embeddings
+    >>> projection = project_embeddings(embeddings, random_state=42)
+    >>> projection.coords.shape, projection.total_variance
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import scipy.sparse as sp
+
+from analysis_cache import AnalysisCache, array_fingerprint
+from similarity_search import Matrix
+
+# Abaixo desta densidade uma matriz densa é tratada como esparsa (TF-IDF)
+SPARSE_DENSITY_THRESHOLD = 0.05
+PROJECTION_METHODS = ("auto", "randomized", "arpack", "incremental")
+# Matrizes densas acima deste tamanho (em float32) usam IncrementalPCA
+PROJECTION_IN_MEMORY_MAX_MB = float(os.getenv("PROJECTION_IN_MEMORY_MAX_MB") or 1024)
+
+# Linhas lidas por vez ao medir a densidade (memmaps não são copiados)
+_DENSITY_BLOCK_ROWS = 8192
+
+
+@dataclass
+class ProjectionResult:
+    """Projeção PCA ajustada e coordenadas dos documentos"""
+
+    coords: np.ndarray                    # (n_docs, n_components) float32
+    components: np.ndarray                # (n_components, n_features)
+    mean: np.ndarray                      # (n_features,)
+    explained_variance_ratio: np.ndarray  # (n_components,)
+    method: str
+
+    @property
+    def total_variance(self) -> float:
+        return float(self.explained_variance_ratio.sum())
+
+    def transform(self, matrix: Matrix) -> np.ndarray:
+        """Projeta novas linhas com os componentes salvos"""
+        projected = matrix @ self.components.T
+        return (np.asarray(projected) - self.mean @ self.components.T).astype(np.float32)
+
+
+def _resolve_method(matrix: Matrix, method: str) -> str:
+    if method not in PROJECTION_METHODS:
+        raise ValueError(f"Método desconhecido: {method} (opções: {PROJECTION_METHODS})")
+    if method != "auto":
+        return method
+    if sp.issparse(matrix):
+        return "arpack"
+    nonzero = sum(
+        np.count_nonzero(matrix[start:start + _DENSITY_BLOCK_ROWS])
+        for start in range(0, matrix.shape[0], _DENSITY_BLOCK_ROWS)
+    )
+    if nonzero / max(matrix.size, 1) < SPARSE_DENSITY_THRESHOLD:
+        return "arpack"
+    float32_mb = matrix.size * np.dtype(np.float32).itemsize / (1024 * 1024)
+    return "incremental" if float32_mb > PROJECTION_IN_MEMORY_MAX_MB else "randomized"
+
+
+def _fit_incremental(
+    matrix: Matrix, n_components: int, chunk_size: int
+) -> ProjectionResult:
+    from sklearn.decomposition import IncrementalPCA
+
+    # Cada bloco precisa de pelo menos n_components linhas
+    chunk_size = max(chunk_size, n_components)
+    n_docs = matrix.shape[0]
+    starts = list(range(0, n_docs, chunk_size))
+    if len(starts) > 1 and n_docs - starts[-1] < n_components:
+        starts.pop()  # Último bloco pequeno demais: incorporado ao anterior
+
+    pca = IncrementalPCA(n_components=n_components)
+    for position, start in enumerate(starts):
+        stop = starts[position + 1] if position + 1 < len(starts) else n_docs
+        pca.partial_fit(np.asarray(matrix[start:stop], dtype=np.float32))
+
+    coords = np.empty((n_docs, n_components), dtype=np.float32)
+    for start in range(0, n_docs, chunk_size):
+        coords[start:start + chunk_size] = pca.transform(
+            np.asarray(matrix[start:start + chunk_size], dtype=np.float32)
+        )
+    return ProjectionResult(
+        coords=coords,
+        components=pca.components_,
+        mean=pca.mean_,
+        explained_variance_ratio=pca.explained_variance_ratio_,
+        method="incremental",
+    )
+
+
+def fit_projection(
+    matrix: Matrix,
+    n_components: int = 2,
+    method: str = "auto",
+    random_state: int = 42,
+    chunk_size: int = 4096,
+) -> ProjectionResult:
+    """
+    Ajusta a PCA com o solver adequado ao formato da matriz (sem cache).
+
+    Args:
+        matrix: Embeddings (densos, memmap ou esparsos)
+        n_components: Número de componentes
+        method: "auto", "randomized", "arpack" ou "incremental"
+        random_state: Semente dos solvers randomizados
+        chunk_size: Linhas por bloco no modo incremental
+
+    Returns:
+        ProjectionResult
+    """
+    from sklearn.decomposition import PCA
+
+    method = _resolve_method(matrix, method)
+    if method == "incremental":
+        return _fit_incremental(matrix, n_components, chunk_size)
+
+    if method == "arpack" and not sp.issparse(matrix):
+        matrix = sp.csr_matrix(matrix)
+    elif method == "randomized" and sp.issparse(matrix):
+        raise ValueError("Use 'arpack' para matrizes esparsas (PCA randomizada exige densa)")
+
+    pca = PCA(n_components=n_components, svd_solver=method, random_state=random_state)
+    # transform (e não fit_transform): coordenadas consistentes com ``components``
+    # mesmo quando a SVD randomizada é aproximada
+    coords = pca.fit(matrix).transform(matrix).astype(np.float32)
+    return ProjectionResult(
+        coords=coords,
+        components=pca.components_,
+        mean=pca.mean_,
+        explained_variance_ratio=pca.explained_variance_ratio_,
+        method=method,
+    )
+
+
+def project_embeddings(
+    matrix: Matrix,
+    n_components: int = 2,
+    method: str = "auto",
+    random_state: int = 42,
+    chunk_size: int = 4096,
+    use_cache: bool = True,
+    fingerprint: Optional[str] = None,
+) -> ProjectionResult:
+    """
+    Projeção PCA com cache por fingerprint da matriz e parâmetros.
+
+    Args:
+        matrix: Embeddings (densos, memmap ou esparsos)
+        n_components: Número de componentes
+        method: "auto", "randomized", "arpack" ou "incremental"
+        random_state: Semente dos solvers randomizados
+        chunk_size: Linhas por bloco no modo incremental
+        use_cache: Lê/grava em ``analysis_cache``
+        fingerprint: Fingerprint já calculado de ``matrix``
+
+    Returns:
+        ProjectionResult
+    """
+    cache = AnalysisCache("projections")
+    key = None
+    if use_cache:
+        resolved = _resolve_method(matrix, method)
+        key = cache.key(
+            fingerprint or array_fingerprint(matrix),
+            n_components=n_components, method=resolved, random_state=random_state,
+            chunk_size=chunk_size if resolved == "incremental" else None,
+        )
+        stored = cache.load(key)
+        if stored is not None:
+            arrays, metadata = stored
+            return ProjectionResult(method=metadata["method"], **arrays)
+
+    result = fit_projection(matrix, n_components, method, random_state, chunk_size)
+    if use_cache:
+        cache.save(
+            key,
+            {
+                "coords": result.coords,
+                "components": result.components,
+                "mean": result.mean,
+                "explained_variance_ratio": result.explained_variance_ratio,
+            },
+            {"method": result.method, "shape": list(matrix.shape)},
+        )
+    return result
+
+
+def project_all(
+    embeddings: Dict[str, Matrix],
+    n_components: int = 2,
+    random_state: int = 42,
+    use_cache: bool = True,
+    verbose: bool = True,
+) -> Dict[str, ProjectionResult]:
+    """Projeção de cada modelo (mesmo formato de chaves de ``embeddings``)"""
+    projections = {}
+    for name, matrix in embeddings.items():
+        projections[name] = project_embeddings(
+            matrix, n_components, random_state=random_state, use_cache=use_cache
+        )
+        if verbose:
+            print(
+                f"   ✅ {name.upper():<9} {projections[name].method:<12} "
+                f"variância explicada: {projections[name].total_variance * 100:.2f}%"
+            )
+    return projections
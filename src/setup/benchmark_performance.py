@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de Performance (CPU)
+Mede throughput (docs/s) das etapas de geração de embeddings.
+
+Uso:
+    python src/setup/benchmark_performance.py encoding --model all-MiniLM-L6-v2 --n-docs 2000
+    python src/setup/benchmark_performance.py pool --model bert-base-uncased --workers 1,2,4,8
+    python src/setup/benchmark_performance.py openai --n-docs 3000 --rpm 3000 --concurrency 16
+    python src/setup/benchmark_performance.py word2vec --n-docs 18000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar os módulos
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Suprimir warnings do tokenizers
+os.environ['TOKENIZERS_PARALLELISM'] = 'false'
+
+
+def load_benchmark_texts(n_docs: int) -> List[str]:
+    """
+    Carrega textos do 20 Newsgroups (mesma distribuição de tamanhos do projeto).
+
+    Sem acesso à rede (dataset não baixado), gera textos sintéticos com
+    tamanhos log-normais (mediana ~160 palavras, cauda longa).
+
+    Args:
+        n_docs: Número de documentos
+
+    Returns:
+        Lista de textos
+    """
+    from sklearn.datasets import fetch_20newsgroups
+
+    try:
+        newsgroups = fetch_20newsgroups(subset='all', remove=('headers', 'footers', 'quotes'))
+        texts = [text for text in newsgroups.data if text.strip()]
+        return texts[:n_docs]
+    except OSError as e:
+        print(f"⚠️  20 Newsgroups indisponível ({e}); usando textos sintéticos")
+
+    rng = np.random.default_rng(42)
+    vocabulary = [f"palavra{i}" for i in range(5000)]
+    lengths = np.clip(rng.lognormal(mean=5.1, sigma=1.0, size=n_docs), 3, 6000).astype(int)
+    return [" ".join(rng.choice(vocabulary, size=length)) for length in lengths]
+
+
+def measure(label: str, func: Callable[[], np.ndarray], n_docs: int, repeats: int) -> float:
+    """Executa ``func`` ``repeats`` vezes e reporta o melhor throughput"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    docs_per_second = n_docs / best
+    print(f"   {label:<32} {best:8.2f}s   {docs_per_second:8.1f} docs/s")
+    return docs_per_second
+
+
+def benchmark_encoding(args: argparse.Namespace) -> int:
+    """batch_size fixo (Notebook 2 original) vs. TokenBudgetEncoder"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    from transformer_encoding import TokenBudgetEncoder
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    texts = load_benchmark_texts(args.n_docs)
+    model = SentenceTransformer(args.model, device='cpu')
+    encoder = TokenBudgetEncoder(model, batch_size=args.batch_size)
+
+    lengths = encoder.token_lengths(texts)
+    batches = encoder.make_batches(texts)
+    fixed_padded = sum(
+        len(chunk) * chunk.max()
+        for chunk in np.array_split(lengths, range(args.batch_size, len(lengths), args.batch_size))
+    )
+    budget_padded = sum(len(batch) * lengths[batch].max() for batch in batches)
+
+    print(f"🧮 BENCHMARK DE ENCODING ({args.model}, {len(texts)} docs, "
+          f"{torch.get_num_threads()} threads)")
+    print("=" * 60)
+    print(f"   Tokens reais: {int(lengths.sum()):,}")
+    print(f"   Tokens com padding (batch fixo={args.batch_size}): {int(fixed_padded):,}")
+    print(f"   Tokens com padding (orçamento={encoder.max_tokens_per_batch}): "
+          f"{int(budget_padded):,} em {len(batches)} batches")
+    print()
+
+    baseline = measure(
+        f"batch_size={args.batch_size} (original)",
+        lambda: model.encode(texts, batch_size=args.batch_size, convert_to_numpy=True),
+        len(texts), args.repeats,
+    )
+    optimized = measure(
+        "TokenBudgetEncoder",
+        lambda: encoder.encode(texts),
+        len(texts), args.repeats,
+    )
+
+    # Mesmos vetores, mesma ordem
+    reference = model.encode(texts[:64], batch_size=args.batch_size, convert_to_numpy=True)
+    result = encoder.encode(texts[:64])
+    max_diff = float(np.abs(reference - result).max())
+
+    print(f"\n   Speedup: {optimized / baseline:.2f}x")
+    print(f"   Diferença máxima entre os vetores: {max_diff:.2e}")
+    return 0
+
+
+def benchmark_pool(args: argparse.Namespace) -> int:
+    """Escalonamento do EncodingPool de 1 a N processos"""
+    from encoding_pool import scaling_sweep
+
+    texts = load_benchmark_texts(args.n_docs)
+    worker_counts = [int(value) for value in args.workers.split(',')]
+
+    print(f"⚡ BENCHMARK DO POOL DE ENCODING ({args.model}, {len(texts)} docs, "
+          f"{os.cpu_count()} núcleos)")
+    print("=" * 60)
+
+    results = scaling_sweep(args.model, texts, worker_counts)
+    baseline = results[0][1]
+    for n_workers, docs_per_second in results:
+        print(f"   {n_workers:>3} workers   {docs_per_second:8.1f} docs/s   "
+              f"{docs_per_second / baseline:5.2f}x")
+    return 0
+
+
+def _char_batches(texts: List[str], max_chars: int) -> List[List[int]]:
+    """Batches sequenciais por caracteres (mesma regra do Notebook 3)"""
+    batches, current, current_chars = [], [], 0
+    for idx, text in enumerate(texts):
+        if current and current_chars + len(text) > max_chars:
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(idx)
+        current_chars += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def benchmark_openai(args: argparse.Namespace) -> int:
+    """Laço sequencial (Notebook 3 original) vs. AsyncEmbeddingClient, no servidor mock"""
+    from openai import OpenAI
+
+    from mock_openai_server import start_mock_server
+    from openai_async_client import AsyncEmbeddingClient
+
+    texts = [text[:args.max_chars] for text in load_benchmark_texts(args.n_docs)]
+    batches = _char_batches(texts, args.max_chars)
+    server_options = dict(
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        latency_ms=args.latency_ms,
+    )
+
+    print(f"🌐 BENCHMARK OPENAI (mock, {len(texts)} docs, {len(batches)} batches, "
+          f"limite {args.rpm} req/min, {args.tpm:,} tokens/min)")
+    print("=" * 60)
+
+    # Um servidor novo por medição: a janela de limite começa vazia
+    server, _ = start_mock_server(**server_options)
+    try:
+        # Original: uma requisição por vez, retries padrão do SDK
+        client = OpenAI(api_key="mock", base_url=server.base_url)
+
+        def sequential() -> None:
+            for batch_idx, batch in enumerate(batches):
+                client.embeddings.create(
+                    model="text-embedding-3-small", input=[texts[i] for i in batch]
+                )
+                if (batch_idx + 1) % 100 == 0:
+                    time.sleep(0.5)
+
+        baseline = measure("Sequencial (original)", sequential, len(texts), 1)
+        rate_limited_before = server.metrics["rate_limited"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    server, _ = start_mock_server(**server_options)
+    try:
+        embedder = AsyncEmbeddingClient(
+            api_key="mock",
+            base_url=server.base_url,
+            max_concurrency=args.concurrency,
+            requests_per_minute=args.rpm,
+            tokens_per_minute=args.tpm,
+        )
+        outcome = {}
+
+        def concurrent() -> None:
+            outcome["result"] = embedder.embed_batches_sync(texts, batches)
+
+        optimized = measure(
+            f"Assíncrono ({args.concurrency} em andamento)", concurrent, len(texts), 1
+        )
+        stats = outcome["result"].stats
+        rate_limited_after = server.metrics["rate_limited"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"\n   Speedup: {optimized / baseline:.2f}x")
+    print(f"   429 recebidos (sequencial): {rate_limited_before}")
+    print(f"   429 recebidos (assíncrono): {rate_limited_after}  "
+          f"| retries: {stats['retries']} | espera no limiter: {stats['wait_seconds']:.1f}s")
+    print(f"   Batches com falha: {len(outcome['result'].failed_batches)}")
+    return 0
+
+
+def benchmark_word2vec(args: argparse.Namespace) -> int:
+    """Word2Vec com tokens em memória (Notebook 2 original) vs. corpus_file"""
+    import tempfile
+
+    from word2vec_corpus import train_word2vec, write_corpus_file
+    from word2vec_pooling import tokenize_texts
+
+    texts = load_benchmark_texts(args.n_docs)
+    params = dict(vector_size=100, window=5, min_count=2, epochs=args.epochs, seed=42)
+
+    print(f"🔤 BENCHMARK DO WORD2VEC ({len(texts)} docs, {args.workers} workers, "
+          f"{os.cpu_count()} núcleos)")
+    print("=" * 60)
+
+    tokenized_texts = tokenize_texts(texts)
+    _, in_memory = train_word2vec(
+        sentences=tokenized_texts, workers=args.workers, verbose=False, **params
+    )
+    del tokenized_texts
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start = time.perf_counter()
+        corpus_path = write_corpus_file(texts, Path(tmp_dir) / "corpus.txt")
+        spill_seconds = time.perf_counter() - start
+        _, from_file = train_word2vec(
+            corpus_file=corpus_path, workers=args.workers, verbose=False, **params
+        )
+
+    for label, stats in (("tokens em memória (original)", in_memory),
+                         ("corpus_file", from_file)):
+        print(f"   {label:<32} {stats['seconds']:8.2f}s   "
+              f"{stats['words_per_second']:12,.0f} palavras/s")
+    print(f"\n   Gravação do corpus_file: {spill_seconds:.2f}s")
+    print(f"   Speedup: {from_file['words_per_second'] / in_memory['words_per_second']:.2f}x")
+    return 0
+
+
+def main() -> int:
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmarks de performance (CPU)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    encoding = subparsers.add_parser('encoding', help="Batching de SentenceTransformer")
+    encoding.add_argument('--model', default='all-MiniLM-L6-v2')
+    encoding.add_argument('--n-docs', type=int, default=2000)
+    encoding.add_argument('--batch-size', type=int,
+                          default=int(os.getenv('EMBEDDING_BATCH_SIZE', 32)))
+    encoding.add_argument('--threads', type=int, default=None)
+    encoding.add_argument('--repeats', type=int, default=1)
+    encoding.set_defaults(func=benchmark_encoding)
+
+    pool = subparsers.add_parser('pool', help="Escalonamento do pool multiprocesso")
+    pool.add_argument('--model', default='all-MiniLM-L6-v2')
+    pool.add_argument('--n-docs', type=int, default=4000)
+    pool.add_argument('--workers', default=f"1,2,4,{os.cpu_count() or 1}")
+    pool.set_defaults(func=benchmark_pool)
+
+    openai_parser = subparsers.add_parser('openai', help="Cliente OpenAI assíncrono (servidor mock)")
+    openai_parser.add_argument('--n-docs', type=int, default=3000)
+    openai_parser.add_argument('--max-chars', type=int,
+                               default=int(os.getenv('MAX_CHARS_PER_REQUEST', 28000)))
+    openai_parser.add_argument('--rpm', type=int, default=3000)
+    openai_parser.add_argument('--tpm', type=int, default=5_000_000)
+    openai_parser.add_argument('--latency-ms', type=float, default=150.0)
+    openai_parser.add_argument('--concurrency', type=int, default=16)
+    openai_parser.set_defaults(func=benchmark_openai)
+
+    word2vec = subparsers.add_parser('word2vec', help="Word2Vec em memória vs. corpus_file")
+    word2vec.add_argument('--n-docs', type=int, default=18000)
+    word2vec.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    word2vec.add_argument('--epochs', type=int, default=10)
+    word2vec.set_defaults(func=benchmark_word2vec)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Servidor Mock da API de Embeddings OpenAI
+Servidor local compatível com ``POST /v1/embeddings`` para benchmarks offline
+de throughput e backoff (sem custo e sem chave real).
+
+- Vetores determinísticos (mesmo texto → mesmo vetor), float ou base64
+- Limites de requisições/min e tokens/min com resposta 429 + Retry-After
+- Latência simulada (fixa + por token) e taxa de erros 5xx opcional
+
+Uso:
+    python src/setup/mock_openai_server.py --port 8089 --rpm 500 --tpm 200000
+
+    >>> from openai import OpenAI
+    >>> client = OpenAI(api_key="mock", base_url="http://127.0.0.1:8089/v1")
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import math
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Dimensões padrão dos modelos de embeddings da OpenAI
+MODEL_DIMENSIONS: Dict[str, int] = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+
+class ReplenishingLimiter:
+    """
+    Limites de requisições e tokens com reposição contínua, como a API real
+    (o limite por minuto é reposto proporcionalmente ao tempo decorrido).
+
+    Por padrão o período é de 60s; valores menores aceleram testes de backoff.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int],
+        tokens_per_minute: Optional[int],
+        window_seconds: float = 60.0,
+    ):
+        self.limits = {"requests": requests_per_minute, "tokens": tokens_per_minute}
+        self.levels = {name: float(limit or 0) for name, limit in self.limits.items()}
+        self.window = window_seconds
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def check(self, n_tokens: int) -> Optional[float]:
+        """
+        Consome a cota da requisição se couber nos limites.
+
+        Returns:
+            None se aceita, ou segundos até haver cota (Retry-After)
+        """
+        with self.lock:
+            now = time.monotonic()
+            elapsed = now - self.updated
+            self.updated = now
+
+            needed = {"requests": 1, "tokens": n_tokens}
+            retry_after = 0.0
+            for name, limit in self.limits.items():
+                if not limit:
+                    continue
+                rate = limit / self.window
+                self.levels[name] = min(limit, self.levels[name] + elapsed * rate)
+                amount = min(needed[name], limit)
+                if self.levels[name] < amount:
+                    retry_after = max(retry_after, (amount - self.levels[name]) / rate)
+
+            if retry_after > 0:
+                return retry_after
+
+            for name, limit in self.limits.items():
+                if limit:
+                    self.levels[name] -= min(needed[name], limit)
+            return None
+
+
+def deterministic_embedding(text: str, dimension: int) -> np.ndarray:
+    """Vetor unitário derivado do hash do texto"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimension).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """Servidor HTTP com o estado do mock (limites, métricas)"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        latency_ms: float = 50.0,
+        latency_ms_per_1k_tokens: float = 5.0,
+        error_rate: float = 0.0,
+        window_seconds: float = 60.0,
+        verbose: bool = False,
+    ):
+        super().__init__(address, MockOpenAIHandler)
+        self.limiter = ReplenishingLimiter(requests_per_minute, tokens_per_minute, window_seconds)
+        self.latency_ms = latency_ms
+        self.latency_ms_per_1k_tokens = latency_ms_per_1k_tokens
+        self.error_rate = error_rate
+        self.verbose = verbose
+        self.metrics = {"requests": 0, "rate_limited": 0, "errors": 0, "tokens": 0, "inputs": 0}
+        self.metrics_lock = threading.Lock()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self.metrics_lock:
+            self.metrics[name] += amount
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Handler de ``POST /v1/embeddings``"""
+
+    server: MockOpenAIServer
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str, error_type: str,
+                    headers: Optional[Dict[str, str]] = None) -> None:
+        self._send_json(
+            status,
+            {"error": {"message": message, "type": error_type, "param": None, "code": None}},
+            headers,
+        )
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") not in ("/v1/embeddings", "/embeddings"):
+            self._send_error(404, f"Rota desconhecida: {self.path}", "invalid_request_error")
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_error(400, "JSON inválido", "invalid_request_error")
+            return
+
+        inputs = request.get("input")
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        if not inputs or not all(isinstance(text, str) for text in inputs):
+            self._send_error(400, "'input' deve ser texto ou lista de textos", "invalid_request_error")
+            return
+
+        model = request.get("model", "text-embedding-3-small")
+        dimension = int(request.get("dimensions") or MODEL_DIMENSIONS.get(model, 1536))
+        # Aproximação de tokens (~4 caracteres por token)
+        n_tokens = sum(max(1, math.ceil(len(text) / 4)) for text in inputs)
+
+        self.server.count("requests")
+        retry_after = self.server.limiter.check(n_tokens)
+        if retry_after is not None:
+            self.server.count("rate_limited")
+            self._send_error(
+                429,
+                "Rate limit reached (mock)",
+                "requests",
+                {
+                    "Retry-After": str(max(1, math.ceil(retry_after))),
+                    "retry-after-ms": str(int(retry_after * 1000)),
+                },
+            )
+            return
+
+        time.sleep(
+            (self.server.latency_ms + self.server.latency_ms_per_1k_tokens * n_tokens / 1000) / 1000
+        )
+
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            self.server.count("errors")
+            self._send_error(500, "Erro interno simulado (mock)", "server_error")
+            return
+
+        self.server.count("tokens", n_tokens)
+        self.server.count("inputs", len(inputs))
+        encoding_format = request.get("encoding_format", "float")
+        data = []
+        for index, text in enumerate(inputs):
+            vector = deterministic_embedding(text, dimension)
+            if encoding_format == "base64":
+                embedding = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+
+        self._send_json(
+            200,
+            {
+                "object": "list",
+                "data": data,
+                "model": model,
+                "usage": {"prompt_tokens": n_tokens, "total_tokens": n_tokens},
+            },
+        )
+
+
+def start_mock_server(
+    host: str = "127.0.0.1", port: int = 0, **options
+) -> Tuple[MockOpenAIServer, threading.Thread]:
+    """
+    Inicia o servidor mock numa thread em segundo plano.
+
+    Args:
+        host: Endereço de escuta
+        port: Porta (0 = porta livre aleatória)
+        **options: requests_per_minute, tokens_per_minute, latency_ms,
+            latency_ms_per_1k_tokens, error_rate, window_seconds, verbose
+
+    Returns:
+        Tuple[server, thread]: use ``server.base_url`` no cliente e
+        ``server.shutdown()`` para encerrar
+    """
+    server = MockOpenAIServer((host, port), **options)
+    thread = threading.Thread(target=server.serve_forever, name="mock-openai", daemon=True)
+    thread.start()
+    return server, thread
+
+
+def main() -> int:
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Servidor mock da API de embeddings OpenAI")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--rpm', type=int, default=None, help="Limite de requisições/min")
+    parser.add_argument('--tpm', type=int, default=None, help="Limite de tokens/min")
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--latency-ms-per-1k-tokens', type=float, default=5.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--window-seconds', type=float, default=60.0)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(
+        (args.host, args.port),
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        latency_ms=args.latency_ms,
+        latency_ms_per_1k_tokens=args.latency_ms_per_1k_tokens,
+        error_rate=args.error_rate,
+        window_seconds=args.window_seconds,
+        verbose=True,
+    )
+    print(f"🧪 Mock OpenAI em {server.base_url} (Ctrl+C para encerrar)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 Métricas: {server.metrics}")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
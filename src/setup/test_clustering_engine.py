@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Teste da Varredura Paralela de K-Means
+Verifica que os resultados (com warm start em cadeias) não dependem do número
+de workers nem dos k pedidos, e que o cache devolve exatamente os mesmos ajustes
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+N_DOCS = 1500
+N_DIMS = 16
+K_VALUES = range(2, 9)
+CHAIN_LENGTH = 5  # Cadeias 2..6 e 7..8
+
+
+def _sample_embeddings():
+    from sklearn.datasets import make_blobs
+
+    blobs, _ = make_blobs(n_samples=N_DOCS, n_features=N_DIMS, centers=6, random_state=0)
+    rng = np.random.default_rng(1)
+    noise = rng.normal(size=(N_DOCS, N_DIMS * 2))
+    return {"blobs": blobs.astype(np.float32), "ruido": noise.astype(np.float32)}
+
+
+def _same_results(first, second) -> bool:
+    if set(first.results) != set(second.results):
+        return False
+    return all(
+        first.results[key].inertia == second.results[key].inertia
+        and np.array_equal(first.results[key].labels, second.results[key].labels)
+        for key in first.results
+    )
+
+
+def test_independent_of_workers() -> bool:
+    """
+    Testa se 1 e 3 workers produzem os mesmos ajustes para todo (embedding, k).
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("🔄 Testando independência do número de workers...")
+
+    try:
+        from clustering_engine import kmeans_sweep
+
+        embeddings = _sample_embeddings()
+        serial = kmeans_sweep(embeddings, K_VALUES, n_workers=1, chain_length=CHAIN_LENGTH,
+                              use_cache=False, verbose=False)
+        parallel = kmeans_sweep(embeddings, K_VALUES, n_workers=3, chain_length=CHAIN_LENGTH,
+                                use_cache=False, verbose=False)
+
+        if len(serial.results) != len(embeddings) * len(K_VALUES):
+            print(f"❌ {len(serial.results)} ajustes (esperado "
+                  f"{len(embeddings) * len(K_VALUES)})")
+            return False
+        if not _same_results(serial, parallel):
+            frame = serial.to_frame().merge(
+                parallel.to_frame(), on=["embedding", "k"], suffixes=("_1", "_3")
+            )
+            print("❌ Resultados dependem do número de workers:")
+            print(frame[["embedding", "k", "inertia_1", "inertia_3"]].to_string())
+            return False
+
+        warm = {k for (_, k), result in serial.results.items() if result.warm_started}
+        if warm != set(K_VALUES) - {2, 7}:
+            print(f"❌ Warm start em k={sorted(warm)} (esperado todos menos 2 e 7)")
+            return False
+
+        print(f"✅ {len(serial.results)} ajustes idênticos com 1 e 3 workers")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_cached_sweep() -> bool:
+    """
+    Testa se uma varredura parcial em cache é completada sem alterar resultados.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n💾 Testando varredura com cache...")
+
+    try:
+        import analysis_cache
+        from clustering_engine import kmeans_sweep
+
+        embeddings = _sample_embeddings()
+        reference = kmeans_sweep(embeddings, K_VALUES, n_workers=1, chain_length=CHAIN_LENGTH,
+                              use_cache=False,
+                                 verbose=False)
+
+        default_dir = analysis_cache.ANALYSIS_CACHE_DIR
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            analysis_cache.ANALYSIS_CACHE_DIR = Path(tmp_dir)
+            try:
+                # k = 2..4 em cache: k = 5 parte dos centróides de k = 4 em cache
+                kmeans_sweep(embeddings, K_VALUES[:3], n_workers=1,
+                             chain_length=CHAIN_LENGTH, verbose=False)
+                completed = kmeans_sweep(embeddings, K_VALUES, n_workers=2,
+                                         chain_length=CHAIN_LENGTH, verbose=False)
+            finally:
+                analysis_cache.ANALYSIS_CACHE_DIR = default_dir
+
+        expected_cached = len(embeddings) * len(K_VALUES[:3])
+        if completed.cached != expected_cached:
+            print(f"❌ {completed.cached} ajustes do cache (esperado {expected_cached})")
+            return False
+        if not _same_results(reference, completed):
+            print("❌ Varredura completada pelo cache difere da referência")
+            return False
+
+        print(f"✅ {completed.cached} ajustes do cache + "
+              f"{len(completed.results) - completed.cached} novos, idênticos à referência")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_independent_of_k_range() -> bool:
+    """
+    Testa se pedir só parte dos k (começando no meio de uma cadeia) devolve os
+    mesmos ajustes da varredura completa.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🔗 Testando independência dos k pedidos...")
+
+    try:
+        from clustering_engine import kmeans_sweep
+
+        embeddings = _sample_embeddings()
+        reference = kmeans_sweep(embeddings, K_VALUES, n_workers=1,
+                                 chain_length=CHAIN_LENGTH, use_cache=False, verbose=False)
+        partial = kmeans_sweep(embeddings, range(5, 9), n_workers=2,
+                               chain_length=CHAIN_LENGTH, use_cache=False, verbose=False)
+
+        if set(partial.results) != {(name, k) for name in embeddings for k in range(5, 9)}:
+            print(f"❌ Pares devolvidos: {sorted(partial.results)}")
+            return False
+        differs = [
+            key for key, result in partial.results.items()
+            if result.inertia != reference.results[key].inertia
+            or not np.array_equal(result.labels, reference.results[key].labels)
+        ]
+        if differs:
+            print(f"❌ Ajustes diferentes da varredura completa: {sorted(differs)}")
+            return False
+
+        print(f"✅ {len(partial.results)} ajustes de k = 5..8 idênticos à varredura completa")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DA VARREDURA DE K-MEANS")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Número de workers", test_independent_of_workers),
+        ("Cache", test_cached_sweep),
+        ("k pedidos", test_independent_of_k_range),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
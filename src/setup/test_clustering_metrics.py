@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Teste das Métricas de Clustering Escaláveis
+Compara silhouette em blocos, Davies-Bouldin e Calinski-Harabasz com o
+scikit-learn e verifica o intervalo do silhouette amostrado
+"""
+
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+N_DOCS = 1500
+N_DIMS = 32
+N_CLUSTERS = 5
+
+
+def _sample_clustering():
+    from sklearn.datasets import make_blobs
+
+    matrix, target = make_blobs(
+        N_DOCS, n_features=N_DIMS, centers=N_CLUSTERS, cluster_std=4.0, random_state=0
+    )
+    # Rótulos "ruidosos": ~15% dos pontos trocados de cluster
+    labels = target.copy()
+    noisy = np.arange(N_DOCS) % 7 == 0
+    labels[noisy] = (labels[noisy] + 1) % N_CLUSTERS
+    return matrix.astype(np.float32), labels, target
+
+
+def test_matches_sklearn() -> bool:
+    """
+    Testa silhouette em blocos e índices por centróide contra o scikit-learn.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("📏 Testando métricas exatas...")
+
+    try:
+        from sklearn.metrics import (
+            calinski_harabasz_score, davies_bouldin_score, silhouette_score
+        )
+        from clustering_metrics import centroid_indices, silhouette_blocked
+
+        matrix, labels, _ = _sample_clustering()
+        # Orçamento pequeno: força vários blocos de linhas
+        blocked = silhouette_blocked(matrix, labels, memory_budget_mb=1, n_threads=2)
+        expected = silhouette_score(matrix, labels)
+        if not np.isclose(blocked, expected, atol=1e-5):
+            print(f"❌ Silhouette: {blocked:.6f} != {expected:.6f}")
+            return False
+
+        # Orçamento mínimo: somas e distâncias ao centróide em vários blocos
+        indices = centroid_indices(matrix, labels, memory_budget_mb=0.01)
+        if not np.isclose(indices["davies_bouldin"], davies_bouldin_score(matrix, labels)):
+            print("❌ Davies-Bouldin divergente")
+            return False
+        if not np.isclose(indices["calinski_harabasz"], calinski_harabasz_score(matrix, labels)):
+            print("❌ Calinski-Harabasz divergente")
+            return False
+
+        print(f"✅ Silhouette {blocked:.4f}, DB {indices['davies_bouldin']:.4f} idênticos")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_sampled_and_sweep() -> bool:
+    """
+    Testa o silhouette amostrado (IC contém o exato) e a avaliação por k.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🎲 Testando silhouette amostrado e avaliação por k...")
+
+    try:
+        from clustering_metrics import evaluate_clusterings, silhouette_sampled
+
+        matrix, labels, target = _sample_clustering()
+        estimate = silhouette_sampled(matrix, labels, sample_size=300, random_state=1)
+        exact = evaluate_clusterings(matrix, {N_CLUSTERS: labels}, silhouette="exact")
+        exact_value = exact["silhouette"].iloc[0]
+        if not estimate.ci_low <= exact_value <= estimate.ci_high:
+            print(f"❌ IC [{estimate.ci_low:.4f}, {estimate.ci_high:.4f}] sem {exact_value:.4f}")
+            return False
+
+        metrics = evaluate_clusterings(
+            matrix, {2: target % 2, N_CLUSTERS: target, 3: target % 3},
+            target=target, silhouette="sample", sample_size=300, n_threads=2,
+        )
+        if list(metrics["k"]) != [2, 3, N_CLUSTERS]:
+            print(f"❌ Ordem de k incorreta: {list(metrics['k'])}")
+            return False
+        best = metrics.set_index("k").loc[N_CLUSTERS]
+        if not np.isclose(best["ari"], 1.0) or not np.isclose(best["nmi"], 1.0):
+            print("❌ ARI/NMI dos rótulos verdadeiros deveriam ser 1")
+            return False
+
+        print(
+            f"✅ Amostrado {estimate.mean:.4f} "
+            f"[{estimate.ci_low:.4f}, {estimate.ci_high:.4f}] ∋ exato {exact_value:.4f}"
+        )
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DAS MÉTRICAS DE CLUSTERING")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Métricas exatas", test_matches_sklearn),
+        ("Amostragem e varredura", test_sampled_and_sweep),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Teste do Snapshot Parquet do Dataset
+Usa um cliente em memória com a mesma interface de scroll do Elasticsearch
+para verificar reuso, invalidação pelo fingerprint e dtypes preservados
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+N_DOCS = 2500
+CATEGORIES = ["comp.graphics", "rec.autos", "sci.space"]
+
+
+class InMemoryElasticsearch:
+    """search/scroll/clear_scroll sobre uma lista de documentos"""
+
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.docs = docs
+        self.max_seq_no = len(docs) - 1
+        self.requests = 0
+        self._fields: List[str] = []
+        self._size = 0
+        self._position = 0
+
+    def index(self, doc: Dict[str, Any]) -> None:
+        self.docs.append(doc)
+        self.max_seq_no += 1
+
+    def search(self, index: str, body: Dict[str, Any], scroll=None, size=None):
+        self.requests += 1
+        if scroll is None:  # Requisição de fingerprint
+            return {
+                'hits': {
+                    'total': {'value': len(self.docs)},
+                    'hits': [{'_seq_no': self.max_seq_no, '_primary_term': 1}],
+                },
+                'aggregations': {'max_created_at': {'value': 1.0}},
+            }
+        self._fields, self._size, self._position = body['_source'], size, 0
+        return self._page()
+
+    def scroll(self, scroll_id: str, scroll: str):
+        self.requests += 1
+        return self._page()
+
+    def clear_scroll(self, scroll_id: str) -> None:
+        pass
+
+    def _page(self):
+        page = self.docs[self._position:self._position + self._size]
+        self._position += self._size
+        hits = [{'_source': {field: doc[field] for field in self._fields}} for doc in page]
+        total = {'value': len(self.docs)}
+        return {'_scroll_id': 'scroll', 'hits': {'total': total, 'hits': hits}}
+
+
+def _sample_docs() -> List[Dict[str, Any]]:
+    return [
+        {
+            'doc_id': f"doc_{i:05d}",
+            'text': f"documento de teste número {i}",
+            'category': CATEGORIES[i % len(CATEGORIES)],
+            'target': i % len(CATEGORIES),
+        }
+        for i in reversed(range(N_DOCS))
+    ]
+
+
+def test_snapshot_reuse() -> bool:
+    """
+    Testa se o segundo carregamento usa o snapshot (1 requisição, mesmos dados).
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("💾 Testando reuso do snapshot...")
+
+    try:
+        from dataset_snapshot import DatasetSnapshot, load_documents_with_snapshot
+
+        es = InMemoryElasticsearch(_sample_docs())
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            snapshot = DatasetSnapshot(Path(tmp_dir))
+            scrolled = load_documents_with_snapshot(
+                es, snapshot=snapshot, batch_size=500, verbose=False
+            )
+            scroll_requests = es.requests
+
+            es.requests = 0
+            cached = load_documents_with_snapshot(es, snapshot=snapshot, verbose=False)
+            if es.requests != 1:
+                print(f"❌ Esperada 1 requisição, feitas {es.requests}")
+                return False
+            if not cached.equals(scrolled):
+                print("❌ Snapshot diferente do scroll")
+                return False
+            dtypes = cached.dtypes.astype(str).to_dict()
+            if dtypes['category'] != "category" or dtypes['target'] != "int8":
+                print(f"❌ Dtypes não preservados: {cached.dtypes.to_dict()}")
+                return False
+
+            # Subconjunto de colunas servido pelo snapshot completo
+            subset = load_documents_with_snapshot(
+                es, snapshot=snapshot, columns=["category"], verbose=False
+            )
+            if list(subset.columns) != ["doc_id", "category"] or es.requests != 2:
+                print(f"❌ Subconjunto incorreto: {list(subset.columns)}")
+                return False
+
+        print(f"✅ {len(cached)} documentos: {scroll_requests} requisições → 1")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_snapshot_invalidation() -> bool:
+    """
+    Testa se uma mudança no índice invalida o snapshot.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🔄 Testando invalidação pelo fingerprint...")
+
+    try:
+        from dataset_snapshot import DatasetSnapshot, load_documents_with_snapshot
+
+        es = InMemoryElasticsearch(_sample_docs())
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            snapshot = DatasetSnapshot(Path(tmp_dir))
+            load_documents_with_snapshot(es, snapshot=snapshot, verbose=False)
+
+            es.index({'doc_id': "doc_99999", 'text': "novo", 'category': "rec.autos",
+                      'target': 1})
+            updated = load_documents_with_snapshot(es, snapshot=snapshot, verbose=False)
+            if len(updated) != N_DOCS + 1 or updated['doc_id'].iloc[-1] != "doc_99999":
+                print(f"❌ Documento novo ausente ({len(updated)} linhas)")
+                return False
+
+            # Snapshot menor não substitui um completo com o mesmo fingerprint
+            fingerprint = snapshot.manifest("documents_dataset")["fingerprint"]
+            snapshot.save("documents_dataset", fingerprint, updated[["doc_id", "target"]])
+            if "text" not in snapshot.manifest("documents_dataset")["columns"]:
+                print("❌ Snapshot completo substituído")
+                return False
+
+        print(f"✅ Snapshot regravado após inserção ({len(updated)} documentos)")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DO SNAPSHOT DO DATASET")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Reuso do snapshot", test_snapshot_reuse),
+        ("Invalidação", test_snapshot_invalidation),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
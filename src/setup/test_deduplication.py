@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Teste da Deduplicação de Textos
+Valida duplicatas exatas, quase-duplicatas (MinHash-LSH) e a replicação dos
+vetores na geração OpenAI
+"""
+
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+
+# Constantes
+BASE_TEXT = (
+    "the quick brown fox jumps over the lazy dog while the farmer watches "
+    "from the porch and the sun sets slowly behind the distant hills "
+) * 4
+TEXTS = [
+    "primeiro texto",
+    "",
+    "primeiro texto",
+    BASE_TEXT,
+    "",
+    BASE_TEXT + " tonight",
+    "um assunto completamente diferente sobre hardware de computadores",
+]
+
+
+def test_exact_duplicates() -> bool:
+    """
+    Testa o agrupamento por text_hash e a replicação dos vetores.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("🧬 Testando duplicatas exatas...")
+
+    try:
+        from deduplication import deduplicate_texts
+
+        dedup = deduplicate_texts(TEXTS, near_duplicates=False)
+        if dedup.representatives.tolist() != [0, 1, 3, 5, 6] or dedup.exact_duplicates != 2:
+            print(f"❌ Representantes inesperados: {dedup.representatives.tolist()}")
+            return False
+
+        unique_vectors = np.arange(dedup.n_unique, dtype=np.float32)[:, None]
+        expanded = dedup.expand(unique_vectors)
+        if expanded[:, 0].tolist() != [0, 1, 0, 2, 1, 3, 4]:
+            print(f"❌ Replicação incorreta: {expanded[:, 0].tolist()}")
+            return False
+
+        print(f"✅ {len(TEXTS)} textos → {dedup.n_unique} únicos")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_near_duplicates() -> bool:
+    """
+    Testa se MinHash-LSH une quase-duplicatas e mantém textos distintos.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🔍 Testando quase-duplicatas (MinHash-LSH)...")
+
+    try:
+        from deduplication import deduplicate_texts
+
+        dedup = deduplicate_texts(TEXTS, near_duplicates=True, near_threshold=0.8)
+        groups = [rows.tolist() for rows in dedup.members()]
+        if [3, 5] not in groups or [6] not in groups or dedup.near_duplicates != 1:
+            print(f"❌ Grupos inesperados: {groups}")
+            return False
+
+        savings = dedup.savings(token_counts=[2, 0, 2, 100, 0, 101, 9])
+        if savings["texts_saved"] != 3 or savings["tokens_saved"] != 103:
+            print(f"❌ Economia calculada incorretamente: {savings}")
+            return False
+
+        # Textos só com pontuação não são quase-duplicatas entre si
+        punctuation = deduplicate_texts(
+            ["!!!", "???", "hello world foo bar", "...", "!!!"], near_duplicates=True
+        )
+        punctuation_groups = [rows.tolist() for rows in punctuation.members()]
+        if punctuation_groups != [[0, 4], [1], [2], [3]]:
+            print(f"❌ Textos sem palavras agrupados: {punctuation_groups}")
+            return False
+
+        print(f"✅ Grupos: {groups}")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_openai_fan_out() -> bool:
+    """
+    Testa se a geração OpenAI envia cada texto único uma vez e replica o vetor.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n📡 Testando replicação na geração OpenAI...")
+
+    try:
+        from mock_openai_server import deterministic_embedding, start_mock_server
+        from openai_async_client import AsyncEmbeddingClient
+        from openai_generation import FailedBatchQueue, generate_openai_embeddings
+
+        import tempfile
+
+        doc_ids = [f"doc_{i:03d}" for i in range(len(TEXTS))]
+        server, _ = start_mock_server(latency_ms=1)
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                embedder = AsyncEmbeddingClient(api_key="mock", base_url=server.base_url)
+                result = generate_openai_embeddings(
+                    TEXTS, doc_ids, embedder, use_cache=False, retry_rounds=0,
+                    failed_queue=FailedBatchQueue(Path(tmp_dir) / "failed.jsonl"),
+                    deduplicate=True,
+                )
+            sent_inputs = server.metrics["inputs"]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        expected = np.stack([deterministic_embedding(text, 1536) for text in TEXTS])
+        if not result.complete or not np.allclose(result.embeddings, expected, atol=1e-6):
+            print("❌ Embeddings replicados incorretamente")
+            return False
+        if result.deduplicated != 2 or result.generated != len(TEXTS):
+            print(f"❌ Contagens inesperadas: {result.deduplicated}, {result.generated}")
+            return False
+        if sent_inputs != len(TEXTS) - 2:
+            print(f"❌ Textos enviados à API: {sent_inputs} (esperado {len(TEXTS) - 2})")
+            return False
+
+        print(f"✅ {sent_inputs} textos enviados para {len(TEXTS)} documentos")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DA DEDUPLICAÇÃO DE TEXTOS")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Duplicatas exatas", test_exact_duplicates),
+        ("Quase-duplicatas", test_near_duplicates),
+        ("Replicação OpenAI", test_openai_fan_out),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,11 +2,16 @@
 """
 Teste do Sistema de Cache Elasticsearch
 Valida o funcionamento completo do sistema de cache de embeddings
+
+Os testes marcados "(em memória)" usam o cliente Elasticsearch real sobre um
+nó de transporte em memória (sem servidor) e rodam em qualquer ambiente
 """
 
+import json
 import sys
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
+from urllib.parse import parse_qs, urlsplit
 
 import numpy as np
 import pandas as pd
@@ -20,6 +25,104 @@ TEST_EMBEDDINGS_SHAPE_SMALL = (2, 50)
 TOLERANCE_RTOL = 1e-5
 
 
+def _in_memory_node_class():
+    """Nó de transporte que atende o cliente Elasticsearch a partir de dicionários"""
+    from elastic_transport import ApiResponseMeta, BaseNode, HttpHeaders
+    from elastic_transport._node._base import NodeApiResponse
+
+    class InMemoryNode(BaseNode):
+        indices: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        fail_ids: set = set()  # _ids rejeitados pelo _bulk (falha parcial)
+        _scrolls: Dict[str, List[Dict[str, Any]]] = {}
+
+        def perform_request(self, method, target, body=None, headers=None,
+                            request_timeout=None):
+            url = urlsplit(target)
+            parts = [part for part in url.path.split("/") if part]
+            status, data = self._route(method, parts, parse_qs(url.query), body or b"")
+            meta = ApiResponseMeta(
+                status=status, http_version="1.1", duration=0.0, node=self.config,
+                headers=HttpHeaders({"x-elastic-product": "Elasticsearch",
+                                     "content-type": "application/json"}),
+            )
+            return NodeApiResponse(meta, b"" if method == "HEAD" else json.dumps(data).encode())
+
+        def _route(self, method, parts, query, body):
+            indices = type(self).indices
+            if parts == ["_bulk"]:
+                return 200, self._bulk(body)
+            if parts[:2] == ["_search", "scroll"]:
+                scroll_id = json.loads(body)["scroll_id"]
+                if method == "DELETE":
+                    return 200, {"succeeded": True}
+                return 200, self._page(scroll_id)
+            index = parts[0]
+            if len(parts) == 1:
+                if method == "PUT":
+                    indices[index] = {}
+                return (200 if index in indices else 404), {}
+            if index not in indices:
+                return 404, {"error": "index_not_found_exception"}
+            docs = indices[index]
+            if parts[1] == "_doc":
+                return (200 if parts[2] in docs else 404), {}
+            if parts[1] == "_refresh":
+                return 200, {}
+            if parts[1] == "_count":
+                return 200, {"count": len(docs)}
+            if parts[1] == "_search":
+                request = json.loads(body) if body else {}
+                terms = request.get("query", {}).get("terms", {})
+                hits = [
+                    {"_id": doc_id, "_source": source} for doc_id, source in docs.items()
+                    if all(source.get(field) in values for field, values in terms.items())
+                ]
+                size = int(query.get("size", [request.get("size", 10)])[0])
+                scroll_id = f"scroll-{len(type(self)._scrolls)}"
+                type(self)._scrolls[scroll_id] = hits
+                page = self._page(scroll_id, size)
+                return 200, page if "scroll" in query else {"hits": page["hits"]}
+            return 404, {}
+
+        def _page(self, scroll_id, size=None):
+            scrolls = type(self)._scrolls
+            hits, scrolls[scroll_id] = scrolls[scroll_id][:size], scrolls[scroll_id][size:]
+            if size is None:  # Continuação do scroll: mesmo tamanho de página
+                hits, scrolls[scroll_id] = hits[:1000], hits[1000:]
+            total = {"value": len(hits), "relation": "eq"}
+            return {"_scroll_id": scroll_id, "hits": {"total": total, "hits": hits}}
+
+        def _bulk(self, body):
+            lines = [json.loads(line) for line in body.decode().splitlines() if line]
+            items = []
+            for action, source in zip(lines[::2], lines[1::2]):
+                header = action["index"]
+                if header["_id"] in type(self).fail_ids:
+                    error = {"type": "mapper_parsing_exception", "reason": "teste"}
+                    items.append({"index": {"_id": header["_id"], "status": 400,
+                                            "error": error}})
+                    continue
+                type(self).indices.setdefault(header["_index"], {})[header["_id"]] = source
+                items.append({"index": {"_id": header["_id"], "status": 201}})
+            return {"errors": any(item["index"]["status"] >= 300 for item in items),
+                    "items": items}
+
+    return InMemoryNode
+
+
+def _in_memory_cache():
+    """ElasticsearchEmbeddingsCache conectado a um nó em memória (índices vazios)"""
+    from elasticsearch import Elasticsearch
+
+    from elasticsearch_manager import ElasticsearchEmbeddingsCache
+
+    node_class = _in_memory_node_class()
+    cache = ElasticsearchEmbeddingsCache()
+    cache.es = Elasticsearch("http://localhost:9200", node_class=node_class)
+    cache.connected = True
+    return cache, node_class
+
+
 def test_elasticsearch_connection() -> bool:
     """
     Testa conexão com Elasticsearch.
@@ -111,6 +214,109 @@ def test_dataset_save_load() -> bool:
         return False
 
 
+def test_columnar_document_loading() -> bool:
+    """
+    Testa o carregamento por colunas (dtypes compactos e ``columns=``).
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🧱 Testando carregamento do dataset por colunas...")
+
+    try:
+        from elasticsearch_helpers import load_all_documents_from_elasticsearch
+        from elasticsearch_manager import cache_manager
+
+        if not cache_manager.connected:
+            print("❌ Não conectado ao Elasticsearch")
+            return False
+
+        df = load_all_documents_from_elasticsearch(cache_manager.es, verbose=False)
+        if str(df['category'].dtype) != "category" or df['target'].dtype.itemsize > 4:
+            print(f"❌ Dtypes inesperados: {df.dtypes.to_dict()}")
+            return False
+        if not df['doc_id'].is_monotonic_increasing:
+            print("❌ DataFrame não ordenado por doc_id")
+            return False
+
+        without_text = load_all_documents_from_elasticsearch(
+            cache_manager.es, columns=["category", "target"], verbose=False
+        )
+        if list(without_text.columns) != ["doc_id", "category", "target"]:
+            print(f"❌ Colunas inesperadas: {list(without_text.columns)}")
+            return False
+        if not (without_text['category'] == df['category']).all():
+            print("❌ Categorias divergentes entre os carregamentos")
+            return False
+
+        print(f"✅ {len(df)} documentos, target {df['target'].dtype}, sem 'text' quando pedido")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado ao testar carregamento por colunas: {e}")
+        return False
+
+
+def test_append_dataset() -> bool:
+    """
+    Testa append_dataset (em memória): continuação dos doc_ids, skip_existing
+    e devolução apenas das linhas gravadas numa falha parcial do bulk.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n➕ Testando acréscimo incremental ao dataset (em memória)...")
+
+    try:
+        cache, node = _in_memory_cache()
+        node.indices["documents_dataset"] = {
+            f"doc_{i:04d}": {"doc_id": f"doc_{i:04d}", "text": f"texto {i}",
+                             "text_hash": cache._generate_text_hash(f"texto {i}")}
+            for i in range(3)
+        }
+        batch = pd.DataFrame({
+            "text": ["texto 1", "novo a", "novo b", "novo a"],
+            "category": ["tech"] * 4,
+            "target": [0] * 4,
+        })
+
+        appended = cache.append_dataset(batch)
+        if appended["doc_id"].tolist() != ["doc_0003", "doc_0004"]:
+            print(f"❌ doc_ids inesperados: {appended['doc_id'].tolist()}")
+            return False
+        if appended["text"].tolist() != ["novo a", "novo b"]:
+            print(f"❌ Textos inesperados: {appended['text'].tolist()}")
+            return False
+        if not cache.append_dataset(batch).empty:
+            print("❌ Reexecução deveria ignorar documentos existentes")
+            return False
+
+        # Falha parcial: o documento gravado é devolvido, o rejeitado não
+        node.fail_ids = {"doc_0006"}
+        partial = cache.append_dataset(pd.DataFrame({
+            "text": ["novo c", "novo d"], "category": ["tech"] * 2, "target": [0] * 2,
+        }))
+        if partial["doc_id"].tolist() != ["doc_0005"]:
+            print(f"❌ Falha parcial devolveu {partial['doc_id'].tolist()}")
+            return False
+        if "doc_0005" not in node.indices["documents_dataset"]:
+            print("❌ Documento gravado ausente do índice")
+            return False
+
+        print("✅ doc_ids contínuos, duplicatas ignoradas e falha parcial tratada")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado ao testar append_dataset: {e}")
+        return False
+
+
 def test_embeddings_save_load() -> bool:
     """
     Testa salvamento e carregamento de embeddings.
@@ -181,6 +387,69 @@ def test_embeddings_save_load() -> bool:
         return False
 
 
+def test_load_embeddings_buffers() -> bool:
+    """
+    Testa load_embeddings (em memória): dtype, normalize e buffer ``out``.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🧮 Testando dtype, normalização e buffer de saída (em memória)...")
+
+    try:
+        cache, node = _in_memory_cache()
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=TEST_EMBEDDINGS_SHAPE)
+        doc_ids = [f"doc_{i:04d}" for i in range(len(vectors))]
+        # Ordem no índice diferente da ordem pedida
+        node.indices["embeddings_test"] = {
+            doc_id: {"doc_id": doc_id, "embedding": vectors[row].tolist()}
+            for row, doc_id in reversed(list(enumerate(doc_ids)))
+        }
+
+        loaded = cache.load_embeddings("embeddings_test", doc_ids, dtype=np.float64)
+        if loaded is None or loaded.dtype != np.float64 or not np.allclose(loaded, vectors):
+            print("❌ Carga em float64 incorreta")
+            return False
+
+        out = np.zeros(TEST_EMBEDDINGS_SHAPE, dtype=np.float32)
+        result = cache.load_embeddings("embeddings_test", doc_ids, normalize=True, out=out)
+        expected = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        if result is not out:
+            print("❌ load_embeddings não devolveu o próprio buffer 'out'")
+            return False
+        if not np.allclose(out, expected, rtol=TOLERANCE_RTOL, atol=1e-6):
+            print("❌ Buffer 'out' não preenchido/normalizado no lugar")
+            return False
+
+        invalid_buffers = {
+            "shape": np.zeros((len(doc_ids) + 1, TEST_EMBEDDINGS_SHAPE[1]), dtype=np.float32),
+            "dtype": np.zeros(TEST_EMBEDDINGS_SHAPE, dtype=np.float64),
+            "contiguidade": np.zeros(TEST_EMBEDDINGS_SHAPE[::-1], dtype=np.float32).T,
+        }
+        for problem, buffer in invalid_buffers.items():
+            try:
+                cache.load_embeddings("embeddings_test", doc_ids, out=buffer)
+            except ValueError:
+                continue
+            print(f"❌ Buffer com {problem} inválido aceito")
+            return False
+
+        if cache.load_embeddings("embeddings_test", doc_ids + ["doc_9999"]) is not None:
+            print("❌ doc_id ausente deveria invalidar a carga")
+            return False
+
+        print("✅ dtype, normalização in-place e validação de 'out' corretos")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado ao testar buffers de load_embeddings: {e}")
+        return False
+
+
 def test_duplicate_prevention() -> bool:
     """
     Testa prevenção de duplicatas.
@@ -324,6 +593,65 @@ def test_integrity_validation() -> bool:
         return False
 
 
+def test_tfidf_artifact_save_load() -> bool:
+    """
+    Testa persistência e restauração do TfidfVectorizer ajustado.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n📦 Testando artefato do TF-IDF (vocabulário + IDF)...")
+
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from elasticsearch_manager import generate_corpus_fingerprint
+        from tfidf_artifacts import load_tfidf_vectorizer, save_tfidf_vectorizer
+
+        test_doc_ids = ["doc_artifact_001", "doc_artifact_002", "doc_artifact_003"]
+        test_texts = [
+            "Test document about machine learning and data.",
+            "Another test document about machine learning.",
+            "A third test document about data science.",
+        ]
+        fingerprint = generate_corpus_fingerprint(test_doc_ids, test_texts)
+
+        vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+        vectorizer.fit(test_texts)
+
+        if not save_tfidf_vectorizer(vectorizer, fingerprint, artifact_name="tfidf_test"):
+            print("❌ Falha ao salvar artefato")
+            return False
+
+        restored = load_tfidf_vectorizer(fingerprint, artifact_name="tfidf_test")
+        if restored is None:
+            print("❌ Falha ao restaurar artefato")
+            return False
+
+        expected = vectorizer.transform(["machine learning test"]).toarray()
+        result = restored.transform(["machine learning test"]).toarray()
+        if not np.allclose(expected, result, rtol=TOLERANCE_RTOL):
+            print("❌ Vectorizer restaurado produz vetores diferentes")
+            return False
+
+        print("✅ Vectorizer restaurado é idêntico ao original")
+
+        # Fingerprint diferente deve invalidar o artefato
+        stale = load_tfidf_vectorizer("fingerprint-invalido", artifact_name="tfidf_test")
+        if stale is None:
+            print("✅ Artefato com fingerprint diferente foi rejeitado")
+            return True
+
+        print("❌ Artefato desatualizado não foi detectado")
+        return False
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado ao testar artefato do TF-IDF: {e}")
+        return False
+
+
 def test_cache_cleanup() -> bool:
     """
     Testa limpeza do cache de teste.
@@ -374,9 +702,13 @@ def main() -> int:
     tests: List[Tuple[str, callable]] = [
         ("Conexão Elasticsearch", test_elasticsearch_connection),
         ("Dataset Save/Load", test_dataset_save_load),
+        ("Dataset por Colunas", test_columnar_document_loading),
+        ("Acréscimo ao Dataset", test_append_dataset),
         ("Embeddings Save/Load", test_embeddings_save_load),
+        ("Buffers de Embeddings", test_load_embeddings_buffers),
         ("Prevenção de Duplicatas", test_duplicate_prevention),
         ("Validação de Integridade", test_integrity_validation),
+        ("Artefato TF-IDF", test_tfidf_artifact_save_load),
         ("Limpeza do Cache", test_cache_cleanup),
     ]
 
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Teste do Pipeline de Embeddings
+Usa um cache em memória e adaptadores de teste para verificar que apenas as
+linhas ausentes são geradas, que a ordem dos doc_ids é mantida e que linhas
+em cache e novas vêm sempre do mesmo modelo
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+N_DOCS = 120
+N_CACHED = 80
+INDEX_NAME = "embeddings_teste"
+
+
+class InMemoryEmbeddingsCache:
+    """Subconjunto da interface de ElasticsearchEmbeddingsCache usado pelo pipeline"""
+
+    connected = True
+
+    def __init__(self):
+        self.vectors: Dict[str, np.ndarray] = {}
+
+    def check_embeddings_exist(self, index_name: str, doc_ids: List[str]):
+        existing = [doc_id for doc_id in doc_ids if doc_id in self.vectors]
+        missing = [doc_id for doc_id in doc_ids if doc_id not in self.vectors]
+        return bool(existing), existing, missing
+
+    def validate_embeddings_integrity(self, index_name, doc_ids, texts):
+        return True, []
+
+    def load_embeddings(self, index_name: str, doc_ids: List[str]) -> Optional[np.ndarray]:
+        return np.stack([self.vectors[doc_id] for doc_id in doc_ids])
+
+    def create_index(self, index_name: str, verbose: bool = True) -> bool:
+        return True
+
+    def save_embeddings(self, index_name, embeddings, doc_ids, texts, *args, **kwargs) -> bool:
+        for doc_id, vector in zip(doc_ids, embeddings):
+            self.vectors[doc_id] = np.array(vector, dtype=np.float32)
+        return True
+
+    def refresh_index(self, index_name: str) -> None:
+        pass
+
+
+class VersionedAdapter:
+    """
+    Adaptador de teste: vetor = [posição do documento, versão do modelo].
+
+    ``refit=True`` simula TF-IDF/Word2Vec reajustados (nova versão a cada fit).
+    """
+
+    model_type = "teste"
+    model_version = "1.0"
+
+    def __init__(self, refit: bool):
+        self.refit = refit
+        self.refitted = False
+        self.version = 1
+        self.encoded: List[str] = []
+
+    def fit(self, texts, doc_ids=None) -> None:
+        if self.refit:
+            self.version += 1
+        self.refitted = self.refit
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        self.encoded.extend(texts)
+        rows = [[float(text.split()[-1]), float(self.version)] for text in texts]
+        return np.asarray(rows, dtype=np.float32)
+
+
+def _corpus() -> Tuple[List[str], List[str]]:
+    doc_ids = [f"doc_{i:04d}" for i in reversed(range(N_DOCS))]
+    texts = [f"documento {int(doc_id[4:])}" for doc_id in doc_ids]
+    return doc_ids, texts
+
+
+def _prefilled_cache(doc_ids: List[str]) -> InMemoryEmbeddingsCache:
+    cache = InMemoryEmbeddingsCache()
+    for doc_id in doc_ids[:N_CACHED]:
+        cache.vectors[doc_id] = np.array([int(doc_id[4:]), 1], dtype=np.float32)
+    return cache
+
+
+def _run(adapter: VersionedAdapter, cache: InMemoryEmbeddingsCache) -> np.ndarray:
+    from embedding_pipeline import EmbeddingPipeline
+
+    pipeline = EmbeddingPipeline(
+        adapter, INDEX_NAME, cache=cache, chunk_size=16, use_cache=True,
+        force_regenerate=False, deduplicate=False, verbose=False,
+    )
+    doc_ids, texts = _corpus()
+    return pipeline.run(doc_ids, texts)
+
+
+def test_only_missing_rows_encoded() -> bool:
+    """
+    Testa se um modelo restaurado gera só as linhas ausentes, na ordem certa.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("🧮 Testando geração apenas das linhas ausentes...")
+
+    try:
+        doc_ids, _ = _corpus()
+        cache = _prefilled_cache(doc_ids)
+        adapter = VersionedAdapter(refit=False)
+        result = _run(adapter, cache)
+
+        if len(adapter.encoded) != N_DOCS - N_CACHED:
+            print(f"❌ {len(adapter.encoded)} textos codificados (esperado "
+                  f"{N_DOCS - N_CACHED})")
+            return False
+        expected_positions = np.array([int(doc_id[4:]) for doc_id in doc_ids])
+        if not np.array_equal(result[:, 0], expected_positions):
+            print("❌ Linhas fora da ordem dos doc_ids")
+            return False
+        if set(cache.vectors) != set(doc_ids):
+            print("❌ Linhas geradas não gravadas no cache")
+            return False
+
+        print(f"✅ {N_CACHED} linhas do cache + {len(adapter.encoded)} geradas, em ordem")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_refit_reencodes_cached_rows() -> bool:
+    """
+    Testa se um modelo reajustado recodifica também as linhas em cache.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🔄 Testando consistência do modelo após refit...")
+
+    try:
+        doc_ids, _ = _corpus()
+        cache = _prefilled_cache(doc_ids)
+        adapter = VersionedAdapter(refit=True)
+        result = _run(adapter, cache)
+
+        versions = np.unique(result[:, 1])
+        if versions.tolist() != [adapter.version]:
+            print(f"❌ Matriz mistura versões de modelo: {versions.tolist()}")
+            return False
+        cached_versions = {int(vector[1]) for vector in cache.vectors.values()}
+        if cached_versions != {adapter.version}:
+            print(f"❌ Cache mistura versões de modelo: {sorted(cached_versions)}")
+            return False
+
+        # Re-execução sem linhas ausentes: nada é reajustado nem gerado
+        adapter.encoded.clear()
+        again = _run(adapter, cache)
+        if adapter.encoded or not np.array_equal(again, result):
+            print("❌ Re-execução com cache completo não deveria gerar embeddings")
+            return False
+
+        print(f"✅ {N_DOCS} linhas recodificadas pelo modelo v{adapter.version}")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_empty_doc_ids() -> bool:
+    """
+    Testa se uma lista vazia de doc_ids devolve uma matriz float32 vazia e se
+    o adaptador base exige ``encode``.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n📭 Testando lista vazia de documentos...")
+
+    try:
+        from embedding_pipeline import EmbeddingAdapter, EmbeddingPipeline
+
+        try:
+            EmbeddingAdapter()
+            print("❌ EmbeddingAdapter sem encode não deveria ser instanciável")
+            return False
+        except TypeError:
+            pass
+
+        adapter = VersionedAdapter(refit=False)
+        pipeline = EmbeddingPipeline(
+            adapter, INDEX_NAME, cache=InMemoryEmbeddingsCache(), use_cache=True,
+            force_regenerate=False, deduplicate=False, verbose=False,
+        )
+        result = pipeline.run([], [])
+        if not isinstance(result, np.ndarray) or result.dtype != np.float32 or len(result):
+            print(f"❌ Resultado para lista vazia: {result!r}")
+            return False
+        if adapter.encoded:
+            print("❌ Nada deveria ser codificado")
+            return False
+
+        print(f"✅ Lista vazia → matriz float32 {result.shape}")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DO PIPELINE DE EMBEDDINGS")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Apenas ausentes", test_only_missing_rows_encoded),
+        ("Refit consistente", test_refit_reencodes_cached_rows),
+        ("Lista vazia", test_empty_doc_ids),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
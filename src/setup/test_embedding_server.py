@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Teste do Servidor Local de Embeddings
+Valida o formato binário, o micro-batching de requisições concorrentes e o
+Unix socket, usando um Word2Vec pequeno treinado no próprio teste
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+CORPUS = [
+    "o gato subiu no telhado e o cachorro latiu para a lua",
+    "modelos de linguagem geram embeddings para cada documento",
+    "o servidor agrupa requisições concorrentes num único batch",
+] * 20
+QUERIES = ["o gato latiu", "embeddings de documento", "palavra_desconhecida"]
+
+
+def _word2vec_encoder(tmp_dir: str):
+    """Treina e salva um Word2Vec pequeno; devolve (encode_fn, dimensão)"""
+    from gensim.models import Word2Vec
+
+    from embedding_server import word2vec_encoder
+
+    model = Word2Vec(
+        [text.split() for text in CORPUS], vector_size=16, min_count=1, workers=1, seed=42
+    )
+    path = Path(tmp_dir) / "word2vec.model"
+    model.save(str(path))
+    return word2vec_encoder(path)
+
+
+def test_binary_roundtrip() -> bool:
+    """
+    Testa se os vetores servidos são idênticos aos calculados localmente.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("📦 Testando resposta binária (TCP)...")
+
+    try:
+        from embedding_server import (
+            EmbeddingServerClient,
+            start_embedding_server,
+            stop_embedding_server,
+        )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            encoder = _word2vec_encoder(tmp_dir)
+            server = start_embedding_server({"word2vec": encoder}, max_wait_ms=2)
+            try:
+                client = EmbeddingServerClient(server.url)
+                served = client.encode(QUERIES, "word2vec")
+                health = client.health()
+
+                latencies = []
+                for _ in range(20):
+                    start = time.perf_counter()
+                    client.encode(QUERIES[:1], "word2vec")
+                    latencies.append((time.perf_counter() - start) * 1000)
+            finally:
+                stop_embedding_server(server)
+
+        if health["models"] != {"word2vec": 16}:
+            print(f"❌ /health inesperado: {health['models']}")
+            return False
+        if served.dtype != np.float32 or not np.allclose(served, encoder[0](QUERIES)):
+            print("❌ Vetores servidos diferem dos locais")
+            return False
+
+        print(f"✅ {served.shape} float32 idênticos; latência mediana {np.median(latencies):.1f} ms")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_micro_batching() -> bool:
+    """
+    Testa se requisições concorrentes são agrupadas em menos encodes.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🧺 Testando micro-batching (Unix socket)...")
+
+    try:
+        from embedding_server import (
+            EmbeddingServerClient,
+            start_embedding_server,
+            stop_embedding_server,
+        )
+
+        n_clients = 16
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            encoder = _word2vec_encoder(tmp_dir)
+            server = start_embedding_server(
+                {"word2vec": encoder},
+                unix_socket=os.path.join(tmp_dir, "embeddings.sock"),
+                max_wait_ms=50,
+            )
+            results: List[np.ndarray] = [None] * n_clients
+            barrier = threading.Barrier(n_clients)
+
+            def worker(i: int) -> None:
+                client = EmbeddingServerClient(server.url)
+                barrier.wait()
+                results[i] = client.encode([QUERIES[i % len(QUERIES)]], "word2vec")
+
+            try:
+                threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_clients)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                stats = server.batchers["word2vec"].stats
+            finally:
+                stop_embedding_server(server)
+
+            expected = encoder[0](QUERIES)
+
+        for i, result in enumerate(results):
+            if result is None or not np.allclose(result[0], expected[i % len(QUERIES)]):
+                print(f"❌ Resposta incorreta para o cliente {i}")
+                return False
+        if stats["batches"] >= n_clients:
+            print(f"❌ Sem agrupamento: {stats['batches']} encodes para {n_clients} requisições")
+            return False
+
+        print(f"✅ {stats['requests']} requisições em {stats['batches']} encodes")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DO SERVIDOR LOCAL DE EMBEDDINGS")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Resposta binária", test_binary_roundtrip),
+        ("Micro-batching", test_micro_batching),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Teste das Estatísticas de Embeddings em Uma Passada
+Compara o acumulador por blocos com as estatísticas calculadas pelo NumPy
+sobre a matriz inteira (densa, esparsa e memmap)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+N_ROWS = 1000
+N_DIMS = 64
+RESERVOIR_SIZE = 500
+
+
+def _sample_matrices():
+    rng = np.random.default_rng(0)
+    dense = rng.normal(loc=0.3, scale=2.0, size=(N_ROWS, N_DIMS)).astype(np.float32)
+    # Estilo TF-IDF: ~97% zeros, linhas normalizadas
+    sparse_like = rng.random((N_ROWS, N_DIMS)).astype(np.float32)
+    sparse_like[rng.random((N_ROWS, N_DIMS)) < 0.97] = 0.0
+    sparse_like[:, 0] += 1e-3  # nenhuma linha nula
+    sparse_like /= np.linalg.norm(sparse_like, axis=1, keepdims=True)
+    return {"denso": dense, "esparso": sparse_like}
+
+
+def test_matches_numpy() -> bool:
+    """
+    Testa se as estatísticas por blocos coincidem com as da matriz inteira.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("📊 Testando estatísticas por blocos...")
+
+    try:
+        from embedding_stats import compute_embedding_stats
+
+        for name, matrix in _sample_matrices().items():
+            stats = compute_embedding_stats(matrix, chunk_size=137)
+            nonzero = matrix[matrix != 0].astype(np.float64)
+            norms = np.linalg.norm(matrix.astype(np.float64), axis=1)
+
+            expected = {
+                "sparsity": np.mean(matrix == 0) * 100,
+                "min": matrix.min(), "max": matrix.max(),
+                "mean": matrix.astype(np.float64).mean(),
+                "std": matrix.astype(np.float64).std(),
+                "nonzero_mean": nonzero.mean(), "nonzero_std": nonzero.std(),
+                "norm_mean": norms.mean(),
+            }
+            for field, value in expected.items():
+                if not np.isclose(getattr(stats, field), value, rtol=1e-6, atol=1e-8):
+                    print(f"❌ {name}.{field}: {getattr(stats, field)} != {value}")
+                    return False
+            if not np.allclose(stats.dim_std, matrix.astype(np.float64).std(axis=0)):
+                print(f"❌ {name}: desvio por dimensão incorreto")
+                return False
+            if stats.is_normalized != np.allclose(norms, 1.0, atol=1e-2):
+                print(f"❌ {name}: detecção de normalização incorreta")
+                return False
+
+        print(f"✅ Estatísticas idênticas (esparsidade TF-IDF-like: {stats.sparsity:.1f}%)")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_streams_and_reservoir() -> bool:
+    """
+    Testa memmap, pares (doc_ids, bloco) e a amostra de reservatório.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🎲 Testando memmap, fluxo de blocos e reservatório...")
+
+    try:
+        from embedding_stats import compute_embedding_stats
+
+        matrix = _sample_matrices()["esparso"]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "embeddings.f32"
+            mapped = np.memmap(path, dtype=np.float32, mode="w+", shape=matrix.shape)
+            mapped[:] = matrix
+            from_memmap = compute_embedding_stats(
+                mapped, chunk_size=100, reservoir_size=RESERVOIR_SIZE
+            )
+            del mapped
+
+        chunks = (
+            ([f"doc_{i}" for i in range(start, start + 250)], matrix[start:start + 250])
+            for start in range(0, N_ROWS, 250)
+        )
+        from_stream = compute_embedding_stats(chunks, reservoir_size=RESERVOIR_SIZE)
+
+        if not np.isclose(from_memmap.nonzero_std, from_stream.nonzero_std):
+            print("❌ memmap e fluxo de blocos divergem")
+            return False
+
+        sample = from_stream.nonzero_sample
+        population = matrix[matrix != 0]
+        if len(sample) != RESERVOIR_SIZE or not np.isin(sample, population).all():
+            print(f"❌ Reservatório inválido ({len(sample)} valores)")
+            return False
+        if np.any(sample == 0) or len(from_stream.value_sample) != RESERVOIR_SIZE:
+            print("❌ Amostras com tamanho/conteúdo incorreto")
+            return False
+        # Amostra uniforme: média próxima da população (erro padrão ~0.012)
+        if abs(sample.mean() - population.mean()) > 0.06:
+            print(f"❌ Amostra enviesada: {sample.mean():.3f} vs {population.mean():.3f}")
+            return False
+
+        print(f"✅ Reservatório de {len(sample)} não-zeros (média {sample.mean():.3f})")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DAS ESTATÍSTICAS DE EMBEDDINGS")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Estatísticas por blocos", test_matches_numpy),
+        ("Fluxos e reservatório", test_streams_and_reservoir),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
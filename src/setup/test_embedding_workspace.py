@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Teste do Workspace Compartilhado de Embeddings
+Publica matrizes num diretório temporário e verifica anexação sem cópia,
+validação por fingerprint/doc_ids/estado do índice e leitura por outro processo
+"""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+N_DOCS = 500
+N_DIMS = 48
+INDEX_NAME = "embeddings_teste"
+
+
+class FakeEmbeddingsCache:
+    """cache_manager mínimo: fingerprint do índice e load_embeddings(out=)"""
+
+    connected = True
+
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = matrix
+        self.max_seq_no = 0
+        self.loads = 0
+        self.es = self
+        self.indices_config = {
+            INDEX_NAME: {"mapping": {"mappings": {"properties": {
+                "embedding": {"dims": matrix.shape[1]}
+            }}}}
+        }
+
+    def search(self, index: str, body):
+        return {
+            'hits': {
+                'total': {'value': len(self.matrix)},
+                'hits': [{'_seq_no': self.max_seq_no, '_primary_term': 1}],
+            },
+            'aggregations': {'max_created_at': {'value': 1.0}},
+        }
+
+    def load_embeddings(self, index_name, doc_ids, dtype=np.float32, out=None):
+        self.loads += 1
+        if out is None:
+            return self.matrix.astype(dtype)
+        out[:] = self.matrix
+        return out
+
+
+def _sample_matrix():
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(N_DOCS, N_DIMS)).astype(np.float32)
+    doc_ids = [f"doc_{i}" for i in range(N_DOCS)]
+    return matrix, doc_ids
+
+
+def test_publish_and_attach() -> bool:
+    """
+    Testa publicação, anexação (memmap somente leitura) e validações.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("🗄️  Testando publicação e anexação...")
+
+    try:
+        from analysis_cache import array_fingerprint
+        from embedding_workspace import EmbeddingWorkspace
+
+        matrix, doc_ids = _sample_matrix()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            workspace = EmbeddingWorkspace(Path(tmp_dir))
+            workspace.publish(INDEX_NAME, matrix, doc_ids)
+
+            attached = workspace.attach(
+                INDEX_NAME, fingerprint=array_fingerprint(matrix), doc_ids=doc_ids
+            )
+            if not isinstance(attached, np.memmap) or attached.flags.writeable:
+                print("❌ Anexação deveria devolver memmap somente leitura")
+                return False
+            if not np.array_equal(attached, matrix):
+                print("❌ Conteúdo anexado diferente do publicado")
+                return False
+            if workspace.attach(INDEX_NAME, doc_ids=doc_ids[::-1]) is not None:
+                print("❌ Ordem de doc_ids diferente deveria ser rejeitada")
+                return False
+            if workspace.attach(INDEX_NAME, fingerprint="0" * 32) is not None:
+                print("❌ Fingerprint diferente deveria ser rejeitado")
+                return False
+
+            # Republicar não invalida quem já anexou a versão anterior
+            workspace.publish(INDEX_NAME, matrix * 2, doc_ids)
+            if not np.array_equal(attached, matrix):
+                print("❌ Versão anexada alterada pela republicação")
+                return False
+            if not np.array_equal(workspace.attach(INDEX_NAME), matrix * 2):
+                print("❌ Republicação não registrada")
+                return False
+
+            calls = []
+            workspace.get_or_publish(INDEX_NAME, lambda: calls.append(1), doc_ids)
+            if calls:
+                print("❌ get_or_publish recarregou uma matriz já publicada")
+                return False
+            if workspace.drop() != 1 or workspace.entries():
+                print("❌ drop não limpou o registro")
+                return False
+            del attached
+
+        print(f"✅ Matriz {matrix.shape} publicada, anexada e validada")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_attach_from_other_process() -> bool:
+    """
+    Testa a anexação por outro processo (apenas nome do índice).
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🔗 Testando anexação por outro processo...")
+
+    try:
+        from embedding_workspace import EmbeddingWorkspace
+
+        matrix, doc_ids = _sample_matrix()
+        src_dir = Path(__file__).parent.parent
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            EmbeddingWorkspace(Path(tmp_dir)).publish(INDEX_NAME, matrix, doc_ids)
+            script = (
+                "import sys; from pathlib import Path; "
+                f"sys.path.insert(0, {str(src_dir)!r}); "
+                "from embedding_workspace import EmbeddingWorkspace; "
+                f"workspace = EmbeddingWorkspace(Path({tmp_dir!r})); "
+                f"matrix = workspace.attach({INDEX_NAME!r}); "
+                "ids = workspace.doc_ids(" + repr(INDEX_NAME) + "); "
+                "print(f'{float(matrix.sum()):.4f} {len(ids)}')"
+            )
+            output = subprocess.run(
+                [sys.executable, "-c", script], capture_output=True, text=True, check=True
+            ).stdout.split()
+
+        if float(output[0]) != round(float(matrix.sum()), 4) or int(output[1]) != N_DOCS:
+            print(f"❌ Outro processo leu {output}")
+            return False
+
+        print(f"✅ Outro processo anexou {N_DOCS} linhas pelo nome do índice")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_reload_after_index_change() -> bool:
+    """
+    Testa se uma mudança no índice de embeddings invalida a cópia publicada.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🔄 Testando invalidação pelo estado do índice...")
+
+    try:
+        import elasticsearch_manager
+        from embedding_workspace import EmbeddingWorkspace
+
+        matrix, doc_ids = _sample_matrix()
+        fake_cache = FakeEmbeddingsCache(matrix)
+        default_cache = elasticsearch_manager.cache_manager
+        elasticsearch_manager.cache_manager = fake_cache
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                workspace = EmbeddingWorkspace(Path(tmp_dir))
+                workspace.load_from_elasticsearch(INDEX_NAME, doc_ids)
+                workspace.load_from_elasticsearch(INDEX_NAME, doc_ids)
+                if fake_cache.loads != 1:
+                    print(f"❌ Índice inalterado recarregado ({fake_cache.loads} cargas)")
+                    return False
+
+                # Notebook 2 regenera os embeddings: novo _seq_no no índice
+                fake_cache.matrix = matrix * 2
+                fake_cache.max_seq_no += len(matrix)
+                reloaded = workspace.load_from_elasticsearch(INDEX_NAME, doc_ids)
+                if fake_cache.loads != 2 or not np.array_equal(reloaded, matrix * 2):
+                    print("❌ Cópia antiga anexada após mudança no índice")
+                    return False
+                del reloaded
+        finally:
+            elasticsearch_manager.cache_manager = default_cache
+
+        print("✅ Cópia reaproveitada com índice inalterado e recarregada após mudança")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_fallback_when_out_of_space() -> bool:
+    """
+    Testa se a falta de espaço no workspace vira OSError e cai para a carga
+    em memória, sem gravar linhas num memmap sem espaço (SIGBUS).
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🛟 Testando workspace sem espaço...")
+
+    try:
+        import errno
+        import os
+        import shutil
+        from types import SimpleNamespace
+
+        import elasticsearch_manager
+        from embedding_workspace import EmbeddingWorkspace, load_workspace_embeddings
+
+        def no_space(*args, **kwargs):
+            raise OSError(errno.ENOSPC, "No space left on device")
+
+        matrix, doc_ids = _sample_matrix()
+        fake_cache = FakeEmbeddingsCache(matrix)
+        default_cache = elasticsearch_manager.cache_manager
+        default_fallocate = getattr(os, "posix_fallocate", None)
+        default_disk_usage = shutil.disk_usage
+        elasticsearch_manager.cache_manager = fake_cache
+        # tmpfs cheio: posix_fallocate (Linux) ou disk_usage (demais) sem espaço
+        if default_fallocate is not None:
+            os.posix_fallocate = no_space
+        shutil.disk_usage = lambda path: SimpleNamespace(total=0, used=0, free=0)
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                workspace = EmbeddingWorkspace(Path(tmp_dir))
+                try:
+                    workspace.load_from_elasticsearch(INDEX_NAME, doc_ids)
+                    print("❌ Falta de espaço deveria levantar OSError")
+                    return False
+                except OSError:
+                    pass
+                if fake_cache.loads != 0:
+                    print("❌ Linhas gravadas no memmap sem espaço reservado")
+                    return False
+
+                embeddings = load_workspace_embeddings(
+                    doc_ids, ["teste"], workspace, verbose=False
+                )
+                leftovers = [path.name for path in Path(tmp_dir).glob("*.npy")]
+        finally:
+            elasticsearch_manager.cache_manager = default_cache
+            if default_fallocate is not None:
+                os.posix_fallocate = default_fallocate
+            shutil.disk_usage = default_disk_usage
+
+        loaded = embeddings.get("teste")
+        if loaded is None or isinstance(loaded, np.memmap) or not np.array_equal(loaded, matrix):
+            print("❌ Workspace sem espaço deveria carregar a matriz em memória")
+            return False
+        if leftovers:
+            print(f"❌ Arquivos temporários deixados no workspace: {leftovers}")
+            return False
+
+        print(f"✅ Workspace sem espaço: OSError e matriz {loaded.shape} carregada em memória")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DO WORKSPACE DE EMBEDDINGS")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Publicação e anexação", test_publish_and_attach),
+        ("Outro processo", test_attach_from_other_process),
+        ("Mudança no índice", test_reload_after_index_change),
+        ("Workspace sem espaço", test_fallback_when_out_of_space),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Teste do Pool Multiprocesso de Encoding
+Usa um encoder de teste (sem PyTorch) para verificar a ordem das linhas
+montadas em memória compartilhada, a liberação do segmento (inclusive com
+erro num worker) e o throughput por número de workers
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+N_TEXTS = 1000
+N_DIMS = 8
+SHARD_SIZE = 64
+SECONDS_PER_TEXT = 0.0005
+SHM_DIR = Path("/dev/shm")
+
+
+class _StubModel:
+    def get_sentence_embedding_dimension(self) -> int:
+        return N_DIMS
+
+
+class StubEncoder:
+    """Vetor = número do texto repetido; 'falha' levanta erro no worker"""
+
+    def __init__(self, model_name: str, batch_size: Optional[int]):
+        self.model = _StubModel()
+
+    def encode(self, texts: Sequence[str], out: np.ndarray) -> np.ndarray:
+        if "falha" in texts:
+            raise RuntimeError("erro simulado no worker")
+        time.sleep(SECONDS_PER_TEXT * len(texts))
+        out[:] = np.array([float(text.split()[-1]) for text in texts])[:, None]
+        return out
+
+
+def _loaded_modules() -> List[str]:
+    return sorted(sys.modules)
+
+
+def _shm_segments() -> set:
+    return set(SHM_DIR.iterdir()) if SHM_DIR.is_dir() else set()
+
+
+def _texts(n: int = N_TEXTS) -> List[str]:
+    return [f"texto {i}" for i in range(n)]
+
+
+def test_shared_memory_order() -> bool:
+    """
+    Testa a ordem das linhas, a liberação do segmento e os imports dos workers.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("🧩 Testando ordem e memória compartilhada do pool...")
+
+    try:
+        from encoding_pool import EncodingPool
+
+        segments_before = _shm_segments()
+        with EncodingPool("stub", n_workers=2, shard_size=SHARD_SIZE,
+                          encoder_factory=StubEncoder) as pool:
+            embeddings = pool.encode(_texts())
+            empty = pool.encode([])
+            worker_modules = pool._executor.submit(_loaded_modules).result()
+
+            failed = False
+            try:
+                pool.encode(_texts(SHARD_SIZE * 2) + ["falha"])
+            except RuntimeError:
+                failed = True
+
+        expected = np.repeat(np.arange(N_TEXTS, dtype=np.float32)[:, None], N_DIMS, axis=1)
+        if embeddings.dtype != np.float32 or not np.array_equal(embeddings, expected):
+            print("❌ Linhas fora da ordem original dos textos")
+            return False
+        if empty.shape != (0, N_DIMS):
+            print(f"❌ Lista vazia devolveu {empty.shape}")
+            return False
+        if not failed:
+            print("❌ Erro no worker não propagado")
+            return False
+        leaked = _shm_segments() - segments_before
+        if leaked:
+            print(f"❌ Segmentos de memória compartilhada não liberados: {leaked}")
+            return False
+        if "embedding_server" in worker_modules:
+            print("❌ Worker importou o servidor de embeddings")
+            return False
+
+        print(f"✅ {N_TEXTS} linhas em ordem, {-(-N_TEXTS // SHARD_SIZE)} shards, "
+              f"segmento liberado (também após erro)")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_scaling_throughput() -> bool:
+    """
+    Mede o throughput com 1 e 2 workers (encoder com custo fixo por texto).
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n⏱️  Testando throughput por número de workers...")
+
+    try:
+        from encoding_pool import scaling_sweep
+
+        results = scaling_sweep("stub", _texts(), [1, 2], encoder_factory=StubEncoder)
+        for n_workers, docs_per_second in results:
+            print(f"   {n_workers} worker(s): {docs_per_second:,.0f} docs/s")
+
+        throughput = dict(results)
+        if throughput[2] <= throughput[1]:
+            print("❌ 2 workers não aumentaram o throughput")
+            return False
+
+        print(f"✅ Speedup com 2 workers: {throughput[2] / throughput[1]:.2f}x")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DO POOL DE ENCODING")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Ordem e memória", test_shared_memory_order),
+        ("Throughput", test_scaling_throughput),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Teste do TF-IDF em Streaming com Feature Hashing
+Compara com o TfidfVectorizer, verifica o IDF incremental (partial_fit,
+save/load) e a atualização a partir do Elasticsearch só com documentos novos
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+TEXTS = [
+    "the cat sat on the mat",
+    "the dog chased the cat around the garden",
+    "stock markets fell sharply on monday",
+    "investors worried about rising interest rates",
+    "the garden was full of flowers and bees",
+    "a new vaccine shows promising results in trials",
+    "the team won the championship after extra time",
+    "rates on government bonds rose for a third day",
+    "bees and birds visit the flowers every morning",
+    "the striker scored twice in the second half",
+]
+
+
+def _chunks(texts: List[str], size: int):
+    return [
+        ([f"doc_{i:04d}" for i in range(start, min(start + size, len(texts)))],
+         texts[start:start + size])
+        for start in range(0, len(texts), size)
+    ]
+
+
+class FakeDocumentsIndex:
+    """Cliente Elasticsearch mínimo: agregação max, query range e scroll"""
+
+    def __init__(self):
+        self.documents: List[dict] = []
+        self.scrolls = {}
+        self.scanned = 0
+
+    def add(self, texts: List[str], created_at: float) -> None:
+        start = len(self.documents)
+        self.documents.extend(
+            {"doc_id": f"doc_{start + i:04d}", "text": text, "created_at": created_at}
+            for i, text in enumerate(texts)
+        )
+
+    def _matches(self, document: dict, query: dict) -> bool:
+        if "range" not in query:
+            return True
+        bounds = query["range"]["created_at"]
+        value = document["created_at"]
+        return value <= bounds["lte"] and ("gt" not in bounds or value > bounds["gt"])
+
+    def search(self, index, body, scroll=None, size=None):
+        if "aggs" in body:
+            values = [document["created_at"] for document in self.documents]
+            return {"aggregations": {"max_created_at": {"value": max(values, default=None)}}}
+        hits = [
+            {"_source": {field: document[field] for field in body["_source"]}}
+            for document in self.documents if self._matches(document, body["query"])
+        ]
+        self.scanned += len(hits)
+        scroll_id = str(len(self.scrolls))
+        self.scrolls[scroll_id] = [hits[i:i + size] for i in range(size, len(hits), size)]
+        return {"_scroll_id": scroll_id, "hits": {"hits": hits[:size]}}
+
+    def scroll(self, scroll_id, scroll):
+        pages = self.scrolls[scroll_id]
+        return {"_scroll_id": scroll_id, "hits": {"hits": pages.pop(0) if pages else []}}
+
+    def clear_scroll(self, scroll_id):
+        self.scrolls.pop(scroll_id, None)
+
+
+def test_matches_tfidf_vectorizer() -> bool:
+    """
+    Testa se os vetores hasheados têm a mesma matriz de Gram do TfidfVectorizer.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("🔢 Testando equivalência com o TfidfVectorizer...")
+
+    try:
+        import scipy.sparse as sp
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from hashing_tfidf import StreamingHashingTfidf
+
+        expected = TfidfVectorizer(ngram_range=(1, 2)).fit_transform(TEXTS)
+        expected_gram = (expected @ expected.T).toarray()
+
+        for n_jobs in (1, 2):
+            model = StreamingHashingTfidf(n_jobs=n_jobs)
+            model.fit_stream(_chunks(TEXTS, 3), verbose=False)
+            vectors = sp.vstack([v for _, v in model.transform_stream(_chunks(TEXTS, 3))])
+            gram = (vectors @ vectors.T).toarray()
+            if not np.allclose(gram, expected_gram, atol=1e-6):
+                print(f"❌ Gram diferente com n_jobs={n_jobs} "
+                      f"(máx. {np.abs(gram - expected_gram).max():.2e})")
+                return False
+
+        print(f"✅ Gram {expected_gram.shape} idêntica com 1 e 2 processos")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_incremental_idf() -> bool:
+    """
+    Testa se partial_fit em partes e save/load reproduzem o IDF do corpus inteiro.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n➕ Testando IDF incremental...")
+
+    try:
+        from hashing_tfidf import StreamingHashingTfidf
+
+        full = StreamingHashingTfidf(n_jobs=1).partial_fit(TEXTS)
+        incremental = StreamingHashingTfidf(n_jobs=1).partial_fit(TEXTS[:6])
+        incremental.seen_until = 1000.0
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = incremental.save(Path(tmp_dir) / "hashing_tfidf.npz")
+            restored = StreamingHashingTfidf.load(path, n_jobs=1)
+        restored.partial_fit(TEXTS[6:])
+
+        if restored.seen_until != 1000.0 or restored.ngram_range != (1, 2):
+            print(f"❌ Estado restaurado: seen_until={restored.seen_until}, "
+                  f"ngram_range={restored.ngram_range}")
+            return False
+        if restored.n_documents != len(TEXTS) or not np.array_equal(restored.idf_, full.idf_):
+            print("❌ IDF incremental diferente do ajuste completo")
+            return False
+
+        print(f"✅ IDF de {restored.n_documents} documentos igual ao ajuste completo")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_stream_reads_only_new_documents() -> bool:
+    """
+    Testa se um estado restaurado só lê os documentos novos para o IDF.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n📥 Testando atualização só com documentos novos...")
+
+    try:
+        from hashing_tfidf import StreamingHashingTfidf, stream_from_elasticsearch
+
+        index = FakeDocumentsIndex()
+        index.add(TEXTS[:6], created_at=1000.0)
+        model = StreamingHashingTfidf(n_jobs=1)
+        first = list(stream_from_elasticsearch(model, index, batch_size=4))
+        if sum(len(ids) for ids, _ in first) != 6 or model.seen_until != 1000.0:
+            print(f"❌ Primeira passada: seen_until={model.seen_until}")
+            return False
+
+        index.add(TEXTS[6:], created_at=2000.0)
+        index.scanned = 0
+        second = list(stream_from_elasticsearch(model, index, batch_size=4))
+        # IDF: só os 4 novos; vetores: o índice inteiro
+        if index.scanned != (len(TEXTS) - 6) + len(TEXTS):
+            print(f"❌ {index.scanned} documentos lidos (esperado {len(TEXTS) - 6 + len(TEXTS)})")
+            return False
+
+        reference = StreamingHashingTfidf(n_jobs=1).partial_fit(TEXTS)
+        if model.n_documents != len(TEXTS) or not np.array_equal(model.idf_, reference.idf_):
+            print("❌ IDF atualizado difere do ajuste completo")
+            return False
+        if sum(len(ids) for ids, _ in second) != len(TEXTS) or model.seen_until != 2000.0:
+            print("❌ Segunda passada não emitiu o índice inteiro")
+            return False
+
+        print(f"✅ IDF acrescido de {len(TEXTS) - 6} documentos novos sem reler o índice")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DO TF-IDF COM FEATURE HASHING")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("TfidfVectorizer", test_matches_tfidf_vectorizer),
+        ("IDF incremental", test_incremental_idf),
+        ("Documentos novos", test_stream_reads_only_new_documents),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Teste da Concordância de Vizinhança entre Espaços de Embeddings
+Compara Jaccard@k, pares amostrados, cossenos e Spearman com o cálculo por
+força bruta em matrizes pequenas e verifica o cache (com e sem rótulos)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+N_DOCS = 300
+K = 8
+N_PAIRS = 5000
+
+
+def _sample_spaces():
+    """Dois espaços correlacionados (b = projeção ruidosa de a) e categorias"""
+    rng = np.random.default_rng(0)
+    space_a = rng.normal(size=(N_DOCS, 24)).astype(np.float32)
+    projection = rng.normal(size=(24, 16)).astype(np.float32)
+    space_b = space_a @ projection + 0.5 * rng.normal(size=(N_DOCS, 16)).astype(np.float32)
+    labels = np.array(["esporte", "política", "ciência"])[rng.integers(0, 3, size=N_DOCS)]
+    return space_a, space_b, labels
+
+
+def _brute_force_neighbours(matrix: np.ndarray, k: int) -> np.ndarray:
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    similarities = cosine_similarity(matrix)
+    np.fill_diagonal(similarities, -np.inf)
+    return np.argsort(-similarities, axis=1)[:, :k]
+
+
+def _brute_force_jaccard(neighbours_a: np.ndarray, neighbours_b: np.ndarray) -> np.ndarray:
+    return np.array([
+        len(set(row_a) & set(row_b)) / len(set(row_a) | set(row_b))
+        for row_a, row_b in zip(neighbours_a, neighbours_b)
+    ])
+
+
+def test_jaccard_and_pairs() -> bool:
+    """
+    Testa jaccard_at_k, sample_pairs e pair_cosines (denso e esparso).
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("🔢 Testando Jaccard@k, pares e cossenos...")
+
+    try:
+        import scipy.sparse as sp
+        from neighbourhood_agreement import jaccard_at_k, pair_cosines, sample_pairs
+
+        rng = np.random.default_rng(1)
+        # k diferentes nos dois lados e sobreposições de 0 a k
+        neighbours_a = np.array([rng.choice(30, size=6, replace=False) for _ in range(200)])
+        neighbours_b = np.array([rng.choice(30, size=9, replace=False) for _ in range(200)])
+        jaccard = jaccard_at_k(neighbours_a, neighbours_b)
+        if not np.allclose(jaccard, _brute_force_jaccard(neighbours_a, neighbours_b)):
+            print("❌ Jaccard@k diferente da força bruta")
+            return False
+
+        left, right = sample_pairs(N_DOCS, N_PAIRS, seed=3)
+        if np.any(left == right) or left.max() >= N_DOCS or right.max() >= N_DOCS:
+            print("❌ Pares inválidos (i == j ou fora do intervalo)")
+            return False
+        again = sample_pairs(N_DOCS, N_PAIRS, seed=3)
+        if not (np.array_equal(left, again[0]) and np.array_equal(right, again[1])):
+            print("❌ Pares não determinísticos para a mesma semente")
+            return False
+
+        matrix, _, _ = _sample_spaces()
+        matrix[0] = 0  # Linha nula: cosseno 0
+        left[:10] = 0
+        expected = np.array([
+            0.0 if i == 0 or j == 0
+            else matrix[i] @ matrix[j] / (np.linalg.norm(matrix[i]) * np.linalg.norm(matrix[j]))
+            for i, j in zip(left, right)
+        ])
+        for name, candidate in (("denso", matrix), ("esparso", sp.csr_matrix(matrix))):
+            cosines = pair_cosines(candidate, left, right)
+            if not np.allclose(cosines, expected, atol=1e-5):
+                print(f"❌ Cossenos {name} diferentes da força bruta")
+                return False
+
+        print(f"✅ Jaccard de {len(jaccard)} linhas e {N_PAIRS} cossenos iguais à força bruta")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_agreement_matches_brute_force() -> bool:
+    """
+    Testa neighbourhood_agreement (sem cache) contra o cálculo completo.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🤝 Testando concordância contra força bruta...")
+
+    try:
+        from scipy.stats import spearmanr
+        from neighbourhood_agreement import neighbourhood_agreement, sample_pairs
+
+        space_a, space_b, labels = _sample_spaces()
+        result = neighbourhood_agreement(
+            space_a, space_b, "a", "b", labels=labels, k=K, n_pairs=N_PAIRS,
+            use_cache=False, memory_budget_mb=0.05,
+        )
+
+        neighbours_a = _brute_force_neighbours(space_a, K)
+        neighbours_b = _brute_force_neighbours(space_b, K)
+        if not np.allclose(result.jaccard, _brute_force_jaccard(neighbours_a, neighbours_b)):
+            print("❌ Jaccard@k diferente da força bruta")
+            return False
+
+        left, right = sample_pairs(N_DOCS, N_PAIRS)
+
+        def cosines(matrix):
+            normalized = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+            return np.einsum("ij,ij->i", normalized[left], normalized[right])
+
+        rho = spearmanr(cosines(space_a), cosines(space_b))[0]
+        if not np.isclose(result.spearman, rho, atol=1e-4):
+            print(f"❌ Spearman {result.spearman:.4f} != {rho:.4f}")
+            return False
+
+        purity_a = (labels[neighbours_a] == labels[:, None]).mean(axis=1)
+        expected_purity = {
+            category: purity_a[labels == category].mean() for category in np.unique(labels)
+        }
+        per_category = result.per_category
+        if not all(
+            np.isclose(per_category.loc[category, "purity_a"], value)
+            for category, value in expected_purity.items()
+        ) or per_category["n_docs"].sum() != N_DOCS:
+            print("❌ Pureza por categoria diferente da força bruta")
+            return False
+
+        print(f"✅ Jaccard@{K} {result.mean_jaccard:.3f}, Spearman {result.spearman:+.3f} "
+              "e pureza iguais à força bruta")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_cache_round_trip() -> bool:
+    """
+    Testa o cache: top-k reaproveitado, resultado idêntico e chaves separadas
+    com e sem rótulos.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n💾 Testando cache da concordância...")
+
+    try:
+        import analysis_cache
+        import neighbourhood_agreement as module
+
+        space_a, space_b, labels = _sample_spaces()
+        searches = []
+        default_search = module.top_k_similar
+
+        def counting_search(matrix, **kwargs):
+            searches.append(matrix.shape)
+            return default_search(matrix, **kwargs)
+
+        default_dir = analysis_cache.ANALYSIS_CACHE_DIR
+        module.top_k_similar = counting_search
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            analysis_cache.ANALYSIS_CACHE_DIR = Path(tmp_dir)
+            try:
+                computed = module.neighbourhood_agreement(space_a, space_b, k=K, n_pairs=N_PAIRS)
+                reloaded = module.neighbourhood_agreement(space_a, space_b, k=K, n_pairs=N_PAIRS)
+                # Com rótulos: outra chave (precisa das purezas), mas top-k do cache
+                labelled = module.neighbourhood_agreement(
+                    space_a, space_b, labels=labels, k=K, n_pairs=N_PAIRS
+                )
+                relabelled = module.neighbourhood_agreement(
+                    space_a, space_b, labels=labels[::-1], k=K, n_pairs=N_PAIRS
+                )
+                n_entries = len(list((Path(tmp_dir) / "neighbourhood_agreement").glob("*.npz")))
+            finally:
+                analysis_cache.ANALYSIS_CACHE_DIR = default_dir
+                module.top_k_similar = default_search
+
+        if len(searches) != 2:
+            print(f"❌ {len(searches)} buscas top-k (esperado 2, uma por espaço)")
+            return False
+        if not np.array_equal(computed.jaccard, reloaded.jaccard) or \
+                computed.spearman != reloaded.spearman:
+            print("❌ Resultado do cache diferente do calculado")
+            return False
+        if computed.per_category is not None or labelled.per_category is None:
+            print("❌ Análise por categoria deveria existir só com rótulos")
+            return False
+        if n_entries != 3 or labelled.per_category.equals(relabelled.per_category):
+            print(f"❌ {n_entries} entradas no cache (esperado 3: sem rótulos e dois rótulos)")
+            return False
+
+        print(f"✅ {n_entries} entradas no cache, top-k calculado uma vez por espaço")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DA CONCORDÂNCIA DE VIZINHANÇA")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Jaccard e pares", test_jaccard_and_pairs),
+        ("Força bruta", test_agreement_matches_brute_force),
+        ("Cache", test_cache_round_trip),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Teste do Cliente Assíncrono de Embeddings OpenAI
+Valida ordem dos vetores, Retry-After, registro de falhas e fila durável
+contra o servidor mock
+"""
+
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+
+# Constantes
+TEXTS = [f"documento de teste número {i} " * (i % 7 + 1) for i in range(40)]
+BATCHES = [list(range(i, min(i + 5, len(TEXTS)))) for i in range(0, len(TEXTS), 5)]
+
+
+def test_embeddings_in_order() -> bool:
+    """
+    Testa se cada linha recebe o vetor do seu próprio texto.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("🔄 Testando ordem dos embeddings com requisições concorrentes...")
+
+    try:
+        from mock_openai_server import deterministic_embedding, start_mock_server
+        from openai_async_client import AsyncEmbeddingClient
+
+        server, _ = start_mock_server(latency_ms=20)
+        try:
+            embedder = AsyncEmbeddingClient(
+                api_key="mock", base_url=server.base_url, max_concurrency=4
+            )
+            result = embedder.embed_batches_sync(TEXTS, BATCHES)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        expected = np.stack([deterministic_embedding(text, 1536) for text in TEXTS])
+        if result.failed_batches:
+            print(f"❌ Batches com falha: {result.failed_batches}")
+            return False
+        if not np.allclose(result.embeddings, expected, atol=1e-6):
+            print("❌ Embeddings fora de ordem")
+            return False
+
+        print(f"✅ {len(TEXTS)} embeddings na ordem correta ({result.stats['requests']} requisições)")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_retry_after_honoured() -> bool:
+    """
+    Testa se respostas 429 com Retry-After são respeitadas até concluir.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n⏳ Testando 429 + Retry-After...")
+
+    try:
+        from mock_openai_server import start_mock_server
+        from openai_async_client import AsyncEmbeddingClient
+
+        # Servidor aceita 3 requisições por janela de 0.5s; cliente não se limita
+        server, _ = start_mock_server(requests_per_minute=3, window_seconds=0.5, latency_ms=5)
+        try:
+            embedder = AsyncEmbeddingClient(
+                api_key="mock", base_url=server.base_url, max_concurrency=8, max_retries=20
+            )
+            result = embedder.embed_batches_sync(TEXTS, BATCHES)
+            rate_limited = server.metrics["rate_limited"]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        if result.failed_batches or np.isnan(result.embeddings).any():
+            print(f"❌ Batches com falha: {result.failed_batches}")
+            return False
+        if rate_limited == 0 or result.stats["rate_limited"] == 0:
+            print("❌ Servidor não devolveu 429 (teste inconclusivo)")
+            return False
+
+        print(f"✅ Todos os batches concluídos após {result.stats['rate_limited']} respostas 429")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_failed_batches_reported() -> bool:
+    """
+    Testa se batches que esgotam os retries são reportados (linhas NaN, sem zeros).
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n❌ Testando registro de batches com falha...")
+
+    try:
+        import openai_async_client
+        from mock_openai_server import start_mock_server
+        from openai_async_client import AsyncEmbeddingClient
+
+        server, _ = start_mock_server(error_rate=1.0, latency_ms=1)
+        original_backoff = openai_async_client.BACKOFF_BASE_SECONDS
+        openai_async_client.BACKOFF_BASE_SECONDS = 0.01
+        try:
+            embedder = AsyncEmbeddingClient(
+                api_key="mock", base_url=server.base_url, max_retries=2
+            )
+            result = embedder.embed_batches_sync(TEXTS[:10], BATCHES[:2])
+        finally:
+            openai_async_client.BACKOFF_BASE_SECONDS = original_backoff
+            server.shutdown()
+            server.server_close()
+
+        if result.failed_batches != [0, 1] or len(result.failed_indices) != 10:
+            print(f"❌ Falhas não reportadas corretamente: {result.failed_batches}")
+            return False
+        if result.stats["retries"] != 4:
+            print(f"❌ Número de retries inesperado: {result.stats['retries']}")
+            return False
+
+        print("✅ Falhas reportadas após esgotar os retries")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_failed_queue_roundtrip() -> bool:
+    """
+    Testa a fila durável: falhas são gravadas em disco e re-tentadas primeiro
+    na execução seguinte, que esvazia a fila.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🔁 Testando fila durável de batches com falha...")
+
+    try:
+        import tempfile
+
+        from mock_openai_server import start_mock_server
+        from openai_async_client import AsyncEmbeddingClient
+        from openai_generation import FailedBatchQueue, generate_openai_embeddings
+
+        texts = TEXTS[:12]
+        doc_ids = [f"doc_{i:03d}" for i in range(len(texts))]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            queue_path = Path(tmp_dir) / "failed.jsonl"
+
+            # 1ª execução: servidor sempre falha
+            server, _ = start_mock_server(error_rate=1.0, latency_ms=1)
+            try:
+                embedder = AsyncEmbeddingClient(
+                    api_key="mock", base_url=server.base_url, max_retries=0
+                )
+                first = generate_openai_embeddings(
+                    texts, doc_ids, embedder, use_cache=False, retry_rounds=0,
+                    failed_queue=FailedBatchQueue(queue_path),
+                )
+            finally:
+                server.shutdown()
+                server.server_close()
+
+            persisted = FailedBatchQueue(queue_path)
+            if sorted(persisted.doc_ids()) != doc_ids or first.generated != 0:
+                print(f"❌ Fila não registrou as falhas: {persisted.doc_ids()}")
+                return False
+            if not np.isnan(first.embeddings if first.embeddings is not None else np.nan).all():
+                print("❌ Linhas com falha deveriam ficar NaN (nunca zero)")
+                return False
+
+            # 2ª execução: servidor saudável, fila é consumida
+            server, _ = start_mock_server(latency_ms=1)
+            try:
+                embedder = AsyncEmbeddingClient(api_key="mock", base_url=server.base_url)
+                second = generate_openai_embeddings(
+                    texts, doc_ids, embedder, use_cache=False, retry_rounds=0,
+                    failed_queue=FailedBatchQueue(queue_path),
+                )
+            finally:
+                server.shutdown()
+                server.server_close()
+
+            if not second.complete or queue_path.exists():
+                print(f"❌ Fila não foi esvaziada: {second.failed_doc_ids}")
+                return False
+            if np.isnan(second.embeddings).any():
+                print("❌ Embeddings incompletos após a segunda execução")
+                return False
+
+        print("✅ Falhas persistidas e re-tentadas na execução seguinte")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DO CLIENTE ASSÍNCRONO OPENAI")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Ordem dos embeddings", test_embeddings_in_order),
+        ("Retry-After", test_retry_after_honoured),
+        ("Batches com falha", test_failed_batches_reported),
+        ("Fila durável", test_failed_queue_roundtrip),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
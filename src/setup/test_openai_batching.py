@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Teste do Bin Packing de Requisições OpenAI
+Valida limites de tokens/inputs e a redução de requisições do First-Fit Decreasing
+"""
+
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+MAX_TOKENS = 1000
+MAX_INPUTS = 16
+
+
+def _skewed_token_counts(n_texts: int = 2000) -> List[int]:
+    """Distribuição de cauda longa, como no 20 Newsgroups"""
+    rng = np.random.default_rng(7)
+    return np.clip(rng.lognormal(mean=4.5, sigma=1.1, size=n_texts), 1, MAX_TOKENS).astype(int).tolist()
+
+
+def _sequential_batches(token_counts: List[int]) -> List[List[int]]:
+    """Agrupamento sequencial (regra do create_dynamic_batches, em tokens)"""
+    batches, current, current_tokens = [], [], 0
+    for idx, n_tokens in enumerate(token_counts):
+        if current and (current_tokens + n_tokens > MAX_TOKENS or len(current) >= MAX_INPUTS):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(idx)
+        current_tokens += n_tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def test_limits_respected() -> bool:
+    """
+    Testa se todo texto aparece uma vez e nenhum limite é excedido.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("🔄 Testando limites de tokens e inputs...")
+
+    try:
+        from openai_batching import pack_batches
+
+        token_counts = _skewed_token_counts()
+        texts = [""] * len(token_counts)
+        plan = pack_batches(texts, MAX_TOKENS, MAX_INPUTS, token_counts=token_counts)
+
+        indices = sorted(i for batch in plan.batches for i in batch)
+        if indices != list(range(len(texts))):
+            print("❌ Textos ausentes ou duplicados nos batches")
+            return False
+        if max(plan.batch_tokens) > MAX_TOKENS:
+            print(f"❌ Batch com {max(plan.batch_tokens)} tokens (> {MAX_TOKENS})")
+            return False
+        if max(len(batch) for batch in plan.batches) > MAX_INPUTS:
+            print("❌ Batch com inputs demais")
+            return False
+
+        print(f"✅ {len(plan.batches)} batches dentro dos limites")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_fewer_requests_than_sequential() -> bool:
+    """
+    Testa se FFD usa menos requisições que o agrupamento sequencial.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n📉 Testando redução de requisições...")
+
+    try:
+        from openai_batching import pack_batches
+
+        token_counts = _skewed_token_counts()
+        plan = pack_batches([""] * len(token_counts), MAX_TOKENS, MAX_INPUTS, token_counts=token_counts)
+        sequential = _sequential_batches(token_counts)
+
+        if len(plan.batches) >= len(sequential):
+            print(f"❌ FFD: {len(plan.batches)} vs. sequencial: {len(sequential)}")
+            return False
+        if len(plan.batches) > np.ceil(plan.lower_bound * 11 / 9) + 1:
+            print(f"❌ FFD longe do mínimo teórico ({len(plan.batches)} vs. {plan.lower_bound})")
+            return False
+
+        print(f"✅ {len(sequential)} → {len(plan.batches)} requisições "
+              f"(mínimo {plan.lower_bound}, eficiência {plan.fill_efficiency * 100:.1f}%)")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_oversized_and_counting() -> bool:
+    """
+    Testa textos acima do limite por input e a contagem de tokens padrão.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n⚠️  Testando textos grandes e contagem automática...")
+
+    try:
+        from openai_batching import MAX_TOKENS_PER_INPUT, pack_batches
+
+        token_counts = [MAX_TOKENS_PER_INPUT + 10, 5, 5]
+        plan = pack_batches(["a", "b", "c"], 100, 4, token_counts=token_counts)
+        if plan.oversized != [0] or [0] not in plan.batches:
+            print(f"❌ Texto grande não isolado/reportado: {plan.batches}")
+            return False
+
+        counted = pack_batches(["texto curto", "outro texto um pouco maior que o primeiro"])
+        if len(counted.batches) != 1 or min(counted.text_tokens) < 1:
+            print(f"❌ Contagem automática inesperada: {counted.text_tokens}")
+            return False
+
+        print("✅ Texto grande isolado e contagem automática correta")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DO BIN PACKING DE REQUISIÇÕES OPENAI")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Limites respeitados", test_limits_respected),
+        ("Menos requisições", test_fewer_requests_than_sequential),
+        ("Textos grandes", test_oversized_and_counting),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Teste das Projeções PCA
+Verifica que o solver é escolhido pela densidade e pelo tamanho da matriz
+(e não por ela ser um memmap) e que memmap e array em memória dão a mesma
+projeção
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+N_DOCS = 2000
+N_DIMS = 256
+
+
+def _sample_matrices():
+    rng = np.random.default_rng(0)
+    dense = rng.normal(size=(N_DOCS, N_DIMS)).astype(np.float32)
+    # TF-IDF: ~1% de não-zeros
+    sparse_like = dense * (rng.random((N_DOCS, N_DIMS)) < 0.01)
+    return {"denso": dense, "tfidf": sparse_like.astype(np.float32)}
+
+
+def _as_memmap(matrix: np.ndarray, directory: str) -> np.memmap:
+    path = Path(directory) / "matriz.npy"
+    np.save(path, matrix)
+    return np.load(path, mmap_mode="r")
+
+
+def test_method_independent_of_memmap() -> bool:
+    """
+    Testa se memmaps usam o mesmo solver e a mesma projeção dos arrays.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("📐 Testando escolha do solver para memmaps...")
+
+    try:
+        from projection_service import fit_projection
+
+        expected = {"denso": "randomized", "tfidf": "arpack"}
+        for name, matrix in _sample_matrices().items():
+            in_memory = fit_projection(matrix)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                mapped = _as_memmap(matrix, tmp_dir)
+                from_memmap = fit_projection(mapped)
+                del mapped
+
+            if in_memory.method != expected[name] or from_memmap.method != expected[name]:
+                print(f"❌ {name}: solvers {in_memory.method}/{from_memmap.method} "
+                      f"(esperado {expected[name]})")
+                return False
+            if not np.allclose(in_memory.coords, from_memmap.coords, atol=1e-4):
+                print(f"❌ {name}: coordenadas do memmap diferentes")
+                return False
+            print(f"   {name:<6} → {from_memmap.method}")
+
+        print("✅ Memmap e array em memória usam o mesmo solver")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_incremental_above_limit() -> bool:
+    """
+    Testa se matrizes densas acima do limite usam IncrementalPCA.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🧱 Testando IncrementalPCA acima do limite de memória...")
+
+    try:
+        import projection_service
+        from projection_service import fit_projection
+
+        dense = _sample_matrices()["denso"]
+        default_limit = projection_service.PROJECTION_IN_MEMORY_MAX_MB
+        projection_service.PROJECTION_IN_MEMORY_MAX_MB = dense.nbytes / (1024 * 1024) / 2
+        try:
+            result = fit_projection(dense, chunk_size=500)
+        finally:
+            projection_service.PROJECTION_IN_MEMORY_MAX_MB = default_limit
+
+        if result.method != "incremental" or result.coords.shape != (N_DOCS, 2):
+            print(f"❌ Solver {result.method}, coordenadas {result.coords.shape}")
+            return False
+
+        print(f"✅ IncrementalPCA: variância explicada {result.total_variance * 100:.2f}%")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DAS PROJEÇÕES PCA")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Solver para memmaps", test_method_independent_of_memmap),
+        ("Limite de memória", test_incremental_above_limit),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
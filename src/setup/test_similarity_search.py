@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Teste da Similaridade de Cosseno em Blocos
+Compara o top-k calculado em tiles com a matriz completa do scikit-learn
+para entradas densas, memmap e esparsas
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+N_DOCS = 700
+K = 7
+# Orçamento minúsculo: força vários tiles de linhas e de colunas
+TINY_BUDGET_MB = 0.05
+
+
+def _reference_top_k(queries, corpus, k: int, exclude_self: bool) -> np.ndarray:
+    """Top-k de referência a partir da matriz completa (scores ordenados)"""
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    similarities = cosine_similarity(queries, corpus)
+    if exclude_self:
+        np.fill_diagonal(similarities, -np.inf)
+    return -np.sort(-similarities, axis=1)[:, :k]
+
+
+def _matches_reference(result, queries, corpus, exclude_self: bool) -> bool:
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    expected_scores = _reference_top_k(queries, corpus, result.k, exclude_self)
+    if not np.allclose(result.scores, expected_scores, atol=1e-5):
+        return False
+    # Os índices devolvidos precisam ter exatamente os scores informados
+    similarities = cosine_similarity(queries, corpus)
+    recomputed = np.take_along_axis(similarities, result.indices, axis=1)
+    if not np.allclose(recomputed, result.scores, atol=1e-5):
+        return False
+    if exclude_self:
+        return not np.any(result.indices == np.arange(len(result.indices))[:, None])
+    return True
+
+
+def test_dense_tiles() -> bool:
+    """
+    Testa entradas densas float64 (com linha nula) em vários tiles e threads.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("🧱 Testando tiles densos...")
+
+    try:
+        from similarity_search import top_k_similar
+
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(size=(N_DOCS, 48))
+        embeddings[5] = 0.0
+        original = embeddings.copy()
+
+        result = top_k_similar(embeddings, k=K, memory_budget_mb=TINY_BUDGET_MB, n_threads=4)
+        if not _matches_reference(result, embeddings, embeddings, exclude_self=True):
+            print("❌ Top-k difere da matriz completa")
+            return False
+        if not np.array_equal(embeddings, original):
+            print("❌ Entrada foi modificada")
+            return False
+
+        queries = rng.normal(size=(31, 48)).astype(np.float32)
+        result = top_k_similar(queries, embeddings, k=K, memory_budget_mb=TINY_BUDGET_MB)
+        if not _matches_reference(result, queries, embeddings, exclude_self=False):
+            print("❌ Top-k de consultas × corpus difere da referência")
+            return False
+
+        print(f"✅ {result.indices.shape} vizinhos idênticos à referência")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_memmap_and_sparse() -> bool:
+    """
+    Testa ``np.memmap`` (normalização por bloco) e matrizes esparsas (TF-IDF).
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n💾 Testando memmap e esparso...")
+
+    try:
+        import scipy.sparse as sp
+
+        from similarity_search import top_k_similar
+
+        rng = np.random.default_rng(1)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "embeddings.f32"
+            mapped = np.memmap(path, dtype=np.float32, mode="w+", shape=(N_DOCS, 32))
+            mapped[:] = rng.normal(size=(N_DOCS, 32))
+            mapped.flush()
+            mapped = np.memmap(path, dtype=np.float32, mode="r", shape=(N_DOCS, 32))
+
+            result = top_k_similar(mapped, k=K, memory_budget_mb=TINY_BUDGET_MB, n_threads=3)
+            dense = np.array(mapped)
+            del mapped
+        if not _matches_reference(result, dense, dense, exclude_self=True):
+            print("❌ Top-k do memmap difere da referência")
+            return False
+
+        # Corpus memmap maior que o orçamento: nunca copiado inteiro para a memória
+        import tracemalloc
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "corpus.f32"
+            corpus = np.memmap(path, dtype=np.float32, mode="w+", shape=(40 * N_DOCS, 64))
+            corpus[:] = rng.normal(size=corpus.shape)
+            corpus.flush()
+            corpus = np.memmap(path, dtype=np.float32, mode="r", shape=corpus.shape)
+            queries = rng.normal(size=(50, 64)).astype(np.float32)
+
+            tracemalloc.start()
+            result = top_k_similar(queries, corpus, k=K, memory_budget_mb=1, n_threads=1)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            corpus_bytes = corpus.nbytes
+            dense = np.array(corpus)
+            del corpus
+        if peak > corpus_bytes / 2:
+            print(f"❌ Pico de {peak / 2**20:.1f} MB para corpus de {corpus_bytes / 2**20:.1f} MB")
+            return False
+        if not _matches_reference(result, queries, dense, exclude_self=False):
+            print("❌ Top-k do corpus memmap difere da referência")
+            return False
+
+        tfidf = sp.random(N_DOCS, 400, density=0.02, format="csr", random_state=2)
+        result = top_k_similar(tfidf, k=K, memory_budget_mb=TINY_BUDGET_MB, n_threads=2)
+        if not _matches_reference(result, tfidf, tfidf, exclude_self=True):
+            print("❌ Top-k esparso difere da referência")
+            return False
+
+        print("✅ memmap e esparso idênticos à referência")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DA SIMILARIDADE EM BLOCOS")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Tiles densos", test_dense_tiles),
+        ("Memmap e esparso", test_memmap_and_sparse),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
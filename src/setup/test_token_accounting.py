@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Teste da Contagem de Tokens com Cache
+Valida truncamento por offsets, equivalência com encode/decode, reuso do cache
+e o atalho count_tokens usado pelo cliente OpenAI e pelo pack_batches
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+MAX_TOKENS = 12
+TEXTS = [
+    "texto curto",
+    "ação e reação com acentuação em português, bem mais longo que o limite",
+    "texto curto",
+    "",
+    "emoji 🚀 no meio de um texto que também passa do limite de tokens",
+]
+
+
+def _byte_encoding():
+    """Encoding tiktoken local (1 token por byte), sem download de vocabulário"""
+    import tiktoken
+
+    return tiktoken.Encoding(
+        name="bytes_test",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+
+
+def test_truncation_matches_encode_decode() -> bool:
+    """
+    Testa se o truncamento por offset equivale a encode → corte → decode.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("✂️  Testando truncamento por offsets...")
+
+    try:
+        from token_accounting import TokenAccountant
+
+        encoding = _byte_encoding()
+        accountant = TokenAccountant(
+            encoding=encoding, max_tokens=MAX_TOKENS, cache_dir=False, n_threads=2, batch_size=2
+        )
+        stats = accountant.analyze(TEXTS, verbose=False)
+
+        expected_counts = [len(encoding.encode_ordinary(text)) for text in TEXTS]
+        if stats.counts.tolist() != expected_counts:
+            print(f"❌ Contagens divergentes: {stats.counts.tolist()} vs. {expected_counts}")
+            return False
+
+        for text, truncated in zip(TEXTS, stats.truncate(TEXTS)):
+            tokens = encoding.encode_ordinary(text)[:MAX_TOKENS]
+            reference = encoding.decode_bytes(tokens).decode("utf-8", errors="ignore")
+            if truncated != reference or not text.startswith(truncated):
+                print(f"❌ Truncamento divergente: {truncated!r} vs. {reference!r}")
+                return False
+
+        print(f"✅ {int(stats.truncated_mask.sum())} textos truncados corretamente")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_cache_reused() -> bool:
+    """
+    Testa se uma segunda execução lê tudo do cache em disco.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n💾 Testando cache em disco...")
+
+    try:
+        from token_accounting import TokenAccountant
+
+        encoding = _byte_encoding()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            first = TokenAccountant(encoding=encoding, max_tokens=MAX_TOKENS, cache_dir=tmp_dir)
+            first_stats = first.analyze(TEXTS, verbose=False)
+
+            second = TokenAccountant(encoding=encoding, max_tokens=MAX_TOKENS, cache_dir=tmp_dir)
+            # Tokenizar de novo seria erro: o cache deve cobrir todos os textos
+            second._tokenize = None
+            second_stats = second.analyze(TEXTS, verbose=False)
+
+        if second_stats.cache_hits != len(TEXTS):
+            print(f"❌ Acertos de cache: {second_stats.cache_hits}/{len(TEXTS)}")
+            return False
+        if (second_stats.counts != first_stats.counts).any() or \
+                (second_stats.char_offsets != first_stats.char_offsets).any():
+            print("❌ Valores do cache diferentes dos calculados")
+            return False
+
+        print(f"✅ {len(TEXTS)} textos lidos do cache sem re-tokenizar")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_count_tokens_reuses_accountant() -> bool:
+    """
+    Testa se count_tokens conta via TokenAccountant e reaproveita seu cache.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n🔁 Testando count_tokens...")
+
+    try:
+        import token_accounting
+        from token_accounting import TokenAccountant, count_tokens
+
+        model = "modelo_teste"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            token_accounting._accountants[model] = TokenAccountant(
+                encoding=_byte_encoding(), cache_dir=tmp_dir
+            )
+            try:
+                counts = count_tokens(TEXTS, model)
+                # Segunda chamada: tudo do cache, sem tokenizar
+                token_accounting._accountants[model]._tokenize = None
+                again = count_tokens(TEXTS, model)
+            finally:
+                token_accounting._accountants.pop(model, None)
+
+        expected = [len(text.encode("utf-8")) for text in TEXTS]
+        if counts != expected or again != expected:
+            print(f"❌ Contagens {counts} (esperado {expected})")
+            return False
+
+        print(f"✅ {len(TEXTS)} textos contados e recontados pelo cache")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DA CONTAGEM DE TOKENS COM CACHE")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Truncamento", test_truncation_matches_encode_decode),
+        ("Cache em disco", test_cache_reused),
+        ("count_tokens", test_count_tokens_reuses_accountant),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Teste do Pooling Vetorizado de Word2Vec
+Valida que o pooling vetorizado reproduz o laço original do Notebook 2
+"""
+
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path para importar o módulo
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Constantes
+VECTOR_SIZE = 8
+TOLERANCE_ATOL = 1e-6
+
+
+def _build_keyed_vectors():
+    """Cria KeyedVectors pequeno e determinístico para os testes"""
+    from gensim.models import KeyedVectors
+
+    words = ["machine", "learning", "data", "science", "neural", "network"]
+    rng = np.random.default_rng(42)
+    keyed_vectors = KeyedVectors(vector_size=VECTOR_SIZE)
+    keyed_vectors.add_vectors(words, rng.normal(size=(len(words), VECTOR_SIZE)))
+    return keyed_vectors
+
+
+def _reference_embeddings(tokenized: List[List[str]], keyed_vectors) -> np.ndarray:
+    """Implementação original (laço por documento) usada como referência"""
+    embeddings = []
+    for tokens in tokenized:
+        valid_vectors = [keyed_vectors[w] for w in tokens if w in keyed_vectors]
+        if valid_vectors:
+            embeddings.append(np.mean(valid_vectors, axis=0))
+        else:
+            embeddings.append(np.zeros(VECTOR_SIZE))
+    return np.array(embeddings)
+
+
+def test_mean_pooling_matches_loop() -> bool:
+    """
+    Testa se a média vetorizada é igual à do laço original.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("🔄 Testando média vetorizada vs. laço original...")
+
+    try:
+        from word2vec_pooling import document_embeddings, tokenize_texts
+
+        keyed_vectors = _build_keyed_vectors()
+        texts = [
+            "Machine learning and data science",
+            "neural network neural network",
+            "texto sem nenhuma palavra conhecida",
+            "",
+            "DATA data Data science",
+        ]
+        tokenized = tokenize_texts(texts, n_jobs=1)
+
+        expected = _reference_embeddings(tokenized, keyed_vectors)
+        result = document_embeddings(tokenized, keyed_vectors)
+
+        if result.dtype != np.float32:
+            print(f"❌ dtype inesperado: {result.dtype}")
+            return False
+
+        if np.allclose(result, expected, atol=TOLERANCE_ATOL):
+            print("✅ Média vetorizada idêntica ao laço original")
+            return True
+
+        print("❌ Média vetorizada difere do laço original")
+        return False
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_tfidf_weighted_pooling() -> bool:
+    """
+    Testa a média ponderada por TF-IDF contra o cálculo manual.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n⚖️  Testando pooling ponderado por TF-IDF...")
+
+    try:
+        from word2vec_pooling import document_embeddings
+
+        keyed_vectors = _build_keyed_vectors()
+        tokenized = [["machine", "data", "data"], ["data", "science"], ["neural"]]
+        result = document_embeddings(tokenized, keyed_vectors, weighting="tfidf")
+
+        # Cálculo manual do primeiro documento
+        n_docs = len(tokenized)
+        idf_machine = np.log((1 + n_docs) / (1 + 1)) + 1
+        idf_data = np.log((1 + n_docs) / (1 + 2)) + 1
+        weighted_sum = (
+            idf_machine * keyed_vectors["machine"] + 2 * idf_data * keyed_vectors["data"]
+        )
+        expected = weighted_sum / (idf_machine + 2 * idf_data)
+
+        if np.allclose(result[0], expected, atol=1e-5):
+            print("✅ Pooling TF-IDF correto")
+            return True
+
+        print("❌ Pooling TF-IDF difere do cálculo manual")
+        return False
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def test_parallel_matches_serial() -> bool:
+    """
+    Testa se a versão multiprocessada produz o mesmo resultado da serial.
+
+    Returns:
+        bool: True se teste passou, False caso contrário
+    """
+    print("\n⚡ Testando tokenização/pooling em múltiplos processos...")
+
+    try:
+        import word2vec_pooling
+        from word2vec_pooling import document_embeddings_from_texts
+
+        keyed_vectors = _build_keyed_vectors()
+        rng = np.random.default_rng(0)
+        vocabulary = list(keyed_vectors.key_to_index) + ["desconhecida"]
+        texts = [
+            " ".join(rng.choice(vocabulary, size=rng.integers(0, 20)))
+            for _ in range(400)
+        ]
+
+        # Forçar paralelismo mesmo com corpus pequeno
+        original_min = word2vec_pooling.MIN_TEXTS_PER_JOB
+        word2vec_pooling.MIN_TEXTS_PER_JOB = 100
+        try:
+            parallel = document_embeddings_from_texts(texts, keyed_vectors, n_jobs=4)
+        finally:
+            word2vec_pooling.MIN_TEXTS_PER_JOB = original_min
+
+        serial = document_embeddings_from_texts(texts, keyed_vectors, n_jobs=1)
+
+        if np.array_equal(parallel, serial):
+            print("✅ Resultado paralelo idêntico ao serial")
+            return True
+
+        print("❌ Resultado paralelo difere do serial")
+        return False
+
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+        return False
+
+
+def main() -> int:
+    """
+    Função principal de teste.
+
+    Returns:
+        int: 0 se todos os testes passaram, 1 caso contrário
+    """
+    print("🧪 TESTE DO POOLING VETORIZADO DE WORD2VEC")
+    print("=" * 60)
+
+    tests: List[Tuple[str, callable]] = [
+        ("Média vs. laço original", test_mean_pooling_matches_loop),
+        ("Pooling TF-IDF", test_tfidf_weighted_pooling),
+        ("Paralelo vs. serial", test_parallel_matches_serial),
+    ]
+
+    results: List[Tuple[str, bool]] = [(name, func()) for name, func in tests]
+
+    print("\n" + "=" * 60)
+    print("📋 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, result in results:
+        status = "✅ PASSOU" if result else "❌ FALHOU"
+        print(f"{test_name:<25}: {status}")
+
+    passed = sum(result for _, result in results)
+    print(f"\nResultado: {passed}/{len(results)} testes passaram")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
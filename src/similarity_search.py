@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Similaridade de Cosseno em Blocos com Top-k
+===========================================
+
+``sklearn.metrics.pairwise.cosine_similarity`` materializa a matriz
+n × n inteira: com 18k documentos são 2.6 GB em float64 — por tipo de
+embedding. Para vizinhos mais próximos só precisamos dos k maiores valores
+de cada linha.
+
+Aqui a matriz é calculada em blocos (tiles):
+
+1. As linhas são normalizadas uma vez (norma L2), então cosseno = produto
+   interno. Para ``np.memmap`` a normalização é feita bloco a bloco (sem
+   copiar o arquivo para a memória).
+2. Cada bloco de linhas × bloco de colunas é um único matmul BLAS em
+   float32 (TF-IDF esparso: produto esparso, densificado só no bloco).
+3. De cada tile só sobrevivem os k maiores por linha (``argpartition``),
+   combinados com o top-k acumulado dos tiles anteriores.
+4. Blocos de linhas são processados por um pool de threads (o BLAS libera
+   o GIL).
+
+O tamanho dos tiles respeita um orçamento de memória
+(``SIMILARITY_MEMORY_BUDGET_MB``, padrão 256 MB, somando todas as threads).
+Com corpus em ``np.memmap`` o bloco de colunas normalizado (cópia float32)
+também entra no orçamento: o arquivo nunca é copiado inteiro para a memória.
+
+Exemplo:
+    >>> from similarity_search import top_k_similar
+    >>> result = top_k_similar(embeddings, k=10)          # vizinhos entre si
+    >>> result.indices[0], result.scores[0]               # vizinhos do doc 0
+    >>> result = top_k_similar(queries, corpus, k=5)      # consultas × corpus
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import scipy.sparse as sp
+
+SIMILARITY_MEMORY_BUDGET_MB = float(os.getenv("SIMILARITY_MEMORY_BUDGET_MB") or 256)
+
+# Bytes por elemento de tile: score float32 + índice int64 do argpartition
+_BYTES_PER_TILE_ELEMENT = 12
+
+Matrix = Union[np.ndarray, sp.spmatrix]
+
+
+@dataclass
+class TopKResult:
+    """Vizinhos mais próximos de cada linha (ordenados por similaridade decrescente)"""
+
+    indices: np.ndarray  # (n_queries, k) int64 — linhas do corpus
+    scores: np.ndarray   # (n_queries, k) float32 — similaridade de cosseno
+
+    @property
+    def k(self) -> int:
+        return self.indices.shape[1]
+
+
+class _NormalizedRows:
+    """Acesso a blocos de linhas com norma L2 unitária, em float32"""
+
+    def __init__(self, matrix: Matrix, block_size: int = 4096):
+        self.shape = matrix.shape
+        self.is_sparse = sp.issparse(matrix)
+
+        if self.is_sparse:
+            from sklearn.preprocessing import normalize
+
+            self.matrix = normalize(sp.csr_matrix(matrix, dtype=np.float32), norm="l2")
+            self.inverse_norms = None
+        elif isinstance(matrix, np.memmap):
+            # Normas calculadas em blocos; a normalização acontece em cada bloco lido
+            self.matrix = matrix
+            norms = np.empty(self.shape[0], dtype=np.float32)
+            for start in range(0, self.shape[0], block_size):
+                block = np.asarray(matrix[start:start + block_size], dtype=np.float32)
+                norms[start:start + block_size] = np.linalg.norm(block, axis=1)
+            self.inverse_norms = self._inverse(norms)
+        else:
+            matrix = np.array(matrix, dtype=np.float32)  # cópia: a entrada não é alterada
+            matrix *= self._inverse(np.linalg.norm(matrix, axis=1))[:, None]
+            self.matrix = matrix
+            self.inverse_norms = None
+
+    @staticmethod
+    def _inverse(norms: np.ndarray) -> np.ndarray:
+        # Linhas nulas ficam nulas (similaridade 0 com tudo)
+        with np.errstate(divide="ignore"):
+            return np.where(norms > 0, 1.0 / norms, 0.0).astype(np.float32)
+
+    def block(self, start: int, stop: int) -> Matrix:
+        rows = self.matrix[start:stop]
+        if self.inverse_norms is not None:
+            rows = np.asarray(rows, dtype=np.float32) * self.inverse_norms[start:stop, None]
+        return rows
+
+
+def _tile_similarities(rows: Matrix, columns: Matrix) -> np.ndarray:
+    product = rows @ columns.T
+    if sp.issparse(product):
+        return product.toarray()
+    return np.asarray(product, dtype=np.float32)
+
+
+def _merge_top_k(
+    best_scores: np.ndarray,
+    best_indices: np.ndarray,
+    scores: np.ndarray,
+    indices: np.ndarray,
+    k: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Mantém os k maiores entre o top-k acumulado e os candidatos do tile"""
+    scores = np.concatenate([best_scores, scores], axis=1)
+    indices = np.concatenate([best_indices, indices], axis=1)
+    if scores.shape[1] > k:
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, keep, axis=1)
+        indices = np.take_along_axis(indices, keep, axis=1)
+    return scores, indices
+
+
+def _tile_sizes(
+    n_queries: int,
+    n_corpus: int,
+    k: int,
+    n_threads: int,
+    memory_budget_mb: float,
+    column_bytes: int = 0,
+) -> Tuple[int, int]:
+    """
+    Blocos de linhas e de colunas que cabem no orçamento (por thread).
+
+    ``column_bytes``: memória de cada coluna do corpus copiada por tile
+    (memmap normalizado bloco a bloco); 0 quando o corpus já está em memória.
+    """
+    budget = memory_budget_mb * 2**20 / n_threads
+    max_columns = n_corpus
+    if column_bytes:
+        # Metade do orçamento para o bloco de colunas, metade para o tile
+        budget /= 2
+        max_columns = min(n_corpus, max(k + 1, int(budget / column_bytes)))
+    elements = max(1, int(budget / _BYTES_PER_TILE_ELEMENT))
+    # Pelo menos um bloco de linhas por thread
+    max_rows = max(1, -(-n_queries // n_threads))
+    if elements >= n_corpus and max_columns == n_corpus:
+        row_block = min(max_rows, elements // n_corpus)
+        return max(1, row_block), n_corpus
+    row_block = min(max_rows, 256)
+    column_block = max(k + 1, elements // row_block)
+    return row_block, min(column_block, max_columns)
+
+
+def top_k_similar(
+    queries: Matrix,
+    corpus: Optional[Matrix] = None,
+    k: int = 10,
+    exclude_self: Optional[bool] = None,
+    memory_budget_mb: Optional[float] = None,
+    n_threads: Optional[int] = None,
+) -> TopKResult:
+    """
+    Top-k vizinhos por similaridade de cosseno, sem materializar a matriz n × m.
+
+    Args:
+        queries: Matriz (n, d) — densa, ``np.memmap`` ou esparsa (TF-IDF)
+        corpus: Matriz (m, d) a buscar (padrão: as próprias ``queries``)
+        k: Número de vizinhos por linha
+        exclude_self: Ignora a própria linha (padrão: True quando ``corpus`` é None)
+        memory_budget_mb: Orçamento dos tiles somando todas as threads
+            (padrão: SIMILARITY_MEMORY_BUDGET_MB)
+        n_threads: Threads do pool (padrão: todos os núcleos)
+
+    Returns:
+        TopKResult com ``indices`` e ``scores`` (n, k), em ordem decrescente
+    """
+    self_search = corpus is None
+    if exclude_self is None:
+        exclude_self = self_search
+    if exclude_self and not self_search:
+        raise ValueError("exclude_self só se aplica quando corpus é None")
+    if queries.shape[1] != (queries if self_search else corpus).shape[1]:
+        raise ValueError(
+            f"Dimensões incompatíveis: {queries.shape[1]} vs {corpus.shape[1]}"
+        )
+
+    normalized_queries = _NormalizedRows(queries)
+    normalized_corpus = normalized_queries if self_search else _NormalizedRows(corpus)
+
+    n_queries, n_corpus = queries.shape[0], normalized_corpus.shape[0]
+    k = min(k, n_corpus - 1 if exclude_self else n_corpus)
+    if k <= 0 or n_queries == 0:
+        return TopKResult(
+            indices=np.empty((n_queries, 0), dtype=np.int64),
+            scores=np.empty((n_queries, 0), dtype=np.float32),
+        )
+
+    n_threads = n_threads or os.cpu_count() or 1
+    # Memmap: cada bloco de colunas é uma cópia float32 normalizada
+    lazy_corpus = normalized_corpus.inverse_norms is not None
+    row_block, column_block = _tile_sizes(
+        n_queries, n_corpus, k, n_threads, memory_budget_mb or SIMILARITY_MEMORY_BUDGET_MB,
+        column_bytes=4 * normalized_corpus.shape[1] if lazy_corpus else 0,
+    )
+    # Corpus em memória num único tile: o bloco (uma view) é obtido uma vez só
+    whole_corpus = (
+        normalized_corpus.block(0, n_corpus)
+        if column_block == n_corpus and not lazy_corpus else None
+    )
+
+    indices = np.empty((n_queries, k), dtype=np.int64)
+    scores = np.empty((n_queries, k), dtype=np.float32)
+
+    def process_rows(start: int) -> None:
+        stop = min(start + row_block, n_queries)
+        rows = normalized_queries.block(start, stop)
+        best_scores = np.empty((stop - start, 0), dtype=np.float32)
+        best_indices = np.empty((stop - start, 0), dtype=np.int64)
+
+        for column_start in range(0, n_corpus, column_block):
+            column_stop = min(column_start + column_block, n_corpus)
+            columns = (
+                whole_corpus if whole_corpus is not None
+                else normalized_corpus.block(column_start, column_stop)
+            )
+            tile = _tile_similarities(rows, columns)
+
+            if exclude_self:
+                # Diagonal global dentro deste tile
+                overlap = np.arange(max(start, column_start), min(stop, column_stop))
+                tile[overlap - start, overlap - column_start] = -np.inf
+
+            tile_indices = np.arange(column_start, column_stop, dtype=np.int64)
+            if tile.shape[1] > k:
+                keep = np.argpartition(-tile, k - 1, axis=1)[:, :k]
+                tile_scores = np.take_along_axis(tile, keep, axis=1)
+                tile_indices = tile_indices[keep]
+            else:
+                tile_scores = tile
+                tile_indices = np.broadcast_to(tile_indices, tile.shape)
+
+            best_scores, best_indices = _merge_top_k(
+                best_scores, best_indices, tile_scores, tile_indices, k
+            )
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        scores[start:stop] = np.take_along_axis(best_scores, order, axis=1)
+        indices[start:stop] = np.take_along_axis(best_indices, order, axis=1)
+
+    starts = range(0, n_queries, row_block)
+    if n_threads == 1 or len(starts) == 1:
+        for start in starts:
+            process_rows(start)
+    else:
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            list(executor.map(process_rows, starts))
+
+    return TopKResult(indices=indices, scores=scores)
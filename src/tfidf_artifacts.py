@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Persistência do TfidfVectorizer ajustado
+========================================
+
+Salva no Elasticsearch (índice ``model_artifacts``) tudo o que é necessário
+para reconstruir um ``TfidfVectorizer`` já ajustado, sem re-treinar:
+
+- vocabulário (termos na ordem das colunas)
+- pesos IDF
+- parâmetros (max_features, ngram_range, min_df, ...)
+- fingerprint do corpus usado no ajuste
+
+Numa execução "quente" do Notebook 2, o vectorizer é restaurado em
+milissegundos e é idêntico ao que gerou os embeddings em cache, podendo
+transformar textos novos sem refit.
+
+Exemplo:
+    >>> from elasticsearch_manager import generate_corpus_fingerprint
+    >>> fingerprint = generate_corpus_fingerprint(doc_ids, texts)
+    >>> save_tfidf_vectorizer(tfidf_vectorizer, fingerprint)
+    >>> vectorizer = load_tfidf_vectorizer(fingerprint)
+    >>> vectorizer.transform(["novo texto"])
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import io
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import elasticsearch_manager
+
+DEFAULT_ARTIFACT_NAME = "tfidf_vectorizer"
+ARTIFACT_TYPE = "tfidf_vectorizer"
+
+
+def serialize_tfidf_vectorizer(vectorizer: TfidfVectorizer) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Serializa um TfidfVectorizer ajustado (sem pickle).
+
+    Args:
+        vectorizer: TfidfVectorizer já ajustado
+
+    Returns:
+        Tuple[payload, params]: npz com vocabulário/IDF e parâmetros em JSON
+
+    Raises:
+        ValueError: Se o vectorizer usa callables (tokenizer, preprocessor, analyzer)
+    """
+    params = {}
+    for name, value in vectorizer.get_params().items():
+        if callable(value) and name != "dtype":
+            raise ValueError(
+                f"Parâmetro '{name}' é uma função e não pode ser persistido sem pickle"
+            )
+        if name == "dtype":
+            value = np.dtype(value).name
+        elif isinstance(value, tuple):
+            value = list(value)
+        elif isinstance(value, frozenset):
+            value = sorted(value)
+        params[name] = value
+
+    # Termos ordenados pelo índice da coluna
+    terms = np.empty(len(vectorizer.vocabulary_), dtype=object)
+    for term, column in vectorizer.vocabulary_.items():
+        terms[column] = term
+
+    buffer = io.BytesIO()
+    np.savez_compressed(
+        buffer,
+        terms=terms.astype(str),
+        idf=np.asarray(vectorizer.idf_, dtype=np.float64),
+    )
+    return buffer.getvalue(), params
+
+
+def deserialize_tfidf_vectorizer(payload: bytes, params: Dict[str, Any]) -> TfidfVectorizer:
+    """
+    Reconstrói um TfidfVectorizer ajustado a partir do payload serializado.
+
+    Args:
+        payload: Conteúdo gerado por ``serialize_tfidf_vectorizer``
+        params: Parâmetros do vectorizer
+
+    Returns:
+        TfidfVectorizer pronto para ``transform``
+    """
+    params = dict(params)
+    params["dtype"] = np.dtype(params.get("dtype", "float64")).type
+    params["ngram_range"] = tuple(params.get("ngram_range", (1, 1)))
+
+    with np.load(io.BytesIO(payload), allow_pickle=False) as data:
+        terms = data["terms"]
+        idf = data["idf"]
+
+    vectorizer = TfidfVectorizer(**params)
+    vectorizer.vocabulary_ = {str(term): column for column, term in enumerate(terms)}
+    vectorizer.idf_ = idf
+    return vectorizer
+
+
+def save_tfidf_vectorizer(
+    vectorizer: TfidfVectorizer,
+    fingerprint: str,
+    artifact_name: str = DEFAULT_ARTIFACT_NAME,
+    cache: Optional["elasticsearch_manager.ElasticsearchEmbeddingsCache"] = None,
+) -> bool:
+    """
+    Persiste o TfidfVectorizer ajustado no cache do Elasticsearch.
+
+    Args:
+        vectorizer: TfidfVectorizer já ajustado
+        fingerprint: Fingerprint do corpus usado no ajuste
+        artifact_name: Nome do artefato
+        cache: Gerenciador de cache (padrão: instância global)
+
+    Returns:
+        bool: True se salvo com sucesso
+    """
+    cache = cache if cache is not None else elasticsearch_manager.cache_manager
+    payload, params = serialize_tfidf_vectorizer(vectorizer)
+    return cache.save_artifact(artifact_name, ARTIFACT_TYPE, payload, params, fingerprint)
+
+
+def load_tfidf_vectorizer(
+    fingerprint: Optional[str] = None,
+    artifact_name: str = DEFAULT_ARTIFACT_NAME,
+    expected_params: Optional[Dict[str, Any]] = None,
+    cache: Optional["elasticsearch_manager.ElasticsearchEmbeddingsCache"] = None,
+) -> Optional[TfidfVectorizer]:
+    """
+    Restaura o TfidfVectorizer ajustado do cache do Elasticsearch.
+
+    Args:
+        fingerprint: Se informado, exige que o corpus seja o mesmo do ajuste
+        artifact_name: Nome do artefato
+        expected_params: Se informado, exige que esses parâmetros coincidam
+            (ex: {"max_features": 4096, "ngram_range": [1, 2]})
+        cache: Gerenciador de cache (padrão: instância global)
+
+    Returns:
+        TfidfVectorizer ou None se ausente/desatualizado
+    """
+    cache = cache if cache is not None else elasticsearch_manager.cache_manager
+    artifact = cache.load_artifact(artifact_name, fingerprint)
+    if artifact is None:
+        return None
+
+    if expected_params:
+        stored = artifact["params"]
+        for name, value in expected_params.items():
+            value = list(value) if isinstance(value, tuple) else value
+            if stored.get(name) != value:
+                print(
+                    f"⚠️  Artefato '{artifact_name}' com parâmetro diferente: "
+                    f"{name}={stored.get(name)!r} (esperado {value!r})"
+                )
+                return None
+
+    return deserialize_tfidf_vectorizer(artifact["payload"], artifact["params"])
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Contagem de Tokens e Truncamento com Cache
+==========================================
+
+O Notebook 3 rodava ``encoding.encode`` texto a texto via
+``DataFrame.apply`` para truncar, e depois contava tokens de novo para
+estatísticas e para montar os batches.
+
+Aqui os textos são tokenizados UMA vez, em lotes distribuídos entre
+threads (``encode_ordinary_batch`` — o tiktoken libera o GIL), e para cada
+texto são guardados:
+
+- o número de tokens
+- o offset (em caracteres) onde o texto deve ser cortado para caber em
+  ``max_tokens``
+
+Esses valores ficam num cache em disco indexado pelo hash MD5 do texto (o
+mesmo ``text_hash`` do Elasticsearch). Numa re-execução nenhum texto é
+tokenizado de novo; os mesmos números alimentam o truncamento e o
+``pack_batches``.
+
+``count_tokens`` é o atalho usado pelo ``AsyncEmbeddingClient`` e pelo
+``pack_batches`` quando nenhuma contagem é informada: um ``TokenAccountant``
+por modelo, reaproveitado entre chamadas, com o mesmo cache em disco.
+
+Configuração (config_example.env):
+
+    TOKEN_CACHE_DIR=    # Vazio = results/token_cache
+
+Exemplo:
+    >>> from token_accounting import TokenAccountant
+    >>> accountant = TokenAccountant(max_tokens=8000)
+    >>> stats = accountant.analyze(df['text'].tolist())
+    >>> df['text_safe'] = stats.truncate(df['text'].tolist())
+    >>> plan = pack_batches(df['text_safe'].tolist(), token_counts=stats.truncated_counts)
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "results" / "token_cache"
+DEFAULT_MODEL = "text-embedding-3-small"
+
+# Textos por chamada de encode_ordinary_batch
+DEFAULT_BATCH_SIZE = 1000
+
+
+def text_hash(text: str) -> str:
+    """Hash MD5 do texto (mesmo ``text_hash`` usado no Elasticsearch)"""
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class TokenStats:
+    """Contagens de tokens e offsets de truncamento de um corpus"""
+
+    counts: np.ndarray
+    char_offsets: np.ndarray
+    max_tokens: int
+    cache_hits: int = 0
+
+    @property
+    def truncated_mask(self) -> np.ndarray:
+        """Textos acima de ``max_tokens``"""
+        return self.counts > self.max_tokens
+
+    @property
+    def truncated_counts(self) -> np.ndarray:
+        """Tokens de cada texto após o truncamento"""
+        return np.minimum(self.counts, self.max_tokens)
+
+    def truncate(self, texts: Sequence[str]) -> List[str]:
+        """
+        Trunca os textos nos offsets calculados (sem re-tokenizar).
+
+        Args:
+            texts: Os mesmos textos passados a ``TokenAccountant.analyze``
+
+        Returns:
+            Lista de textos com no máximo ``max_tokens`` tokens
+        """
+        return [
+            text if not cut else text[:offset]
+            for text, offset, cut in zip(texts, self.char_offsets, self.truncated_mask)
+        ]
+
+
+class TokenAccountant:
+    """Tokeniza em paralelo e guarda contagens/offsets em cache no disco"""
+
+    def __init__(
+        self,
+        encoding=None,
+        model: str = DEFAULT_MODEL,
+        max_tokens: int = 8000,
+        cache_dir: Optional[Path] = None,
+        n_threads: Optional[int] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        """
+        Args:
+            encoding: ``tiktoken.Encoding`` (padrão: encoding do ``model``)
+            model: Modelo de embeddings (usado se ``encoding`` não for informado)
+            max_tokens: Limite de tokens por texto
+            cache_dir: Diretório do cache (padrão: TOKEN_CACHE_DIR ou results/token_cache;
+                ``False`` desativa o cache)
+            n_threads: Threads de tokenização (padrão: núcleos disponíveis)
+            batch_size: Textos por chamada a ``encode_ordinary_batch``
+        """
+        if encoding is None:
+            import tiktoken
+
+            encoding = tiktoken.encoding_for_model(model)
+
+        self.encoding = encoding
+        self.max_tokens = max_tokens
+        self.n_threads = n_threads or os.cpu_count() or 1
+        self.batch_size = batch_size
+
+        if cache_dir is False:
+            self.cache_path = None
+        else:
+            cache_dir = Path(cache_dir or os.getenv("TOKEN_CACHE_DIR") or DEFAULT_CACHE_DIR)
+            self.cache_path = cache_dir / f"{encoding.name}_{max_tokens}.npz"
+
+        self._cache: Optional[Dict[str, Tuple[int, int]]] = None
+
+    # ------------------------------------------------------------------
+    # Cache em disco
+    # ------------------------------------------------------------------
+
+    def _load_cache(self) -> Dict[str, Tuple[int, int]]:
+        if self._cache is not None:
+            return self._cache
+
+        self._cache = {}
+        if self.cache_path is not None and self.cache_path.exists():
+            try:
+                with np.load(self.cache_path, allow_pickle=False) as data:
+                    self._cache = dict(
+                        zip(
+                            data["hashes"].tolist(),
+                            zip(data["counts"].tolist(), data["offsets"].tolist()),
+                        )
+                    )
+            except (OSError, KeyError, ValueError) as e:
+                print(f"⚠️  Cache de tokens ilegível, recriando: {e}")
+        return self._cache
+
+    def _save_cache(self) -> None:
+        if self.cache_path is None or not self._cache:
+            return
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        hashes = list(self._cache)
+        values = np.asarray([self._cache[h] for h in hashes], dtype=np.int64)
+        tmp_path = self.cache_path.with_name(self.cache_path.stem + ".tmp.npz")
+        np.savez(
+            tmp_path,
+            hashes=np.asarray(hashes, dtype="U32"),
+            counts=values[:, 0],
+            offsets=values[:, 1],
+        )
+        os.replace(tmp_path, self.cache_path)
+
+    # ------------------------------------------------------------------
+    # Tokenização
+    # ------------------------------------------------------------------
+
+    def _truncation_offset(self, tokens: Sequence[int]) -> int:
+        """Caracteres do prefixo que corresponde aos primeiros ``max_tokens`` tokens"""
+        prefix = self.encoding.decode_bytes(tokens[: self.max_tokens])
+        # Um caractere multibyte cortado ao meio fica de fora
+        return len(prefix.decode("utf-8", errors="ignore"))
+
+    def _tokenize(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        counts = np.empty(len(texts), dtype=np.int64)
+        offsets = np.empty(len(texts), dtype=np.int64)
+
+        for start in range(0, len(texts), self.batch_size):
+            chunk = list(texts[start:start + self.batch_size])
+            encoded = self.encoding.encode_ordinary_batch(chunk, num_threads=self.n_threads)
+            for i, (text, tokens) in enumerate(zip(chunk, encoded)):
+                counts[start + i] = len(tokens)
+                offsets[start + i] = (
+                    self._truncation_offset(tokens) if len(tokens) > self.max_tokens else len(text)
+                )
+        return counts, offsets
+
+    def analyze(self, texts: Sequence[str], verbose: bool = True) -> TokenStats:
+        """
+        Conta tokens e calcula offsets de truncamento (usando o cache).
+
+        Args:
+            texts: Lista de textos
+            verbose: Se True, mostra acertos de cache
+
+        Returns:
+            TokenStats alinhado com ``texts``
+        """
+        texts = list(texts)
+        cache = self._load_cache()
+        hashes = [text_hash(text) for text in texts]
+
+        counts = np.empty(len(texts), dtype=np.int64)
+        offsets = np.empty(len(texts), dtype=np.int64)
+        missing_rows: List[int] = []
+        for row, h in enumerate(hashes):
+            cached = cache.get(h)
+            if cached is None:
+                missing_rows.append(row)
+            else:
+                counts[row], offsets[row] = cached
+
+        # Textos repetidos são tokenizados uma única vez
+        unique_missing: Dict[str, int] = {}
+        for row in missing_rows:
+            unique_missing.setdefault(hashes[row], row)
+
+        if unique_missing:
+            rows = list(unique_missing.values())
+            new_counts, new_offsets = self._tokenize([texts[row] for row in rows])
+            for row, count, offset in zip(rows, new_counts.tolist(), new_offsets.tolist()):
+                cache[hashes[row]] = (count, offset)
+            for row in missing_rows:
+                counts[row], offsets[row] = cache[hashes[row]]
+            self._save_cache()
+
+        cache_hits = len(texts) - len(missing_rows)
+        if verbose:
+            print(f"🔢 Tokens contados: {len(texts):,} textos | cache: {cache_hits:,} | "
+                  f"tokenizados: {len(unique_missing):,} ({self.n_threads} threads)")
+
+        return TokenStats(
+            counts=counts, char_offsets=offsets, max_tokens=self.max_tokens, cache_hits=cache_hits
+        )
+
+
+# Um TokenAccountant por modelo para count_tokens (cache em memória e em disco)
+_accountants: Dict[str, TokenAccountant] = {}
+_accountants_lock = threading.Lock()
+
+
+def count_tokens(texts: Sequence[str], model: str = DEFAULT_MODEL) -> List[int]:
+    """
+    Conta tokens de cada texto (tiktoken; estimativa chars/4 se indisponível).
+
+    Args:
+        texts: Lista de textos
+        model: Modelo de embeddings (define o encoding)
+
+    Returns:
+        Lista com a contagem de tokens de cada texto
+    """
+    with _accountants_lock:
+        accountant = _accountants.get(model)
+        if accountant is None:
+            try:
+                accountant = TokenAccountant(model=model)
+            except Exception:
+                # tiktoken ausente ou encoding não baixado (sem rede)
+                return [max(1, len(text) // 4) for text in texts]
+            _accountants[model] = accountant
+        return accountant.analyze(texts, verbose=False).counts.tolist()
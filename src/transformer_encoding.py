@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Encoding com Batches por Orçamento de Tokens
+============================================
+
+Wrapper para ``SentenceTransformer.encode`` que reduz o padding.
+
+O Notebook 2 codificava BERT e SBERT com ``batch_size=32`` fixo. No
+20 Newsgroups o tamanho dos textos varia de poucas palavras a dezenas de
+milhares de caracteres: num batch de tamanho fixo, o texto mais longo dita o
+comprimento de todos (padding) e textos curtos ocupam batches inteiros.
+
+Este módulo:
+
+1. Mede o comprimento REAL em tokens de cada texto (tokenizer rápido do
+   modelo, já truncado em ``max_seq_length``)
+2. Ordena por comprimento (decrescente) — textos parecidos ficam juntos
+3. Forma batches sob um orçamento de tokens com padding
+   (``len(batch) × maior_texto_do_batch ≤ max_tokens_per_batch``): muitos
+   textos curtos por batch, poucos textos longos
+4. Restaura a ordem original na saída
+
+Configuração (config_example.env):
+
+    EMBEDDING_BATCH_SIZE=32              # Define o orçamento padrão:
+                                         # 32 × max_seq_length tokens por batch
+    EMBEDDING_MAX_TOKENS_PER_BATCH=      # (opcional) orçamento explícito
+
+Exemplo:
+    >>> from sentence_transformers import SentenceTransformer
+    >>> from transformer_encoding import TokenBudgetEncoder
+    >>> model = SentenceTransformer('all-MiniLM-L6-v2')
+    >>> embeddings = TokenBudgetEncoder(model).encode(df['text'].tolist())
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import os
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 32))
+
+# Limite de textos por batch (evita batches gigantes de textos vazios)
+MAX_TEXTS_PER_BATCH_FACTOR = 8
+
+# Tamanho dos lotes usados apenas para medir comprimentos com o tokenizer
+_LENGTH_CHUNK_SIZE = 1024
+
+
+def make_token_budget_batches(
+    lengths: Sequence[int], max_tokens_per_batch: int, max_batch_size: int
+) -> List[np.ndarray]:
+    """
+    Agrupa índices de textos em batches sob um orçamento de tokens com padding.
+
+    Os textos são ordenados por comprimento decrescente; como o primeiro texto
+    de cada batch é o mais longo, o custo com padding é
+    ``len(batch) × lengths[batch[0]]``.
+
+    Args:
+        lengths: Comprimento em tokens de cada texto
+        max_tokens_per_batch: Orçamento de tokens (com padding) por batch
+        max_batch_size: Número máximo de textos por batch
+
+    Returns:
+        Lista de arrays de índices (na ordem original dos textos)
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    order = np.argsort(-lengths, kind="stable")
+
+    batches: List[np.ndarray] = []
+    start = 0
+    while start < len(order):
+        longest = max(int(lengths[order[start]]), 1)
+        size = max(1, min(max_batch_size, max_tokens_per_batch // longest))
+        batches.append(order[start:start + size])
+        start += size
+    return batches
+
+
+class TokenBudgetEncoder:
+    """
+    Codifica textos com um SentenceTransformer usando batches ordenados por
+    comprimento e limitados por orçamento de tokens.
+    """
+
+    def __init__(
+        self,
+        model,
+        batch_size: Optional[int] = None,
+        max_tokens_per_batch: Optional[int] = None,
+        max_batch_size: Optional[int] = None,
+    ):
+        """
+        Args:
+            model: SentenceTransformer já carregado
+            batch_size: Batch de referência (padrão: EMBEDDING_BATCH_SIZE)
+            max_tokens_per_batch: Orçamento de tokens com padding por batch
+                (padrão: EMBEDDING_MAX_TOKENS_PER_BATCH ou batch_size × max_seq_length)
+            max_batch_size: Máximo de textos por batch
+                (padrão: batch_size × MAX_TEXTS_PER_BATCH_FACTOR)
+        """
+        self.model = model
+        self.batch_size = batch_size or EMBEDDING_BATCH_SIZE
+        self.max_seq_length = int(getattr(model, "max_seq_length", None) or 512)
+
+        env_budget = os.getenv("EMBEDDING_MAX_TOKENS_PER_BATCH")
+        self.max_tokens_per_batch = (
+            max_tokens_per_batch
+            or (int(env_budget) if env_budget else None)
+            or self.batch_size * self.max_seq_length
+        )
+        self.max_batch_size = max_batch_size or self.batch_size * MAX_TEXTS_PER_BATCH_FACTOR
+
+    def token_lengths(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Comprimento em tokens (com tokens especiais, truncado em max_seq_length)
+
+        Args:
+            texts: Lista de textos
+
+        Returns:
+            np.ndarray (n_textos,) int64
+        """
+        tokenizer = self.model.tokenizer
+        lengths = np.empty(len(texts), dtype=np.int64)
+
+        for start in range(0, len(texts), _LENGTH_CHUNK_SIZE):
+            chunk = list(texts[start:start + _LENGTH_CHUNK_SIZE])
+            encoded = tokenizer(
+                chunk,
+                add_special_tokens=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+            )
+            lengths[start:start + len(chunk)] = [len(ids) for ids in encoded["input_ids"]]
+
+        return lengths
+
+    def make_batches(self, texts: Sequence[str]) -> List[np.ndarray]:
+        """Batches de índices ordenados por comprimento sob o orçamento de tokens"""
+        return make_token_budget_batches(
+            self.token_lengths(texts), self.max_tokens_per_batch, self.max_batch_size
+        )
+
+    def encode(
+        self,
+        texts: Sequence[str],
+        show_progress_bar: bool = False,
+        normalize_embeddings: bool = False,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Gera embeddings float32 na ordem original dos textos.
+
+        Args:
+            texts: Lista de textos
+            show_progress_bar: Se True, mostra barra de progresso (tqdm) por batch
+            normalize_embeddings: Se True, normaliza os vetores (norma L2)
+            out: Buffer pré-alocado (len(texts), dim) float32 (opcional)
+
+        Returns:
+            np.ndarray (n_textos, dim) float32
+        """
+        texts = list(texts)
+        batches = self.make_batches(texts)
+
+        if out is None:
+            dim = self.model.get_sentence_embedding_dimension()
+            out = np.empty((len(texts), dim), dtype=np.float32)
+
+        iterator = batches
+        if show_progress_bar:
+            from tqdm.auto import tqdm
+
+            iterator = tqdm(batches, desc="Batches", unit="batch")
+
+        for batch in iterator:
+            embeddings = self.model.encode(
+                [texts[i] for i in batch],
+                batch_size=len(batch),
+                convert_to_numpy=True,
+                normalize_embeddings=normalize_embeddings,
+                show_progress_bar=False,
+            )
+            out[batch] = embeddings
+
+        return out
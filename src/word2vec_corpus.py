@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Corpus de Treino do Word2Vec em Streaming
+=========================================
+
+O Notebook 2 materializava ``tokenized_texts`` — o corpus inteiro como listas
+Python de strings — antes de treinar o Word2Vec com ``workers=4``. Além da
+memória (dezenas de bytes por token), o iterável Python é consumido por uma
+única thread presa ao GIL, que não alimenta os workers do gensim rápido o
+bastante.
+
+Duas alternativas:
+
+1. ``ElasticsearchSentences``: iterável reiniciável que lê e tokeniza os
+   documentos de ``documents_dataset`` em lotes (Scroll API). Cada passada
+   do gensim (vocabulário + épocas) abre um novo scroll; a memória é a de
+   um lote.
+
+2. ``write_corpus_file``: grava o corpus tokenizado em formato LineSentence
+   (um documento por linha, tokens separados por espaço). No modo
+   ``corpus_file`` o gensim lê o arquivo em Cython, cada worker num trecho,
+   sem GIL — o treino escala com todos os núcleos.
+
+``train_word2vec`` treina em qualquer dos modos e reporta palavras/s; o
+comparativo com o modo em memória está em
+``python src/setup/benchmark_performance.py word2vec``.
+
+Observação: o gensim corta linhas com mais de 10.000 tokens no modo
+``corpus_file`` (o mesmo limite se aplica a sentenças em memória).
+
+Exemplo:
+    >>> from word2vec_corpus import write_corpus_file, train_word2vec
+    >>> corpus_path = write_corpus_file(df['text'])
+    >>> model, stats = train_word2vec(corpus_file=corpus_path, vector_size=100)
+    >>> stats["words_per_second"]
+
+Autor: Sistema de Embeddings e Clustering
+Data: 2025-10
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from word2vec_pooling import tokenize
+
+if TYPE_CHECKING:
+    from gensim.models import Word2Vec
+
+DEFAULT_CORPUS_PATH = (
+    Path(__file__).resolve().parent.parent / "results" / "models" / "word2vec_corpus.txt"
+)
+
+
+class ElasticsearchSentences:
+    """
+    Sentenças tokenizadas lidas do Elasticsearch em lotes.
+
+    Reiniciável: cada ``iter()`` abre um novo scroll, como o gensim exige para
+    construir o vocabulário e percorrer várias épocas.
+    """
+
+    def __init__(
+        self,
+        es_client,
+        index_name: str = "documents_dataset",
+        batch_size: int = 1000,
+    ):
+        self.es_client = es_client
+        self.index_name = index_name
+        self.batch_size = batch_size
+
+    def __iter__(self) -> Iterator[List[str]]:
+        from elasticsearch_helpers import iter_document_batches
+
+        for batch in iter_document_batches(
+            self.es_client, self.index_name, batch_size=self.batch_size, fields=("text",)
+        ):
+            for text in batch["text"]:
+                yield tokenize(text)
+
+
+def write_corpus_file(
+    texts: Iterable[str],
+    path: Optional[Path] = None,
+) -> Path:
+    """
+    Grava textos tokenizados em formato LineSentence.
+
+    Args:
+        texts: Textos (qualquer iterável, inclusive ``ElasticsearchSentences``
+            já tokenizado — listas de tokens também são aceitas)
+        path: Arquivo de saída (padrão: results/models/word2vec_corpus.txt)
+
+    Returns:
+        Path do arquivo gravado
+    """
+    path = Path(path or DEFAULT_CORPUS_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Grava num temporário e renomeia: um treino concorrente nunca lê arquivo pela metade
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as corpus:
+        for text in texts:
+            tokens = text if isinstance(text, list) else tokenize(text)
+            corpus.write(" ".join(tokens))
+            corpus.write("\n")
+    os.replace(tmp_name, path)
+    return path
+
+
+def spill_corpus_from_elasticsearch(
+    es_client,
+    path: Optional[Path] = None,
+    index_name: str = "documents_dataset",
+    batch_size: int = 1000,
+) -> Path:
+    """Grava o corpus LineSentence direto do Elasticsearch (memória de um lote)"""
+    return write_corpus_file(ElasticsearchSentences(es_client, index_name, batch_size), path)
+
+
+def train_word2vec(
+    sentences: Optional[Iterable[List[str]]] = None,
+    corpus_file: Optional[Path] = None,
+    workers: Optional[int] = None,
+    verbose: bool = True,
+    **params: Any,
+) -> Tuple["Word2Vec", Dict[str, float]]:
+    """
+    Treina um Word2Vec a partir de sentenças (iterável) ou de um corpus_file.
+
+    Args:
+        sentences: Iterável reiniciável de listas de tokens
+        corpus_file: Arquivo LineSentence (escala com ``workers`` sem GIL)
+        workers: Threads de treino (padrão: todos os núcleos)
+        verbose: Imprime o throughput
+        **params: Demais parâmetros do Word2Vec (vector_size, window, min_count,
+            epochs, seed, ...)
+
+    Returns:
+        Tuple[modelo, estatísticas]: estatísticas com ``seconds``, ``words``
+        (palavras efetivamente treinadas) e ``words_per_second``
+    """
+    from gensim.models import Word2Vec
+
+    if (sentences is None) == (corpus_file is None):
+        raise ValueError("Informe exatamente um de 'sentences' ou 'corpus_file'")
+
+    workers = workers or os.cpu_count() or 1
+    source = {"corpus_file": str(corpus_file)} if corpus_file else {"corpus_iterable": sentences}
+
+    model = Word2Vec(workers=workers, **params)
+    model.build_vocab(**source)
+
+    start = time.perf_counter()
+    trained_words, _ = model.train(
+        **source,
+        total_examples=model.corpus_count,
+        total_words=model.corpus_total_words,
+        epochs=model.epochs,
+    )
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        "seconds": elapsed,
+        "words": float(trained_words),
+        "words_per_second": trained_words / elapsed if elapsed > 0 else 0.0,
+    }
+    if verbose:
+        mode = "corpus_file" if corpus_file else "iterável"
+        print(
+            f"✅ Word2Vec ({mode}, {workers} workers): {elapsed:.1f}s, "
+            f"{stats['words_per_second']:,.0f} palavras/s"
+        )
+    return model, stats